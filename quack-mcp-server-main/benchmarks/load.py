@@ -0,0 +1,776 @@
+#!/usr/bin/env python3
+"""
+Load-generation benchmark for the Quack MCP server.
+
+Starts ``quack.py`` over stdio and/or SSE, drives it with concurrent MCP
+clients that submit code from a corpus (``tests/examples`` plus synthetic
+modules of 10 to 50,000 lines) and wait for the results, and reports
+throughput, end-to-end latency percentiles and server memory.
+
+Over stdio a server serves a single session, so the clients share one
+session and issue their requests concurrently on it; over SSE every client
+opens a session of its own. Each submission gets a unique trailing comment,
+so the result cache never answers it (see ``--allow-cache``).
+
+Example::
+
+    python benchmarks/load.py --transport stdio sse --clients 8 --jobs 10 \\
+        --output baseline.json
+    python benchmarks/load.py --clients 8 --jobs 10 --compare baseline.json
+
+The JSON report written with ``--output`` serves as a baseline for
+``--compare`` in a later run, e.g. on another commit.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import datetime
+import json
+import os
+import platform
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+# Directory containing quack.py
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Line counts of the synthetic modules in the default corpus
+DEFAULT_SIZES = (10, 100, 1000, 10000, 50000)
+
+# Statuses in which a job has finished
+TERMINAL_STATUSES = {"completed", "failed", "cancelled", "timed_out"}
+
+# Seconds between samples of the server's memory
+RSS_SAMPLE_INTERVAL = 0.25
+
+# Metrics compared between runs, and whether a higher value is better
+COMPARED_METRICS = (
+    ("throughput", True),
+    ("latency.p50", False),
+    ("latency.p95", False),
+    ("latency.p99", False),
+    ("server_rss_kb.peak", False),
+)
+
+
+@dataclass
+class CorpusFile:
+    """A module submitted by the benchmark clients"""
+    name: str
+    code: str
+
+    @property
+    def lines(self) -> int:
+        """Number of lines in the module"""
+        return self.code.count("\n")
+
+
+@dataclass
+class Sample:
+    """Outcome of one submission"""
+    job_type: str
+    file: str
+    status: str
+    latency: float
+    rejections: int = 0
+    execution_time: Optional[float] = None
+    queue_wait_time: Optional[float] = None
+
+
+@dataclass
+class RunResult:
+    """Samples and memory readings of one benchmark run"""
+    transport: str
+    samples: List[Sample] = field(default_factory=list)
+    duration: float = 0.0
+    server_rss_kb: List[int] = field(default_factory=list)
+    tree_rss_kb: List[int] = field(default_factory=list)
+
+
+def synthetic_module(lines: int) -> str:
+    """
+    Generate a valid module of exactly the given number of lines
+
+    The module repeats a block with a typed function, an unused variable
+    for pylint to report and a test for the function, and is padded with
+    constants to the requested length.
+
+    Args:
+        lines: Number of lines
+
+    Returns:
+        Module source
+    """
+    source = ['"""Synthetic module for load testing."""', "import os"]
+    index = 0
+    while True:
+        factor = index % 7 + 1
+        block = [
+            "",
+            "",
+            f"def compute_{index}(values: list, factor: int = {factor}) -> int:",
+            '    """Scale and sum values."""',
+            "    unused = os.sep",
+            "    total = 0",
+            "    for value in values:",
+            "        total += value * factor",
+            "    return total",
+            "",
+            "",
+            f"def test_compute_{index}():",
+            f'    """Check compute_{index}."""',
+            f"    assert compute_{index}([1, 2]) == {3 * factor}",
+        ]
+        if len(source) + len(block) > lines:
+            break
+        source.extend(block)
+        index += 1
+    source.extend(f"CONSTANT_{i} = {i}" for i in range(max(0, lines - len(source))))
+    return "\n".join(source[:max(lines, 1)]) + "\n"
+
+
+def build_corpus(sizes: Sequence[int], examples: bool = True) -> List[CorpusFile]:
+    """
+    Build the benchmark corpus
+
+    Args:
+        sizes: Line counts of the synthetic modules
+        examples: Include the modules in ``tests/examples``
+
+    Returns:
+        Corpus files
+    """
+    corpus = []
+    if examples:
+        for path in sorted((PROJECT_ROOT / "tests" / "examples").glob("*.py")):
+            code = path.read_text(encoding="utf-8")
+            if code.strip():
+                corpus.append(CorpusFile(f"examples/{path.name}", code))
+    corpus.extend(CorpusFile(f"synthetic_{size}.py", synthetic_module(size)) for size in sizes)
+    return corpus
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Compute a percentile with linear interpolation between closest ranks
+
+    Args:
+        values: Observed values
+        q: Percentile between 0 and 100
+
+    Returns:
+        The percentile, or 0.0 for no values
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def latency_summary(latencies: Sequence[float]) -> Dict[str, float]:
+    """
+    Summarise end-to-end latencies
+
+    Args:
+        latencies: Latencies in seconds
+
+    Returns:
+        Mean, p50, p95, p99 and maximum, in seconds
+    """
+    return {
+        "mean": round(sum(latencies) / len(latencies), 4) if latencies else 0.0,
+        "p50": round(percentile(latencies, 50), 4),
+        "p95": round(percentile(latencies, 95), 4),
+        "p99": round(percentile(latencies, 99), 4),
+        "max": round(max(latencies), 4) if latencies else 0.0,
+    }
+
+
+def summarize(run: RunResult) -> Dict[str, Any]:
+    """
+    Summarise a benchmark run
+
+    Args:
+        run: The run
+
+    Returns:
+        Dictionary with counts, throughput, latency percentiles overall and
+        per job type and corpus file, and server memory
+    """
+    def group(key: str) -> Dict[str, Any]:
+        groups: Dict[str, List[Sample]] = {}
+        for sample in run.samples:
+            groups.setdefault(getattr(sample, key), []).append(sample)
+        return {
+            name: {"jobs": len(samples), "latency": latency_summary([sample.latency for sample in samples])}
+            for name, samples in sorted(groups.items())
+        }
+
+    statuses: Dict[str, int] = {}
+    for sample in run.samples:
+        statuses[sample.status] = statuses.get(sample.status, 0) + 1
+    return {
+        "jobs": len(run.samples),
+        "statuses": statuses,
+        "rejections": sum(sample.rejections for sample in run.samples),
+        "duration": round(run.duration, 3),
+        "throughput": round(len(run.samples) / run.duration, 3) if run.duration else 0.0,
+        "latency": latency_summary([sample.latency for sample in run.samples]),
+        "by_job_type": group("job_type"),
+        "by_file": group("file"),
+        "server_rss_kb": {
+            "peak": max(run.server_rss_kb, default=None),
+            "final": run.server_rss_kb[-1] if run.server_rss_kb else None
+        },
+        "tree_rss_kb": {
+            "peak": max(run.tree_rss_kb, default=None),
+            "final": run.tree_rss_kb[-1] if run.tree_rss_kb else None
+        },
+    }
+
+
+def _rss_kb(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            return next((int(line.split()[1]) for line in f if line.startswith("VmRSS:")), None)
+    except (OSError, ValueError):
+        return None
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for entry in os.listdir("/proc") if os.path.isdir("/proc") else []:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="utf-8") as f:
+                parent = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if parent == pid:
+            children.append(int(entry))
+    return children
+
+
+def process_tree_rss_kb(pid: int) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Measure the resident memory of a process and of its process tree
+
+    Worker processes are children of the server and are counted in the
+    tree; mypy daemons detach from the server and are not.
+
+    Args:
+        pid: Process ID of the server
+
+    Returns:
+        Tuple of (RSS of the process, RSS of the process and its
+        descendants) in kilobytes, or Nones where /proc is not available
+    """
+    own = _rss_kb(pid)
+    if own is None:
+        return None, None
+    total = own
+    pending = _children(pid)
+    while pending:
+        child = pending.pop()
+        total += _rss_kb(child) or 0
+        pending.extend(_children(child))
+    return own, total
+
+
+async def sample_rss(pid: int, run: RunResult) -> None:
+    """
+    Record the server's memory until cancelled
+
+    Args:
+        pid: Process ID of the server
+        run: Run to record the readings in
+    """
+    while True:
+        own, total = process_tree_rss_kb(pid)
+        if own is not None:
+            run.server_rss_kb.append(own)
+            run.tree_rss_kb.append(total)
+        await asyncio.sleep(RSS_SAMPLE_INTERVAL)
+
+
+def _tool_result(result: Any) -> Dict[str, Any]:
+    if result.isError:
+        raise RuntimeError(f"Tool call failed: {result.content[0].text if result.content else 'no content'}")
+    return json.loads(result.content[0].text)
+
+
+async def submit_and_wait(
+    session: Any,
+    job_type: str,
+    corpus_file: CorpusFile,
+    wait_mode: str,
+    poll_interval: float,
+    allow_cache: bool
+) -> Sample:
+    """
+    Submit one file and wait until its job has finished
+
+    Args:
+        session: Initialised MCP client session
+        job_type: Job type to submit
+        corpus_file: File to submit
+        wait_mode: "wait" to long-poll with ``wait_for_jobs``, or "poll" to
+            call ``get_job_results`` every ``poll_interval`` seconds
+        poll_interval: Seconds between polls
+        allow_cache: Submit the code unchanged, so repeated submissions may
+            be answered from the result cache
+
+    Returns:
+        Outcome of the submission
+    """
+    code = corpus_file.code if allow_cache else f"{corpus_file.code}# quack-bench {uuid.uuid4().hex}\n"
+    started = time.perf_counter()
+    rejections = 0
+    while True:
+        submitted = _tool_result(await session.call_tool("submit_code", {"job_type": job_type, "code": code}))
+        if submitted.get("status") != "rejected":
+            break
+        rejections += 1
+        await asyncio.sleep(submitted.get("retry_after") or 0.1)
+    if "job_id" not in submitted:
+        return Sample(job_type, corpus_file.name, "error", time.perf_counter() - started, rejections)
+
+    job_id = submitted["job_id"]
+    while True:
+        if wait_mode == "wait":
+            waited = _tool_result(await session.call_tool("wait_for_jobs", {"job_ids": [job_id], "timeout": 60}))
+            response = waited["jobs"][job_id]
+        else:
+            response = _tool_result(await session.call_tool("get_job_results", {"job_id": job_id}))
+        if response.get("status") in TERMINAL_STATUSES or response.get("status") == "error":
+            break
+        if wait_mode == "poll":
+            await asyncio.sleep(poll_interval)
+    return Sample(
+        job_type, corpus_file.name, response["status"], time.perf_counter() - started, rejections,
+        response.get("execution_time"), response.get("queue_wait_time")
+    )
+
+
+async def run_client(
+    session: Any,
+    client_id: int,
+    corpus: Sequence[CorpusFile],
+    job_types: Sequence[str],
+    jobs: int,
+    args: argparse.Namespace,
+    run: RunResult
+) -> None:
+    """
+    Submit jobs one after another, cycling through the corpus and job types
+
+    Args:
+        session: Initialised MCP client session
+        client_id: Index of the client, which staggers its position in the corpus
+        corpus: Files to submit
+        job_types: Job types to submit
+        jobs: Number of jobs to submit
+        args: Command line arguments
+        run: Run to record the samples in
+    """
+    for n in range(jobs):
+        position = client_id + n
+        corpus_file = corpus[position % len(corpus)]
+        job_type = job_types[(position // len(corpus)) % len(job_types)]
+        run.samples.append(await submit_and_wait(
+            session, job_type, corpus_file, args.wait_mode, args.poll_interval, args.allow_cache
+        ))
+
+
+async def warm_up(session: Any, job_types: Sequence[str], args: argparse.Namespace) -> None:
+    """
+    Run one small job per job type, so workers and daemons are started
+
+    Args:
+        session: Initialised MCP client session
+        job_types: Job types to warm up
+        args: Command line arguments
+    """
+    warmup_file = CorpusFile("warmup.py", synthetic_module(20))
+    for _ in range(args.warmup):
+        await asyncio.gather(*(
+            submit_and_wait(session, job_type, warmup_file, "wait", args.poll_interval, False)
+            for job_type in job_types
+        ))
+
+
+def _server_environment(workdir: str) -> Dict[str, str]:
+    # A private temporary directory keeps the job database and caches of
+    # the benchmarked server apart from those of any other server
+    tmpdir = os.path.join(workdir, "tmp")
+    os.makedirs(tmpdir, exist_ok=True)
+    env = dict(os.environ)
+    env["TMPDIR"] = tmpdir
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(PROJECT_ROOT), env.get("PYTHONPATH")]))
+    return env
+
+
+@contextlib.asynccontextmanager
+async def stdio_sessions(clients: int, workdir: str) -> AsyncIterator[Tuple[List[Any], int]]:
+    """
+    Start a server over stdio and open a session to it
+
+    Args:
+        clients: Number of clients; they all share the one stdio session
+        workdir: Working directory of the server
+
+    Yields:
+        Tuple of (one session per client, process ID of the server)
+    """
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=[str(PROJECT_ROOT / "quack.py")],
+        env=_server_environment(workdir),
+        cwd=workdir
+    )
+    known = set(_children(os.getpid()))
+    with open(os.path.join(workdir, "server.log"), "w", encoding="utf-8") as errlog:
+        async with stdio_client(params, errlog=errlog) as (read, write):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                pids = [pid for pid in _children(os.getpid()) if pid not in known]
+                yield [session] * clients, pids[0] if pids else -1
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.asynccontextmanager
+async def sse_sessions(clients: int, workdir: str) -> AsyncIterator[Tuple[List[Any], int]]:
+    """
+    Start a server over SSE and open one session per client
+
+    Args:
+        clients: Number of client sessions
+        workdir: Working directory of the server
+
+    Yields:
+        Tuple of (one session per client, process ID of the server)
+    """
+    import httpx
+    from mcp import ClientSession
+    from mcp.client.sse import sse_client
+
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    with open(os.path.join(workdir, "server.log"), "w", encoding="utf-8") as errlog:
+        process = subprocess.Popen(
+            [sys.executable, str(PROJECT_ROOT / "quack.py"), "--sse", "--host", "127.0.0.1", "--port", str(port)],
+            stdout=errlog,
+            stderr=errlog,
+            cwd=workdir,
+            env=_server_environment(workdir)
+        )
+        try:
+            # Wait until the server answers
+            async with httpx.AsyncClient() as http:
+                deadline = time.monotonic() + 60
+                while True:
+                    if process.poll() is not None:
+                        raise RuntimeError(f"Server exited with code {process.returncode}, see {errlog.name}")
+                    try:
+                        if (await http.get(f"{url}/metrics")).status_code == 200:
+                            break
+                    except httpx.TransportError:
+                        pass
+                    if time.monotonic() > deadline:
+                        raise RuntimeError("Server did not start within 60 seconds")
+                    await asyncio.sleep(0.2)
+
+            async with contextlib.AsyncExitStack() as stack:
+                sessions = []
+                for _ in range(clients):
+                    read, write = await stack.enter_async_context(sse_client(f"{url}/sse", sse_read_timeout=600))
+                    session = await stack.enter_async_context(ClientSession(read, write))
+                    await session.initialize()
+                    sessions.append(session)
+                yield sessions, process.pid
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+
+async def run_transport(
+    transport: str,
+    corpus: Sequence[CorpusFile],
+    job_types: Sequence[str],
+    args: argparse.Namespace
+) -> RunResult:
+    """
+    Benchmark the server over one transport
+
+    Args:
+        transport: "stdio" or "sse"
+        corpus: Files to submit
+        job_types: Job types to submit
+        args: Command line arguments
+
+    Returns:
+        The run's samples and memory readings
+    """
+    run = RunResult(transport)
+    workdir = tempfile.mkdtemp(prefix=f"quack-bench-{transport}-")
+    open_sessions = stdio_sessions if transport == "stdio" else sse_sessions
+    try:
+        async with open_sessions(args.clients, workdir) as (sessions, pid):
+            await warm_up(sessions[0], job_types, args)
+            sampler = asyncio.create_task(sample_rss(pid, run))
+            started = time.perf_counter()
+            try:
+                await asyncio.gather(*(
+                    run_client(session, client_id, corpus, job_types, args.jobs, args, run)
+                    for client_id, session in enumerate(sessions)
+                ))
+            finally:
+                run.duration = time.perf_counter() - started
+                sampler.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await sampler
+    finally:
+        if args.keep_workdir:
+            print(f"[{transport}] Server files kept in {workdir}", file=sys.stderr)
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return run
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=10, check=False
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return result.stdout.strip() or None
+
+
+def build_report(
+    runs: Sequence[RunResult],
+    corpus: Sequence[CorpusFile],
+    job_types: Sequence[str],
+    args: argparse.Namespace
+) -> Dict[str, Any]:
+    """
+    Build the JSON report of a benchmark
+
+    Args:
+        runs: Runs, one per transport
+        corpus: Files submitted
+        job_types: Job types submitted
+        args: Command line arguments
+
+    Returns:
+        Report with the configuration and a summary per transport
+    """
+    return {
+        "schema": 1,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "cpus": os.cpu_count(),
+        "config": {
+            "clients": args.clients,
+            "jobs_per_client": args.jobs,
+            "job_types": list(job_types),
+            "wait_mode": args.wait_mode,
+            "poll_interval": args.poll_interval,
+            "allow_cache": args.allow_cache,
+            "warmup": args.warmup,
+            "corpus": {corpus_file.name: corpus_file.lines for corpus_file in corpus},
+        },
+        "transports": {run.transport: summarize(run) for run in runs},
+    }
+
+
+def _lookup(summary: Dict[str, Any], path: str) -> Optional[float]:
+    value: Any = summary
+    for key in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Compare the headline metrics of two reports
+
+    Args:
+        baseline: Earlier report
+        current: Report of this run
+
+    Returns:
+        One row per transport and metric present in both reports, with the
+        relative change and whether it is a regression (positive
+        ``regression`` is worse, in percent)
+    """
+    rows = []
+    for transport, summary in current["transports"].items():
+        previous = baseline.get("transports", {}).get(transport)
+        if previous is None:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            old = _lookup(previous, metric)
+            new = _lookup(summary, metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old * 100
+            rows.append({
+                "transport": transport,
+                "metric": metric,
+                "baseline": old,
+                "current": new,
+                "change": round(change, 2),
+                "regression": round(-change if higher_is_better else change, 2)
+            })
+    return rows
+
+
+def print_summary(report: Dict[str, Any]) -> None:
+    """
+    Print a human-readable summary of a report
+
+    Args:
+        report: Report built by ``build_report``
+    """
+    for transport, summary in report["transports"].items():
+        latency = summary["latency"]
+        print(f"== {transport}: {summary['jobs']} jobs in {summary['duration']:.2f}s "
+              f"({summary['throughput']:.2f} jobs/s), statuses {summary['statuses']}, "
+              f"{summary['rejections']} rejections")
+        print(f"   latency p50 {latency['p50']:.3f}s  p95 {latency['p95']:.3f}s  "
+              f"p99 {latency['p99']:.3f}s  max {latency['max']:.3f}s")
+        for job_type, stats in summary["by_job_type"].items():
+            print(f"   {job_type:<16} {stats['jobs']:>5} jobs  p50 {stats['latency']['p50']:.3f}s  "
+                  f"p95 {stats['latency']['p95']:.3f}s  p99 {stats['latency']['p99']:.3f}s")
+        if summary["server_rss_kb"]["peak"] is not None:
+            print(f"   server RSS peak {summary['server_rss_kb']['peak'] // 1024} MB, "
+                  f"with workers {summary['tree_rss_kb']['peak'] // 1024} MB")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """
+    Parse command line arguments
+
+    Args:
+        argv: Arguments (default: ``sys.argv[1:]``)
+
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(description="Load-generation benchmark for the Quack MCP server")
+    parser.add_argument("--transport", nargs="+", choices=["stdio", "sse"], default=["stdio", "sse"],
+                        help="Transports to benchmark (default: both)")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent clients (default: 4)")
+    parser.add_argument("--jobs", type=int, default=10, help="Jobs submitted by each client (default: 10)")
+    parser.add_argument("--job-types", nargs="+", default=["lint", "static_analysis"],
+                        help="Job types to submit, in rotation (default: lint static_analysis)")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(DEFAULT_SIZES),
+                        help="Line counts of the synthetic modules (default: 10 100 1000 10000 50000)")
+    parser.add_argument("--no-examples", action="store_true", help="Leave tests/examples out of the corpus")
+    parser.add_argument("--wait-mode", choices=["wait", "poll"], default="wait",
+                        help="Wait for results with wait_for_jobs, or poll get_job_results (default: wait)")
+    parser.add_argument("--poll-interval", type=float, default=0.1,
+                        help="Seconds between polls in poll mode (default: 0.1)")
+    parser.add_argument("--allow-cache", action="store_true",
+                        help="Submit code unchanged, so the result cache may answer repeated files")
+    parser.add_argument("--warmup", type=int, default=1,
+                        help="Warm-up rounds of one job per type before measuring (default: 1)")
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--compare", help="Compare against a JSON report of an earlier run")
+    parser.add_argument("--max-regression", type=float,
+                        help="With --compare, exit with status 1 if a metric regressed by more than this percentage")
+    parser.add_argument("--keep-workdir", action="store_true", help="Keep the servers' working directories and logs")
+    args = parser.parse_args(argv)
+    if args.clients < 1 or args.jobs < 1:
+        parser.error("--clients and --jobs must be at least 1")
+    return args
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Run the benchmark over every requested transport
+
+    Args:
+        args: Command line arguments
+
+    Returns:
+        The JSON report
+    """
+    corpus = build_corpus(args.sizes, examples=not args.no_examples)
+    if not corpus:
+        raise SystemExit("The corpus is empty")
+    runs = []
+    for transport in args.transport:
+        print(f"[{transport}] {args.clients} clients x {args.jobs} jobs over {len(corpus)} files", file=sys.stderr)
+        runs.append(await run_transport(transport, corpus, args.job_types, args))
+    return build_report(runs, corpus, args.job_types, args)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the benchmark from the command line
+
+    Args:
+        argv: Arguments (default: ``sys.argv[1:]``)
+
+    Returns:
+        Exit status
+    """
+    args = parse_args(argv)
+    report = asyncio.run(run_benchmark(args))
+    print_summary(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare_reports(baseline, report)
+        print(f"Compared with {args.compare} (commit {baseline.get('commit') or 'unknown'}):")
+        if baseline.get("config") != report["config"]:
+            print("   Warning: the baseline was run with a different configuration")
+        for row in rows:
+            print(f"   {row['transport']:<6} {row['metric']:<20} {row['baseline']:>12} -> {row['current']:>12} "
+                  f"({row['change']:+.1f}%)")
+        if args.max_regression is not None:
+            regressed = [row for row in rows if row["regression"] > args.max_regression]
+            if regressed:
+                print(f"{len(regressed)} metrics regressed by more than {args.max_regression:g}%")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,8 +6,10 @@ This MCP server provides asynchronous linting and static analysis tools
 for Python code.
 """
 
+import asyncio
 import logging
 import os
+import subprocess
 import sys
 import argparse
 
@@ -30,11 +32,36 @@ except (PermissionError, OSError):
     logger.warning("Could not create log directory. File logging disabled.")
 
 # Import server creation function
-from quack.server import create_server
+import quack.server
+from quack.server import create_server, run_worker, WATCH_PATHS
+from quack.cli import add_arguments as add_analyze_arguments, run as run_analyze
 
 # Create the server at module level with a standard name that MCP CLI can find
 server = create_server()
 
+def spawn_workers(args, count):
+    """
+    Start more processes sharing this process's job database
+    
+    Args:
+        args: Parsed arguments of this process
+        count: Number of processes to start
+        
+    Returns:
+        The started processes; SSE servers listen on the ports after ``args.port``
+    """
+    common = [sys.executable, os.path.abspath(__file__), "--db", quack.server.JOB_DB_PATH]
+    if args.debug:
+        common.append("--debug")
+    processes = []
+    for index in range(1, count + 1):
+        if args.command == "worker":
+            command = common + ["worker"]
+        else:
+            command = common + ["--sse", "--shared", "--host", args.host, "--port", str(args.port + index)]
+        processes.append(subprocess.Popen(command))
+    return processes
+
 def main():
     """Main entry point for the Quack server"""
     parser = argparse.ArgumentParser(description="Quack - Python code analysis MCP server")
@@ -42,6 +69,31 @@ def main():
     parser.add_argument("--sse", action="store_true", help="Run with SSE transport")
     parser.add_argument("--host", default="0.0.0.0", help="Host to bind (default: 0.0.0.0)")
     parser.add_argument("--port", type=int, default=8000, help="Port to bind (default: 8000)")
+    parser.add_argument(
+        "--watch", action="append", default=[], metavar="DIR",
+        help="Re-analyse the Python files of DIR as they change (repeatable)"
+    )
+    parser.add_argument(
+        "--db", metavar="PATH",
+        help="Job database, shared by processes using the same one (default: one per working directory, "
+             f"or {quack.server.SHARED_JOB_DB_PATH} with --shared, --workers or the worker command)"
+    )
+    parser.add_argument(
+        "--shared", action="store_true",
+        help="Share the job queue of the job database with other Quack processes"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1, metavar="N",
+        help="Number of processes sharing the job queue: SSE servers listening on a port each, "
+             "--port to --port+N-1, as an SSE session cannot move between processes; "
+             "or job workers with the worker command (default: 1)"
+    )
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("worker", help="Run jobs from the shared job queue without serving MCP clients")
+    analyze_parser = commands.add_parser(
+        "analyze", help="Analyse the Python files of a directory tree without an MCP client"
+    )
+    add_analyze_arguments(analyze_parser)
     args = parser.parse_args()
     
     # Set debug logging if requested
@@ -49,8 +101,32 @@ def main():
         logger.setLevel(logging.DEBUG)
         logger.debug("Debug logging enabled")
     
+    if args.command == "analyze":
+        # Findings go to the output; only problems are logged unless debugging
+        if not args.debug:
+            logger.setLevel(logging.WARNING)
+        sys.exit(run_analyze(args))
+    
+    for path in args.watch:
+        if not os.path.isdir(path):
+            parser.error(f"--watch: not a directory: {path}")
+    WATCH_PATHS.extend(os.path.abspath(path) for path in args.watch)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1 and not args.sse and args.command != "worker":
+        parser.error("--workers requires --sse or the worker command")
+    quack.server.SHARE_QUEUE = args.shared or args.workers > 1 or args.command == "worker"
+    if args.db:
+        quack.server.JOB_DB_PATH = os.path.abspath(args.db)
+    elif quack.server.SHARE_QUEUE:
+        quack.server.JOB_DB_PATH = quack.server.SHARED_JOB_DB_PATH
+    
+    children = spawn_workers(args, args.workers - 1)
     try:
-        if args.sse:
+        if args.command == "worker":
+            logger.info(f"[Server] Starting Quack job worker (job store: {quack.server.JOB_DB_PATH})")
+            asyncio.run(run_worker(server))
+        elif args.sse:
             # Import uvicorn only when needed
             import uvicorn
             logger.info(f"[Server] Starting Quack MCP server with SSE transport on {args.host}:{args.port}")
@@ -61,6 +137,11 @@ def main():
     except Exception as e:
         logger.critical(f"[Server] Fatal error: {str(e)}", exc_info=True)
         sys.exit(1)
+    finally:
+        for child in children:
+            child.terminate()
+        for child in children:
+            child.wait()
 
 
 if __name__ == "__main__":
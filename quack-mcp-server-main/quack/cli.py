@@ -0,0 +1,396 @@
+"""
+Offline batch analysis of a directory tree.
+
+``python quack.py analyze PATH`` runs the server's processors over the
+Python files of a repository without an MCP client: files are analysed in
+place, on worker pools sized to the machine, through the same job manager
+and scheduler the server uses. Findings are written while the analysis
+runs, either as JSON Lines or as a SARIF log.
+
+Findings have the same shape whichever tool reported them (see
+``quack/processors/findings.py``); paths are relative to the working
+directory. Analyses that could not run are reported as failures.
+
+The command exits with 0 if there are no findings, 1 if there are, and 2
+if an analysis could not run.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+from typing import Dict, Any, List, Optional, Sequence, Set, TextIO
+
+from .jobs.base import Job
+from .jobs.enums import JobStatus, JobType
+from .jobs.factory import JobFactory
+from .jobs.manager import JobManager
+from .jobs.scheduler import JobScheduler
+from .processors.lint import LintJobProcessor
+from .processors.local import LocalFileJobProcessor
+from .processors.findings import TOOL_NAMES, job_records
+from .processors.static_analysis import StaticAnalysisJobProcessor
+from .processors.test_job_processor import TestJobProcessor
+from .server import RESOURCE_LIMITS
+from .tree import discover_files, display_path, is_python_file, is_test_file
+
+logger = logging.getLogger("quack")
+
+# Analyses the command can run, by name on the command line
+TOOLS: Dict[str, JobType] = {
+    "lint": JobType.LINT,
+    "static_analysis": JobType.STATIC_ANALYSIS,
+    "test": JobType.TEST,
+}
+
+# Analyses run when --tools is not given
+DEFAULT_TOOLS = ("lint", "static_analysis")
+
+# Lint jobs arriving within this many seconds are linted in one pylint run
+LINT_BATCH_WINDOW = 0.02
+
+# Maximum number of lint jobs per pylint run
+LINT_BATCH_SIZE = 16
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+
+
+def changed_files(root: str, since: str, until: Optional[str] = None) -> List[str]:
+    """
+    Find the Python files under a path changed between two git revisions
+
+    Deleted files are left out; files are analysed as they are on disk.
+
+    Args:
+        root: Directory or file inside a git work tree
+        since: Base revision
+        until: Revision to compare with (default: the work tree)
+
+    Returns:
+        Paths of the changed ``.py`` files under ``root``, sorted
+
+    Raises:
+        ValueError: If ``root`` is not in a git work tree or a revision is unknown
+    """
+    directory = root if os.path.isdir(root) else os.path.dirname(os.path.abspath(root))
+
+    def git(*args: str) -> str:
+        result = subprocess.run(["git", "-C", directory, *args], capture_output=True, text=True)
+        if result.returncode != 0:
+            raise ValueError(f"git {args[0]} failed: {result.stderr.strip()}")
+        return result.stdout
+
+    toplevel = git("rev-parse", "--show-toplevel").strip()
+    names = git(
+        "diff", "--name-only", "--no-renames", "--diff-filter=ACM", "-z",
+        since, *([until] if until else []), "--", os.path.abspath(root)
+    )
+    paths = []
+    for name in filter(None, names.split("\0")):
+        path = os.path.join(toplevel, name)
+        if is_python_file(name) and os.path.isfile(path):
+            paths.append(display_path(path))
+    return sorted(paths)
+
+
+class JsonLinesWriter:
+    """Writes one JSON object per finding or failure, flushing after each file"""
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+
+    def start(self, tool_info: Dict[str, Any]) -> None:
+        """Start the output; JSON Lines have no header"""
+        pass
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Write the records of one analysed file
+
+        Args:
+            records: Findings and failures
+        """
+        for record in records:
+            self.stream.write(json.dumps(record) + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Finish the output"""
+        self.stream.flush()
+
+
+class SarifWriter:
+    """
+    Writes a SARIF 2.1.0 log, appending results as they arrive
+
+    The log's opening is written before the first file is analysed and each
+    result as soon as its file has been analysed; failures are reported as
+    tool execution notifications when the log is closed.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.results = 0
+        self.failures: List[Dict[str, Any]] = []
+
+    def start(self, tool_info: Dict[str, Any]) -> None:
+        """
+        Write the opening of the log
+
+        Args:
+            tool_info: Versions of the tools that run, recorded in the log
+        """
+        driver = {"name": "quack", "properties": {"tools": tool_info}}
+        header = json.dumps({"$schema": SARIF_SCHEMA, "version": "2.1.0", "runs": [{"tool": {"driver": driver}}]})
+        # Leave the run open for its results
+        self.stream.write(header[:-3] + ', "results": [\n')
+        self.stream.flush()
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        """
+        Write the records of one analysed file
+
+        Args:
+            records: Findings and failures
+        """
+        for record in records:
+            if record["kind"] == "failure":
+                self.failures.append(record)
+                continue
+            region: Dict[str, Any] = {}
+            if record["line"] is not None:
+                region["startLine"] = record["line"]
+                if record["column"] is not None:
+                    region["startColumn"] = record["column"]
+            location: Dict[str, Any] = {"artifactLocation": {"uri": record["path"]}}
+            if region:
+                location["region"] = region
+            result = {
+                "ruleId": f"{record['tool']}/{record['rule']}" if record["rule"] else record["tool"],
+                "level": record["severity"],
+                "message": {"text": record["message"]},
+                "locations": [{"physicalLocation": location}]
+            }
+            self.stream.write(("" if self.results == 0 else ",\n") + json.dumps(result))
+            self.results += 1
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Finish the log with the invocation and its failures"""
+        invocation = {
+            "executionSuccessful": not self.failures,
+            "toolExecutionNotifications": [
+                {
+                    "level": "error",
+                    "message": {"text": f"{failure['tool']} {failure['status']}: {failure['message']}"},
+                    "locations": [{"physicalLocation": {"artifactLocation": {"uri": failure["path"]}}}]
+                }
+                for failure in self.failures
+            ]
+        }
+        self.stream.write(f"\n], \"invocations\": [{json.dumps(invocation)}]}}]}}\n")
+        self.stream.flush()
+
+
+def register_processors(job_types: Sequence[JobType], jobs: int, timeout: float) -> Dict[JobType, int]:
+    """
+    Register in-place processors for the given job types, sized for ``jobs`` cores
+
+    Args:
+        job_types: Job types to register processors for
+        jobs: Number of worker processes (and mypy daemons) per tool
+        timeout: Seconds a single tool run may take
+
+    Returns:
+        Concurrency limit of each job type
+    """
+    concurrency: Dict[JobType, int] = {}
+    for job_type in job_types:
+        if job_type == JobType.LINT:
+            processor = LintJobProcessor(
+                pool_size=jobs,
+                batch_window=LINT_BATCH_WINDOW,
+                max_batch_size=LINT_BATCH_SIZE,
+                timeout=timeout,
+                limits=RESOURCE_LIMITS.get(JobType.LINT)
+            )
+            # Let enough lint jobs run at once to fill a batch on every worker
+            concurrency[job_type] = jobs * LINT_BATCH_SIZE
+        elif job_type == JobType.STATIC_ANALYSIS:
+            processor = StaticAnalysisJobProcessor(
+                daemons_per_config=jobs, timeout=timeout, limits=RESOURCE_LIMITS.get(JobType.STATIC_ANALYSIS)
+            )
+            concurrency[job_type] = jobs
+        else:
+            processor = TestJobProcessor(pool_size=jobs, timeout=timeout, limits=RESOURCE_LIMITS.get(JobType.TEST))
+            concurrency[job_type] = jobs
+        JobFactory.register_processor(job_type, LocalFileJobProcessor(processor))
+    return concurrency
+
+
+async def analyze(
+    paths: Sequence[str],
+    job_types: Sequence[JobType],
+    writer: Any,
+    jobs: Optional[int] = None,
+    timeout: float = 120.0
+) -> Dict[str, int]:
+    """
+    Analyse files in place and write findings as each analysis finishes
+
+    At most a few jobs per concurrency slot are submitted ahead of the
+    running ones, so memory use does not grow with the size of the tree.
+
+    Args:
+        paths: Files to analyse
+        job_types: Analyses to run; test jobs only run on test modules
+        writer: JsonLinesWriter or SarifWriter receiving the records; it is
+            started here and closed by the caller
+        jobs: Worker processes per tool (default: one per CPU)
+        timeout: Seconds a single tool run may take
+
+    Returns:
+        Counts of analysed ``files``, ``findings`` and ``failures``
+    """
+    jobs = jobs or os.cpu_count() or 1
+    # Restored afterwards, so the server's processors survive a run in the same process
+    registered = dict(JobFactory.processors)
+    concurrency = register_processors(job_types, jobs, timeout)
+    writer.start({
+        TOOL_NAMES[job_type]: JobFactory.get_processor(job_type).tool_info()[TOOL_NAMES[job_type]]
+        for job_type in job_types
+    })
+    # A job may wait for a worker behind other jobs' runs, so its deadline allows for several
+    manager = JobManager(
+        scheduler=JobScheduler(concurrency=concurrency),
+        job_ttl=0.0,
+        purge_interval=1.0,
+        deadlines={job_type: timeout * 3 for job_type in job_types}
+    )
+
+    finished: "asyncio.Queue[Job]" = asyncio.Queue()
+    manager.add_completion_listener(finished.put_nowait)
+    window = 2 * sum(concurrency.values())
+    counts = {"files": 0, "findings": 0, "failures": 0}
+    syntax_errors: Set[str] = set()
+
+    def report(job: Job) -> None:
+        path = job.options["display_path"]
+        records = job_records(job, path)
+        if job.status != JobStatus.COMPLETED and (job.quick_result or {}).get("syntax_error"):
+            # Every analysis of the file fails the same precheck; report it once
+            if path in syntax_errors:
+                records = []
+            syntax_errors.add(path)
+        counts["findings"] += sum(record["kind"] == "finding" for record in records)
+        counts["failures"] += sum(record["kind"] == "failure" for record in records)
+        writer.write(records)
+
+    submissions = [
+        (job_type, path) for path in paths for job_type in job_types
+        if job_type != JobType.TEST or is_test_file(path)
+    ]
+    outstanding = 0
+    try:
+        for job_type, path in submissions:
+            while outstanding >= window:
+                report(await finished.get())
+                outstanding -= 1
+            try:
+                with open(path, encoding="utf-8") as f:
+                    code = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                writer.write([{
+                    "kind": "failure", "path": display_path(path), "tool": TOOL_NAMES[job_type],
+                    "status": "failed", "message": f"Could not read file: {str(e)}"
+                }])
+                counts["failures"] += 1
+                continue
+            options = {"path": os.path.abspath(path), "display_path": display_path(path)}
+            job = manager.submit_job(job_type, code, options=options)
+            if job.status.is_terminal():
+                # Failed its precheck without being queued
+                report(job)
+            else:
+                outstanding += 1
+        while outstanding:
+            report(await finished.get())
+            outstanding -= 1
+    finally:
+        for job_type in job_types:
+            JobFactory.processors[job_type].close()
+        JobFactory.processors.clear()
+        JobFactory.processors.update(registered)
+        manager.documents.close()
+    counts["files"] = len({path for _, path in submissions})
+    return counts
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the arguments of the ``analyze`` command
+
+    Args:
+        parser: Parser of the command
+    """
+    parser.add_argument("path", help="Directory or Python file to analyse")
+    parser.add_argument(
+        "--tools", default=",".join(DEFAULT_TOOLS),
+        help=f"Comma-separated analyses to run, of {', '.join(TOOLS)} (default: {','.join(DEFAULT_TOOLS)}); "
+             "tests only run on test_*.py and *_test.py files"
+    )
+    parser.add_argument("--format", choices=("jsonl", "sarif"), default="jsonl", help="Output format (default: jsonl)")
+    parser.add_argument("--output", "-o", help="File to write findings to (default: standard output)")
+    parser.add_argument("--since", help="Only analyse files changed since this git revision")
+    parser.add_argument("--until", help="With --since, compare with this revision instead of the work tree")
+    parser.add_argument("--jobs", "-j", type=int, help="Worker processes per tool (default: one per CPU)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Seconds a single tool run may take")
+
+
+def run(args: argparse.Namespace) -> int:
+    """
+    Run the ``analyze`` command
+
+    Args:
+        args: Parsed arguments
+
+    Returns:
+        Exit status: 0 without findings, 1 with findings, 2 if an analysis could not run
+    """
+    try:
+        job_types = [TOOLS[name.strip()] for name in args.tools.split(",") if name.strip()]
+    except KeyError as e:
+        print(f"Unknown tool: {e.args[0]}", file=sys.stderr)
+        return 2
+    if not os.path.exists(args.path):
+        print(f"No such file or directory: {args.path}", file=sys.stderr)
+        return 2
+    if args.until and not args.since:
+        print("--until requires --since", file=sys.stderr)
+        return 2
+
+    try:
+        paths = changed_files(args.path, args.since, args.until) if args.since else discover_files(args.path)
+    except ValueError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+
+    stream = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        writer = SarifWriter(stream) if args.format == "sarif" else JsonLinesWriter(stream)
+        counts = asyncio.run(analyze(paths, job_types, writer, args.jobs, args.timeout))
+        writer.close()
+    finally:
+        if args.output:
+            stream.close()
+
+    print(
+        f"Analysed {counts['files']} files: {counts['findings']} findings, {counts['failures']} failed analyses",
+        file=sys.stderr
+    )
+    if counts["failures"]:
+        return 2
+    return 1 if counts["findings"] else 0
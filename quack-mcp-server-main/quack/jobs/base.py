@@ -2,11 +2,19 @@
 Base classes for jobs and processors.
 """
 
+import json
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Dict, Any, Optional, TypeVar
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, TypeVar, TYPE_CHECKING
 
 from .enums import JobType, JobStatus
+from .profiles import DEFAULT_PROFILE
+from .source import SourceDocument
+from .tracing import Trace
+from .usage import ResourceUsage
+
+if TYPE_CHECKING:
+    from .documents import DocumentSession
 
 
 @dataclass
@@ -21,6 +29,39 @@ class Job(ABC):
     completed_at: Optional[float] = None
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    cache_hit: bool = False
+    priority: int = 0
+    dispatched_at: Optional[float] = None
+    quick_result: Optional[Dict[str, Any]] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+    # CPU time, peak memory and output of the processes run for the job, if measured
+    usage: Optional[ResourceUsage] = None
+    # Process running the job as ``host:pid``, or None while it waits in a shared queue
+    worker: Optional[str] = None
+    # Timings of the stages of the job
+    trace: Trace = field(default_factory=Trace, init=False, repr=False, compare=False)
+    _document: Optional[SourceDocument] = field(default=None, init=False, repr=False, compare=False)
+    # Session of the document this job analyses a version of, if any
+    session: Optional["DocumentSession"] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def document(self) -> SourceDocument:
+        """Parsed view of the job's code, built on first use and shared by processors"""
+        if self._document is None:
+            self._document = SourceDocument(self.code)
+        return self._document
+
+    def record_usage(self, usage: Optional[Dict[str, Any]]) -> None:
+        """
+        Add the resource usage of a process run made for this job
+        
+        Args:
+            usage: Usage reported by a worker or daemon, or None if not measured
+        """
+        if usage:
+            if self.usage is None:
+                self.usage = ResourceUsage()
+            self.usage.add(usage)
 
     @property
     def execution_time(self) -> Optional[float]:
@@ -34,6 +75,18 @@ class Job(ABC):
             return self.completed_at - self.started_at
         return None
     
+    @property
+    def queue_wait_time(self) -> Optional[float]:
+        """
+        Calculate how long the job waited in the scheduler queue
+        
+        Returns:
+            Queue wait in seconds, or None if the job has not left the queue
+        """
+        if self.dispatched_at:
+            return self.dispatched_at - self.submitted_at
+        return None
+    
     def to_dict(self) -> Dict[str, Any]:
         """
         Convert job to dictionary for API responses
@@ -48,9 +101,15 @@ class Job(ABC):
             "submitted_at": self.submitted_at,
             "started_at": self.started_at,
             "completed_at": self.completed_at,
+            "queue_wait_time": self.queue_wait_time,
             "execution_time": self.execution_time,
+            "priority": self.priority,
+            "profile": self.options.get("profile", DEFAULT_PROFILE),
             "has_result": self.result is not None,
-            "has_error": self.error is not None
+            "has_error": self.error is not None,
+            "cache_hit": self.cache_hit,
+            "usage": self.usage.to_dict() if self.usage is not None else None,
+            "worker": self.worker
         }
 
 
@@ -74,8 +133,38 @@ class JobProcessor(ABC):
     5. Setting job.completed_at timestamp when processing ends
     
     The job manager takes care of job creation, cleanup, and history management.
+    
+    Results of processors with ``cacheable = True`` are cached by the job
+    manager, keyed by the submitted code and ``tool_info()``. Processors may
+    implement ``precheck`` to return a quick result before the job is queued.
     """
     
+    cacheable: bool = True
+    
+    def precheck(self, job: T) -> Optional[Dict[str, Any]]:
+        """
+        Run fast in-process checks before the job is queued.
+        
+        The job manager fails the job immediately if the returned result
+        reports a syntax error. The default implementation does nothing.
+        
+        Args:
+            job: The job about to be queued
+            
+        Returns:
+            Quick result to show while the job is queued, or None
+        """
+        return None
+    
+    def tool_info(self) -> Dict[str, Any]:
+        """
+        Describe the tool versions and options that affect results.
+        
+        Returns:
+            JSON-serialisable dictionary mixed into the result cache key
+        """
+        return {}
+    
     @abstractmethod
     async def process(self, job: T) -> None:
         """
@@ -88,6 +177,30 @@ class JobProcessor(ABC):
         update the job status to FAILED if processing cannot complete.
         """
         pass
+    
+    async def process_file(self, job: T, path: str) -> None:
+        """
+        Process a job whose code has already been written to a file.
+        
+        Lets composite jobs write the code once and share the file between
+        processors. Unlike ``process``, the caller marks the job as running.
+        
+        Args:
+            job: The job to process
+            path: File containing ``job.code``
+            
+        Raises:
+            NotImplementedError: If the processor only supports ``process``
+        """
+        raise NotImplementedError(f"{type(self).__name__} cannot process a shared file")
+    
+    def close(self) -> None:
+        """
+        Release resources held by the processor (worker processes, daemons).
+        
+        Called by the server on shutdown. The default implementation does nothing.
+        """
+        pass
 
 
 # Concrete job implementations
@@ -115,3 +228,69 @@ class StaticAnalysisJob(Job):
             job_type=JobType.STATIC_ANALYSIS,
             submitted_at=float(__import__('time').time())
         )
+
+
+@dataclass
+class TestJob(Job):
+    """Job for running pytest tests embedded in the code"""
+    
+    # Not a test class, despite the name
+    __test__ = False
+    
+    def __init__(self, job_id: str, code: str):
+        super().__init__(
+            id=job_id,
+            status=JobStatus.PENDING,
+            code=code,
+            job_type=JobType.TEST,
+            submitted_at=float(__import__('time').time())
+        )
+
+
+@dataclass
+class ProjectJob(Job):
+    """
+    Job for analysing several modules together
+    
+    The code of a project job is a JSON object mapping relative file paths
+    to their sources (see ``ProjectJob.encode_files``).
+    """
+    def __init__(self, job_id: str, code: str):
+        super().__init__(
+            id=job_id,
+            status=JobStatus.PENDING,
+            code=code,
+            job_type=JobType.PROJECT,
+            submitted_at=float(__import__('time').time())
+        )
+    
+    @staticmethod
+    def encode_files(files: Dict[str, str]) -> str:
+        """
+        Encode a file mapping as canonical JSON job code
+        
+        Args:
+            files: Mapping of relative paths to file contents
+            
+        Returns:
+            JSON string with sorted keys, so identical projects hash identically
+        """
+        return json.dumps(files, sort_keys=True)
+    
+    @property
+    def files(self) -> Dict[str, str]:
+        """Mapping of relative paths to file contents"""
+        return json.loads(self.code)
+
+
+@dataclass
+class AnalyzeAllJob(Job):
+    """Job running every analysis on the same code"""
+    def __init__(self, job_id: str, code: str):
+        super().__init__(
+            id=job_id,
+            status=JobStatus.PENDING,
+            code=code,
+            job_type=JobType.ANALYZE_ALL,
+            submitted_at=float(__import__('time').time())
+        )
@@ -0,0 +1,263 @@
+"""
+Job queue shared by several Quack processes through one SQLite job database.
+
+Processes sharing a database put the jobs they accept in the database
+instead of their own scheduler. Every process claims queued jobs of the
+types and profiles it has free slots for, runs them and writes the results back, so
+analysis capacity grows with the number of processes and any of them can
+answer for any job. Each process polls the database for the jobs its
+clients submitted, wait for or subscribed to, and finishes them locally
+once another process has run them.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from .base import Job
+from .enums import JobType, JobStatus
+from .manager import JobManager
+from .profiles import PROFILES
+from .scheduler import JobScheduler, QueueFullError
+from .store import SqliteJobStore
+
+logger = logging.getLogger("quack")
+
+
+class JobBroker:
+    """
+    Shares a job manager's queue with other processes using the same job database
+
+    Jobs with a document session stay in the process that owns the session.
+    Jobs of processes that exit on this host are returned to the queue.
+    """
+
+    def __init__(
+        self,
+        manager: JobManager,
+        poll_interval: float = 0.1,
+        reap_interval: float = 5.0,
+        max_queue_depth: Optional[int] = None,
+        execute: bool = True
+    ):
+        """
+        Attach a broker to a job manager
+
+        Args:
+            manager: Job manager whose store is a SqliteJobStore
+            poll_interval: Seconds between polls of the job database
+            reap_interval: Seconds between checks for jobs of exited processes
+            max_queue_depth: Maximum number of unclaimed jobs in the shared
+                queue (default: the manager scheduler's queue depth)
+            execute: Whether this process runs queued jobs, or only submits them
+
+        Raises:
+            ValueError: If the manager's store is not a SqliteJobStore
+        """
+        if not isinstance(manager.store, SqliteJobStore):
+            raise ValueError("A shared job queue needs a SQLite job store")
+        self.manager = manager
+        self.store: SqliteJobStore = manager.store
+        self.poll_interval = poll_interval
+        self.reap_interval = reap_interval
+        self.max_queue_depth = max_queue_depth if max_queue_depth is not None else manager.scheduler.max_queue_depth
+        self.execute = execute
+        self.delegated: Dict[str, Tuple[Job, Optional[str]]] = {}  # job_id -> (job, cache key)
+        self.watched: Set[str] = set()  # IDs of other processes' jobs waited for here
+        self.claimed = 0
+        self.finished_elsewhere = 0
+        self.rejected = 0
+        self._last_reap = 0.0
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        manager.broker = self
+        # Claim more jobs as soon as one of this process's jobs frees its slot
+        manager.add_completion_listener(lambda job: self._wake.set())
+
+    def start(self) -> None:
+        """Start polling the job database in a background task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def enqueue(self, job: Job, key: Optional[str] = None) -> None:
+        """
+        Put a job submitted here in the shared queue
+
+        The manager stores the job after this call, which makes it visible
+        to other processes.
+
+        Args:
+            job: The job
+            key: Result cache key, or None if the result should not be cached
+
+        Raises:
+            QueueFullError: If the shared queue is full
+        """
+        if self.store.count_unclaimed() >= self.max_queue_depth:
+            self.rejected += 1
+            raise QueueFullError(self.manager.scheduler.retry_after(job.job_type))
+        job.worker = None
+        self.delegated[job.id] = (job, key)
+        self._wake.set()
+
+    def watch(self, job_id: str) -> None:
+        """
+        Poll for the end of a job another process runs
+
+        Args:
+            job_id: ID of the job
+        """
+        self.watched.add(job_id)
+
+    def cancel(self, job: Job) -> Job:
+        """
+        Cancel a job this process does not run
+
+        Args:
+            job: The job
+
+        Returns:
+            The job; cancelled if no process had claimed it yet, otherwise
+            unchanged until the process running it has cancelled it
+        """
+        if not self.store.request_cancel(job.id):
+            logger.info(f"[{job.job_type.value}:{job.id}] Asked {job.worker} to cancel the job")
+            self.watch(job.id)
+            return job
+        job.status = JobStatus.CANCELLED
+        job.error = "Job was cancelled"
+        job.completed_at = time.time()
+        logger.info(f"[{job.job_type.value}:{job.id}] Cancelled before any process claimed it")
+        entry = self.delegated.pop(job.id, None)
+        if entry is not None:
+            self.manager.finish_remote_job(job, entry[1])
+        else:
+            self.manager.notify_remote_job(job)
+        return job
+
+    async def poll(self) -> None:
+        """Claim queued jobs, pick up finished ones and handle cancellation requests"""
+        now = time.time()
+        if now - self._last_reap >= self.reap_interval:
+            self._last_reap = now
+            released = self.store.release_exited()
+            if released:
+                logger.info(f"[Broker] Returned {released} jobs of exited processes to the queue")
+        if self.execute:
+            self._claim()
+        self._collect()
+        for job_id in self.store.cancel_requests():
+            await self.manager.cancel_job(job_id)
+
+    def _claim(self) -> None:
+        # Profiles without their own concurrency share the manager's scheduler and its free slots
+        profiles_by_scheduler: Dict[int, Tuple[JobScheduler, List[str]]] = {}
+        for profile in PROFILES:
+            scheduler = self.manager.scheduler_for(profile)
+            profiles_by_scheduler.setdefault(id(scheduler), (scheduler, []))[1].append(profile)
+        for scheduler, profiles in profiles_by_scheduler.values():
+            for job_type in JobType:
+                free = scheduler.limit(job_type) - scheduler.running.get(job_type, 0) \
+                    - len(scheduler.queues.get(job_type, []))
+                self._run_claimed(self.store.claim(job_type, free, profiles))
+
+    def _run_claimed(self, jobs: List[Job]) -> None:
+        for job in jobs:
+            # Keep the object of a job submitted here, which waiters hold
+            entry = self.delegated.pop(job.id, None)
+            if entry is not None:
+                job = entry[0]
+            self.watched.discard(job.id)
+            self.claimed += 1
+            try:
+                self.manager.run_stored_job(job)
+            except (ValueError, QueueFullError) as e:
+                job.status = JobStatus.FAILED
+                job.error = f"Could not run job: {str(e)}"
+                job.completed_at = time.time()
+                self.manager.finish_remote_job(job, entry[1] if entry is not None else None)
+
+    def _collect(self) -> None:
+        job_ids = set(self.delegated) | self.watched
+        if not job_ids:
+            return
+        stored_jobs = {stored.id: stored for stored in self.store.refresh(list(job_ids))}
+        self.watched &= set(stored_jobs)
+        for job_id, stored in stored_jobs.items():
+            entry = self.delegated.get(job_id)
+            if entry is not None:
+                _copy_state(stored, entry[0])
+            if not stored.status.is_terminal():
+                continue
+            self.watched.discard(job_id)
+            if entry is not None:
+                del self.delegated[job_id]
+                self.finished_elsewhere += 1
+                logger.debug(f"[{stored.job_type.value}:{job_id}] Finished by {stored.worker}")
+                self.manager.finish_remote_job(entry[0], entry[1])
+            else:
+                self.manager.notify_remote_job(stored)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.poll()
+            except sqlite3.Error as e:
+                logger.warning(f"[Broker] Could not poll the job database: {str(e)}")
+
+    async def close(self) -> None:
+        """Stop polling and return the jobs this process claimed but has not started"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        queued = [
+            job.id for job in self.store.active.values()
+            if job.worker == self.store.worker and job.dispatched_at is None
+        ]
+        released = self.store.release(queued)
+        if released:
+            logger.info(f"[Broker] Returned {released} queued jobs to the shared queue")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the shared queue
+
+        Returns:
+            Dictionary with this process's worker ID, the unclaimed jobs and
+            the jobs claimed here or finished by other processes
+        """
+        return {
+            "worker": self.store.worker,
+            "unclaimed": self.store.count_unclaimed(),
+            "max_queue_depth": self.max_queue_depth,
+            "delegated": len(self.delegated),
+            "watched": len(self.watched),
+            "claimed": self.claimed,
+            "finished_elsewhere": self.finished_elsewhere,
+            "rejected": self.rejected
+        }
+
+
+def _copy_state(source: Job, target: Job) -> None:
+    # Progress of a job run by another process, onto the object held here
+    target.status = source.status
+    target.worker = source.worker
+    target.dispatched_at = source.dispatched_at
+    target.started_at = source.started_at
+    target.completed_at = source.completed_at
+    target.result = source.result
+    target.error = source.error
+    target.cache_hit = source.cache_hit
+    target.usage = source.usage
+    target.trace = source.trace
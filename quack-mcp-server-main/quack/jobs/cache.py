@@ -0,0 +1,174 @@
+"""
+Content-addressed cache of job results.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger("quack")
+
+
+def cache_key(job_type: str, code: str, tool_info: Dict[str, Any]) -> str:
+    """
+    Compute the cache key for a submission
+
+    Args:
+        job_type: Job type value
+        code: Submitted Python code
+        tool_info: Tool versions and options that affect the result
+
+    Returns:
+        Hex digest identifying the submission
+    """
+    digest = hashlib.sha256()
+    digest.update(job_type.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(json.dumps(tool_info, sort_keys=True, default=str).encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(code.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    LRU + TTL cache of job results with an optional on-disk tier
+
+    Results are treated as immutable once stored. The disk tier keeps one
+    JSON file per entry so cached results survive a server restart.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 3600.0, disk_dir: Optional[str] = None):
+        """
+        Initialize a new result cache
+
+        Args:
+            max_entries: Maximum number of results kept in memory
+            ttl: Seconds a result stays valid
+            disk_dir: Optional directory for the persistent tier
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a result
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached result, or None on a miss
+        """
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored_at, result = entry
+            if now - stored_at <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+            del self._entries[key]
+            self.evictions += 1
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            stored_at, result = entry
+            if now - stored_at <= self.ttl:
+                self._store_memory(key, stored_at, result)
+                self.hits += 1
+                self.disk_hits += 1
+                return result
+            self._remove_disk(key)
+
+        self.misses += 1
+        return None
+
+    def put(self, key: str, result: Dict[str, Any]) -> None:
+        """
+        Store a result
+
+        Args:
+            key: Cache key
+            result: Job result
+        """
+        stored_at = time.time()
+        self._store_memory(key, stored_at, result)
+        self._write_disk(key, stored_at, result)
+
+    def _store_memory(self, key: str, stored_at: float, result: Dict[str, Any]) -> None:
+        self._entries[key] = (stored_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data["stored_at"], data["result"]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"[Cache] Ignoring unreadable cache entry {key}: {str(e)}")
+            self._remove_disk(key)
+            return None
+
+    def _write_disk(self, key: str, stored_at: float, result: Dict[str, Any]) -> None:
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": stored_at, "result": result}, f)
+            os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"[Cache] Failed to write cache entry {key}: {str(e)}")
+
+    def _remove_disk(self, key: str) -> None:
+        try:
+            os.unlink(self._disk_path(key))
+        except OSError:
+            pass
+
+    def clear(self) -> None:
+        """Drop all in-memory entries (the disk tier is left untouched)"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the cache
+
+        Returns:
+            Dictionary with cache statistics
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
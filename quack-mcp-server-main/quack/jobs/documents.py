@@ -0,0 +1,274 @@
+"""
+Document sessions: successive versions of one file submitted by a client.
+
+A client that tags submissions with a ``document_id`` opens a session. The
+session keeps the latest version of the document, the last result of each
+job type, and a workspace with a stable file per job type, so processors
+can re-analyse only what changed between versions.
+"""
+
+import ast
+import asyncio
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .enums import JobType
+from .source import SourceDocument
+from .workspaces import WorkspaceManager, shared_workspaces
+
+logger = logging.getLogger("quack")
+
+
+class StaleVersionError(ValueError):
+    """Raised when a document version older than the latest one is submitted"""
+
+
+def top_level_functions(document: SourceDocument) -> Dict[str, Tuple[int, int]]:
+    """
+    Find the top-level functions of a module
+
+    Args:
+        document: Parsed source of the module
+
+    Returns:
+        Line span (first decorator line, last line) of each function by name;
+        names defined more than once at top level are left out
+    """
+    if document.ast is None:
+        return {}
+    spans: Dict[str, Tuple[int, int]] = {}
+    seen = set()
+    for node in document.ast.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            if node.name in seen:
+                spans.pop(node.name, None)
+                continue
+            seen.add(node.name)
+            if not isinstance(node, ast.ClassDef):
+                start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                spans[node.name] = (start, node.end_lineno or node.lineno)
+    return spans
+
+
+def _module_lines(document: SourceDocument, spans: Dict[str, Tuple[int, int]]) -> List[str]:
+    # Non-blank lines outside the top-level functions: imports, globals, classes
+    inside = {line for start, end in spans.values() for line in range(start, end + 1)}
+    return [
+        line for line_number, line in enumerate(document.lines, 1)
+        if line_number not in inside and line.strip()
+    ]
+
+
+def unchanged_functions(old: SourceDocument, new: SourceDocument) -> Dict[str, Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """
+    Find the top-level functions whose source is identical in two versions
+
+    The findings of a function also depend on the module around it (an
+    import it uses, a global it reads), so no function counts as unchanged
+    once any line outside the top-level functions has changed.
+
+    Args:
+        old: Previous version of the document
+        new: Current version of the document
+
+    Returns:
+        Old and new line spans of each unchanged function by name
+    """
+    old_spans, new_spans = top_level_functions(old), top_level_functions(new)
+    if _module_lines(old, old_spans) != _module_lines(new, new_spans):
+        return {}
+    unchanged = {}
+    for name, (new_start, new_end) in new_spans.items():
+        if name not in old_spans:
+            continue
+        old_start, old_end = old_spans[name]
+        if old.lines[old_start - 1:old_end] == new.lines[new_start - 1:new_end]:
+            unchanged[name] = ((old_start, old_end), (new_start, new_end))
+    return unchanged
+
+
+class DocumentSession:
+    """Latest version, per-type results and workspace of one document"""
+
+    def __init__(self, document_id: str, workspaces: Optional[WorkspaceManager] = None):
+        """
+        Initialize an empty session
+
+        Args:
+            document_id: Client-supplied identity of the document
+            workspaces: Manager providing the session workspace (default: shared)
+        """
+        self.document_id = document_id
+        self.workspaces = workspaces if workspaces is not None else shared_workspaces()
+        self.version = 0
+        self.document: Optional[SourceDocument] = None
+        self.results: Dict[JobType, Tuple[int, SourceDocument, Dict[str, Any]]] = {}
+        self.workspace: Optional[str] = None
+        self.jobs = 0  # queued or running jobs of the session
+        self.closed = False
+        self._sizes: Dict[JobType, int] = {}  # job type -> bytes of its file
+        self._locks: Dict[JobType, asyncio.Lock] = {}
+
+    def path(self, job_type: JobType) -> str:
+        """
+        Stable path of the document's file for one job type
+
+        Args:
+            job_type: Type of job that analyses the file
+
+        Returns:
+            Path inside the session workspace
+        """
+        # Reserve room for the latest version in the file of every job type used so far
+        self._sizes[job_type] = len(self.document.text.encode("utf-8")) if self.document is not None else 0
+        if self.workspace is None:
+            self.workspace = self.workspaces.acquire(sum(self._sizes.values()))
+        else:
+            self.workspaces.resize(self.workspace, sum(self._sizes.values()))
+        directory = os.path.join(self.workspace, job_type.value)
+        os.makedirs(directory, exist_ok=True)
+        # Unique module names, as one pylint run may lint several documents
+        digest = hashlib.sha256(self.document_id.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(directory, f"document_{digest}.py")
+
+    def lock(self, job_type: JobType) -> asyncio.Lock:
+        """
+        Lock serialising the analyses of one job type, which share a file
+
+        Args:
+            job_type: Type of job
+
+        Returns:
+            The job type's lock
+        """
+        if job_type not in self._locks:
+            self._locks[job_type] = asyncio.Lock()
+        return self._locks[job_type]
+
+    def previous(self, job_type: JobType) -> Optional[Tuple[SourceDocument, Dict[str, Any]]]:
+        """
+        Get the last recorded result of a job type
+
+        Args:
+            job_type: Type of job
+
+        Returns:
+            Tuple of (analysed document, result), or None
+        """
+        recorded = self.results.get(job_type)
+        return (recorded[1], recorded[2]) if recorded is not None else None
+
+    def record(self, job_type: JobType, version: int, document: SourceDocument, result: Dict[str, Any]) -> None:
+        """
+        Remember a result, unless a newer version was already recorded
+
+        Args:
+            job_type: Type of job that produced the result
+            version: Version of the analysed document
+            document: The analysed document
+            result: The job result
+        """
+        recorded = self.results.get(job_type)
+        if recorded is None or recorded[0] <= version:
+            self.results[job_type] = (version, document, result)
+
+    def add_job(self) -> None:
+        """Record a queued job of the session, which keeps its workspace until the job finishes"""
+        self.jobs += 1
+
+    def finish_job(self) -> None:
+        """Record the end of a job added with ``add_job``, releasing the workspace of a closed session"""
+        self.jobs -= 1
+        if self.closed and self.jobs == 0:
+            self._release()
+
+    def close(self) -> None:
+        """Release the session workspace, once the session's outstanding jobs have finished"""
+        self.closed = True
+        if self.jobs == 0:
+            self._release()
+
+    def _release(self) -> None:
+        if self.workspace is not None:
+            self.workspaces.release(self.workspace)
+            self.workspace = None
+        self._sizes.clear()
+
+
+class DocumentSessions:
+    """LRU of document sessions keyed by document ID"""
+
+    def __init__(self, max_documents: int = 256, workspaces: Optional[WorkspaceManager] = None):
+        """
+        Initialize the session registry
+
+        Args:
+            max_documents: Maximum number of sessions kept; the least recently
+                used session is closed beyond this
+            workspaces: Manager providing session workspaces (default: shared)
+        """
+        self.max_documents = max_documents
+        self.workspaces = workspaces if workspaces is not None else shared_workspaces()
+        self.sessions: "OrderedDict[str, DocumentSession]" = OrderedDict()
+
+    def update(self, document_id: str, version: Optional[int], document: SourceDocument) -> DocumentSession:
+        """
+        Submit a version of a document
+
+        Args:
+            document_id: Client-supplied identity of the document
+            version: Version number, increasing with every edit; None takes
+                the next version
+            document: Source of this version
+
+        Returns:
+            The document's session, with this version as the latest
+
+        Raises:
+            StaleVersionError: If the version is older than the latest one, or
+                reuses the latest version number for different code
+        """
+        session = self.sessions.get(document_id)
+        if session is None:
+            session = self.sessions[document_id] = DocumentSession(document_id, self.workspaces)
+        self.sessions.move_to_end(document_id)
+        while len(self.sessions) > self.max_documents:
+            _, evicted = self.sessions.popitem(last=False)
+            evicted.close()
+            logger.debug(f"[Documents] Closed least recently used session {evicted.document_id}")
+
+        if version is None:
+            if session.document is not None and session.document.content_hash == document.content_hash:
+                return session
+            version = session.version + 1
+        if version < session.version:
+            raise StaleVersionError(
+                f"Version {version} of {document_id} is older than the latest version {session.version}"
+            )
+        if version == session.version and session.document is not None \
+                and session.document.content_hash != document.content_hash:
+            raise StaleVersionError(f"Version {version} of {document_id} was already submitted with different code")
+        session.version = version
+        session.document = document
+        return session
+
+    def get(self, document_id: str) -> Optional[DocumentSession]:
+        """
+        Get a document's session
+
+        Args:
+            document_id: Client-supplied identity of the document
+
+        Returns:
+            The session, or None if the document is unknown
+        """
+        return self.sessions.get(document_id)
+
+    def close(self) -> None:
+        """Close every session"""
+        for session in self.sessions.values():
+            session.close()
+        self.sessions.clear()
@@ -10,6 +10,8 @@ class JobType(Enum):
     LINT = "lint"
     STATIC_ANALYSIS = "static_analysis"
     TEST = "test"
+    PROJECT = "project"
+    ANALYZE_ALL = "analyze_all"
     
     @classmethod
     def from_string(cls, value: str) -> "JobType":
@@ -38,12 +40,14 @@ class JobStatus(Enum):
     RUNNING = "running"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
+    TIMED_OUT = "timed_out"
     
     def is_terminal(self) -> bool:
         """
         Check if this is a terminal status
         
         Returns:
-            True if the status is terminal (completed or failed)
+            True if the status is terminal (completed, failed, cancelled or timed out)
         """
-        return self in (JobStatus.COMPLETED, JobStatus.FAILED)
+        return self in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED, JobStatus.TIMED_OUT)
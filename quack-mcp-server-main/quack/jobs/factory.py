@@ -3,10 +3,10 @@ Factory for creating jobs and processors.
 """
 
 import uuid
-from typing import Dict
+from typing import Dict, Type
 
 from .enums import JobType
-from .base import Job, JobProcessor, LintJob, StaticAnalysisJob
+from .base import Job, JobProcessor, LintJob, StaticAnalysisJob, TestJob, ProjectJob, AnalyzeAllJob
 
 
 class JobFactory:
@@ -42,11 +42,38 @@ class JobFactory:
             ValueError: If the job type is unknown
         """
         job_id = uuid.uuid4().hex
+        return cls.restore_job(job_type, job_id, code)
+    
+    @classmethod
+    def restore_job(cls, job_type: JobType, job_id: str, code: str) -> Job:
+        """
+        Recreate a job with a known ID, e.g. when loading it from a job store
         
+        Args:
+            job_type: Type of job to create
+            job_id: ID of the job
+            code: Python code to analyze
+            
+        Returns:
+            A job instance of the appropriate type
+            
+        Raises:
+            ValueError: If the job type is unknown
+        """
+        return cls._job_class(job_type)(job_id, code)
+    
+    @classmethod
+    def _job_class(cls, job_type: JobType) -> Type[Job]:
         if job_type == JobType.LINT:
-            return LintJob(job_id, code)
+            return LintJob
         elif job_type == JobType.STATIC_ANALYSIS:
-            return StaticAnalysisJob(job_id, code)
+            return StaticAnalysisJob
+        elif job_type == JobType.TEST:
+            return TestJob
+        elif job_type == JobType.PROJECT:
+            return ProjectJob
+        elif job_type == JobType.ANALYZE_ALL:
+            return AnalyzeAllJob
         else:
             raise ValueError(f"Unknown job type: {job_type}")
     
@@ -4,14 +4,35 @@ Job management system for asynchronous processing.
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List, Deque
+import time
+from typing import Dict, Any, Optional, List, Deque, Callable, TYPE_CHECKING
 from collections import deque
 
 from .enums import JobType, JobStatus
 from .base import Job, JobProcessor
+from .cache import ResultCache, cache_key
+from .documents import DocumentSessions
+from .source import SourceDocument
+from .metrics import Metrics
+from .profiles import DEFAULT_PROFILE, get_profile
+from .scheduler import JobScheduler, QueueFullError
+from .store import JobStore, MemoryJobStore, local_worker
+
+if TYPE_CHECKING:
+    from .broker import JobBroker
 
 logger = logging.getLogger("quack")
 
+# Default seconds a job of each type may run before it is cancelled and its
+# worker processes killed; time spent queued does not count
+DEFAULT_DEADLINES: Dict[JobType, float] = {
+    JobType.LINT: 60.0,
+    JobType.STATIC_ANALYSIS: 60.0,
+    JobType.TEST: 120.0,
+    JobType.PROJECT: 300.0,
+    JobType.ANALYZE_ALL: 180.0,
+}
+
 
 class JobManager:
     """
@@ -19,70 +40,528 @@ class JobManager:
     
     The manager is responsible for:
     1. Creating jobs via the factory
-    2. Starting background tasks for processing
+    2. Queueing jobs on the scheduler, which runs them within per-type
+       concurrency limits
     3. Tracking job status and history
     4. Providing access to job results
+    5. Answering repeated submissions from the result cache, and attaching
+       identical submissions to a job that is already running
+    6. Persisting jobs in the job store and purging expired ones
+    7. Signalling job completion to waiters and completion listeners
+    8. Running jobs of analysis profiles with their own concurrency limits
+       in a scheduler per profile
+    9. Handing jobs to a broker when the queue is shared with other processes
     """
     
-    def __init__(self, max_history: int = 100):
+    def __init__(
+        self,
+        max_history: int = 100,
+        cache: Optional[ResultCache] = None,
+        scheduler: Optional[JobScheduler] = None,
+        store: Optional[JobStore] = None,
+        job_ttl: Optional[float] = None,
+        purge_interval: float = 60.0,
+        documents: Optional[DocumentSessions] = None,
+        deadlines: Optional[Dict[JobType, float]] = None,
+        metrics: Optional[Metrics] = None
+    ):
         """
         Initialize a new job manager
         
         Args:
             max_history: Maximum number of completed jobs to keep in history
+            cache: Result cache to use (default: in-memory cache)
+            scheduler: Job scheduler to use (default: standard concurrency limits);
+                profiles with their own concurrency get a scheduler each
+            store: Job store to use (default: in-memory store)
+            job_ttl: Seconds finished jobs are kept before being purged (None keeps them forever)
+            purge_interval: Minimum seconds between purges
+            documents: Document sessions for submissions with a ``document_id``
+            deadlines: Maximum seconds a job of each type may run (defaults to
+                DEFAULT_DEADLINES; job types missing from both have no deadline)
+            metrics: Metrics to report job activity to (default: new metrics)
         """
-        self.jobs: Dict[str, Job] = {}  # job_id -> Job
+        self.store = store if store is not None else MemoryJobStore()
+        self.job_ttl = job_ttl
+        self.purge_interval = purge_interval
+        self._last_purge = time.time()
         self.job_history: Deque[Job] = deque(maxlen=max_history)  # Limited history of completed jobs
-        self.active_tasks: Dict[str, asyncio.Task] = {}  # job_id -> asyncio.Task
+        self.scheduler = scheduler if scheduler is not None else JobScheduler()
+        self.schedulers: Dict[str, JobScheduler] = {DEFAULT_PROFILE: self.scheduler}  # profile -> scheduler
+        self.active_tasks: Dict[str, asyncio.Task] = self.scheduler.tasks  # job_id -> asyncio.Task
+        self.cache = cache if cache is not None else ResultCache()
+        self.documents = documents if documents is not None else DocumentSessions()
+        self.deadlines: Dict[JobType, float] = dict(DEFAULT_DEADLINES)
+        if deadlines:
+            self.deadlines.update(deadlines)
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.metrics.track_scheduler(self.scheduler)
+        self.inflight: Dict[str, Job] = {}  # cache key -> running job
+        self.coalesced = 0
+        self._waiters: Dict[str, List[asyncio.Future]] = {}  # job_id -> futures resolved on completion
+        self._listeners: List[Callable[[Job], None]] = []
+        self.worker_id = getattr(self.store, "worker", None) or local_worker()
+        self.broker: Optional["JobBroker"] = None  # set by a JobBroker sharing the queue
+        self._closing = False
     
-    def submit_job(self, job_type: JobType, code: str) -> Job:
+    def submit_job(
+        self,
+        job_type: JobType,
+        code: str,
+        priority: int = 0,
+        options: Optional[Dict[str, Any]] = None
+    ) -> Job:
         """
         Submit a new job for processing
         
         Args:
             job_type: Type of job to create
             code: Python code to analyze
+            priority: Scheduling priority; higher values run first
+            options: Processor-specific options (e.g. ``file_id`` for test jobs);
+                a ``document_id`` and optional ``version`` submit a new
+                version of a document session; a ``profile`` names the
+                analysis profile (default: standard)
             
         Returns:
-            The newly created job instance
+            The job instance handling the submission
             
-        This method creates a job and starts processing it asynchronously.
+        Raises:
+            QueueFullError: If the scheduler queue is full
+            StaleVersionError: If the document version is older than the latest one
+            ValueError: If the analysis profile is unknown
+            
+        This method creates a job and queues it for asynchronous processing.
+        If an identical submission is already running, that job is returned
+        instead; if its result is cached, a completed job is returned
+        without starting any processing. Code that fails the processor's
+        precheck (e.g. a syntax error) is failed without being queued.
         """
         # Import here to avoid circular imports
         from .factory import JobFactory
         
+        processor = JobFactory.get_processor(job_type)
+        
+        # Only name non-default profiles, so their results are cached apart
+        profile = get_profile(options.get("profile") if options else None)
+        if options and "profile" in options:
+            options = {key: value for key, value in options.items() if key != "profile"}
+            if profile.name != DEFAULT_PROFILE:
+                options["profile"] = profile.name
+        self.metrics.job_submitted(job_type)
+        
+        # Record the new version of a document, numbering it if needed; each
+        # profile keeps its own session, as findings are not comparable
+        session = None
+        document = SourceDocument(code)
+        if options and options.get("document_id"):
+            document_id = options["document_id"]
+            if profile.name != DEFAULT_PROFILE:
+                document_id = f"{document_id}@{profile.name}"
+            session = self.documents.update(document_id, options.get("version"), document)
+            options = {**options, "version": session.version}
+        
+        key = self._cache_key(processor, job_type, code, options)
+        if key is not None:
+            # Attach to an identical running job
+            running = self.inflight.get(key)
+            if running is not None:
+                self.coalesced += 1
+                self.metrics.cache_lookup("coalesced")
+                logger.debug(f"[{job_type.value}:{running.id}] Coalesced identical submission")
+                return running
+        
         # Create appropriate job type
         job = JobFactory.create_job(job_type, code)
+        job.priority = priority
+        job.options = dict(options or {})
+        job._document = document
+        job.session = session
         
-        # Store job
-        self.jobs[job.id] = job
+        # Serve from cache if possible
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                job.dispatched_at = job.started_at = job.completed_at = time.time()
+                job.result = cached
+                job.cache_hit = True
+                job.status = JobStatus.COMPLETED
+                self.store.add(job)
+                self.job_history.append(job)
+                self.metrics.cache_lookup("hit")
+                self.metrics.job_finished(job)
+                logger.debug(f"[{job_type.value}:{job.id}] Served from result cache")
+                return job
+            self.metrics.cache_lookup("miss")
         
-        # Start background task
-        processor = JobFactory.get_processor(job_type)
-        task = asyncio.create_task(self._process_job(job, processor))
-        self.active_tasks[job.id] = task
+        # Fail fast if the code does not compile
+        with job.trace.span("precheck"):
+            job.quick_result = processor.precheck(job)
+        if job.quick_result is not None and job.quick_result.get("syntax_error"):
+            syntax_error = job.quick_result["syntax_error"]
+            job.dispatched_at = job.started_at = job.completed_at = time.time()
+            job.error = f"Syntax error: {syntax_error['message']} (line {syntax_error['line']})"
+            job.status = JobStatus.FAILED
+            self.store.add(job)
+            self.job_history.append(job)
+            self.metrics.job_finished(job)
+            logger.info(f"[{job_type.value}:{job.id}] Failed precheck: {job.error}")
+            return job
+        
+        # Queue for processing (raises QueueFullError when at capacity); with
+        # a shared queue, any process may run jobs without a document session
+        try:
+            if self.broker is not None and session is None:
+                self.broker.enqueue(job, key)
+            else:
+                job.worker = self.worker_id
+                self.scheduler_for(profile.name).submit(job, lambda: self._process_job(job, processor, key))
+                if session is not None:
+                    session.add_job()
+        except QueueFullError:
+            self.metrics.job_rejected(job_type)
+            raise
         
+        # Store job
+        self.store.add(job)
+        if key is not None:
+            self.inflight[key] = job
+        
+        self._maybe_purge()
         return job
     
-    async def _process_job(self, job: Job, processor: JobProcessor) -> None:
+    def _cache_key(
+        self, processor: JobProcessor, job_type: JobType, code: str, options: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
+        if not processor.cacheable:
+            return None
+        tool_info = processor.tool_info()
+        if options:
+            tool_info = {**tool_info, "options": options}
+        return cache_key(job_type.value, code, tool_info)
+    
+    def run_stored_job(self, job: Job) -> None:
+        """
+        Queue a job loaded from the job store, e.g. one interrupted by a
+        restart or claimed from a shared queue
+        
+        Args:
+            job: The job, claimed by this process
+            
+        Raises:
+            QueueFullError: If the scheduler queue is full
+            ValueError: If the job type or analysis profile is unknown
+        """
+        # Import here to avoid circular imports
+        from .factory import JobFactory
+        
+        processor = JobFactory.get_processor(job.job_type)
+        scheduler = self.scheduler_for(get_profile(job.options.get("profile")).name)
+        job.status = JobStatus.PENDING
+        job.dispatched_at = job.started_at = job.completed_at = None
+        job.worker = self.worker_id
+        key = self._cache_key(processor, job.job_type, job.code, job.options)
+        scheduler.submit(job, lambda: self._process_job(job, processor, key))
+        self.store.add(job)
+        if key is not None:
+            self.inflight.setdefault(key, job)
+    
+    def resume_interrupted_jobs(self) -> int:
+        """
+        Re-queue jobs that were pending or running when the server last stopped
+        
+        Returns:
+            Number of jobs resumed
+        """
+        resumed = 0
+        for job in self.store.interrupted():
+            try:
+                self.run_stored_job(job)
+            except (ValueError, QueueFullError) as e:
+                job.status = JobStatus.FAILED
+                job.error = f"Could not resume job after restart: {str(e)}"
+                job.completed_at = time.time()
+                self.store.update(job)
+                continue
+            resumed += 1
+        if resumed:
+            logger.info(f"[Manager] Resumed {resumed} interrupted jobs")
+        return resumed
+    
+    def scheduler_for(self, profile: str) -> JobScheduler:
+        """
+        Get the scheduler running jobs of an analysis profile
+        
+        Args:
+            profile: Name of the profile
+            
+        Returns:
+            The profile's own scheduler, created on first use, or the
+            manager's scheduler for profiles without their own concurrency
+        """
+        scheduler = self.schedulers.get(profile)
+        if scheduler is None:
+            concurrency = get_profile(profile).concurrency
+            if concurrency is None:
+                return self.scheduler
+            scheduler = JobScheduler(concurrency=concurrency, max_queue_depth=self.scheduler.max_queue_depth)
+            self.schedulers[profile] = scheduler
+            self.metrics.track_scheduler(scheduler)
+        return scheduler
+    
+    def _maybe_purge(self) -> None:
+        if self.job_ttl is None:
+            return
+        now = time.time()
+        if now - self._last_purge < self.purge_interval:
+            return
+        self._last_purge = now
+        purged = self.store.purge(now - self.job_ttl)
+        if purged:
+            logger.info(f"[Manager] Purged {purged} expired jobs")
+    
+    async def _process_job(self, job: Job, processor: JobProcessor, key: Optional[str] = None) -> None:
         """
         Process a job using the appropriate processor
         
         Args:
             job: The job to process
             processor: The processor to use
+            key: Result cache key, or None if the result should not be cached
             
-        This internal method handles job processing and cleanup.
+        This internal method handles job processing and cleanup. A job that
+        runs past its deadline is cancelled and marked TIMED_OUT; cancelling
+        the processor kills the worker processes it was using.
         """
+        deadline = self.deadlines.get(job.job_type)
+        expired = asyncio.Event()
+        timer = None
+        if deadline is not None:
+            # Cancel this task in place, so the job finishes in the same step as its processor
+            task = asyncio.current_task()
+            
+            def expire() -> None:
+                expired.set()
+                task.cancel()
+            
+            timer = asyncio.get_running_loop().call_later(deadline, expire)
+        if job.dispatched_at is not None:
+            job.trace.add("queued", job.submitted_at, job.dispatched_at)
+        # Processors mark the job running as well; storing it here lets other
+        # processes reading the job database tell it from a queued job
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        self.store.update(job)
         try:
-            await processor.process(job)
+            with job.trace.span("process"):
+                await processor.process(job)
+        except asyncio.CancelledError:
+            if self._closing:
+                # Stopped by close(), which returns the job to the queue
+                raise
+            job.completed_at = time.time()
+            if not expired.is_set():
+                logger.info(f"[{job.job_type.value}:{job.id}] Cancelled")
+                job.status = JobStatus.CANCELLED
+                job.error = "Job was cancelled"
+                raise
+            logger.warning(f"[{job.job_type.value}:{job.id}] Exceeded its deadline of {deadline:g} seconds")
+            job.status = JobStatus.TIMED_OUT
+            job.error = f"Job exceeded its deadline of {deadline:g} seconds"
         finally:
-            # Move to history if completed
+            if timer is not None:
+                timer.cancel()
+            if key is not None:
+                self.inflight.pop(key, None)
+                if job.status == JobStatus.COMPLETED and job.result is not None:
+                    self.cache.put(key, job.result)
+            # Persist and move to history if completed
             if job.status.is_terminal():
-                self.job_history.append(job)
-                # Clean up active tasks
-                if job.id in self.active_tasks:
-                    del self.active_tasks[job.id]
+                self._finish(job)
+    
+    def _finish(self, job: Job) -> None:
+        if job.session is not None:
+            job.session.finish_job()
+        self.store.update(job)
+        self.job_history.append(job)
+        self.metrics.job_finished(job)
+        self._notify_completion(job)
+    
+    def finish_remote_job(self, job: Job, key: Optional[str] = None) -> None:
+        """
+        Record the end of a job submitted here that another process ran
+        
+        Args:
+            job: The job, updated with its final state
+            key: Result cache key, or None if the result should not be cached
+        """
+        if key is not None:
+            if self.inflight.get(key) is job:
+                del self.inflight[key]
+            if job.status == JobStatus.COMPLETED and job.result is not None:
+                self.cache.put(key, job.result)
+        self._finish(job)
+    
+    def notify_remote_job(self, job: Job) -> None:
+        """
+        Signal waiters and listeners that a job of another process has finished
+        
+        Args:
+            job: The finished job
+        """
+        self._notify_completion(job)
+    
+    def watch_job(self, job: Job) -> None:
+        """
+        Make sure waiters and listeners learn when a job finishes, even if
+        another process sharing the queue runs it
+        
+        Args:
+            job: An unfinished job
+        """
+        if self.broker is not None and job.worker != self.worker_id:
+            self.broker.watch(job.id)
+    
+    async def cancel_job(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a pending or running job
+        
+        A queued job is removed from the queue. A running job's task is
+        cancelled and awaited, which kills its worker processes and frees
+        its concurrency slot before this method returns.
+        
+        Args:
+            job_id: ID of the job to cancel
+            
+        Returns:
+            The job in its final state (unchanged if it had already
+            finished), or None if the job is unknown
+        """
+        job = self.store.get(job_id)
+        if job is None or job.status.is_terminal():
+            return job
+        if self.broker is not None and job.worker != self.worker_id:
+            return self.broker.cancel(job)
+        
+        if not any(scheduler.cancel(job_id) for scheduler in list(self.schedulers.values())):
+            task = next(
+                (scheduler.tasks[job_id] for scheduler in self.schedulers.values() if job_id in scheduler.tasks), None
+            )
+            if task is None:
+                return job
+            task.cancel()
+            await asyncio.wait([task])
+        
+        if not job.status.is_terminal():
+            # Cancelled before it started processing
+            for key, inflight in list(self.inflight.items()):
+                if inflight is job:
+                    del self.inflight[key]
+            logger.info(f"[{job.job_type.value}:{job.id}] Cancelled before it started")
+            job.status = JobStatus.CANCELLED
+            job.error = "Job was cancelled"
+            job.completed_at = time.time()
+            self._finish(job)
+        return job
+    
+    async def close(self) -> None:
+        """
+        Stop running jobs and return every unfinished job of this manager
+        to the queue
+        
+        The returned jobs are resumed by the next manager using the job
+        store, or claimed by another process sharing the queue, instead of
+        being left pending or running under a process that no longer runs them.
+        """
+        self._closing = True
+        jobs: List[Job] = []
+        tasks: List[asyncio.Task] = []
+        for scheduler in self.schedulers.values():
+            for queue in scheduler.queues.values():
+                jobs.extend(entry.job for entry in queue)
+                queue.clear()
+            for job_id, task in scheduler.tasks.items():
+                job = self.store.get(job_id)
+                if job is not None:
+                    jobs.append(job)
+                task.cancel()
+                tasks.append(task)
+        if tasks:
+            await asyncio.wait(tasks)
+        self.inflight.clear()
+        jobs = [job for job in jobs if not job.status.is_terminal()]
+        for job in jobs:
+            job.status = JobStatus.PENDING
+            job.dispatched_at = job.started_at = job.completed_at = None
+            job.result = job.error = None
+            job.worker = None
+            self.store.update(job)
+            if job.session is not None:
+                job.session.finish_job()
+        if jobs:
+            logger.info(f"[Manager] Returned {len(jobs)} unfinished jobs to the queue")
+    
+    def add_completion_listener(self, listener: Callable[[Job], None]) -> None:
+        """
+        Register a callback invoked whenever a job reaches a terminal status
+        
+        Args:
+            listener: Function called with the finished job
+        """
+        self._listeners.append(listener)
+    
+    def _notify_completion(self, job: Job) -> None:
+        for future in self._waiters.pop(job.id, []):
+            if not future.done():
+                future.set_result(job)
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                logger.error(f"[{job.job_type.value}:{job.id}] Completion listener failed: {str(e)}", exc_info=True)
+    
+    async def wait_for_jobs(
+        self,
+        job_ids: List[str],
+        timeout: Optional[float] = None,
+        return_when: str = asyncio.FIRST_COMPLETED
+    ) -> List[Job]:
+        """
+        Wait until any or all of the given jobs have finished
+        
+        Args:
+            job_ids: IDs of the jobs to wait for
+            timeout: Maximum seconds to wait (None waits indefinitely)
+            return_when: asyncio.FIRST_COMPLETED or asyncio.ALL_COMPLETED
+            
+        Returns:
+            The known jobs among job_ids, in their current state
+        """
+        jobs = [job for job in (self.get_job(job_id) for job_id in job_ids) if job is not None]
+        pending = [job for job in jobs if not job.status.is_terminal()]
+        if not pending or (return_when == asyncio.FIRST_COMPLETED and len(pending) < len(jobs)):
+            return jobs
+        
+        loop = asyncio.get_running_loop()
+        futures = {}
+        for job in pending:
+            self.watch_job(job)
+            future = loop.create_future()
+            self._waiters.setdefault(job.id, []).append(future)
+            futures[job.id] = future
+        try:
+            await asyncio.wait(futures.values(), timeout=timeout, return_when=return_when)
+        finally:
+            for job_id, future in futures.items():
+                waiters = self._waiters.get(job_id)
+                if waiters and future in waiters:
+                    waiters.remove(future)
+                    if not waiters:
+                        del self._waiters[job_id]
+        if self.broker is not None:
+            # Jobs other processes ran finished in the job store, not in the objects held here
+            jobs = [self.get_job(job.id) or job for job in jobs]
+        return jobs
     
     def get_job(self, job_id: str) -> Optional[Job]:
         """
@@ -94,23 +573,57 @@ class JobManager:
         Returns:
             The job if found, None otherwise
         """
-        return self.jobs.get(job_id)
+        return self.store.get(job_id)
+    
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """
+        Get the position of a pending job in its queue
+        
+        Args:
+            job_id: ID of the job
+            
+        Returns:
+            Zero-based queue position, or None if the job is not queued
+        """
+        for scheduler in self.schedulers.values():
+            position = scheduler.queue_position(job_id)
+            if position is not None:
+                return position
+        return None
     
-    def list_jobs(self, job_type: Optional[JobType] = None) -> List[Dict[str, Any]]:
+    def list_jobs(
+        self,
+        job_type: Optional[JobType] = None,
+        status: Optional[JobStatus] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Dict[str, Any]]:
         """
-        List all jobs, optionally filtered by type
+        List jobs newest first, optionally filtered and paginated
         
         Args:
             job_type: Optional filter for job type
+            status: Optional filter for job status
+            limit: Maximum number of jobs to return (None for all)
+            offset: Number of matching jobs to skip
             
         Returns:
             List of job dictionaries
         """
-        jobs_info = []
-        for job in self.jobs.values():
-            if job_type is None or job.job_type == job_type:
-                jobs_info.append(job.to_dict())
-        return jobs_info
+        return [job.to_dict() for job in self.store.list(job_type, status, limit, offset)]
+    
+    def count_jobs(self, job_type: Optional[JobType] = None, status: Optional[JobStatus] = None) -> int:
+        """
+        Count jobs matching the filters
+        
+        Args:
+            job_type: Optional filter for job type
+            status: Optional filter for job status
+            
+        Returns:
+            Number of matching jobs
+        """
+        return self.store.count(job_type, status)
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -119,21 +632,26 @@ class JobManager:
         Returns:
             Dictionary with job statistics
         """
-        total = len(self.jobs)
-        by_status = {}
-        by_type = {}
+        by_status = self.store.counts_by("status")
+        by_type = self.store.counts_by("job_type")
+        total = sum(by_status.values())
         
-        for job in self.jobs.values():
-            # Count by status
-            status_key = job.status.value
-            by_status[status_key] = by_status.get(status_key, 0) + 1
-            
-            # Count by type
-            type_key = job.job_type.value
-            by_type[type_key] = by_type.get(type_key, 0) + 1
+        cache_stats = self.cache.get_stats()
+        cache_stats["coalesced"] = self.coalesced
         
-        return {
+        stats = {
             "total_jobs": total,
             "by_status": by_status,
-            "by_type": by_type
+            "by_type": by_type,
+            "cache": cache_stats,
+            "scheduler": self.scheduler.get_stats(),
+            "profiles": {
+                profile: scheduler.get_stats()
+                for profile, scheduler in self.schedulers.items() if scheduler is not self.scheduler
+            },
+            "usage": self.store.usage_by_type(),
+            "workspaces": self.documents.workspaces.get_stats()
         }
+        if self.broker is not None:
+            stats["shared_queue"] = self.broker.get_stats()
+        return stats
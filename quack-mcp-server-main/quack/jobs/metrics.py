@@ -0,0 +1,353 @@
+"""
+Incrementally maintained job metrics.
+
+Counters and histograms are updated as jobs are submitted and finish, so
+reading them never scans the job store. Metrics can be read as a
+dictionary or rendered in the Prometheus text exposition format.
+"""
+
+import bisect
+import json
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, List, Sequence, Tuple
+
+from .base import Job
+from .enums import JobType
+from .profiles import get_profile
+
+# Upper bounds of the latency histogram buckets, in seconds
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Upper bounds of the result size histogram buckets, in bytes
+SIZE_BUCKETS: Tuple[float, ...] = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Submissions per second are averaged over this many seconds
+RATE_WINDOW = 60
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds"""
+
+    def __init__(self, buckets: Sequence[float]):
+        """
+        Initialize an empty histogram
+
+        Args:
+            buckets: Increasing upper bounds; an implicit +Inf bucket is added
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Record one observation
+
+        Args:
+            value: Observed value
+        """
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """
+        Get the cumulative count of each bucket
+
+        Returns:
+            List of (upper bound, observations at or below it), ending with "+Inf"
+        """
+        total = 0
+        result = []
+        for bound, count in zip([*map(_format_value, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the histogram to a dictionary
+
+        Returns:
+            Dictionary with the count, sum, mean and cumulative buckets
+        """
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "buckets": dict(self.cumulative())
+        }
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+class Metrics:
+    """
+    Counters and histograms of job activity
+
+    Job managers report submissions and finished jobs. Schedulers and worker
+    pools registered with ``track_scheduler``/``track_pool`` are read when
+    the metrics are collected, to report queue depth and pool utilisation.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.submitted: Dict[str, int] = {}
+        self.rejected: Dict[str, int] = {}
+        self.finished: Dict[Tuple[str, str], int] = {}
+        self.cache: Dict[str, int] = {"hit": 0, "miss": 0, "coalesced": 0}
+        self.queue_wait: Dict[str, Histogram] = {}
+        self.execution: Dict[str, Histogram] = {}
+        self.result_size: Dict[str, Histogram] = {}
+        # Time from submission to result by (profile, job type), and how many met the profile's target
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.within_target: Dict[Tuple[str, str], int] = {}
+        self._recent: Deque[List[int]] = deque()  # [second, submissions]
+        self._schedulers: "weakref.WeakSet" = weakref.WeakSet()
+        self._pools: "weakref.WeakValueDictionary" = weakref.WeakValueDictionary()
+
+    def track_scheduler(self, scheduler: Any) -> None:
+        """
+        Report the queue depth of a scheduler
+
+        Args:
+            scheduler: A ``JobScheduler``
+        """
+        self._schedulers.add(scheduler)
+
+    def track_pool(self, pool: Any) -> None:
+        """
+        Report the utilisation of a worker pool
+
+        Args:
+            pool: A ``WorkerPool``
+        """
+        self._pools[pool.name] = pool
+
+    def job_submitted(self, job_type: JobType) -> None:
+        """
+        Count a submission
+
+        Args:
+            job_type: Type of the submitted job
+        """
+        self.submitted[job_type.value] = self.submitted.get(job_type.value, 0) + 1
+        second = int(time.monotonic())
+        if self._recent and self._recent[-1][0] == second:
+            self._recent[-1][1] += 1
+        else:
+            self._recent.append([second, 1])
+        self._expire(second)
+
+    def job_rejected(self, job_type: JobType) -> None:
+        """
+        Count a submission rejected because the queue was full
+
+        Args:
+            job_type: Type of the rejected job
+        """
+        self.rejected[job_type.value] = self.rejected.get(job_type.value, 0) + 1
+
+    def cache_lookup(self, result: str) -> None:
+        """
+        Count a result cache lookup
+
+        Args:
+            result: "hit", "miss" or "coalesced" (attached to a running job)
+        """
+        self.cache[result] += 1
+
+    def job_finished(self, job: Job) -> None:
+        """
+        Record a job that reached a terminal status
+
+        Args:
+            job: The finished job
+        """
+        job_type = job.job_type.value
+        key = (job_type, job.status.value)
+        self.finished[key] = self.finished.get(key, 0) + 1
+        if job.cache_hit:
+            return
+        if job.queue_wait_time is not None:
+            self.queue_wait.setdefault(job_type, Histogram(LATENCY_BUCKETS)).observe(job.queue_wait_time)
+        if job.execution_time is not None:
+            self.execution.setdefault(job_type, Histogram(LATENCY_BUCKETS)).observe(job.execution_time)
+        if job.result is not None:
+            size = len(json.dumps(job.result))
+            self.result_size.setdefault(job_type, Histogram(SIZE_BUCKETS)).observe(size)
+        if job.completed_at is not None:
+            profile = get_profile(job.options.get("profile"))
+            latency = job.completed_at - job.submitted_at
+            key = (profile.name, job_type)
+            self.latency.setdefault(key, Histogram(LATENCY_BUCKETS)).observe(latency)
+            if profile.latency_target is not None and latency <= profile.latency_target:
+                self.within_target[key] = self.within_target.get(key, 0) + 1
+
+    def _expire(self, now: int) -> None:
+        while self._recent and self._recent[0][0] <= now - RATE_WINDOW:
+            self._recent.popleft()
+
+    def submissions_per_second(self) -> float:
+        """
+        Average submission rate over the last minute
+
+        Returns:
+            Submissions per second
+        """
+        now = int(time.monotonic())
+        self._expire(now)
+        window = min(RATE_WINDOW, max(1.0, time.time() - self.started_at))
+        return sum(count for _, count in self._recent) / window
+
+    def cache_hit_rate(self) -> float:
+        """
+        Fraction of cacheable submissions answered without running a job
+
+        Returns:
+            Hit rate between 0 and 1
+        """
+        lookups = sum(self.cache.values())
+        return (self.cache["hit"] + self.cache["coalesced"]) / lookups if lookups else 0.0
+
+    def _scheduler_gauges(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        queued: Dict[str, int] = {}
+        running: Dict[str, int] = {}
+        for scheduler in list(self._schedulers):
+            for job_type, queue in scheduler.queues.items():
+                queued[job_type.value] = queued.get(job_type.value, 0) + len(queue)
+            for job_type, count in scheduler.running.items():
+                running[job_type.value] = running.get(job_type.value, 0) + count
+        return queued, running
+
+    def _pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        pools = {}
+        for name, pool in list(self._pools.items()):
+            stats = pool.get_stats()
+            stats["utilization"] = stats["busy"] / stats["size"] if stats["size"] else 0.0
+            pools[name] = stats
+        return pools
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Collect the metrics into a dictionary
+
+        Returns:
+            Dictionary with counters, rates, histograms per job type, queue
+            depth, worker pool utilisation and the latency of each analysis
+            profile against its target
+        """
+        queued, running = self._scheduler_gauges()
+        job_types = sorted(set(self.submitted) | {job_type for job_type, _ in self.finished})
+        return {
+            "uptime": round(time.time() - self.started_at, 3),
+            "submissions_per_second": round(self.submissions_per_second(), 3),
+            "cache": {**self.cache, "hit_rate": round(self.cache_hit_rate(), 4)},
+            "jobs": {
+                job_type: {
+                    "submitted": self.submitted.get(job_type, 0),
+                    "rejected": self.rejected.get(job_type, 0),
+                    "finished": {
+                        status: count for (finished_type, status), count in self.finished.items()
+                        if finished_type == job_type
+                    },
+                    "queued": queued.get(job_type, 0),
+                    "running": running.get(job_type, 0),
+                    "queue_wait_seconds": self.queue_wait[job_type].to_dict() if job_type in self.queue_wait else None,
+                    "execution_seconds": self.execution[job_type].to_dict() if job_type in self.execution else None,
+                    "result_bytes": self.result_size[job_type].to_dict() if job_type in self.result_size else None
+                }
+                for job_type in job_types
+            },
+            "pools": self._pool_stats(),
+            "profiles": self._profile_stats()
+        }
+
+    def _profile_stats(self) -> Dict[str, Dict[str, Any]]:
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for (profile, job_type), histogram in sorted(self.latency.items()):
+            target = get_profile(profile).latency_target
+            stats = profiles.setdefault(profile, {"latency_target": target, "jobs": {}})
+            stats["jobs"][job_type] = {
+                "latency_seconds": histogram.to_dict(),
+                "within_target": (
+                    round(self.within_target.get((profile, job_type), 0) / histogram.count, 4)
+                    if target is not None else None
+                )
+            }
+        return profiles
+
+    def render_prometheus(self) -> str:
+        """
+        Render the metrics in the Prometheus text exposition format
+
+        Returns:
+            Metrics text, version 0.0.4
+        """
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[Tuple[Dict[str, str], float]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(labels)} {_format_value(value)}")
+
+        def histograms(name: str, help_text: str, by_type: Dict[str, Histogram]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for job_type, histogram in sorted(by_type.items()):
+                for bound, count in histogram.cumulative():
+                    lines.append(f"{name}_bucket{_labels({'job_type': job_type, 'le': bound})} {count}")
+                lines.append(f"{name}_sum{_labels({'job_type': job_type})} {_format_value(histogram.sum)}")
+                lines.append(f"{name}_count{_labels({'job_type': job_type})} {histogram.count}")
+
+        queued, running = self._scheduler_gauges()
+        pools = self._pool_stats()
+        metric("quack_jobs_submitted_total", "counter", "Jobs submitted.",
+               [({"job_type": job_type}, count) for job_type, count in sorted(self.submitted.items())])
+        metric("quack_jobs_rejected_total", "counter", "Jobs rejected because the queue was full.",
+               [({"job_type": job_type}, count) for job_type, count in sorted(self.rejected.items())])
+        metric("quack_jobs_finished_total", "counter", "Jobs that reached a terminal status.",
+               [({"job_type": job_type, "status": status}, count)
+                for (job_type, status), count in sorted(self.finished.items())])
+        metric("quack_submissions_per_second", "gauge", f"Submission rate over the last {RATE_WINDOW} seconds.",
+               [({}, self.submissions_per_second())])
+        metric("quack_cache_lookups_total", "counter", "Result cache lookups by outcome.",
+               [({"result": result}, count) for result, count in self.cache.items()])
+        metric("quack_cache_hit_ratio", "gauge", "Fraction of cacheable submissions answered without a new run.",
+               [({}, self.cache_hit_rate())])
+        metric("quack_jobs_queued", "gauge", "Jobs waiting for a slot.",
+               [({"job_type": job_type}, count) for job_type, count in sorted(queued.items())])
+        metric("quack_jobs_running", "gauge", "Jobs being processed.",
+               [({"job_type": job_type}, count) for job_type, count in sorted(running.items())])
+        histograms("quack_job_queue_wait_seconds", "Time jobs waited for a slot.", self.queue_wait)
+        histograms("quack_job_execution_seconds", "Time jobs took to process.", self.execution)
+        histograms("quack_job_result_bytes", "Size of job results as JSON.", self.result_size)
+        lines.append("# HELP quack_job_latency_seconds Time from submission to result, by analysis profile.")
+        lines.append("# TYPE quack_job_latency_seconds histogram")
+        for (profile, job_type), histogram in sorted(self.latency.items()):
+            labels = {"profile": profile, "job_type": job_type}
+            for bound, count in histogram.cumulative():
+                lines.append(f"quack_job_latency_seconds_bucket{_labels({**labels, 'le': bound})} {count}")
+            lines.append(f"quack_job_latency_seconds_sum{_labels(labels)} {_format_value(histogram.sum)}")
+            lines.append(f"quack_job_latency_seconds_count{_labels(labels)} {histogram.count}")
+        metric("quack_pool_workers", "gauge", "Worker processes per pool.",
+               [({"pool": name}, stats["size"]) for name, stats in sorted(pools.items())])
+        metric("quack_pool_busy_workers", "gauge", "Workers serving a job.",
+               [({"pool": name}, stats["busy"]) for name, stats in sorted(pools.items())])
+        metric("quack_pool_utilization", "gauge", "Fraction of workers serving a job.",
+               [({"pool": name}, stats["utilization"]) for name, stats in sorted(pools.items())])
+        metric("quack_pool_busy_seconds_total", "counter", "Worker time spent serving jobs.",
+               [({"pool": name}, stats["busy_seconds"]) for name, stats in sorted(pools.items())])
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,97 @@
+"""
+Named analysis profiles trading depth of analysis for latency.
+
+A submission picks a profile with the ``profile`` option. Jobs of each
+profile are scheduled in their own concurrency pool, cached under their own
+keys and reported separately in the metrics, so quick checks from an
+agent's inner loop never wait behind thorough analyses.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, Tuple
+
+from .enums import JobType
+
+
+@dataclass(frozen=True)
+class AnalysisProfile:
+    """How deeply jobs of a profile analyse code, and how fast they should finish"""
+    name: str
+    description: str
+    # Extra pylint command line arguments
+    pylint_args: Tuple[str, ...] = ()
+    # Extra mypy command line arguments
+    mypy_args: Tuple[str, ...] = ()
+    # Maximum running jobs per job type in this profile's pool (None: the
+    # manager's own scheduler, shared with submissions without a profile)
+    concurrency: Optional[Dict[JobType, int]] = field(default=None, hash=False)
+    # Pylint workers kept for this profile alone (None: share the default pool)
+    lint_workers: Optional[int] = None
+    # Seconds from submission to result that jobs of this profile aim for
+    latency_target: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the profile to a dictionary for API responses
+
+        Returns:
+            Dictionary with the name, description, tool arguments and latency target
+        """
+        return {
+            "name": self.name,
+            "description": self.description,
+            "pylint_args": list(self.pylint_args),
+            "mypy_args": list(self.mypy_args),
+            "latency_target": self.latency_target
+        }
+
+
+# Profile of submissions that do not name one
+DEFAULT_PROFILE = "standard"
+
+PROFILES: Dict[str, AnalysisProfile] = {
+    "fast": AnalysisProfile(
+        "fast",
+        "Errors only; expensive checkers such as duplicate-code and design are disabled",
+        pylint_args=("--errors-only", "--disable=duplicate-code,design"),
+        concurrency={JobType.LINT: 16, JobType.STATIC_ANALYSIS: 2, JobType.ANALYZE_ALL: 2},
+        lint_workers=1,
+        latency_target=1.0
+    ),
+    DEFAULT_PROFILE: AnalysisProfile(
+        DEFAULT_PROFILE,
+        "Pylint's default checkers and mypy's default checks",
+        latency_target=5.0
+    ),
+    "thorough": AnalysisProfile(
+        "thorough",
+        "Default checkers plus docstring, complexity and type redefinition extensions; strict mypy",
+        pylint_args=(
+            "--load-plugins=pylint.extensions.docparams,pylint.extensions.mccabe,"
+            "pylint.extensions.redefined_variable_type,pylint.extensions.overlapping_exceptions",
+            "--enable=useless-suppression"
+        ),
+        mypy_args=("--strict",),
+        concurrency={JobType.LINT: 2, JobType.STATIC_ANALYSIS: 1, JobType.ANALYZE_ALL: 1},
+        latency_target=30.0
+    ),
+}
+
+
+def get_profile(name: Optional[str]) -> AnalysisProfile:
+    """
+    Look up a profile by name
+
+    Args:
+        name: Name of the profile, or None for the default profile
+
+    Returns:
+        The profile
+
+    Raises:
+        ValueError: If there is no profile of that name
+    """
+    profile = PROFILES.get((name or DEFAULT_PROFILE).lower())
+    if profile is None:
+        raise ValueError(f"Invalid profile: '{name}'. Valid profiles are: {', '.join(PROFILES)}")
+    return profile
@@ -0,0 +1,202 @@
+"""
+Bounded, prioritised scheduler for job processing.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Callable, Awaitable
+
+from .enums import JobType
+from .base import Job
+
+logger = logging.getLogger("quack")
+
+# Default number of jobs of each type that may run at the same time
+DEFAULT_CONCURRENCY: Dict[JobType, int] = {
+    JobType.LINT: 4,
+    JobType.STATIC_ANALYSIS: 2,
+    JobType.TEST: 2,
+    JobType.PROJECT: 1,
+    JobType.ANALYZE_ALL: 2,
+}
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+    def __init__(self, retry_after: float):
+        """
+        Args:
+            retry_after: Suggested number of seconds to wait before resubmitting
+        """
+        super().__init__(f"Job queue is full. Retry after {retry_after:.0f} seconds.")
+        self.retry_after = retry_after
+
+
+@dataclass(order=True)
+class _QueueEntry:
+    sort_key: tuple
+    job: Job = field(compare=False)
+    run: Callable[[], Awaitable[None]] = field(compare=False)
+
+
+class JobScheduler:
+    """
+    Runs jobs with per-type concurrency limits
+
+    Pending jobs wait in one priority queue per job type; higher priorities
+    run first and equal priorities run in submission order. When the total
+    number of queued jobs reaches ``max_queue_depth`` new submissions are
+    rejected with a retry-after hint.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[Dict[JobType, int]] = None,
+        default_concurrency: int = 2,
+        max_queue_depth: int = 100
+    ):
+        """
+        Initialize a new scheduler
+
+        Args:
+            concurrency: Maximum running jobs per job type
+            default_concurrency: Limit for job types missing from ``concurrency``
+            max_queue_depth: Maximum number of queued (not yet running) jobs
+        """
+        self.limits: Dict[JobType, int] = dict(DEFAULT_CONCURRENCY)
+        if concurrency:
+            self.limits.update(concurrency)
+        self.default_concurrency = default_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.queues: Dict[JobType, List[_QueueEntry]] = {}
+        self.running: Dict[JobType, int] = {}
+        self.tasks: Dict[str, asyncio.Task] = {}  # job_id -> running task
+        self.rejected = 0
+        self._avg_run_time: Dict[JobType, float] = {}
+        self._counter = itertools.count()
+
+    def limit(self, job_type: JobType) -> int:
+        """
+        Get the concurrency limit for a job type
+
+        Args:
+            job_type: Type of job
+
+        Returns:
+            Maximum number of jobs of this type that may run at once
+        """
+        return self.limits.get(job_type, self.default_concurrency)
+
+    @property
+    def queued(self) -> int:
+        """Total number of jobs waiting to run"""
+        return sum(len(queue) for queue in self.queues.values())
+
+    def submit(self, job: Job, run: Callable[[], Awaitable[None]]) -> None:
+        """
+        Queue a job and start it as soon as a slot is free
+
+        Args:
+            job: The job to schedule
+            run: Coroutine function that processes the job
+
+        Raises:
+            QueueFullError: If the queue is at capacity
+        """
+        if self.queued >= self.max_queue_depth:
+            self.rejected += 1
+            raise QueueFullError(self.retry_after(job.job_type))
+
+        entry = _QueueEntry((-job.priority, next(self._counter)), job, run)
+        heapq.heappush(self.queues.setdefault(job.job_type, []), entry)
+        self._dispatch(job.job_type)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Remove a queued job before it starts
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            True if the job was queued and has been removed
+        """
+        for queue in self.queues.values():
+            for index, entry in enumerate(queue):
+                if entry.job.id == job_id:
+                    queue[index] = queue[-1]
+                    queue.pop()
+                    heapq.heapify(queue)
+                    return True
+        return False
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """
+        Get the position of a queued job within its job type's queue
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            Zero-based position, or None if the job is not queued
+        """
+        for queue in self.queues.values():
+            for position, entry in enumerate(sorted(queue)):
+                if entry.job.id == job_id:
+                    return position
+        return None
+
+    def retry_after(self, job_type: JobType) -> float:
+        """
+        Estimate how long until a job of this type could start
+
+        Args:
+            job_type: Type of job
+
+        Returns:
+            Estimated wait in whole seconds (at least 1)
+        """
+        waiting = len(self.queues.get(job_type, []))
+        avg_run_time = self._avg_run_time.get(job_type, 1.0)
+        return float(max(1, math.ceil(avg_run_time * (waiting / self.limit(job_type) + 1))))
+
+    def _dispatch(self, job_type: JobType) -> None:
+        queue = self.queues.get(job_type)
+        while queue and self.running.get(job_type, 0) < self.limit(job_type):
+            entry = heapq.heappop(queue)
+            self.running[job_type] = self.running.get(job_type, 0) + 1
+            entry.job.dispatched_at = time.time()
+            task = asyncio.create_task(entry.run())
+            # Released from a callback, as a task cancelled before its first
+            # step never runs its own cleanup
+            task.add_done_callback(lambda task, job=entry.job: self._release(job))
+            self.tasks[entry.job.id] = task
+
+    def _release(self, job: Job) -> None:
+        self.running[job.job_type] -= 1
+        self.tasks.pop(job.id, None)
+        run_time = time.time() - (job.dispatched_at or time.time())
+        previous = self._avg_run_time.get(job.job_type)
+        self._avg_run_time[job.job_type] = run_time if previous is None else 0.8 * previous + 0.2 * run_time
+        self._dispatch(job.job_type)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the scheduler
+
+        Returns:
+            Dictionary with queue and concurrency statistics
+        """
+        return {
+            "queued": {job_type.value: len(queue) for job_type, queue in self.queues.items()},
+            "running": {job_type.value: count for job_type, count in self.running.items()},
+            "limits": {job_type.value: limit for job_type, limit in self.limits.items()},
+            "max_queue_depth": self.max_queue_depth,
+            "rejected": self.rejected
+        }
@@ -0,0 +1,136 @@
+"""
+Parsed view of submitted source code, shared by all processors.
+"""
+
+import ast
+import hashlib
+import io
+import re
+import tokenize
+from bisect import bisect_right
+from functools import cached_property
+from typing import List, Optional, Tuple
+
+# Line endings recognised by the Python tokenizer
+_NEWLINE = re.compile(r"\r\n|\r|\n")
+
+
+class SourceDocument:
+    """
+    Source code with a line index, computed once per submission
+
+    The line index is built eagerly; the content hash, AST and token stream
+    are computed on first use and then cached.
+    """
+
+    def __init__(self, text: str):
+        """
+        Index the source text
+
+        Args:
+            text: Python source code
+        """
+        self.text = text
+        self.line_offsets: List[int] = [0]  # offset of the first character of each line
+        self.lines: List[str] = []
+        start = 0
+        for match in _NEWLINE.finditer(text):
+            self.lines.append(text[start:match.start()])
+            start = match.end()
+            self.line_offsets.append(start)
+        if start < len(text):
+            self.lines.append(text[start:])
+        else:
+            # A trailing newline does not start another line
+            self.line_offsets.pop()
+
+    @property
+    def line_count(self) -> int:
+        """Number of lines in the source"""
+        return len(self.lines)
+
+    def line(self, line_number: int) -> Optional[str]:
+        """
+        Get the text of a line, without its line ending
+
+        Args:
+            line_number: One-based line number
+
+        Returns:
+            The line, or None if the line number is out of range
+        """
+        if 1 <= line_number <= len(self.lines):
+            return self.lines[line_number - 1]
+        return None
+
+    def offset(self, line_number: int, column: int = 0) -> int:
+        """
+        Convert a position to an offset into the text
+
+        Args:
+            line_number: One-based line number
+            column: Zero-based column
+
+        Returns:
+            Offset of the position in ``text``
+
+        Raises:
+            IndexError: If the line number is out of range
+        """
+        if not 1 <= line_number <= len(self.line_offsets):
+            raise IndexError(f"Line {line_number} out of range")
+        return self.line_offsets[line_number - 1] + column
+
+    def position(self, offset: int) -> Tuple[int, int]:
+        """
+        Convert an offset into the text to a position
+
+        Args:
+            offset: Offset in ``text``
+
+        Returns:
+            Tuple of (one-based line number, zero-based column)
+        """
+        index = max(bisect_right(self.line_offsets, offset) - 1, 0)
+        return index + 1, offset - self.line_offsets[index]
+
+    @cached_property
+    def content_hash(self) -> str:
+        """SHA-256 hex digest of the source text"""
+        return hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+
+    @cached_property
+    def _parsed(self) -> Tuple[Optional[ast.Module], Optional[SyntaxError]]:
+        try:
+            return ast.parse(self.text), None
+        except SyntaxError as e:
+            return None, e
+        except ValueError as e:
+            # e.g. source code containing null bytes
+            return None, SyntaxError(str(e))
+
+    @property
+    def ast(self) -> Optional[ast.Module]:
+        """The parsed module, or None if the source has a syntax error"""
+        return self._parsed[0]
+
+    @property
+    def syntax_error(self) -> Optional[SyntaxError]:
+        """The error raised when parsing the source, or None if it parses"""
+        return self._parsed[1]
+
+    @cached_property
+    def tokens(self) -> List[tokenize.TokenInfo]:
+        """
+        The token stream of the source
+
+        Tokenizing stops at the first tokenizer error, so the list may be
+        incomplete for invalid code.
+        """
+        tokens: List[tokenize.TokenInfo] = []
+        try:
+            for token in tokenize.generate_tokens(io.StringIO(self.text).readline):
+                tokens.append(token)
+        except (tokenize.TokenError, SyntaxError):
+            pass
+        return tokens
@@ -0,0 +1,718 @@
+"""
+Pluggable storage for jobs.
+"""
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional, List
+
+from .enums import JobType, JobStatus
+from .base import Job
+from .profiles import DEFAULT_PROFILE
+from .tracing import Trace
+from .usage import ResourceUsage, UsageStats
+
+logger = logging.getLogger("quack")
+
+TERMINAL_STATUSES = tuple(status for status in JobStatus if status.is_terminal())
+
+# Seconds a write waits for another process's write lock
+BUSY_TIMEOUT = 5.0
+
+# Seconds claiming queued jobs waits for the write lock; the broker polls
+# on the event loop and rather claims at its next poll than blocks the loop
+CLAIM_BUSY_TIMEOUT = 0.05
+
+# Columns written for every job; other processes may set ``cancel_requested``
+JOB_COLUMNS = (
+    "id", "job_type", "status", "priority", "submitted_at", "dispatched_at", "started_at",
+    "completed_at", "cache_hit", "code", "result", "error", "options",
+    "cpu_time", "peak_rss_kb", "output_bytes", "trace", "worker"
+)
+
+
+def local_worker() -> str:
+    """
+    Get the ID under which this process claims jobs
+
+    Returns:
+        ``host:pid`` of this process
+    """
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def worker_exited(worker: str) -> bool:
+    """
+    Check whether the process behind a worker ID has exited
+
+    Args:
+        worker: ID returned by ``local_worker``
+
+    Returns:
+        True if the worker ran on this host and its process no longer exists;
+        workers on other hosts are assumed to be alive
+    """
+    host, _, pid = worker.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+class JobStore(ABC):
+    """
+    Abstract base class for job storage.
+
+    The job manager calls ``add`` when a job is submitted and ``update``
+    once it reaches a terminal status. Jobs that are still pending or
+    running are always kept in memory, because processors update them in
+    place.
+    """
+
+    @abstractmethod
+    def add(self, job: Job) -> None:
+        """
+        Store a newly submitted job
+
+        Args:
+            job: The job to store
+        """
+        pass
+
+    @abstractmethod
+    def update(self, job: Job) -> None:
+        """
+        Persist the current state of a job
+
+        Args:
+            job: The job to persist
+        """
+        pass
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """
+        Get a job by ID
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            The job if found, None otherwise
+        """
+        pass
+
+    @abstractmethod
+    def list(
+        self,
+        job_type: Optional[JobType] = None,
+        status: Optional[JobStatus] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Job]:
+        """
+        List jobs, newest first
+
+        Args:
+            job_type: Optional filter for job type
+            status: Optional filter for job status
+            limit: Maximum number of jobs to return (None for all)
+            offset: Number of matching jobs to skip
+
+        Returns:
+            List of jobs
+        """
+        pass
+
+    @abstractmethod
+    def count(self, job_type: Optional[JobType] = None, status: Optional[JobStatus] = None) -> int:
+        """
+        Count jobs matching the filters
+
+        Args:
+            job_type: Optional filter for job type
+            status: Optional filter for job status
+
+        Returns:
+            Number of matching jobs
+        """
+        pass
+
+    @abstractmethod
+    def counts_by(self, column: str) -> Dict[str, int]:
+        """
+        Count jobs grouped by ``"status"`` or ``"job_type"``
+
+        Args:
+            column: Either "status" or "job_type"
+
+        Returns:
+            Dictionary mapping the column value to a count
+        """
+        pass
+
+    @abstractmethod
+    def usage_by_type(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Aggregate the resource usage of finished jobs per job type
+
+        Returns:
+            Dictionary mapping the job type to its usage statistics; jobs
+            without measured usage (e.g. cache hits) are not counted
+        """
+        pass
+
+    @abstractmethod
+    def purge(self, older_than: float) -> int:
+        """
+        Delete terminal jobs that completed before a timestamp
+
+        Args:
+            older_than: Unix timestamp
+
+        Returns:
+            Number of jobs deleted
+        """
+        pass
+
+    def interrupted(self) -> List[Job]:
+        """
+        Get jobs that were pending or running when the previous server stopped
+
+        Returns:
+            List of jobs to resume
+        """
+        return []
+
+    def close(self) -> None:
+        """Release any resources held by the store"""
+        pass
+
+
+class MemoryJobStore(JobStore):
+    """Job store keeping every job in a dictionary"""
+
+    def __init__(self):
+        self.jobs: Dict[str, Job] = {}  # job_id -> Job
+
+    def add(self, job: Job) -> None:
+        self.jobs[job.id] = job
+
+    def update(self, job: Job) -> None:
+        self.jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def _matching(self, job_type: Optional[JobType], status: Optional[JobStatus]) -> List[Job]:
+        return [
+            job for job in self.jobs.values()
+            if (job_type is None or job.job_type == job_type) and (status is None or job.status == status)
+        ]
+
+    def list(
+        self,
+        job_type: Optional[JobType] = None,
+        status: Optional[JobStatus] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Job]:
+        jobs = sorted(self._matching(job_type, status), key=lambda job: job.submitted_at, reverse=True)
+        return jobs[offset:] if limit is None else jobs[offset:offset + limit]
+
+    def count(self, job_type: Optional[JobType] = None, status: Optional[JobStatus] = None) -> int:
+        return len(self._matching(job_type, status))
+
+    def counts_by(self, column: str) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for job in self.jobs.values():
+            key = job.status.value if column == "status" else job.job_type.value
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def usage_by_type(self) -> Dict[str, Dict[str, Any]]:
+        stats: Dict[str, UsageStats] = {}
+        for job in self.jobs.values():
+            if job.status.is_terminal() and job.usage is not None:
+                stats.setdefault(job.job_type.value, UsageStats()).add(job.usage)
+        return {job_type: usage.to_dict() for job_type, usage in stats.items()}
+
+    def purge(self, older_than: float) -> int:
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.status.is_terminal() and (job.completed_at or job.submitted_at) < older_than
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+        return len(expired)
+
+
+class SqliteJobStore(JobStore):
+    """
+    Job store backed by SQLite in WAL mode
+
+    Only pending and running jobs plus a small LRU of recently used
+    finished jobs are held in memory. Listing, counting and purging are
+    answered by indexed queries. Jobs persist across server restarts.
+
+    Several processes may open the same database. Each job row records the
+    ``worker`` running it; rows without one are queued for any process to
+    ``claim``. Jobs of other processes are read from the database.
+    """
+
+    def __init__(self, path: str, hot_size: int = 100, worker: Optional[str] = None):
+        """
+        Open (or create) a job database
+
+        Args:
+            path: Path of the SQLite database file
+            hot_size: Number of finished jobs cached in memory
+            worker: ID under which this process claims jobs (default: ``local_worker()``)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.hot_size = hot_size
+        self.worker = worker or local_worker()
+        self.active: Dict[str, Job] = {}  # job_id -> pending or running Job
+        self.recent: "OrderedDict[str, Job]" = OrderedDict()  # job_id -> finished Job
+        self.conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                job_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                priority INTEGER NOT NULL DEFAULT 0,
+                submitted_at REAL NOT NULL,
+                dispatched_at REAL,
+                started_at REAL,
+                completed_at REAL,
+                cache_hit INTEGER NOT NULL DEFAULT 0,
+                code TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                options TEXT,
+                cpu_time REAL,
+                peak_rss_kb INTEGER,
+                output_bytes INTEGER,
+                trace TEXT,
+                worker TEXT,
+                cancel_requested INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, submitted_at);
+            CREATE INDEX IF NOT EXISTS jobs_type ON jobs (job_type, submitted_at);
+            CREATE INDEX IF NOT EXISTS jobs_submitted ON jobs (submitted_at);
+            CREATE INDEX IF NOT EXISTS jobs_completed ON jobs (completed_at);
+        """)
+        # Databases created before job options, resource usage, traces and workers existed
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(jobs)")}
+        for column, column_type in (
+            ("options", "TEXT"), ("cpu_time", "REAL"), ("peak_rss_kb", "INTEGER"), ("output_bytes", "INTEGER"),
+            ("trace", "TEXT"), ("worker", "TEXT"), ("cancel_requested", "INTEGER NOT NULL DEFAULT 0")
+        ):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {column_type}")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, worker, job_type)")
+
+    def add(self, job: Job) -> None:
+        self._write(job)
+        if job.status.is_terminal():
+            self._remember(job)
+        else:
+            self.active[job.id] = job
+
+    def update(self, job: Job) -> None:
+        self._write(job)
+        if job.status.is_terminal():
+            self.active.pop(job.id, None)
+            self._remember(job)
+
+    def _write(self, job: Job) -> None:
+        # Upsert, so a cancellation requested by another process is kept
+        self.conn.execute(
+            f"""
+            INSERT INTO jobs ({', '.join(JOB_COLUMNS)}) VALUES ({', '.join('?' for _ in JOB_COLUMNS)})
+            ON CONFLICT (id) DO UPDATE SET {', '.join(f'{column} = excluded.{column}' for column in JOB_COLUMNS[1:])}
+            """,
+            (
+                job.id, job.job_type.value, job.status.value, job.priority, job.submitted_at,
+                job.dispatched_at, job.started_at, job.completed_at, int(job.cache_hit), job.code,
+                json.dumps(job.result) if job.result is not None else None, job.error,
+                json.dumps(job.options) if job.options else None,
+                *((job.usage.cpu_time, job.usage.peak_rss_kb, job.usage.output_bytes)
+                  if job.usage is not None else (None, None, None)),
+                json.dumps(job.trace.to_list()) if len(job.trace) else None,
+                job.worker
+            )
+        )
+
+    def _remember(self, job: Job) -> None:
+        self.recent[job.id] = job
+        self.recent.move_to_end(job.id)
+        while len(self.recent) > self.hot_size:
+            self.recent.popitem(last=False)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self.active.get(job_id) or self.recent.get(job_id)
+        if job is not None:
+            return job
+        row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = self._row_to_job(row)
+        if job.status.is_terminal():
+            self._remember(job)
+        return job
+
+    def _row_to_job(self, row: sqlite3.Row) -> Job:
+        # Import here to avoid circular imports
+        from .factory import JobFactory
+
+        job = JobFactory.restore_job(JobType(row["job_type"]), row["id"], row["code"])
+        job.status = JobStatus(row["status"])
+        job.priority = row["priority"]
+        job.submitted_at = row["submitted_at"]
+        job.dispatched_at = row["dispatched_at"]
+        job.started_at = row["started_at"]
+        job.completed_at = row["completed_at"]
+        job.cache_hit = bool(row["cache_hit"])
+        job.result = json.loads(row["result"]) if row["result"] is not None else None
+        job.error = row["error"]
+        job.options = json.loads(row["options"]) if row["options"] is not None else {}
+        if row["cpu_time"] is not None:
+            job.usage = ResourceUsage(row["cpu_time"], row["peak_rss_kb"], row["output_bytes"])
+        if row["trace"] is not None:
+            job.trace = Trace.from_list(json.loads(row["trace"]))
+        job.worker = row["worker"]
+        return job
+
+    def _active_matching(self, job_type: Optional[JobType], status: Optional[JobStatus]) -> List[Job]:
+        return [
+            job for job in self.active.values()
+            if (job_type is None or job.job_type == job_type) and (status is None or job.status == status)
+        ]
+
+    def _terminal_filter(self, job_type: Optional[JobType], status: Optional[JobStatus]):
+        clauses = [f"status IN ({', '.join('?' for _ in TERMINAL_STATUSES)})"]
+        params: List[Any] = [status.value for status in TERMINAL_STATUSES]
+        if job_type is not None:
+            clauses.append("job_type = ?")
+            params.append(job_type.value)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status.value)
+        return " AND ".join(clauses), params
+
+    def _unfinished_filter(self, job_type: Optional[JobType], status: Optional[JobStatus]):
+        # Pending and running jobs not held in memory, i.e. those of other processes
+        where, params = self._terminal_filter(job_type, status)
+        where = where.replace("status IN", "status NOT IN", 1)
+        if self.active:
+            where += f" AND id NOT IN ({', '.join('?' for _ in self.active)})"
+            params.extend(self.active)
+        return where, params
+
+    def list(
+        self,
+        job_type: Optional[JobType] = None,
+        status: Optional[JobStatus] = None,
+        limit: Optional[int] = None,
+        offset: int = 0
+    ) -> List[Job]:
+        # Pending and running jobs of this process live in memory; all others come from the database
+        window = -1 if limit is None else offset + limit
+        active: List[Job] = []
+        if status is None or not status.is_terminal():
+            active = self._active_matching(job_type, status)
+            where, params = self._unfinished_filter(job_type, status)
+            rows = self.conn.execute(
+                f"SELECT * FROM jobs WHERE {where} ORDER BY submitted_at DESC LIMIT ?",
+                (*params, window)
+            ).fetchall()
+            active.extend(self._row_to_job(row) for row in rows)
+        finished: List[Job] = []
+        if status is None or status.is_terminal():
+            where, params = self._terminal_filter(job_type, status)
+            rows = self.conn.execute(
+                f"SELECT * FROM jobs WHERE {where} ORDER BY submitted_at DESC LIMIT ?",
+                (*params, window)
+            ).fetchall()
+            finished = [self.recent.get(row["id"]) or self._row_to_job(row) for row in rows]
+        jobs = sorted(active + finished, key=lambda job: job.submitted_at, reverse=True)
+        return jobs[offset:] if limit is None else jobs[offset:offset + limit]
+
+    def count(self, job_type: Optional[JobType] = None, status: Optional[JobStatus] = None) -> int:
+        total = 0
+        filters = []
+        if status is None or not status.is_terminal():
+            total += len(self._active_matching(job_type, status))
+            filters.append(self._unfinished_filter(job_type, status))
+        if status is None or status.is_terminal():
+            filters.append(self._terminal_filter(job_type, status))
+        for where, params in filters:
+            total += self.conn.execute(f"SELECT COUNT(*) FROM jobs WHERE {where}", params).fetchone()[0]
+        return total
+
+    def counts_by(self, column: str) -> Dict[str, int]:
+        if column not in ("status", "job_type"):
+            raise ValueError(f"Cannot count jobs by {column}")
+        counts: Dict[str, int] = {}
+        for where, params in (self._terminal_filter(None, None), self._unfinished_filter(None, None)):
+            for row in self.conn.execute(
+                f"SELECT {column}, COUNT(*) FROM jobs WHERE {where} GROUP BY {column}", params
+            ):
+                counts[row[0]] = counts.get(row[0], 0) + row[1]
+        for job in self.active.values():
+            key = job.status.value if column == "status" else job.job_type.value
+            counts[key] = counts.get(key, 0) + 1
+        return counts
+
+    def usage_by_type(self) -> Dict[str, Dict[str, Any]]:
+        where, params = self._terminal_filter(None, None)
+        usage: Dict[str, Dict[str, Any]] = {}
+        for row in self.conn.execute(
+            f"""
+            SELECT job_type, COUNT(*), SUM(cpu_time), MAX(cpu_time), MAX(peak_rss_kb), SUM(output_bytes)
+            FROM jobs WHERE {where} AND cpu_time IS NOT NULL GROUP BY job_type
+            """,
+            params
+        ):
+            stats = UsageStats()
+            stats.jobs, stats.cpu_time, stats.max_cpu_time, stats.peak_rss_kb, stats.output_bytes = row[1:]
+            usage[row[0]] = stats.to_dict()
+        return usage
+
+    def purge(self, older_than: float) -> int:
+        where, params = self._terminal_filter(None, None)
+        cursor = self.conn.execute(f"DELETE FROM jobs WHERE {where} AND completed_at < ?", (*params, older_than))
+        for job_id, job in list(self.recent.items()):
+            if (job.completed_at or 0) < older_than:
+                del self.recent[job_id]
+        return cursor.rowcount
+
+    def interrupted(self) -> List[Job]:
+        # Queued jobs and jobs of exited processes, claimed one by one as
+        # other processes may be resuming them at the same time
+        where, params = self._terminal_filter(None, None)
+        rows = self.conn.execute(
+            f"SELECT * FROM jobs WHERE NOT ({where}) ORDER BY submitted_at", params
+        ).fetchall()
+        jobs = []
+        for row in rows:
+            if row["id"] in self.active or (row["worker"] is not None and not worker_exited(row["worker"])):
+                continue
+            claimed = self.conn.execute(
+                "UPDATE jobs SET worker = ? WHERE id = ? AND worker IS ?", (self.worker, row["id"], row["worker"])
+            ).rowcount
+            if not claimed:
+                continue
+            try:
+                job = self._row_to_job(row)
+            except ValueError as e:
+                logger.warning(f"[Store] Skipping unrecoverable job {row['id']}: {str(e)}")
+                continue
+            job.worker = self.worker
+            jobs.append(job)
+        return jobs
+
+    def claim(self, job_type: JobType, limit: int, profiles: Optional[List[str]] = None) -> List[Job]:
+        """
+        Take queued jobs no process has claimed yet
+
+        Claiming does not wait while another process holds the write lock;
+        nothing is claimed then.
+
+        Args:
+            job_type: Type of jobs to take
+            limit: Maximum number of jobs to take
+            profiles: Names of the analysis profiles of the jobs to take (default: any)
+
+        Returns:
+            The claimed jobs, highest priority first, with ``worker`` set to
+            this store's worker
+        """
+        profile_filter, profile_params = "", ()
+        if profiles is not None:
+            profile_filter = (
+                f"AND LOWER(COALESCE(json_extract(options, '$.profile'), ?)) IN ({', '.join('?' for _ in profiles)})"
+            )
+            profile_params = (DEFAULT_PROFILE, *profiles)
+        queued = f"""
+            SELECT * FROM jobs WHERE status = ? AND worker IS NULL AND job_type = ? {profile_filter}
+            ORDER BY priority DESC, submitted_at LIMIT ?
+        """
+        params = (JobStatus.PENDING.value, job_type.value, *profile_params, limit)
+        # Only take the write lock when there is something to claim
+        if limit <= 0 or self.conn.execute(queued, params).fetchone() is None:
+            return []
+        with self._busy_timeout(CLAIM_BUSY_TIMEOUT):
+            try:
+                self.conn.execute("BEGIN IMMEDIATE")
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                logger.debug(f"[Store] Job database is locked by another process; not claiming {job_type.value} jobs")
+                return []
+        try:
+            rows = self.conn.execute(queued, params).fetchall()
+            if rows:
+                self.conn.execute(
+                    f"UPDATE jobs SET worker = ? WHERE id IN ({', '.join('?' for _ in rows)})",
+                    (self.worker, *(row["id"] for row in rows))
+                )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        jobs = []
+        for row in rows:
+            try:
+                job = self._row_to_job(row)
+            except ValueError as e:
+                logger.warning(f"[Store] Skipping unrecoverable job {row['id']}: {str(e)}")
+                continue
+            job.worker = self.worker
+            jobs.append(job)
+        return jobs
+
+    def release(self, job_ids: List[str]) -> int:
+        """
+        Return unfinished jobs claimed by this store's worker to the queue
+
+        Args:
+            job_ids: IDs of the jobs
+
+        Returns:
+            Number of jobs returned
+        """
+        if not job_ids:
+            return 0
+        where, params = self._terminal_filter(None, None)
+        return self.conn.execute(
+            f"""
+            UPDATE jobs SET worker = NULL, status = ?, dispatched_at = NULL, started_at = NULL
+            WHERE id IN ({', '.join('?' for _ in job_ids)}) AND worker = ? AND NOT ({where})
+            """,
+            (JobStatus.PENDING.value, *job_ids, self.worker, *params)
+        ).rowcount
+
+    def release_exited(self) -> int:
+        """
+        Return the unfinished jobs of exited processes to the queue
+
+        Returns:
+            Number of jobs returned
+        """
+        where, params = self._terminal_filter(None, None)
+        workers = [
+            row[0] for row in self.conn.execute(
+                f"SELECT DISTINCT worker FROM jobs WHERE worker IS NOT NULL AND NOT ({where})", params
+            )
+        ]
+        released = 0
+        for worker in workers:
+            if worker != self.worker and worker_exited(worker):
+                try:
+                    with self._busy_timeout(CLAIM_BUSY_TIMEOUT):
+                        released += self.conn.execute(
+                            f"""
+                            UPDATE jobs SET worker = NULL, status = ?, dispatched_at = NULL, started_at = NULL
+                            WHERE worker = ? AND NOT ({where})
+                            """,
+                            (JobStatus.PENDING.value, worker, *params)
+                        ).rowcount
+                except sqlite3.OperationalError as e:
+                    if "locked" not in str(e):
+                        raise
+                    # Returned at the next check
+                    logger.debug(f"[Store] Job database is locked by another process; not releasing jobs of {worker}")
+        return released
+
+    @contextmanager
+    def _busy_timeout(self, seconds: float) -> Iterator[None]:
+        self.conn.execute(f"PRAGMA busy_timeout = {int(seconds * 1000)}")
+        try:
+            yield
+        finally:
+            self.conn.execute(f"PRAGMA busy_timeout = {int(BUSY_TIMEOUT * 1000)}")
+
+    def refresh(self, job_ids: List[str]) -> List[Job]:
+        """
+        Read the stored state of jobs, e.g. of jobs other processes are running
+
+        Args:
+            job_ids: IDs of the jobs
+
+        Returns:
+            The jobs found, as new objects
+        """
+        if not job_ids:
+            return []
+        rows = self.conn.execute(
+            f"SELECT * FROM jobs WHERE id IN ({', '.join('?' for _ in job_ids)})", list(job_ids)
+        ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def count_unclaimed(self) -> int:
+        """
+        Count queued jobs no process has claimed yet
+
+        Returns:
+            Number of jobs
+        """
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = ? AND worker IS NULL", (JobStatus.PENDING.value,)
+        ).fetchone()[0]
+
+    def request_cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job, or ask the process running it to cancel it
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            True if the job was still unclaimed and is now cancelled; False if
+            the process that claimed it has been asked to cancel it
+        """
+        cancelled = self.conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, completed_at = ? WHERE id = ? AND status = ? AND worker IS NULL",
+            (JobStatus.CANCELLED.value, "Job was cancelled", time.time(), job_id, JobStatus.PENDING.value)
+        ).rowcount
+        if not cancelled:
+            self.conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+        return bool(cancelled)
+
+    def cancel_requests(self) -> List[str]:
+        """
+        Get the unfinished jobs of this store's worker that other processes asked to cancel
+
+        Returns:
+            IDs of the jobs
+        """
+        where, params = self._terminal_filter(None, None)
+        return [
+            row[0] for row in self.conn.execute(
+                f"SELECT id FROM jobs WHERE worker = ? AND cancel_requested = 1 AND NOT ({where})",
+                (self.worker, *params)
+            )
+        ]
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,198 @@
+"""
+Stage timings of jobs.
+
+Processors record spans for the stages of a job (writing files, waiting
+for and starting workers, running the tool, parsing its output). Spans are
+returned with job results on request and can be exported in the Chrome
+trace-event format, which chrome://tracing and Perfetto load directly.
+"""
+
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+@dataclass
+class Span:
+    """One timed stage of a job"""
+    name: str
+    start: float  # Wall-clock time, in seconds since the epoch
+    duration: float
+    # Spans of concurrent work (test shards, sub-analyses) get their own lane
+    lane: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self, origin: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Convert the span to a dictionary
+
+        Args:
+            origin: If given, also report the start as an offset from this time
+
+        Returns:
+            Dictionary with the name, start, duration, lane and attributes
+        """
+        span: Dict[str, Any] = {"name": self.name, "start": self.start, "duration": round(self.duration, 6)}
+        if origin is not None:
+            span["offset"] = round(self.start - origin, 6)
+        if self.lane:
+            span["lane"] = self.lane
+        if self.attributes:
+            span["attributes"] = self.attributes
+        return span
+
+
+class Trace:
+    """
+    Spans recorded for one job
+
+    Spans are appended as they finish, so concurrent stages of the same job
+    can record spans without coordinating.
+    """
+
+    def __init__(self, spans: Optional[List[Span]] = None):
+        self.spans: List[Span] = spans or []
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    @contextmanager
+    def span(self, name: str, lane: int = 0, **attributes: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time the enclosed block
+
+        The span is recorded even if the block raises or is cancelled.
+
+        Args:
+            name: Name of the stage
+            lane: Lane of the span (0 for the job's main line of work)
+            **attributes: Attributes of the span
+
+        Yields:
+            The span's attributes, which the block may add to
+        """
+        start = time.time()
+        try:
+            yield attributes
+        finally:
+            self.spans.append(Span(name, start, time.time() - start, lane, attributes))
+
+    def add(self, name: str, start: float, end: float, lane: int = 0, **attributes: Any) -> None:
+        """
+        Record a stage timed elsewhere, e.g. in a worker thread
+
+        Args:
+            name: Name of the stage
+            start: Wall-clock start time
+            end: Wall-clock end time
+            lane: Lane of the span
+            **attributes: Attributes of the span
+        """
+        self.spans.append(Span(name, start, max(0.0, end - start), lane, attributes))
+
+    def add_timing(self, name: str, timing: Optional[Dict[str, Any]], lane: int = 0) -> None:
+        """
+        Record the stages of a request served by a worker or daemon
+
+        Args:
+            name: Name of the tool run on the worker
+            timing: ``timing`` of the worker response: wall-clock ``submitted``,
+                ``acquired``, ``spawned`` (if a worker had to be started) and
+                ``finished`` times, and the ``handler`` seconds spent in the
+                tool itself, if reported; None if the response was not timed
+            lane: Lane of the spans
+        """
+        if not timing:
+            return
+        self.add("wait_for_worker", timing["submitted"], timing["acquired"], lane)
+        started = timing["acquired"]
+        if timing.get("spawned") is not None:
+            self.add("spawn_worker", started, timing["spawned"], lane)
+            started = timing["spawned"]
+        attributes: Dict[str, Any] = {}
+        if timing.get("handler") is not None:
+            # Time spent outside the tool: pipe I/O and JSON encoding
+            attributes["overhead"] = round(max(0.0, timing["finished"] - started - timing["handler"]), 6)
+        self.add(name, started, timing["finished"], lane, **attributes)
+
+    def merge(self, other: "Trace", prefix: str, lane_offset: int) -> None:
+        """
+        Add the spans of a sub-job, which ran concurrently with other sub-jobs
+
+        Args:
+            other: Trace of the sub-job
+            prefix: Prefix for the names of the sub-job's spans
+            lane_offset: Added to the lanes of the sub-job's spans, so they
+                do not share lanes with other sub-jobs
+        """
+        for span in other.spans:
+            self.spans.append(Span(
+                f"{prefix}.{span.name}", span.start, span.duration, lane_offset + span.lane, span.attributes
+            ))
+
+    def to_list(self, origin: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Convert the spans to dictionaries, in order of their start
+
+        Args:
+            origin: If given, also report starts as offsets from this time
+
+        Returns:
+            List of span dictionaries
+        """
+        return [span.to_dict(origin) for span in sorted(self.spans, key=lambda span: (span.start, -span.duration))]
+
+    @classmethod
+    def from_list(cls, spans: Iterable[Dict[str, Any]]) -> "Trace":
+        """
+        Rebuild a trace from ``to_list`` output
+
+        Args:
+            spans: Span dictionaries
+
+        Returns:
+            The trace
+        """
+        return cls([
+            Span(span["name"], span["start"], span["duration"], span.get("lane", 0), span.get("attributes", {}))
+            for span in spans
+        ])
+
+
+def chrome_trace(jobs: Iterable[Any]) -> Dict[str, Any]:
+    """
+    Export the traces of jobs in the Chrome trace-event format
+
+    Each job becomes a process named after its type and ID; each lane of
+    the job becomes a thread.
+
+    Args:
+        jobs: Jobs whose traces to export
+
+    Returns:
+        JSON-serialisable trace, loadable by chrome://tracing and Perfetto
+    """
+    events: List[Dict[str, Any]] = []
+    for pid, job in enumerate(jobs, 1):
+        events.append({
+            "name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+            "args": {"name": f"{job.job_type.value}:{job.id}"}
+        })
+        for lane in sorted({span.lane for span in job.trace.spans}):
+            events.append({
+                "name": "thread_name", "ph": "M", "pid": pid, "tid": lane,
+                "args": {"name": "main" if lane == 0 else f"lane {lane}"}
+            })
+        for span in sorted(job.trace.spans, key=lambda span: (span.start, -span.duration)):
+            events.append({
+                "name": span.name,
+                "cat": job.job_type.value,
+                "ph": "X",
+                "ts": round(span.start * 1e6, 3),
+                "dur": round(span.duration * 1e6, 3),
+                "pid": pid,
+                "tid": span.lane,
+                "args": span.attributes
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
@@ -0,0 +1,86 @@
+"""
+Resource usage of jobs.
+
+Processors add up the usage reported for every process run they make for
+a job; the job manager aggregates the usage of finished jobs per job type.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+
+@dataclass
+class ResourceUsage:
+    """CPU time, peak memory and output size of one job"""
+    cpu_time: float = 0.0
+    peak_rss_kb: int = 0
+    output_bytes: int = 0
+
+    def add(self, usage: Optional[Dict[str, Any]]) -> None:
+        """
+        Add the usage of one process run
+
+        CPU time and output add up; peak memory is the largest peak seen.
+
+        Args:
+            usage: Usage reported for the run (``cpu_time``, ``peak_rss_kb``,
+                ``output_bytes``), or None if it was not measured
+        """
+        if not usage:
+            return
+        self.cpu_time += usage.get("cpu_time", 0.0)
+        self.peak_rss_kb = max(self.peak_rss_kb, usage.get("peak_rss_kb", 0))
+        self.output_bytes += usage.get("output_bytes", 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the usage to a dictionary
+
+        Returns:
+            Dictionary with ``cpu_time``, ``peak_rss_kb`` and ``output_bytes``
+        """
+        return {
+            "cpu_time": round(self.cpu_time, 6),
+            "peak_rss_kb": self.peak_rss_kb,
+            "output_bytes": self.output_bytes
+        }
+
+
+class UsageStats:
+    """Resource usage of the finished jobs of one type"""
+
+    def __init__(self):
+        self.jobs = 0
+        self.cpu_time = 0.0
+        self.max_cpu_time = 0.0
+        self.peak_rss_kb = 0
+        self.output_bytes = 0
+
+    def add(self, usage: ResourceUsage) -> None:
+        """
+        Count a finished job
+
+        Args:
+            usage: Resource usage of the job
+        """
+        self.jobs += 1
+        self.cpu_time += usage.cpu_time
+        self.max_cpu_time = max(self.max_cpu_time, usage.cpu_time)
+        self.peak_rss_kb = max(self.peak_rss_kb, usage.peak_rss_kb)
+        self.output_bytes += usage.output_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the statistics to a dictionary
+
+        Returns:
+            Totals, averages and maxima over the counted jobs
+        """
+        return {
+            "jobs": self.jobs,
+            "cpu_time": round(self.cpu_time, 3),
+            "avg_cpu_time": round(self.cpu_time / self.jobs, 3) if self.jobs else 0.0,
+            "max_cpu_time": round(self.max_cpu_time, 3),
+            "max_peak_rss_kb": self.peak_rss_kb,
+            "output_bytes": self.output_bytes
+        }
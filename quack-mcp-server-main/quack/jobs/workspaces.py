@@ -0,0 +1,333 @@
+"""
+Reusable job workspaces on a memory-backed filesystem.
+
+Processors write the submitted code to a file for the tools to read. Those
+files live in per-job directories under a tmpfs such as ``/dev/shm``, so
+writing them never waits for the disk. Released directories are emptied
+and kept for the next job. The files of the workspaces in use are limited
+to a size budget, beyond which workspaces are created on disk instead.
+
+Every process keeps its workspaces below a directory named after its PID.
+Directories of processes that no longer exist, e.g. after a crash, are
+removed when the first manager of a process starts.
+"""
+
+import atexit
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional
+
+logger = logging.getLogger("quack")
+
+# Memory-backed directories to keep workspaces in, in order of preference
+TMPFS_CANDIDATES = ("/dev/shm", "/run/shm")
+
+# Workspaces on disk, when no tmpfs is available or the budget is exhausted
+DISK_ROOT = os.path.join(tempfile.gettempdir(), "quack", "workspaces")
+
+# Default bytes of submitted files kept on the tmpfs at once
+DEFAULT_BUDGET = 256 * 1024 * 1024
+
+# Default number of emptied workspaces kept for reuse
+DEFAULT_MAX_IDLE = 32
+
+def _filesystem_type(path: str) -> Optional[str]:
+    """
+    Get the type of the filesystem a path is on
+
+    Args:
+        path: Existing path
+
+    Returns:
+        Filesystem type from ``/proc/mounts`` (e.g. "tmpfs"), or None if unknown
+    """
+    path = os.path.realpath(path)
+    best, fs_type = "", None
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = fields[1].replace("\\040", " ")
+                inside = path == mount_point or path.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) >= len(best):
+                    best, fs_type = mount_point, fields[2]
+    except OSError:
+        return None
+    return fs_type
+
+
+def default_root() -> str:
+    """
+    Choose the directory to keep workspaces in
+
+    Returns:
+        A ``quack`` directory on the first writable tmpfs, or DISK_ROOT
+    """
+    for candidate in TMPFS_CANDIDATES:
+        if os.path.isdir(candidate) and os.access(candidate, os.W_OK | os.X_OK):
+            return os.path.join(candidate, "quack")
+    return DISK_ROOT
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_stale(root: str) -> int:
+    """
+    Remove the workspaces of processes that no longer exist
+
+    Args:
+        root: Directory holding one directory per process
+
+    Returns:
+        Number of process directories removed
+    """
+    removed = 0
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return 0
+    for entry in entries:
+        if not entry.name.isdigit() or not entry.is_dir(follow_symlinks=False):
+            continue
+        pid = int(entry.name)
+        if pid != os.getpid() and not _pid_alive(pid):
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+class WorkspaceManager:
+    """
+    Pool of per-job directories, preferably on a tmpfs
+
+    A workspace is acquired with the number of bytes the caller will write
+    into it, and released once the job is done. Every acquired workspace
+    has a path that was never used before, since tools such as dmypy
+    recognise files by path, size and whole-second modification time.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        budget: int = DEFAULT_BUDGET,
+        max_idle: int = DEFAULT_MAX_IDLE,
+        disk_root: str = DISK_ROOT
+    ):
+        """
+        Initialize the manager and remove leftovers of dead processes
+
+        Args:
+            root: Directory for workspaces (default: a tmpfs if available)
+            budget: Bytes the workspaces in use may hold below ``root``;
+                workspaces that would exceed it are created below ``disk_root``
+            max_idle: Number of emptied workspaces kept for reuse
+            disk_root: Directory for workspaces beyond the budget
+        """
+        self.root = root or default_root()
+        self.disk_root = disk_root
+        self.budget = budget
+        self.max_idle = max_idle
+        self.directory = os.path.join(self.root, str(os.getpid()))
+        try:
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"[Workspaces] Cannot use {self.root} ({str(e)}); using {disk_root}")
+            self.root = disk_root
+            self.directory = os.path.join(self.root, str(os.getpid()))
+        self.filesystem = _filesystem_type(self.root)
+        self.disk_directory = os.path.join(self.disk_root, str(os.getpid()))
+        self.reserved = 0
+        self.peak_reserved = 0
+        self.created = 0
+        self.reused = 0
+        self.overflowed = 0
+        self._in_use: Dict[str, int] = {}  # workspace -> reserved bytes
+        self._idle: List[str] = []
+        self._lock = threading.Lock()
+        self.stale_removed = sum(remove_stale(root) for root in {self.root, self.disk_root})
+        if self.stale_removed:
+            logger.info(f"[Workspaces] Removed workspaces of {self.stale_removed} exited processes")
+
+    @property
+    def on_tmpfs(self) -> bool:
+        """Whether workspaces within the budget are kept in memory"""
+        return self.filesystem in ("tmpfs", "ramfs")
+
+    def acquire(self, size: int = 0) -> str:
+        """
+        Get an empty workspace
+
+        Args:
+            size: Bytes the caller will write into it
+
+        Returns:
+            Path of a new, empty directory; its last component is a valid
+            Python identifier that is never reused, as mypy's cache would
+            take a resubmitted module of the same name for an unchanged one
+        """
+        with self._lock:
+            name = f"ws_{uuid.uuid4().hex}"
+            if self.reserved + size > self.budget:
+                self.overflowed += 1
+                path = os.path.join(self.disk_directory, name)
+                os.makedirs(path, mode=0o700)
+                self._in_use[path] = 0
+                return path
+            path = os.path.join(self.directory, name)
+            if self._idle:
+                os.rename(self._idle.pop(), path)
+                self.reused += 1
+            else:
+                os.makedirs(path, mode=0o700)
+                self.created += 1
+            self._in_use[path] = size
+            self.reserved += size
+            self.peak_reserved = max(self.peak_reserved, self.reserved)
+            return path
+
+    def resize(self, path: str, size: int) -> None:
+        """
+        Change the bytes reserved for a workspace in use
+
+        The workspace stays where it is; workspaces on disk reserve nothing.
+
+        Args:
+            path: Workspace returned by ``acquire``
+            size: Bytes the caller now keeps in it
+        """
+        with self._lock:
+            if path not in self._in_use or os.path.dirname(path) != self.directory:
+                return
+            self.reserved += size - self._in_use[path]
+            self._in_use[path] = size
+            self.peak_reserved = max(self.peak_reserved, self.reserved)
+
+    def release(self, path: str) -> None:
+        """
+        Return a workspace, emptying it for reuse
+
+        Args:
+            path: Workspace returned by ``acquire``
+        """
+        with self._lock:
+            size = self._in_use.pop(path, None)
+            if size is None:
+                return
+            self.reserved -= size
+            reuse = os.path.dirname(path) == self.directory and len(self._idle) < self.max_idle
+        if not reuse:
+            shutil.rmtree(path, ignore_errors=True)
+            return
+        try:
+            for entry in os.scandir(path):
+                if entry.is_dir(follow_symlinks=False):
+                    shutil.rmtree(entry.path)
+                else:
+                    os.unlink(entry.path)
+        except OSError as e:
+            logger.warning(f"[Workspaces] Could not empty {path}: {str(e)}")
+            shutil.rmtree(path, ignore_errors=True)
+            return
+        with self._lock:
+            self._idle.append(path)
+
+    @contextmanager
+    def workspace(self, size: int = 0) -> Iterator[str]:
+        """
+        Use a workspace for the duration of a block
+
+        Args:
+            size: Bytes the caller will write into it
+
+        Yields:
+            Path of the workspace
+        """
+        path = self.acquire(size)
+        try:
+            yield path
+        finally:
+            self.release(path)
+
+    def close(self) -> None:
+        """Remove every workspace of this manager, with this process's directories"""
+        with self._lock:
+            self._in_use.clear()
+            self._idle.clear()
+            self.reserved = 0
+        for directory in (self.directory, self.disk_directory):
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the workspaces
+
+        Returns:
+            Dictionary with the location, budget use and reuse counters
+        """
+        with self._lock:
+            return {
+                "root": self.root,
+                "filesystem": self.filesystem,
+                "on_tmpfs": self.on_tmpfs,
+                "budget_bytes": self.budget,
+                "reserved_bytes": self.reserved,
+                "peak_reserved_bytes": self.peak_reserved,
+                "in_use": len(self._in_use),
+                "idle": len(self._idle),
+                "created": self.created,
+                "reused": self.reused,
+                "overflowed": self.overflowed,
+                "stale_removed": self.stale_removed
+            }
+
+
+_shared: Optional[WorkspaceManager] = None
+
+
+def shared_workspaces() -> WorkspaceManager:
+    """
+    Get the workspace manager shared by the processors of this process
+
+    Returns:
+        The manager, created on first use
+    """
+    global _shared
+    if _shared is None:
+        _shared = WorkspaceManager()
+        # Every session of the process uses it, so it is removed at exit
+        atexit.register(_shared.close)
+    return _shared
+
+
+def write_module(workspace: str, code: str, name: Optional[str] = None) -> str:
+    """
+    Write code into a workspace
+
+    Args:
+        workspace: Workspace returned by ``acquire``
+        code: Python source
+        name: File name (default: the workspace's name, so modules of
+            concurrent jobs linted in one run have distinct names)
+
+    Returns:
+        Path of the written file
+    """
+    path = os.path.join(workspace, name or f"{os.path.basename(workspace)}.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(code)
+    return path
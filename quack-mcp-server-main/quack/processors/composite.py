@@ -0,0 +1,147 @@
+"""
+Processor running several analyses over one shared workspace.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Optional
+
+from ..jobs.enums import JobStatus, JobType
+from ..jobs.base import Job, JobProcessor, AnalyzeAllJob
+from ..jobs.workspaces import WorkspaceManager, shared_workspaces, write_module
+from .precheck import run_precheck
+
+logger = logging.getLogger("quack")
+
+# Name of the submitted module inside the workspace
+MODULE_NAME = "submission.py"
+
+
+class AnalyzeAllJobProcessor(JobProcessor):
+    """Processor for analyze_all jobs, fanning out to other processors"""
+
+    # Includes test runs, which may depend on time, randomness or the environment
+    cacheable = False
+
+    def __init__(self, processors: Dict[JobType, JobProcessor], workspaces: Optional[WorkspaceManager] = None):
+        """
+        Initialize the processor
+
+        Args:
+            processors: Processors to run, by the job type they report under;
+                each must implement ``process_file``
+            workspaces: Workspaces to write submitted code to (default: the
+                process's shared workspaces)
+        """
+        self.processors = processors
+        self.workspaces = workspaces if workspaces is not None else shared_workspaces()
+
+    def tool_info(self) -> Dict[str, Any]:
+        """Tool information of every processor"""
+        return {job_type.value: processor.tool_info() for job_type, processor in self.processors.items()}
+
+    def precheck(self, job: Job) -> Dict[str, Any]:
+        """Syntax check, run on the event loop before the job is queued"""
+        return run_precheck(job.document, pyflakes=False)
+
+    async def _run_one(self, job: Job, job_type: JobType, processor: JobProcessor, path: str) -> Job:
+        # Each processor updates its own sub-job, sharing the parsed source
+        sub_job = Job(
+            id=f"{job.id}:{job_type.value}",
+            status=JobStatus.RUNNING,
+            code=job.code,
+            job_type=job_type,
+            submitted_at=job.submitted_at,
+            started_at=time.time(),
+            options=job.options
+        )
+        sub_job._document = job.document
+        sub_job.session = job.session
+        try:
+            await processor.process_file(sub_job, path)
+        except Exception as e:
+            logger.error(f"[{job.job_type.value}:{job.id}] {job_type.value} failed: {str(e)}", exc_info=True)
+            sub_job.status = JobStatus.FAILED
+            sub_job.error = f"Error: {str(e)}"
+            sub_job.completed_at = time.time()
+        return sub_job
+
+    async def process(self, job: AnalyzeAllJob) -> None:
+        """
+        Process an analyze_all job
+
+        This processor:
+        1. Writes the code once into a workspace
+        2. Runs every configured processor on that file concurrently
+        3. Merges their results, with the execution time of each
+
+        The job is COMPLETED when at least one processor succeeded;
+        failures of individual processors are reported in the result.
+
+        Args:
+            job: The analyze_all job to process
+        """
+        # Mark job as running
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        logger.info(f"[{job.job_type.value}:{job.id}] Starting {len(self.processors)} analyses")
+
+        workspace = None
+        try:
+            # Write the code once for all processors
+            workspace = self.workspaces.acquire(len(job.code))
+            with job.trace.span("write_file"):
+                path = write_module(workspace, job.code, MODULE_NAME)
+
+            sub_jobs = await asyncio.gather(*(
+                self._run_one(job, job_type, processor, path)
+                for job_type, processor in self.processors.items()
+            ))
+
+            analyses: Dict[str, Dict[str, Any]] = {}
+            for index, sub_job in enumerate(sub_jobs, 1):
+                # Each analysis gets its own block of lanes, leaving room for test shards
+                job.trace.merge(sub_job.trace, prefix=sub_job.job_type.value, lane_offset=index * 100)
+                analysis: Dict[str, Any] = {
+                    "status": sub_job.status.value,
+                    "execution_time": sub_job.execution_time,
+                    "usage": sub_job.usage.to_dict() if sub_job.usage is not None else None
+                }
+                job.record_usage(analysis["usage"])
+                if sub_job.status == JobStatus.COMPLETED:
+                    analysis["results"] = sub_job.result
+                else:
+                    analysis["error"] = sub_job.error
+                analyses[sub_job.job_type.value] = analysis
+
+            succeeded = [name for name, analysis in analyses.items() if analysis["status"] == "completed"]
+            job.result = {
+                "status": "success" if len(succeeded) == len(analyses) else "partial",
+                "summary": {
+                    "completed": succeeded,
+                    "failed": [name for name in analyses if name not in succeeded]
+                },
+                "analyses": analyses
+            }
+
+            if succeeded:
+                logger.info(f"[{job.job_type.value}:{job.id}] Analyses complete ({', '.join(succeeded)} succeeded)")
+                job.status = JobStatus.COMPLETED
+            else:
+                job.status = JobStatus.FAILED
+                job.error = "; ".join(f"{name}: {analysis['error']}" for name, analysis in analyses.items())
+                logger.error(f"[{job.job_type.value}:{job.id}] All analyses failed")
+            job.completed_at = time.time()
+
+        except Exception as e:
+            logger.error(f"[{job.job_type.value}:{job.id}] Error: {str(e)}", exc_info=True)
+            job.status = JobStatus.FAILED
+            job.error = f"Error: {str(e)}"
+            job.completed_at = time.time()
+
+        finally:
+            # Clean up the workspace
+            if workspace is not None:
+                self.workspaces.release(workspace)
+                logger.debug(f"[{job.job_type.value}:{job.id}] Cleaned up workspace: {workspace}")
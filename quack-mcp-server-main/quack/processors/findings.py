@@ -0,0 +1,142 @@
+"""
+Conversion of job results into findings of one shape, whichever tool reported them.
+
+A finding looks like::
+
+    {"kind": "finding", "path": "pkg/mod.py", "line": 3, "column": 1,
+     "tool": "pylint", "rule": "unused-import", "severity": "warning",
+     "message": "Unused import os"}
+
+Lines and columns are one-based. Severity is one of error, warning or note.
+Analyses that could not run are reported as ``{"kind": "failure", "path",
+"tool", "status", "message"}``.
+"""
+
+from typing import Dict, Any, List, Optional
+
+from ..jobs.base import Job
+from ..jobs.enums import JobStatus, JobType
+from .static_analysis import MYPY_CODE
+
+# Name of the tool behind each job type, as reported in findings
+TOOL_NAMES: Dict[JobType, str] = {
+    JobType.LINT: "pylint",
+    JobType.STATIC_ANALYSIS: "mypy",
+    JobType.TEST: "pytest",
+}
+
+# Pylint message types by severity
+PYLINT_SEVERITIES = {"fatal": "error", "error": "error", "warning": "warning"}
+
+
+def finding(
+    path: str,
+    line: Optional[int],
+    column: Optional[int],
+    tool: str,
+    rule: Optional[str],
+    severity: str,
+    message: str
+) -> Dict[str, Any]:
+    """
+    Build a finding
+
+    Args:
+        path: Path of the file, as reported
+        line: One-based line, or None for the whole file
+        column: One-based column, or None
+        tool: Tool that reported the finding
+        rule: Rule or error code, if the tool names one
+        severity: "error", "warning" or "note"
+        message: Description of the finding
+
+    Returns:
+        The finding
+    """
+    return {
+        "kind": "finding",
+        "path": path,
+        "line": line,
+        "column": column,
+        "tool": tool,
+        "rule": rule,
+        "severity": severity,
+        "message": message
+    }
+
+
+def job_findings(job: Job, path: str) -> List[Dict[str, Any]]:
+    """
+    Convert the result of a completed job into findings
+
+    Args:
+        job: Completed lint, static analysis or test job
+        path: Path of the analysed file, as reported in findings
+
+    Returns:
+        Findings of the job
+    """
+    result = job.result or {}
+    findings: List[Dict[str, Any]] = []
+    if job.job_type == JobType.LINT:
+        for category in ("errors", "warnings", "refactors", "conventions"):
+            for message in result.get(category, []):
+                findings.append(finding(
+                    path, message.get("line"), message.get("column", 0) + 1, "pylint",
+                    message.get("symbol") or message.get("message-id"),
+                    PYLINT_SEVERITIES.get(message.get("type", ""), "note"), message.get("message", "")
+                ))
+    elif job.job_type == JobType.STATIC_ANALYSIS:
+        for issue in result.get("issues", []):
+            # Messages read "error: <text>  [code]" or "note: <text>"
+            severity, _, text = issue["message"].partition(":")
+            if severity not in ("error", "warning", "note"):
+                severity, text = "error", issue["message"]
+            findings.append(finding(
+                path, issue["line"], issue["column"], "mypy", issue["error_code"],
+                severity, MYPY_CODE.sub("", text).strip()
+            ))
+    elif job.job_type == JobType.TEST:
+        lines = {}
+        if job.document.ast is not None:
+            lines = {node.name: node.lineno for node in job.document.ast.body if hasattr(node, "name")}
+        for error in result.get("collection_errors", []):
+            findings.append(finding(path, None, None, "pytest", "collection-error", "error", error["message"]))
+        for test in result.get("tests", []):
+            if test["outcome"] in ("failed", "error"):
+                name = test["name"].split("::", 1)[0].split("[", 1)[0]
+                findings.append(finding(
+                    path, lines.get(name), 1 if name in lines else None, "pytest", test["outcome"], "error",
+                    f"{test['name']} {test['outcome']}: {test['message'] or ''}".rstrip(": ")
+                ))
+    return findings
+
+
+def job_records(job: Job, path: str) -> List[Dict[str, Any]]:
+    """
+    Convert a finished job into findings, or into a failure if its analysis could not run
+
+    Code that failed the precheck yields a single syntax error finding.
+
+    Args:
+        job: Finished lint, static analysis or test job
+        path: Path of the analysed file, as reported in records
+
+    Returns:
+        Findings and failures of the job
+    """
+    if job.status == JobStatus.COMPLETED:
+        return job_findings(job, path)
+    syntax_error = (job.quick_result or {}).get("syntax_error")
+    if syntax_error is not None:
+        return [finding(
+            path, syntax_error["line"], syntax_error["column"], "python", "syntax-error", "error",
+            syntax_error["message"]
+        )]
+    return [{
+        "kind": "failure",
+        "path": path,
+        "tool": TOOL_NAMES[job.job_type],
+        "status": job.status.value,
+        "message": job.error
+    }]
@@ -2,32 +2,465 @@
 Processor for linting Python code using pylint.
 """
 
+import ast
 import asyncio
 import json
 import logging
-import tempfile
 import os
 import time
-import subprocess
-import sys
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Set, Tuple
 
 from ..jobs.enums import JobStatus
-from ..jobs.base import JobProcessor, LintJob
+from ..jobs.base import Job, JobProcessor, LintJob
+from ..jobs.documents import unchanged_functions
+from ..jobs.profiles import PROFILES, get_profile
+from ..jobs.source import SourceDocument
+from ..jobs.workspaces import WorkspaceManager, shared_workspaces, write_module
+from ..workers.resources import ResourceLimits
+from ..workers.pool import WorkerPool, WorkerError, WorkerTimeoutError
+from .precheck import run_precheck
 
 logger = logging.getLogger("quack")
 
+# Pylint options for batched runs; duplicate-code compares modules with each
+# other and would report similarities between unrelated jobs
+BATCH_ARGS = ["--disable=duplicate-code"]
+
+# Messages about the whole module that pylint may report on a line inside a function
+MODULE_SYMBOLS = ("missing-module-docstring", "too-many-lines")
+
+
+def categorize_messages(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Organize pylint messages by category
+    
+    Args:
+        messages: Messages from pylint's JSON reporter
+        
+    Returns:
+        Lint result with a summary and one list per category
+    """
+    errors: List[Dict[str, Any]] = []
+    warnings: List[Dict[str, Any]] = []
+    conventions: List[Dict[str, Any]] = []
+    refactors: List[Dict[str, Any]] = []
+    
+    for message in messages:
+        msg_type = message.get("type", "")
+        if msg_type == "error":
+            errors.append(message)
+        elif msg_type == "warning":
+            warnings.append(message)
+        elif msg_type == "refactor":
+            refactors.append(message)
+        else:
+            conventions.append(message)
+    
+    issue_count = len(errors) + len(warnings) + len(conventions) + len(refactors)
+    return {
+        "status": "success",
+        "summary": {
+            "error_count": len(errors),
+            "warning_count": len(warnings),
+            "refactor_count": len(refactors),
+            "convention_count": len(conventions),
+            "total_issues": issue_count
+        },
+        "errors": errors,
+        "warnings": warnings,
+        "refactors": refactors,
+        "conventions": conventions
+    }
+
+
+def add_line_content(messages: List[Dict[str, Any]], document: SourceDocument) -> None:
+    """
+    Attach the source line each message points at
+    
+    Args:
+        messages: Messages from pylint's JSON reporter, updated in place
+        document: Source the messages refer to
+    """
+    for message in messages:
+        if "line" in message and "column" in message:
+            line_content = document.line(message["line"])
+            if line_content is not None:
+                message["line_content"] = line_content
+
+
+def split_messages(output: str, paths: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Split the JSON report of a batched pylint run by file
+    
+    Args:
+        output: JSON report covering every file of the batch
+        paths: Files linted in the batch
+        
+    Returns:
+        Dictionary mapping the absolute path of every file to its messages;
+        messages about other files are dropped
+    """
+    by_path: Dict[str, List[Dict[str, Any]]] = {os.path.abspath(path): [] for path in paths}
+    # Messages repeat a handful of paths; resolve each path once
+    resolved: Dict[str, Optional[List[Dict[str, Any]]]] = {}
+    for message in json.loads(output) if output.strip() else []:
+        path = message.get("path", "")
+        if path not in resolved:
+            resolved[path] = by_path.get(os.path.abspath(path))
+        messages = resolved[path]
+        if messages is not None:
+            messages.append(message)
+    return by_path
+
+
+def stub_functions(document: SourceDocument, names: Set[str]) -> Tuple[str, Set[str]]:
+    """
+    Replace the bodies of top-level functions with stubs, keeping line numbers
+    
+    Each stub raises NotImplementedError, so pylint infers no return value
+    for calls to it, and references every name the body used, so imports
+    only used there do not become unused.
+    
+    Args:
+        document: Parsed source of the module
+        names: Top-level functions to stub
+        
+    Returns:
+        Tuple of (stubbed source, names of the functions actually stubbed);
+        functions whose body shares a line with the signature are kept
+    """
+    lines = list(document.lines)
+    stubbed: Set[str] = set()
+    for node in document.ast.body if document.ast is not None else []:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) or node.name not in names:
+            continue
+        first = node.body[0]
+        indent = lines[first.lineno - 1][:first.col_offset]
+        if first.lineno == node.lineno or indent.strip():
+            continue
+        loaded = sorted({
+            name.id for statement in node.body for name in ast.walk(statement)
+            if isinstance(name, ast.Name) and isinstance(name.ctx, ast.Load)
+        })
+        for line_number in range(first.lineno, (node.end_lineno or node.lineno) + 1):
+            lines[line_number - 1] = ""
+        lines[first.lineno - 1] = f"{indent}raise NotImplementedError({', '.join(loaded)})"
+        stubbed.add(node.name)
+    return "\n".join(lines) + "\n", stubbed
+
+
+def merge_messages(
+    messages: List[Dict[str, Any]],
+    previous: Dict[str, Any],
+    reused: Dict[str, Tuple[Tuple[int, int], Tuple[int, int]]],
+    document: SourceDocument
+) -> List[Dict[str, Any]]:
+    """
+    Combine messages of a stubbed run with the previous findings of the stubbed functions
+    
+    Args:
+        messages: Messages from linting the stubbed source
+        previous: Previous lint result of the document
+        reused: Old and new line spans of each stubbed function by name
+        document: Current version of the document
+        
+    Returns:
+        Messages sorted by position
+    """
+    def owner(message: Dict[str, Any], spans: Dict[str, Tuple[int, int]]) -> Optional[str]:
+        obj = message.get("obj") or ""
+        line = message.get("line")
+        for name, (start, end) in spans.items():
+            if obj == name or obj.startswith(name + "."):
+                return name
+            if not obj and line is not None and start <= line <= end and message.get("symbol") not in MODULE_SYMBOLS:
+                return name
+        return None
+    
+    old_spans = {name: spans[0] for name, spans in reused.items()}
+    new_spans = {name: spans[1] for name, spans in reused.items()}
+    merged = [message for message in messages if owner(message, new_spans) is None]
+    for category in ("errors", "warnings", "refactors", "conventions"):
+        for message in previous.get(category, []):
+            name = owner(message, old_spans)
+            if name is None:
+                continue
+            shift = new_spans[name][0] - old_spans[name][0]
+            message = dict(message)
+            for key in ("line", "endLine"):
+                if message.get(key) is not None:
+                    message[key] += shift
+            if message.get("line") is not None:
+                message["line_content"] = document.line(message["line"])
+            merged.append(message)
+    merged.sort(key=lambda message: (message.get("line") or 0, message.get("column") or 0))
+    return merged
+
+
+def _pylint_version() -> str:
+    try:
+        from pylint import __version__
+        return __version__
+    except ImportError:
+        return "unknown"
+
 
 class LintJobProcessor(JobProcessor):
     """Processor for lint jobs using pylint"""
     
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        max_jobs_per_worker: int = 100,
+        max_worker_memory_mb: Optional[int] = 512,
+        batch_window: Optional[float] = None,
+        max_batch_size: int = 16,
+        timeout: float = 30.0,
+        limits: Optional[ResourceLimits] = None,
+        workspaces: Optional[WorkspaceManager] = None
+    ):
+        """
+        Initialize the processor with pools of warm pylint workers
+        
+        Profiles with ``lint_workers`` get a pool of their own, so their
+        jobs never wait for a worker busy with another profile's run.
+        
+        Args:
+            pool_size: Number of pylint worker processes (default: up to 4, one per CPU)
+            max_jobs_per_worker: Recycle a worker after this many jobs
+            max_worker_memory_mb: Recycle a worker whose peak RSS exceeds this
+            batch_window: Seconds to collect jobs into a single pylint run (None disables batching)
+            max_batch_size: Maximum number of jobs per batch
+            timeout: Seconds a pylint run may take before its worker is killed
+            limits: CPU time and memory limits for each pylint run
+            workspaces: Workspaces to write submitted code to (default: the
+                process's shared workspaces)
+        """
+        if pool_size is None:
+            pool_size = max(1, min(4, os.cpu_count() or 1))
+        self.pool = WorkerPool(
+            "quack.workers.pylint_worker",
+            size=pool_size,
+            max_jobs_per_worker=max_jobs_per_worker,
+            max_memory_mb=max_worker_memory_mb,
+            name="pylint",
+            limits=limits
+        )
+        self.profile_pools = {
+            profile.name: WorkerPool(
+                "quack.workers.pylint_worker",
+                size=profile.lint_workers,
+                max_jobs_per_worker=max_jobs_per_worker,
+                max_memory_mb=max_worker_memory_mb,
+                name=f"pylint-{profile.name}",
+                limits=limits
+            )
+            for profile in PROFILES.values() if profile.lint_workers
+        }
+        self.workspaces = workspaces if workspaces is not None else shared_workspaces()
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.timeout = timeout
+        self.batches = 0
+        self.batched_jobs = 0
+        self.batch_retries = 0
+        self._pending: Dict[str, List[Tuple[str, asyncio.Future]]] = {}  # profile -> files to lint
+        self._flush_timers: Dict[str, asyncio.TimerHandle] = {}
+        self._batch_tasks: Set[asyncio.Task] = set()
+    
+    def tool_info(self) -> Dict[str, Any]:
+        """Pylint version, which determines the reported messages"""
+        return {"pylint": _pylint_version()}
+    
+    def precheck(self, job: Job) -> Dict[str, Any]:
+        """Syntax check, run on the event loop before the job is queued"""
+        return run_precheck(job.document, pyflakes=False)
+    
+    def close(self) -> None:
+        """Stop the pylint workers"""
+        self.pool.close()
+        for pool in self.profile_pools.values():
+            pool.close()
+    
+    def pool_for(self, profile: str) -> WorkerPool:
+        """
+        Get the pool serving a profile
+        
+        Args:
+            profile: Name of the profile
+            
+        Returns:
+            The profile's own pool, or the default pool
+        """
+        return self.profile_pools.get(profile, self.pool)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about batching
+        
+        Returns:
+            Dictionary with the number of batches, the jobs they contained
+            and the timed-out batches whose files were linted one by one
+        """
+        return {
+            "batch_window": self.batch_window,
+            "batches": self.batches,
+            "batched_jobs": self.batched_jobs,
+            "avg_batch_size": self.batched_jobs / self.batches if self.batches else 0.0,
+            "batch_retries": self.batch_retries
+        }
+    
+    async def lint_file(self, path: str, profile: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Lint one file on a warm worker
+        
+        With a batch window, files of the same profile submitted within the
+        window are linted in a single pylint run and the messages are split
+        up again by path. The run is stopped once every job waiting for it
+        has been cancelled; if it times out, its files are linted one by one.
+        
+        Args:
+            path: File to lint
+            profile: Name of the analysis profile (default: standard)
+            
+        Returns:
+            Worker response with the JSON report for this file
+            
+        Raises:
+            WorkerTimeoutError: If pylint ran longer than the timeout
+            WorkerError: If the worker process failed
+        """
+        profile = get_profile(profile)
+        if not self.batch_window:
+            return await self.pool_for(profile.name).submit(
+                {"paths": [path], "args": list(profile.pylint_args)}, timeout=self.timeout
+            )
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        pending = self._pending.setdefault(profile.name, [])
+        pending.append((path, future))
+        if len(pending) >= self.max_batch_size:
+            self._flush(profile.name)
+        elif profile.name not in self._flush_timers:
+            self._flush_timers[profile.name] = loop.call_later(self.batch_window, self._flush, profile.name)
+        return await future
+    
+    def _flush(self, profile: str) -> None:
+        timer = self._flush_timers.pop(profile, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(profile, [])
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch, profile))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+    
+    async def _request(
+        self, futures: List[asyncio.Future], payload: Dict[str, Any], pool: WorkerPool
+    ) -> asyncio.Future:
+        """
+        Submit a pylint run on behalf of waiting jobs
+        
+        The run is cancelled, killing its worker, once every job waiting
+        for it has been cancelled.
+        
+        Args:
+            futures: Futures of the jobs waiting for the run
+            payload: Request for the worker
+            pool: Pool to run it on
+            
+        Returns:
+            The finished or cancelled request
+        """
+        request = asyncio.ensure_future(pool.submit(payload, timeout=self.timeout))
+        
+        def abandon(future: asyncio.Future) -> None:
+            if all(waiting.cancelled() for waiting in futures):
+                request.cancel()
+        
+        for future in futures:
+            future.add_done_callback(abandon)
+        try:
+            await asyncio.wait([request])
+        except asyncio.CancelledError:
+            request.cancel()
+            raise
+        return request
+    
+    async def _run_alone(self, path: str, future: asyncio.Future, profile: str) -> None:
+        request = await self._request(
+            [future], {"paths": [path], "args": list(PROFILES[profile].pylint_args)}, self.pool_for(profile)
+        )
+        if future.done():
+            return
+        if request.exception() is not None:
+            future.set_exception(request.exception())
+        else:
+            future.set_result(request.result())
+    
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]], profile: str) -> None:
+        # Jobs cancelled while the batch was collected
+        batch = [(path, future) for path, future in batch if not future.done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.batched_jobs += len(batch)
+        logger.debug(f"[lint] Linting batch of {len(batch)} files ({profile} profile)")
+        
+        request = await self._request(
+            [future for _, future in batch],
+            {"paths": [path for path, _ in batch], "args": [*BATCH_ARGS, *PROFILES[profile].pylint_args]},
+            self.pool_for(profile)
+        )
+        if request.cancelled():
+            return
+        error = request.exception()
+        survivors = [(path, future) for path, future in batch if not future.done()]
+        if isinstance(error, WorkerTimeoutError) and len(survivors) > 1:
+            # One slow file must not time out the others; lint each file on its own
+            logger.warning(f"[lint] Batch of {len(batch)} files timed out, linting them one by one")
+            self.batch_retries += 1
+            await asyncio.gather(*(self._run_alone(path, future, profile) for path, future in survivors))
+            return
+        
+        responses: Dict[str, Dict[str, Any]] = {}
+        try:
+            if error is not None:
+                raise error
+            response = request.result()
+            output = response.get("output", "")
+            if response.get("ok"):
+                # Demultiplex the messages by file
+                by_path = split_messages(output, [path for path, _ in batch])
+                # Split the run's CPU time evenly between the jobs
+                usage = response.get("usage") or {}
+                responses = {}
+                for path, messages in by_path.items():
+                    output = json.dumps(messages)
+                    responses[path] = {"ok": True, "output": output, "timing": response.get("timing"), "usage": {
+                        **usage, "cpu_time": usage.get("cpu_time", 0.0) / len(batch), "output_bytes": len(output)
+                    }}
+            else:
+                responses = {os.path.abspath(path): response for path, _ in batch}
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for path, future in batch:
+            if not future.done():
+                future.set_result(responses[os.path.abspath(path)])
+    
     async def process(self, job: LintJob) -> None:
         """
         Process a lint job using pylint
         
         This processor:
-        1. Creates a temporary file with the code
-        2. Runs pylint on the file
+        1. Writes the code into a workspace
+        2. Runs pylint on the file in a pre-warmed worker process, batched
+           with other jobs when a batch window is set
         3. Parses the JSON output
         4. Updates the job with results or error information
         
@@ -42,151 +475,15 @@ class LintJobProcessor(JobProcessor):
         job.started_at = time.time()
         logger.info(f"[{job.job_type.value}:{job.id}] Starting pylint analysis")
         
-        temp_path = None
+        workspace = None
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix='.py', delete=False) as temp_file:
-                temp_path = temp_file.name
-                temp_file.write(job.code.encode('utf-8'))
-                logger.debug(f"[{job.job_type.value}:{job.id}] Created temporary file at {temp_path}")
-                
-            # Run pylint using a simpler approach
-            try:
-                # Use a simple approach to run pylint
-                logger.debug(f"[{job.job_type.value}:{job.id}] Running pylint on {temp_path}")
-                
-                # Create a simple Python script to run pylint
-                with tempfile.NamedTemporaryFile(suffix='.py', delete=False) as script_file:
-                    script_path = script_file.name
-                    script_file.write(f"""
-import sys
-import json
-import pylint.lint
-
-# Run pylint with JSON reporter
-pylint_args = ['--output-format=json', '{temp_path}']
-try:
-    pylint.lint.Run(pylint_args)
-except SystemExit as e:
-    # Pylint calls sys.exit(), which we catch
-    pass
-""".encode('utf-8'))
-                
-                # Run the script
-                logger.debug(f"[{job.job_type.value}:{job.id}] Running script: {script_path}")
-                result = subprocess.run(
-                    [sys.executable, script_path],
-                    capture_output=True,
-                    text=True,
-                    check=False
-                )
-                
-                # Log the output for debugging
-                logger.debug(f"[{job.job_type.value}:{job.id}] Script stdout: {result.stdout}")
-                logger.debug(f"[{job.job_type.value}:{job.id}] Script stderr: {result.stderr}")
-                logger.debug(f"[{job.job_type.value}:{job.id}] Script return code: {result.returncode}")
-                
-                # Clean up the script file
-                try:
-                    os.unlink(script_path)
-                except Exception as e:
-                    logger.error(f"[{job.job_type.value}:{job.id}] Failed to clean up script file: {str(e)}")
-                
-                # Check for process errors
-                if result.returncode != 0:
-                    error_msg = result.stderr.strip()
-                    logger.error(f"[{job.job_type.value}:{job.id}] Script failed: {error_msg}")
-                    job.status = JobStatus.FAILED
-                    job.error = f"Script failed: {error_msg}"
-                    job.completed_at = time.time()
-                    return
-                
-                # Process results
-                lint_output = result.stdout
-                logger.debug(f"[{job.job_type.value}:{job.id}] Parsing lint output: {lint_output}")
-                
-                # If there's no output, it means there were no issues
-                if not lint_output.strip():
-                    logger.info(f"[{job.job_type.value}:{job.id}] No issues found")
-                    job.result = {
-                        "status": "success",
-                        "summary": {
-                            "error_count": 0,
-                            "warning_count": 0,
-                            "refactor_count": 0,
-                            "convention_count": 0,
-                            "total_issues": 0
-                        },
-                        "errors": [],
-                        "warnings": [],
-                        "refactors": [],
-                        "conventions": []
-                    }
-                    job.status = JobStatus.COMPLETED
-                    job.completed_at = time.time()
-                    return
-                
-                try:
-                    lint_results = json.loads(lint_output) if lint_output.strip() else []
-                    logger.debug(f"[{job.job_type.value}:{job.id}] Parsed lint results: {lint_results}")
-                except json.JSONDecodeError as e:
-                    logger.error(f"[{job.job_type.value}:{job.id}] Failed to parse JSON: {str(e)}")
-                    job.status = JobStatus.FAILED
-                    job.error = f"Failed to parse pylint output: {str(e)}"
-                    job.completed_at = time.time()
-                    return
-                
-                # Organize results by category
-                errors: List[Dict[str, Any]] = []
-                warnings: List[Dict[str, Any]] = []
-                conventions: List[Dict[str, Any]] = []
-                refactors: List[Dict[str, Any]] = []
-                
-                for message in lint_results:
-                    msg_type = message.get("type", "")
-                    
-                    # Add line content
-                    if "line" in message and "column" in message:
-                        code_lines = job.code.splitlines()
-                        if 0 <= message["line"]-1 < len(code_lines):
-                            message["line_content"] = code_lines[message["line"]-1]
-                    
-                    # Categorize
-                    if msg_type == "error":
-                        errors.append(message)
-                    elif msg_type == "warning":
-                        warnings.append(message)
-                    elif msg_type == "refactor":
-                        refactors.append(message)
-                    else:
-                        conventions.append(message)
-                
-                # Create result
-                issue_count = len(errors) + len(warnings) + len(conventions) + len(refactors)
-                job.result = {
-                    "status": "success",
-                    "summary": {
-                        "error_count": len(errors),
-                        "warning_count": len(warnings),
-                        "refactor_count": len(refactors),
-                        "convention_count": len(conventions),
-                        "total_issues": issue_count
-                    },
-                    "errors": errors,
-                    "warnings": warnings,
-                    "refactors": refactors,
-                    "conventions": conventions
-                }
-                
-                logger.info(f"[{job.job_type.value}:{job.id}] Analysis complete with {issue_count} issues")
-                job.status = JobStatus.COMPLETED
-                job.completed_at = time.time()
-                
-            except Exception as e:
-                logger.error(f"[{job.job_type.value}:{job.id}] Error running pylint: {str(e)}", exc_info=True)
-                job.status = JobStatus.FAILED
-                job.error = f"Error running pylint: {str(e)}"
-                job.completed_at = time.time()
+            # Write the code into a workspace
+            workspace = self.workspaces.acquire(len(job.code))
+            with job.trace.span("write_file"):
+                path = write_module(workspace, job.code)
+            logger.debug(f"[{job.job_type.value}:{job.id}] Wrote code to {path}")
+            
+            await self.process_file(job, path)
                 
         except Exception as e:
             logger.error(f"[{job.job_type.value}:{job.id}] Error: {str(e)}", exc_info=True)
@@ -195,10 +492,160 @@ except SystemExit as e:
             job.completed_at = time.time()
             
         finally:
-            # Clean up temporary file
-            if temp_path and os.path.exists(temp_path):
-                try:
-                    os.unlink(temp_path)
-                    logger.debug(f"[{job.job_type.value}:{job.id}] Cleaned up temporary file: {temp_path}")
-                except Exception as e:
-                    logger.error(f"[{job.job_type.value}:{job.id}] Failed to clean up temporary file: {str(e)}")
+            # Empty the workspace for the next job
+            if workspace is not None:
+                self.workspaces.release(workspace)
+    
+    async def process_file(self, job: Job, path: str) -> None:
+        """
+        Lint a file holding the job's code and update the job
+        
+        Used by ``process`` and by composite jobs that share one workspace
+        between several processors. The caller marks the job as running.
+        Jobs in a document session are linted incrementally from the
+        session's own file instead (see ``_lint_session``).
+        
+        Args:
+            job: The job to update
+            path: File containing ``job.code``
+        """
+        try:
+            reused = None
+            if job.session is not None:
+                linted = await self._lint_session(job)
+                if linted is None:
+                    return
+                lint_results, reused = linted
+            else:
+                lint_results = await self._lint(job, path)
+                if lint_results is None:
+                    return
+            
+            # Create result
+            with job.trace.span("categorize"):
+                job.result = categorize_messages(lint_results)
+            if job.session is not None:
+                job.result["incremental"] = {
+                    "document_id": job.session.document_id,
+                    "version": job.options["version"],
+                    "reused_functions": reused
+                }
+                job.session.record(job.job_type, job.options["version"], job.document, job.result)
+            issue_count = job.result["summary"]["total_issues"]
+            
+            logger.info(f"[{job.job_type.value}:{job.id}] Analysis complete with {issue_count} issues")
+            job.status = JobStatus.COMPLETED
+            job.completed_at = time.time()
+        
+        except Exception as e:
+            logger.error(f"[{job.job_type.value}:{job.id}] Error running pylint: {str(e)}", exc_info=True)
+            job.status = JobStatus.FAILED
+            job.error = f"Error running pylint: {str(e)}"
+            job.completed_at = time.time()
+    
+    async def _lint(self, job: Job, path: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Run pylint on a warm worker and parse its messages
+        
+        Args:
+            job: The job being processed; marked FAILED if pylint fails
+            path: File to lint; its lines must match ``job.code``
+            
+        Returns:
+            Pylint messages with line content, or None if the job failed
+        """
+        logger.debug(f"[{job.job_type.value}:{job.id}] Running pylint on {path}")
+        try:
+            with job.trace.span("pylint_request", batched=bool(self.batch_window)):
+                response = await self.lint_file(path, job.options.get("profile"))
+        except WorkerTimeoutError:
+            logger.error(f"[{job.job_type.value}:{job.id}] Pylint timed out")
+            job.status = JobStatus.TIMED_OUT
+            job.error = f"Pylint timed out after {self.timeout:g} seconds"
+            job.completed_at = time.time()
+            return None
+        except WorkerError as e:
+            logger.error(f"[{job.job_type.value}:{job.id}] Pylint worker failed: {str(e)}")
+            job.status = JobStatus.FAILED
+            job.error = f"Pylint worker failed: {str(e)}"
+            job.completed_at = time.time()
+            return None
+        
+        job.record_usage(response.get("usage"))
+        job.trace.add_timing("pylint", response.get("timing"))
+        
+        # Check for worker errors
+        if not response.get("ok"):
+            error_msg = response.get("error", "unknown error")
+            logger.error(f"[{job.job_type.value}:{job.id}] Pylint failed: {error_msg}")
+            job.status = JobStatus.FAILED
+            job.error = f"Pylint failed: {error_msg}"
+            job.completed_at = time.time()
+            return None
+        
+        # Process results
+        lint_output = response.get("output", "")
+        logger.debug(f"[{job.job_type.value}:{job.id}] Parsing lint output: {lint_output}")
+        
+        # If there's no output, it means there were no issues
+        if not lint_output.strip():
+            logger.info(f"[{job.job_type.value}:{job.id}] No issues found")
+            return []
+        
+        try:
+            with job.trace.span("parse_output", output_bytes=len(lint_output)):
+                lint_results = json.loads(lint_output)
+            logger.debug(f"[{job.job_type.value}:{job.id}] Parsed lint results: {lint_results}")
+        except json.JSONDecodeError as e:
+            logger.error(f"[{job.job_type.value}:{job.id}] Failed to parse JSON: {str(e)}")
+            job.status = JobStatus.FAILED
+            job.error = f"Failed to parse pylint output: {str(e)}"
+            job.completed_at = time.time()
+            return None
+        
+        # Add line content
+        with job.trace.span("add_line_content", messages=len(lint_results)):
+            add_line_content(lint_results, job.document)
+        return lint_results
+    
+    async def _lint_session(self, job: Job) -> Optional[Tuple[List[Dict[str, Any]], List[str]]]:
+        """
+        Lint a new version of a document, reusing findings of unchanged functions
+        
+        When no code outside the top-level functions has changed, functions
+        whose source is identical to the previously linted version are
+        stubbed out, so pylint only analyses changed code; their
+        messages are carried over from the previous result, moved to the
+        functions' new lines.
+        
+        Args:
+            job: Job with a document session
+            
+        Returns:
+            Tuple of (pylint messages with line content, names of the
+            functions whose findings were reused), or None if the job failed
+        """
+        session = job.session
+        async with session.lock(job.job_type):
+            previous = session.previous(job.job_type)
+            with job.trace.span("stub_unchanged") as span:
+                unchanged = unchanged_functions(previous[0], job.document) if previous is not None else {}
+                code, stubbed = stub_functions(job.document, set(unchanged))
+                span["stubbed"] = len(stubbed)
+            
+            path = session.path(job.job_type)
+            with job.trace.span("write_file"), open(path, "w", encoding="utf-8") as f:
+                f.write(code)
+            
+            lint_results = await self._lint(job, path)
+            if lint_results is None:
+                return None
+            
+            if stubbed:
+                reused = {name: unchanged[name] for name in stubbed}
+                with job.trace.span("merge_findings"):
+                    lint_results = merge_messages(lint_results, previous[1], reused, job.document)
+            logger.debug(
+                f"[{job.job_type.value}:{job.id}] Reused findings of {len(stubbed)} unchanged functions"
+            )
+            return lint_results, sorted(stubbed)
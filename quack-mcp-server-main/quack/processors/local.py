@@ -0,0 +1,69 @@
+"""
+Processor running another processor on files that already exist on disk.
+"""
+
+import logging
+import time
+from typing import Dict, Any, Optional
+
+from ..jobs.enums import JobStatus
+from ..jobs.base import Job, JobProcessor
+
+logger = logging.getLogger("quack")
+
+
+class LocalFileJobProcessor(JobProcessor):
+    """
+    Processor analysing a file in place instead of a temporary copy
+
+    Used by the offline ``analyze`` command: the job's ``path`` option names
+    the file its code was read from, and the wrapped processor runs on that
+    file through ``process_file``. Tools therefore see the file at its real
+    location, so imports of neighbouring modules and the project's own
+    configuration resolve as they would in the repository.
+    """
+
+    # Results refer to a path on disk, which the code alone does not identify
+    cacheable = False
+
+    def __init__(self, processor: JobProcessor):
+        """
+        Initialize the processor
+
+        Args:
+            processor: Processor to run; must implement ``process_file``
+        """
+        self.processor = processor
+
+    def tool_info(self) -> Dict[str, Any]:
+        """Tool information of the wrapped processor"""
+        return self.processor.tool_info()
+
+    def precheck(self, job: Job) -> Optional[Dict[str, Any]]:
+        """Precheck of the wrapped processor"""
+        return self.processor.precheck(job)
+
+    def close(self) -> None:
+        """Release the resources of the wrapped processor"""
+        self.processor.close()
+
+    async def process(self, job: Job) -> None:
+        """
+        Process a job whose ``path`` option names the file holding its code
+
+        Args:
+            job: The job to process
+        """
+        # Mark job as running
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        path = job.options["path"]
+        logger.debug(f"[{job.job_type.value}:{job.id}] Analysing {path} in place")
+
+        try:
+            await self.processor.process_file(job, path)
+        except Exception as e:
+            logger.error(f"[{job.job_type.value}:{job.id}] Error: {str(e)}", exc_info=True)
+            job.status = JobStatus.FAILED
+            job.error = f"Error: {str(e)}"
+            job.completed_at = time.time()
@@ -0,0 +1,80 @@
+"""
+Fast in-process checks run before a job is queued.
+"""
+
+import logging
+from typing import Dict, Any, List, Optional
+
+from ..jobs.source import SourceDocument
+
+logger = logging.getLogger("quack")
+
+try:
+    from pyflakes.checker import Checker as PyflakesChecker
+except ImportError:
+    PyflakesChecker = None
+
+
+def _syntax_error(document: SourceDocument) -> Optional[SyntaxError]:
+    """Parse errors, plus errors only raised when compiling (e.g. 'return' outside function)"""
+    if document.syntax_error is not None:
+        return document.syntax_error
+    try:
+        compile(document.ast, "<submission>", "exec", dont_inherit=True)
+    except SyntaxError as e:
+        return e
+    return None
+
+
+def _pyflakes_issues(document: SourceDocument) -> List[Dict[str, Any]]:
+    checker = PyflakesChecker(document.ast, filename="<submission>")
+    issues = []
+    for message in sorted(checker.messages, key=lambda m: (m.lineno, m.col)):
+        issues.append({
+            "line": message.lineno,
+            "column": message.col,
+            "message": message.message % message.message_args,
+            "type": type(message).__name__,
+            "line_content": document.line(message.lineno)
+        })
+    return issues
+
+
+def run_precheck(document: SourceDocument, pyflakes: bool = True) -> Dict[str, Any]:
+    """
+    Check that code compiles and run pyflakes over it
+
+    This runs in the server process, so its result can be returned while
+    the full analysis is still queued. Compiling takes milliseconds; the
+    pyflakes pass can take over a hundred on large files, so callers on
+    the event loop skip it or run it in a thread.
+
+    Args:
+        document: Parsed source of the submission
+        pyflakes: Whether to run pyflakes on code that compiles
+
+    Returns:
+        Quick result; ``syntax_error`` is set if the code does not compile,
+        and ``issues`` lists pyflakes findings (empty if pyflakes did not run)
+    """
+    error = _syntax_error(document)
+    if error is not None:
+        return {
+            "status": "syntax_error",
+            "syntax_error": {
+                "line": error.lineno,
+                "column": error.offset,
+                "message": error.msg,
+                "line_content": document.line(error.lineno) if error.lineno else None
+            },
+            "pyflakes": False,
+            "issues": []
+        }
+
+    pyflakes = pyflakes and PyflakesChecker is not None
+    return {
+        "status": "success",
+        "syntax_error": None,
+        "pyflakes": pyflakes,
+        "issues": _pyflakes_issues(document) if pyflakes else []
+    }
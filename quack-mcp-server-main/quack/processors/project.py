@@ -0,0 +1,273 @@
+"""
+Processor for analysing multi-file Python projects with pylint and mypy.
+"""
+
+import asyncio
+import base64
+import io
+import json
+import logging
+import os
+import posixpath
+import tarfile
+import time
+from typing import Dict, Any, List
+
+from ..jobs.enums import JobStatus
+from ..jobs.base import JobProcessor, ProjectJob
+from ..jobs.profiles import get_profile
+from ..jobs.source import SourceDocument
+from ..workers.pool import WorkerError
+from .lint import LintJobProcessor, categorize_messages
+from .static_analysis import StaticAnalysisJobProcessor, parse_mypy_output
+
+logger = logging.getLogger("quack")
+
+# Limits on the size of a submitted project
+MAX_PROJECT_FILES = 500
+MAX_PROJECT_BYTES = 5 * 1024 * 1024
+
+
+def validate_path(path: str) -> str:
+    """
+    Check that a project path is relative and stays inside the project
+
+    Args:
+        path: Path of a file within the project
+
+    Returns:
+        The normalised path, using forward slashes
+
+    Raises:
+        ValueError: If the path is absolute, escapes the project or is not a .py file
+    """
+    normalised = posixpath.normpath(path.replace("\\", "/"))
+    if normalised.startswith("/") or normalised == ".." or normalised.startswith("../"):
+        raise ValueError(f"Invalid project path: {path}")
+    if not normalised.endswith(".py"):
+        raise ValueError(f"Only .py files are supported: {path}")
+    return normalised
+
+
+def validate_files(files: Dict[str, str]) -> Dict[str, str]:
+    """
+    Validate a mapping of project paths to sources
+
+    Args:
+        files: Mapping of relative paths to file contents
+
+    Returns:
+        Mapping with normalised paths
+
+    Raises:
+        ValueError: If the project is empty, too large or contains an invalid path
+    """
+    if not files:
+        raise ValueError("Project contains no Python files")
+    if len(files) > MAX_PROJECT_FILES:
+        raise ValueError(f"Project has {len(files)} files; the limit is {MAX_PROJECT_FILES}")
+    if sum(len(source.encode("utf-8")) for source in files.values()) > MAX_PROJECT_BYTES:
+        raise ValueError(f"Project exceeds {MAX_PROJECT_BYTES} bytes")
+
+    validated: Dict[str, str] = {}
+    for path, source in files.items():
+        validated[validate_path(path)] = source
+    return validated
+
+
+def files_from_tarball(data: str) -> Dict[str, str]:
+    """
+    Read the Python files from a base64-encoded tarball
+
+    Only regular ``.py`` files are read; other members are ignored. Nothing
+    is extracted to disk.
+
+    Args:
+        data: Base64-encoded tar archive, optionally gzip/bz2/xz compressed
+
+    Returns:
+        Mapping of relative paths to file contents
+
+    Raises:
+        ValueError: If the archive is invalid, too large or contains an unsafe path
+    """
+    try:
+        raw = base64.b64decode(data, validate=True)
+    except ValueError as e:
+        raise ValueError(f"Invalid base64 data: {str(e)}")
+
+    files: Dict[str, str] = {}
+    total = 0
+    try:
+        with tarfile.open(fileobj=io.BytesIO(raw), mode="r:*") as archive:
+            for member in archive:
+                if not member.isfile() or not member.name.endswith(".py"):
+                    continue
+                path = validate_path(member.name)
+                total += member.size
+                if len(files) >= MAX_PROJECT_FILES or total > MAX_PROJECT_BYTES:
+                    raise ValueError(
+                        f"Project exceeds {MAX_PROJECT_FILES} files or {MAX_PROJECT_BYTES} bytes"
+                    )
+                extracted = archive.extractfile(member)
+                if extracted is not None:
+                    files[path] = extracted.read().decode("utf-8")
+    except (tarfile.TarError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid tarball: {str(e)}")
+
+    return validate_files(files)
+
+
+class ProjectJobProcessor(JobProcessor):
+    """Processor for project jobs, running pylint and mypy once over all files"""
+
+    def __init__(self, lint_processor: LintJobProcessor, static_processor: StaticAnalysisJobProcessor):
+        """
+        Initialize the processor
+
+        Args:
+            lint_processor: Processor whose pylint workers are reused
+            static_processor: Processor whose mypy daemons are reused
+        """
+        self.lint_processor = lint_processor
+        self.static_processor = static_processor
+
+    def tool_info(self) -> Dict[str, Any]:
+        """Versions and options of both tools"""
+        return {**self.lint_processor.tool_info(), **self.static_processor.tool_info()}
+
+    async def _run_pylint(self, job: ProjectJob, paths: List[str]) -> List[Dict[str, Any]]:
+        profile = get_profile(job.options.get("profile"))
+        response = await self.lint_processor.pool_for(profile.name).submit(
+            {"paths": paths, "args": list(profile.pylint_args)}, timeout=self.lint_processor.timeout
+        )
+        job.record_usage(response.get("usage"))
+        if not response.get("ok"):
+            raise WorkerError(response.get("error", "unknown error"))
+        output = response.get("output", "")
+        return json.loads(output) if output.strip() else []
+
+    async def process(self, job: ProjectJob) -> None:
+        """
+        Process a project job using pylint and mypy
+
+        This processor:
+        1. Writes all files into one workspace of the lint processor's workspaces
+        2. Runs pylint and mypy over the whole workspace concurrently
+        3. Groups the issues by file
+        4. Updates the job with results or error information
+
+        The job status will be updated to COMPLETED or FAILED
+        based on the outcome of the processing.
+
+        Args:
+            job: The project job to process
+        """
+        # Mark job as running
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        logger.info(f"[{job.job_type.value}:{job.id}] Starting project analysis")
+
+        workspace = None
+        try:
+            files = validate_files(job.files)
+
+            # Materialise the project
+            workspace = self.lint_processor.workspaces.acquire(sum(len(source) for source in files.values()))
+            paths = []
+            for rel_path, source in files.items():
+                path = os.path.join(workspace, *rel_path.split("/"))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(source)
+                paths.append(path)
+            logger.debug(f"[{job.job_type.value}:{job.id}] Wrote {len(paths)} files to {workspace}")
+
+            # Run both tools once over the whole project
+            lint_results, mypy_results = await asyncio.gather(
+                self._run_pylint(job, paths),
+                self.static_processor.run_mypy(job, paths),
+                return_exceptions=True
+            )
+
+            errors = []
+            if isinstance(lint_results, BaseException):
+                errors.append(f"Pylint failed: {str(lint_results)}")
+            if isinstance(mypy_results, BaseException):
+                errors.append(f"Mypy failed: {str(mypy_results)}")
+            elif mypy_results[1]:
+                errors.append(f"Mypy error: {mypy_results[1]}")
+            if errors:
+                logger.error(f"[{job.job_type.value}:{job.id}] {'; '.join(errors)}")
+                job.status = JobStatus.FAILED
+                job.error = "; ".join(errors)
+                job.completed_at = time.time()
+                return
+
+            def relative(path: str) -> str:
+                return os.path.relpath(os.path.abspath(path), workspace).replace(os.sep, "/")
+
+            documents = {rel_path: SourceDocument(source) for rel_path, source in files.items()}
+
+            # Group issues by file
+            lint_by_file: Dict[str, List[Dict[str, Any]]] = {rel_path: [] for rel_path in files}
+            for message in lint_results:
+                rel_path = relative(message.get("path", ""))
+                if rel_path not in lint_by_file:
+                    continue
+                if "line" in message:
+                    message["line_content"] = documents[rel_path].line(message["line"])
+                message["path"] = rel_path
+                lint_by_file[rel_path].append(message)
+
+            mypy_by_file: Dict[str, List[Dict[str, Any]]] = {rel_path: [] for rel_path in files}
+            for file_path, issue in parse_mypy_output(mypy_results[0], f"{job.job_type.value}:{job.id}"):
+                # mypy reports files below its working directory relative to it
+                rel_path = relative(file_path)
+                if rel_path not in mypy_by_file:
+                    continue
+                issue["line_content"] = documents[rel_path].line(issue["line"])
+                mypy_by_file[rel_path].append(issue)
+
+            file_results = {
+                rel_path: {
+                    "lint": categorize_messages(lint_by_file[rel_path]),
+                    "static_analysis": {
+                        "summary": {"issue_count": len(mypy_by_file[rel_path])},
+                        "issues": mypy_by_file[rel_path]
+                    }
+                }
+                for rel_path in sorted(files)
+            }
+            lint_issue_count = sum(len(messages) for messages in lint_by_file.values())
+            type_issue_count = sum(len(issues) for issues in mypy_by_file.values())
+
+            # Create result
+            job.result = {
+                "status": "success",
+                "summary": {
+                    "file_count": len(files),
+                    "lint_issue_count": lint_issue_count,
+                    "type_issue_count": type_issue_count
+                },
+                "files": file_results
+            }
+
+            logger.info(
+                f"[{job.job_type.value}:{job.id}] Analysis of {len(files)} files complete with "
+                f"{lint_issue_count} lint and {type_issue_count} type issues"
+            )
+            job.status = JobStatus.COMPLETED
+            job.completed_at = time.time()
+
+        except Exception as e:
+            logger.error(f"[{job.job_type.value}:{job.id}] Error: {str(e)}", exc_info=True)
+            job.status = JobStatus.FAILED
+            job.error = f"Error: {str(e)}"
+            job.completed_at = time.time()
+
+        finally:
+            # Clean up the workspace
+            if workspace is not None:
+                self.lint_processor.workspaces.release(workspace)
+                logger.debug(f"[{job.job_type.value}:{job.id}] Cleaned up workspace: {workspace}")
@@ -4,27 +4,240 @@ Processor for static type analysis of Python code using mypy.
 
 import asyncio
 import logging
-import tempfile
 import os
+import re
 import time
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
 from ..jobs.enums import JobStatus
-from ..jobs.base import JobProcessor, StaticAnalysisJob
+from ..jobs.base import Job, JobProcessor, StaticAnalysisJob
+from ..jobs.profiles import get_profile
+from ..jobs.source import SourceDocument
+from ..jobs.workspaces import WorkspaceManager, shared_workspaces, write_module
+from ..workers.dmypy import DmypyBackend, DaemonError, DaemonTimeoutError, DEFAULT_CACHE_DIR
+from ..workers.resources import MeasuredProcess, ResourceLimits
+from .precheck import run_precheck
 
 logger = logging.getLogger("quack")
 
+# Options for machine-readable mypy output
+MYPY_FLAGS = ("--no-error-summary", "--show-column-numbers", "--show-error-codes", "--no-pretty")
+
+# Error code at the end of a mypy message
+MYPY_CODE = re.compile(r"\s+\[([a-z0-9-]+)\]$")
+
+
+def parse_mypy_output(mypy_output: str, log_prefix: str = "static_analysis") -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Parse mypy's machine-readable output
+    
+    Args:
+        mypy_output: Output of mypy run with MYPY_FLAGS
+        log_prefix: Prefix for log messages about malformed lines
+        
+    Returns:
+        List of (file path, issue) pairs; issues have no line content yet
+    """
+    issues: List[Tuple[str, Dict[str, Any]]] = []
+    for line in mypy_output.splitlines():
+        # The message itself may contain colons
+        parts = line.split(":", 3)
+        if len(parts) == 4:
+            file_path, line_num, col_num, message = parts
+            try:
+                line_num = int(line_num)
+                col_num = int(col_num)
+                
+                # Extract the trailing error code, e.g. "[arg-type]", if present
+                error_code = None
+                code = MYPY_CODE.search(message)
+                if code:
+                    error_code = code.group(1)
+                
+                issues.append((file_path, {
+                    "line": line_num,
+                    "column": col_num,
+                    "message": message.strip(),
+                    "error_code": error_code
+                }))
+            except (ValueError, IndexError):
+                # Skip malformed output lines
+                logger.warning(f"[{log_prefix}] Skipping malformed output line: {line}")
+                continue
+    return issues
+
+
+def mypy_issues(
+    mypy_output: str,
+    document: SourceDocument,
+    log_prefix: str = "static_analysis",
+    path: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """
+    Parse mypy's output for a single file and attach the source lines
+    
+    Args:
+        mypy_output: Output of mypy run with MYPY_FLAGS on one file
+        document: Source of the checked file
+        log_prefix: Prefix for log messages about malformed lines
+        path: Checked file; if given, issues mypy reports in the modules it
+            imports are dropped
+        
+    Returns:
+        Issues with line content
+    """
+    target = os.path.abspath(path) if path is not None else None
+    issues: List[Dict[str, Any]] = []
+    for file_path, issue in parse_mypy_output(mypy_output, log_prefix):
+        if target is not None and os.path.abspath(file_path) != target:
+            continue
+        issue["line_content"] = document.line(issue["line"])
+        issues.append(issue)
+    return issues
+
 
 class StaticAnalysisJobProcessor(JobProcessor):
     """Processor for static analysis jobs using mypy"""
     
+    def __init__(
+        self,
+        use_daemon: bool = True,
+        daemons_per_config: int = 1,
+        cache_dir: Optional[str] = None,
+        timeout: float = 30.0,
+        limits: Optional[ResourceLimits] = None,
+        workspaces: Optional[WorkspaceManager] = None
+    ):
+        """
+        Initialize the processor
+        
+        Args:
+            use_daemon: Route jobs to warm dmypy daemons, falling back to a cold mypy run
+            daemons_per_config: Number of daemons kept alive for each set of mypy flags
+            cache_dir: Persistent mypy cache directory
+            timeout: Seconds a type check may take before mypy is killed
+            limits: Memory limit for the daemons, and CPU time and memory
+                limits for cold mypy runs
+            workspaces: Workspaces to write submitted code to (default: the
+                process's shared workspaces)
+        """
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.timeout = timeout
+        self.limits = limits
+        self.workspaces = workspaces if workspaces is not None else shared_workspaces()
+        self.daemon = DmypyBackend(daemons_per_config, self.cache_dir, limits=limits) if use_daemon else None
+    
+    def tool_info(self) -> Dict[str, Any]:
+        """Mypy version and flags, which determine the reported issues"""
+        try:
+            from mypy.version import __version__ as mypy_version
+        except ImportError:
+            mypy_version = "unknown"
+        return {"mypy": mypy_version, "flags": list(MYPY_FLAGS)}
+    
+    def precheck(self, job: Job) -> Dict[str, Any]:
+        """Syntax check, run on the event loop before the job is queued"""
+        return run_precheck(job.document, pyflakes=False)
+    
+    def close(self) -> None:
+        """Stop the mypy daemons"""
+        if self.daemon is not None:
+            self.daemon.close()
+    
+    async def run_mypy(self, job: Job, paths: List[str]) -> Tuple[str, str]:
+        """
+        Type-check files on a warm daemon, or with a cold mypy process as fallback
+        
+        The job's analysis profile may add mypy flags; each set of flags
+        has its own daemons.
+        
+        Args:
+            job: The job being processed
+            paths: Files to check
+            
+        Returns:
+            Tuple of (mypy output, mypy error output)
+            
+        Raises:
+            asyncio.TimeoutError: If the check took longer than the timeout
+        """
+        if self.daemon is not None:
+            try:
+                response = await self.daemon.check(paths, self._flags(job), timeout=self.timeout)
+                job.record_usage(response.get("usage"))
+                job.trace.add_timing("dmypy", response.get("timing"))
+                return response.get("out", "").strip(), response.get("err", "").strip()
+            except DaemonTimeoutError:
+                # A cold run of the same check would time out as well
+                raise asyncio.TimeoutError()
+            except DaemonError as e:
+                logger.warning(f"[{job.job_type.value}:{job.id}] {str(e)}; falling back to mypy subprocess")
+        
+        return await self._run_cold(job, paths)
+    
+    def _flags(self, job: Job) -> Tuple[str, ...]:
+        return (*MYPY_FLAGS, *get_profile(job.options.get("profile")).mypy_args)
+    
+    async def _run_cold(self, job: Job, paths: List[str]) -> Tuple[str, str]:
+        """
+        Type-check files with a fresh mypy process
+        
+        Args:
+            job: The job being processed
+            paths: Files to check
+            
+        Returns:
+            Tuple of (mypy output, mypy error output)
+        """
+        # Try up to 3 times with exponential backoff
+        for attempt in range(3):
+            try:
+                if attempt > 0:
+                    logger.info(f"[{job.job_type.value}:{job.id}] Retry attempt {attempt+1}")
+                    # Wait with exponential backoff
+                    await asyncio.sleep(2 ** attempt)
+                    
+                # Run mypy with options for machine-readable output, in its
+                # own process group so it can be killed with its children
+                process = MeasuredProcess(
+                    ["mypy", *self._flags(job), "--cache-dir", os.path.join(self.cache_dir, "cold"), *paths],
+                    limits=self.limits
+                )
+                
+                logger.debug(f"[{job.job_type.value}:{job.id}] Mypy process started with PID: {process.pid}")
+                
+                # Set a timeout for the process; on timeout or cancellation
+                # the process group is killed rather than left running
+                loop = asyncio.get_running_loop()
+                try:
+                    with job.trace.span("mypy", attempt=attempt + 1):
+                        _, stdout, stderr, usage = await asyncio.wait_for(
+                            loop.run_in_executor(None, process.wait), timeout=self.timeout
+                        )
+                except BaseException:
+                    process.kill()
+                    raise
+                
+                # If we get here, the process completed without timing out
+                job.record_usage(usage)
+                break
+            except asyncio.TimeoutError:
+                # A subclass of OSError, but retrying would time out again
+                raise
+            except OSError as e:
+                if attempt == 2:  # Last attempt
+                    raise  # Re-raise the exception
+                logger.warning(f"[{job.job_type.value}:{job.id}] Attempt {attempt+1} failed: {str(e)}")
+        
+        return stdout.decode().strip(), stderr.decode().strip()
+    
     async def process(self, job: StaticAnalysisJob) -> None:
         """
         Process a static analysis job using mypy
         
         This processor:
-        1. Creates a temporary file with the code
-        2. Runs mypy on the file
+        1. Writes the code into a workspace
+        2. Runs mypy on the file (on a warm dmypy daemon when available)
         3. Parses the output into structured data
         4. Updates the job with results or error information
         
@@ -39,108 +252,15 @@ class StaticAnalysisJobProcessor(JobProcessor):
         job.started_at = time.time()
         logger.info(f"[{job.job_type.value}:{job.id}] Starting mypy analysis")
         
-        temp_path = None
+        workspace = None
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(suffix='.py', delete=False) as temp_file:
-                temp_path = temp_file.name
-                temp_file.write(job.code.encode('utf-8'))
-                logger.debug(f"[{job.job_type.value}:{job.id}] Created temporary file at {temp_path}")
-                
-            # Run mypy
-            try:
-                # Try up to 3 times with exponential backoff
-                for attempt in range(3):
-                    try:
-                        if attempt > 0:
-                            logger.info(f"[{job.job_type.value}:{job.id}] Retry attempt {attempt+1}")
-                            # Wait with exponential backoff
-                            await asyncio.sleep(2 ** attempt)
-                            
-                        # Run mypy with options for machine-readable output
-                        process = await asyncio.create_subprocess_exec(
-                            "mypy", "--no-error-summary", "--show-column-numbers", 
-                            "--show-error-codes", "--no-pretty", temp_path,
-                            stdout=asyncio.subprocess.PIPE,
-                            stderr=asyncio.subprocess.PIPE
-                        )
-                        
-                        logger.debug(f"[{job.job_type.value}:{job.id}] Mypy process started with PID: {process.pid}")
-                        
-                        # Set a timeout for the process
-                        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=30.0)
-                        
-                        # If we get here, the process completed without timing out
-                        break
-                    except (OSError, asyncio.TimeoutError) as e:
-                        if attempt == 2:  # Last attempt
-                            raise  # Re-raise the exception
-                        logger.warning(f"[{job.job_type.value}:{job.id}] Attempt {attempt+1} failed: {str(e)}")
-                
-                # Process results - mypy returns non-zero if it finds type errors
-                mypy_output = stdout.decode().strip()
-                mypy_errors = stderr.decode().strip()
-                
-                if mypy_errors:
-                    logger.error(f"[{job.job_type.value}:{job.id}] Mypy error: {mypy_errors}")
-                    job.status = JobStatus.FAILED
-                    job.error = f"Mypy error: {mypy_errors}"
-                    job.completed_at = time.time()
-                    return
-                
-                # Parse mypy output
-                issues: List[Dict[str, Any]] = []
-                if mypy_output:
-                    for line in mypy_output.splitlines():
-                        parts = line.split(":", 4)
-                        if len(parts) >= 4:
-                            file_path, line_num, col_num, message = parts[:4]
-                            try:
-                                line_num = int(line_num)
-                                col_num = int(col_num)
-                                
-                                # Extract error code if present
-                                error_code = None
-                                if "[" in message and "]" in message:
-                                    code_part = message.split("[")[1].split("]")[0]
-                                    if code_part.startswith("error-"):
-                                        error_code = code_part
-                                
-                                # Add line content
-                                line_content = None
-                                if 0 <= line_num-1 < len(job.code.splitlines()):
-                                    line_content = job.code.splitlines()[line_num-1]
-                                
-                                issues.append({
-                                    "line": line_num,
-                                    "column": col_num,
-                                    "message": message.strip(),
-                                    "error_code": error_code,
-                                    "line_content": line_content
-                                })
-                            except (ValueError, IndexError):
-                                # Skip malformed output lines
-                                logger.warning(f"[{job.job_type.value}:{job.id}] Skipping malformed output line: {line}")
-                                continue
-                
-                # Create result
-                job.result = {
-                    "status": "success",
-                    "summary": {
-                        "issue_count": len(issues)
-                    },
-                    "issues": issues
-                }
-                
-                logger.info(f"[{job.job_type.value}:{job.id}] Analysis complete with {len(issues)} issues")
-                job.status = JobStatus.COMPLETED
-                job.completed_at = time.time()
-                
-            except asyncio.TimeoutError:
-                logger.error(f"[{job.job_type.value}:{job.id}] Process timed out")
-                job.status = JobStatus.FAILED
-                job.error = "Process timed out after 30 seconds"
-                job.completed_at = time.time()
+            # Write the code into a workspace
+            workspace = self.workspaces.acquire(len(job.code))
+            with job.trace.span("write_file"):
+                path = write_module(workspace, job.code)
+            logger.debug(f"[{job.job_type.value}:{job.id}] Wrote code to {path}")
+            
+            await self.process_file(job, path)
                 
         except Exception as e:
             logger.error(f"[{job.job_type.value}:{job.id}] Error: {str(e)}", exc_info=True)
@@ -149,10 +269,83 @@ class StaticAnalysisJobProcessor(JobProcessor):
             job.completed_at = time.time()
             
         finally:
-            # Clean up temporary file
-            if temp_path and os.path.exists(temp_path):
-                try:
-                    os.unlink(temp_path)
-                    logger.debug(f"[{job.job_type.value}:{job.id}] Cleaned up temporary file: {temp_path}")
-                except Exception as e:
-                    logger.error(f"[{job.job_type.value}:{job.id}] Failed to clean up temporary file: {str(e)}")
+            # Empty the workspace for the next job
+            if workspace is not None:
+                self.workspaces.release(workspace)
+    
+    async def process_file(self, job: Job, path: str) -> None:
+        """
+        Type-check a file holding the job's code and update the job
+        
+        Used by ``process`` and by composite jobs that share one workspace
+        between several processors. The caller marks the job as running.
+        Jobs in a document session are checked at the session's own stable
+        path instead, so the daemon's fine-grained incremental mode only
+        rechecks the definitions affected by the edit.
+        
+        Args:
+            job: The job to update
+            path: File containing ``job.code``
+        """
+        if job.session is None:
+            await self._check_file(job, path)
+            return
+        
+        session = job.session
+        async with session.lock(job.job_type):
+            session_path = session.path(job.job_type)
+            previous = os.stat(session_path).st_mtime_ns if os.path.exists(session_path) else None
+            with job.trace.span("write_file"), open(session_path, "w", encoding="utf-8") as f:
+                f.write(job.code)
+            # dmypy notices changes by size and whole-second mtime, so a
+            # same-size edit within one second must still move the mtime on
+            if previous is not None and os.stat(session_path).st_mtime_ns // 10**9 <= previous // 10**9:
+                bumped = (previous // 10**9 + 1) * 10**9
+                os.utime(session_path, ns=(bumped, bumped))
+            await self._check_file(job, session_path)
+        if job.status == JobStatus.COMPLETED:
+            job.result["incremental"] = {"document_id": session.document_id, "version": job.options["version"]}
+            session.record(job.job_type, job.options["version"], job.document, job.result)
+    
+    async def _check_file(self, job: Job, path: str) -> None:
+        """
+        Run mypy on a file and update the job
+        
+        Args:
+            job: The job to update
+            path: File containing ``job.code``
+        """
+        # Run mypy
+        try:
+            with job.trace.span("mypy_request", daemon=self.daemon is not None):
+                mypy_output, mypy_errors = await self.run_mypy(job, [path])
+            
+            if mypy_errors:
+                logger.error(f"[{job.job_type.value}:{job.id}] Mypy error: {mypy_errors}")
+                job.status = JobStatus.FAILED
+                job.error = f"Mypy error: {mypy_errors}"
+                job.completed_at = time.time()
+                return
+            
+            # Parse mypy output
+            with job.trace.span("parse_output", output_bytes=len(mypy_output)):
+                issues = mypy_issues(mypy_output, job.document, f"{job.job_type.value}:{job.id}", path)
+            
+            # Create result
+            job.result = {
+                "status": "success",
+                "summary": {
+                    "issue_count": len(issues)
+                },
+                "issues": issues
+            }
+            
+            logger.info(f"[{job.job_type.value}:{job.id}] Analysis complete with {len(issues)} issues")
+            job.status = JobStatus.COMPLETED
+            job.completed_at = time.time()
+        
+        except asyncio.TimeoutError:
+            logger.error(f"[{job.job_type.value}:{job.id}] Process timed out")
+            job.status = JobStatus.TIMED_OUT
+            job.error = f"Process timed out after {self.timeout:g} seconds"
+            job.completed_at = time.time()
@@ -0,0 +1,211 @@
+"""
+Test impact analysis: rerun only the tests affected by an edit.
+
+Test jobs submitted with a ``file_id`` record which functions of the
+submission every test executed. When the same file is submitted again,
+the two versions are diffed and previous results are reused for tests
+that only executed unchanged functions.
+"""
+
+import ast
+import difflib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from ..jobs.source import SourceDocument
+
+# Pseudo-function for code executed at module level
+MODULE = "<module>"
+
+# Outcomes whose result can be reused; failing tests are always rerun
+REUSABLE_OUTCOMES = ("passed", "skipped", "xfailed")
+
+
+class _Function:
+    """Span of a function definition in a source file"""
+
+    def __init__(self, qualname: str, start: int, end: int, volatile: bool):
+        self.qualname = qualname
+        self.start = start  # first decorator or def line
+        self.end = end
+        self.volatile = volatile
+
+
+def _is_mark(decorator: ast.expr) -> bool:
+    """Check whether a decorator is a pytest mark such as @pytest.mark.parametrize(...)"""
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+    return "mark" in ast.unparse(decorator).split(".")
+
+
+def _functions(document: SourceDocument) -> List[_Function]:
+    functions: List[_Function] = []
+
+    def visit(body: List[ast.stmt], prefix: str) -> None:
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                qualname = prefix + node.name
+                start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                # Functions with other decorators (fixtures, caches) may run
+                # once for many tests, so their coverage cannot be trusted
+                volatile = not all(_is_mark(d) for d in node.decorator_list)
+                functions.append(_Function(qualname, start, node.end_lineno or node.lineno, volatile))
+                visit(node.body, qualname + ".")
+            elif isinstance(node, ast.ClassDef):
+                visit(node.body, prefix + node.name + ".")
+
+    if document.ast is not None:
+        visit(document.ast.body, "")
+    return functions
+
+
+def _innermost(functions: List[_Function], line: int) -> Optional[_Function]:
+    found = None
+    for function in functions:
+        if function.start <= line <= function.end and (found is None or function.start >= found.start):
+            found = function
+    return found
+
+
+def _top_level_names(document: SourceDocument) -> Dict[str, Tuple[int, int]]:
+    names: Dict[str, Tuple[int, int]] = {}
+    if document.ast is not None:
+        for node in document.ast.body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                names[node.name] = (start, node.end_lineno or node.lineno)
+    return names
+
+
+def executed_functions(document: SourceDocument, lines: Dict[str, List[int]]) -> Dict[str, List[str]]:
+    """
+    Map the lines each test executed to the functions containing them
+
+    Args:
+        document: Source the lines belong to
+        lines: Executed line numbers by node ID
+
+    Returns:
+        Sorted qualified names by node ID; MODULE stands for lines outside any function
+    """
+    functions = _functions(document)
+    executed = {}
+    for nodeid, test_lines in lines.items():
+        names = set()
+        for line in test_lines:
+            function = _innermost(functions, line)
+            names.add(function.qualname if function is not None else MODULE)
+        executed[nodeid] = sorted(names)
+    return executed
+
+
+def changed_functions(old: SourceDocument, new: SourceDocument) -> Optional[Set[str]]:
+    """
+    Find the functions whose code differs between two versions of a file
+
+    Args:
+        old: Previous version
+        new: Current version
+
+    Returns:
+        Qualified names of changed functions, or None if module-level code
+        changed and every test has to be rerun
+    """
+    if old.ast is None or new.ast is None:
+        return None
+    old_functions, new_functions = _functions(old), _functions(new)
+    old_names, new_names = _top_level_names(old), _top_level_names(new)
+
+    def added_or_removed(line: int, names: Dict[str, Tuple[int, int]], other: Dict[str, Tuple[int, int]]) -> bool:
+        # Lines of a whole top-level definition that only exists in one version
+        return any(start <= line <= end and name not in other for name, (start, end) in names.items())
+
+    def trivial(document: SourceDocument, line: int) -> bool:
+        text = (document.line(line) or "").strip()
+        return not text or text.startswith("#")
+
+    changed: Set[str] = set()
+    matcher = difflib.SequenceMatcher(None, old.lines, new.lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        sides = [(old, old_functions, old_names, new_names, range(i1 + 1, i2 + 1)),
+                 (new, new_functions, new_names, old_names, range(j1 + 1, j2 + 1))]
+        for document, functions, names, other_names, lines in sides:
+            for line in lines:
+                if trivial(document, line):
+                    continue
+                function = _innermost(functions, line)
+                if function is not None:
+                    if function.volatile:
+                        return None
+                    changed.add(function.qualname)
+                elif not added_or_removed(line, names, other_names):
+                    return None
+    return changed
+
+
+class ImpactMap:
+    """Previous version of a file and the functions each of its tests executed"""
+
+    def __init__(self, document: SourceDocument, tests: Dict[str, Dict[str, Any]], functions: Dict[str, List[str]]):
+        """
+        Args:
+            document: Source the tests were run against
+            tests: Test results by node ID
+            functions: Functions executed by each test, by node ID
+        """
+        self.document = document
+        self.tests = tests
+        self.functions = functions
+
+    def reusable(self, document: SourceDocument, test_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Select previous results that are still valid for a new version
+
+        Args:
+            document: New version of the file
+            test_names: Top-level tests defined in the new version
+
+        Returns:
+            Test results by node ID
+        """
+        changed = changed_functions(self.document, document)
+        if changed is None:
+            return {}
+        reusable = {}
+        for nodeid, test in self.tests.items():
+            top_level = nodeid.split("::")[1].split("[")[0] if "::" in nodeid else ""
+            if (test["outcome"] in REUSABLE_OUTCOMES
+                    and top_level in test_names
+                    and MODULE not in self.functions[nodeid]
+                    and not changed.intersection(self.functions[nodeid])):
+                reusable[nodeid] = test
+        return reusable
+
+
+class ImpactMaps:
+    """Bounded LRU of impact maps keyed by client-supplied file identity"""
+
+    def __init__(self, max_entries: int = 256):
+        """
+        Args:
+            max_entries: Maximum number of files remembered
+        """
+        self.max_entries = max_entries
+        self.maps: "OrderedDict[str, ImpactMap]" = OrderedDict()
+
+    def get(self, file_id: str) -> Optional[ImpactMap]:
+        impact_map = self.maps.get(file_id)
+        if impact_map is not None:
+            self.maps.move_to_end(file_id)
+        return impact_map
+
+    def put(self, file_id: str, impact_map: ImpactMap) -> None:
+        self.maps[file_id] = impact_map
+        self.maps.move_to_end(file_id)
+        while len(self.maps) > self.max_entries:
+            self.maps.popitem(last=False)
+
+    def discard(self, file_id: str) -> None:
+        self.maps.pop(file_id, None)
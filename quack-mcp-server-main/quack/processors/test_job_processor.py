@@ -1,30 +1,348 @@
+import ast
 import subprocess
 import asyncio
 import logging
+import math
+import os
 import re
-from quack.jobs.base import JobProcessor
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from quack.jobs.base import Job, JobProcessor
+from quack.jobs.enums import JobStatus
+from quack.jobs.source import SourceDocument
+from quack.jobs.workspaces import WorkspaceManager, shared_workspaces, write_module
+from quack.processors.precheck import run_precheck
+from quack.processors.test_impact import ImpactMap, ImpactMaps, executed_functions
+from quack.workers.resources import ResourceLimits
+from quack.workers.pool import WorkerPool, WorkerError, WorkerTimeoutError
 
 logger = logging.getLogger(__name__)
 
+# Test outcomes reported by the pytest workers, and their summary keys
+OUTCOMES = {
+    "passed": "passed",
+    "failed": "failed",
+    "error": "errors",
+    "skipped": "skipped",
+    "xfailed": "xfailed",
+    "xpassed": "xpassed",
+}
+
+
+def find_test_names(document: SourceDocument) -> List[str]:
+    """
+    Find the top-level tests of a module without importing it.
+
+    Args:
+        document: Parsed source of the module
+
+    Returns:
+        Names of test functions and test classes, in source order
+    """
+    if document.ast is None:
+        return []
+    names = []
+    for node in document.ast.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+            names.append(node.name)
+        elif isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            names.append(node.name)
+    return names
+
+
+def summarize_tests(tests: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Count test outcomes.
+
+    Args:
+        tests: Per-test results from the pytest workers
+
+    Returns:
+        Summary with the total, a count per outcome and the summed duration
+    """
+    summary: Dict[str, Any] = {"total": len(tests)}
+    summary.update({key: 0 for key in OUTCOMES.values()})
+    for test in tests:
+        summary[OUTCOMES.get(test["outcome"], "errors")] += 1
+    summary["duration"] = sum(test["duration"] for test in tests)
+    return summary
+
+
 class TestJobProcessor(JobProcessor):
     """
     Test job processor used to run pytest tests.
+
+    Tests run in a pool of pre-warmed pytest worker processes. Modules with
+    many tests are split into shards that run on several workers at once.
+
+    Jobs submitted with a ``file_id`` option (or in a document session)
+    record which functions each test executed. When the same file is resubmitted, only tests affected
+    by the edit are rerun and previous results are reused for the rest.
     """
 
-    def process(self, job) -> dict:
+    # Not a test class, despite the name
+    __test__ = False
+
+    # Tests may depend on time, randomness or the environment
+    cacheable = False
+
+    def __init__(
+        self,
+        pool_size: Optional[int] = None,
+        max_jobs_per_worker: int = 20,
+        max_worker_memory_mb: Optional[int] = 512,
+        timeout: float = 30.0,
+        shard_size: int = 20,
+        max_impact_maps: int = 256,
+        limits: Optional[ResourceLimits] = None,
+        workspaces: Optional[WorkspaceManager] = None
+    ):
+        """
+        Initialize the processor with a pool of warm pytest workers.
+
+        Args:
+            pool_size: Number of pytest worker processes (default: up to 4, one per CPU)
+            max_jobs_per_worker: Recycle a worker after this many runs; submitted
+                code runs inside the worker, so workers are recycled often
+            max_worker_memory_mb: Recycle a worker whose peak RSS exceeds this
+            timeout: Seconds a test run may take before its worker is killed
+            shard_size: Split modules with more top-level tests than this into
+                shards run on separate workers
+            max_impact_maps: Number of files remembered for test impact analysis
+            limits: CPU time and memory limits for each test run, inherited by
+                processes the tests start
+            workspaces: Workspaces to write submitted code to (default: the
+                process's shared workspaces)
+        """
+        if pool_size is None:
+            pool_size = max(1, min(4, os.cpu_count() or 1))
+        self.pool = WorkerPool(
+            "quack.workers.pytest_worker",
+            size=pool_size,
+            max_jobs_per_worker=max_jobs_per_worker,
+            max_memory_mb=max_worker_memory_mb,
+            name="pytest",
+            limits=limits
+        )
+        self.workspaces = workspaces if workspaces is not None else shared_workspaces()
+        self.timeout = timeout
+        self.shard_size = shard_size
+        self.impact_maps = ImpactMaps(max_impact_maps)
+
+    def tool_info(self) -> Dict[str, Any]:
+        """Pytest version, which determines how tests are collected and run"""
+        try:
+            from pytest import __version__ as pytest_version
+        except ImportError:
+            pytest_version = "unknown"
+        return {"pytest": pytest_version}
+
+    def precheck(self, job: Job) -> Dict[str, Any]:
+        """Syntax check, run on the event loop before the job is queued"""
+        return run_precheck(job.document, pyflakes=False)
+
+    def close(self) -> None:
+        """Stop the pytest workers"""
+        self.pool.close()
+
+    def shards(self, job: Job, path: str) -> List[List[str]]:
+        """
+        Split a module's tests into shards.
+
+        Args:
+            job: The job whose code is being tested
+            path: File containing ``job.code``
+
+        Returns:
+            One list of pytest node IDs per shard
+        """
+        names = find_test_names(job.document)
+        count = min(self.pool.size, math.ceil(len(names) / self.shard_size))
+        if count <= 1:
+            return [[path]]
+        return [[f"{path}::{name}" for name in names[i::count]] for i in range(count)]
+
+    async def process(self, job: Job) -> None:
+        """
+        Process a test job using pytest.
+
+        This processor:
+        1. Writes the code into a workspace
+        2. Runs pytest on it in pre-warmed worker processes, sharded for large modules
+        3. Updates the job with per-test results or error information
+
+        The job is COMPLETED whenever pytest ran, whether or not the tests
+        passed; it is TIMED_OUT if the tests ran longer than the timeout and
+        FAILED if pytest could not run.
+
+        Args:
+            job: The test job to process
+        """
+        # Mark job as running
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        logger.info(f"[{job.job_type.value}:{job.id}] Starting pytest run")
+
+        workspace = None
+        try:
+            workspace = self.workspaces.acquire(len(job.code))
+            with job.trace.span("write_file"):
+                path = write_module(workspace, job.code, "submission.py")
+            await self.process_file(job, path)
+        except Exception as e:
+            logger.error(f"[{job.job_type.value}:{job.id}] Error: {str(e)}", exc_info=True)
+            job.status = JobStatus.FAILED
+            job.error = f"Error: {str(e)}"
+            job.completed_at = time.time()
+        finally:
+            if workspace is not None:
+                self.workspaces.release(workspace)
+
+    async def process_file(self, job: Job, path: str) -> None:
+        """
+        Run pytest on a file holding the job's code and update the job.
+
+        Args:
+            job: The job to update
+            path: File containing ``job.code``
+        """
+        with job.trace.span("select_tests") as span:
+            shards = self.shards(job, path)
+            rootdir = os.path.dirname(path)
+
+            # Reuse results of tests the edit cannot have affected
+            file_id = job.options.get("file_id") or job.options.get("document_id")
+            previous = self.impact_maps.get(file_id) if file_id else None
+            reused: Dict[str, Dict[str, Any]] = {}
+            if previous is not None:
+                reused = previous.reusable(job.document, find_test_names(job.document))
+            span.update(shards=len(shards), reused=len(reused))
+        request: Dict[str, Any] = {"rootdir": rootdir}
+        if file_id:
+            request["trace"] = True
+        if reused:
+            request["deselect"] = sorted(reused)
+
+        logger.debug(
+            f"[{job.job_type.value}:{job.id}] Running pytest in {len(shards)} shard(s), "
+            f"reusing {len(reused)} previous results"
+        )
+        try:
+            with job.trace.span("pytest_request"):
+                responses = await asyncio.gather(*(
+                    self.pool.submit({**request, "paths": shard}, timeout=self.timeout)
+                    for shard in shards
+                ))
+        except WorkerTimeoutError:
+            logger.error(f"[{job.job_type.value}:{job.id}] Tests timed out")
+            job.status = JobStatus.TIMED_OUT
+            job.error = f"Tests timed out after {self.timeout:g} seconds"
+            job.completed_at = time.time()
+            return
+        except WorkerError as e:
+            logger.error(f"[{job.job_type.value}:{job.id}] Pytest worker failed: {str(e)}")
+            job.status = JobStatus.FAILED
+            job.error = f"Pytest worker failed: {str(e)}"
+            job.completed_at = time.time()
+            return
+
+        for index, response in enumerate(responses):
+            job.record_usage(response.get("usage"))
+            # Shards run concurrently, each in a lane of its own
+            job.trace.add_timing("pytest", response.get("timing"), lane=index + 1 if len(responses) > 1 else 0)
+        failed = [response for response in responses if not response.get("ok")]
+        if failed:
+            error_msg = failed[0].get("error", "unknown error")
+            logger.error(f"[{job.job_type.value}:{job.id}] Pytest failed: {error_msg}")
+            job.status = JobStatus.FAILED
+            job.error = f"Pytest failed: {error_msg}"
+            job.completed_at = time.time()
+            return
+
+        # Merge the shards; every shard collects the module, so collection
+        # errors are reported once
+        tests: List[Dict[str, Any]] = []
+        collection_errors: Dict[str, Dict[str, Any]] = {}
+        for response in responses:
+            tests.extend(response["tests"])
+            for error in response["collection_errors"]:
+                collection_errors.setdefault(error["nodeid"], error)
+
+        impact = None
+        if file_id:
+            with job.trace.span("apply_impact"):
+                tests, impact = self._apply_impact(job, file_id, tests, reused, previous, bool(collection_errors))
+
+        job.result = {
+            "status": "success",
+            "summary": summarize_tests(tests),
+            "tests": tests,
+            "collection_errors": list(collection_errors.values()),
+            "shards": len(shards)
+        }
+        if impact is not None:
+            job.result["impact"] = impact
+        summary = job.result["summary"]
+        logger.info(
+            f"[{job.job_type.value}:{job.id}] Ran {summary['total']} tests: "
+            f"{summary['passed']} passed, {summary['failed']} failed, {summary['errors']} errors"
+        )
+        job.status = JobStatus.COMPLETED
+        job.completed_at = time.time()
+
+    def _apply_impact(
+        self,
+        job: Job,
+        file_id: str,
+        tests: List[Dict[str, Any]],
+        reused: Dict[str, Dict[str, Any]],
+        previous: Optional[ImpactMap],
+        incomplete: bool
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
         """
-        Process the test job.
+        Merge reused results into a traced run and remember the new impact map.
 
         Args:
-            job: A job object containing code and metadata, should provide the attribute code_file_path
+            job: The job whose code was tested
+            file_id: Client-supplied identity of the file
+            tests: Results of the tests that ran, with executed ``lines``
+            reused: Previous results of the deselected tests
+            previous: Impact map the reused results came from
+            incomplete: Whether collection failed, so not every test ran
 
         Returns:
-            A dictionary of test results
+            All test results, in source order, and the impact summary
         """
-        file_path = job.code_file_path  # Assume the job object provides the code file path
-        logger.info(f"Processing test job for file: {file_path}")
-        return self.run_pytest_sync(file_path)
+        lines = {test["nodeid"]: test.pop("lines", []) for test in tests}
+        functions = executed_functions(job.document, lines)
+        ran = set(lines)
+        for nodeid, test in reused.items():
+            if nodeid not in ran:
+                tests.append({**test, "reused": True})
+                functions[nodeid] = previous.functions[nodeid]
+
+        names = find_test_names(job.document)
+
+        def source_order(test: Dict[str, Any]) -> int:
+            name = test["name"].split("::")[0].split("[")[0]
+            return names.index(name) if name in names else len(names)
+
+        tests.sort(key=source_order)
+
+        if incomplete:
+            # Results of tests that did not run cannot be reused later
+            self.impact_maps.discard(file_id)
+        else:
+            stored = {test["nodeid"]: {k: v for k, v in test.items() if k != "reused"} for test in tests}
+            self.impact_maps.put(file_id, ImpactMap(job.document, stored, functions))
 
+        impact = {
+            "file_id": file_id,
+            "mode": "incremental" if previous is not None else "full",
+            "rerun": len(ran),
+            "reused": len(tests) - len(ran)
+        }
+        return tests, impact
 
     def run_pytest_sync(self, file_path: str, timeout: int = 30) -> dict:
         """
@@ -2,28 +2,192 @@
 MCP server implementation for Quack.
 """
 
+import asyncio
+import atexit
+import hashlib
+import json
 import logging
-from typing import Dict, Any, Optional, List
+import os
+import signal
+import tempfile
+from typing import Dict, Any, Optional, List, Set
 from contextlib import asynccontextmanager
 from collections.abc import AsyncIterator
 
 from mcp.server.fastmcp import FastMCP, Context
+from mcp.server.session import ServerSession
+from pydantic import AnyUrl
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 
+from .jobs.base import Job, ProjectJob
+from .jobs.broker import JobBroker
+from .jobs.documents import StaleVersionError
 from .jobs.enums import JobType, JobStatus
 from .jobs.manager import JobManager
+from .jobs.metrics import Metrics
+from .jobs.profiles import DEFAULT_PROFILE, PROFILES, get_profile
 from .jobs.factory import JobFactory
+from .jobs.scheduler import JobScheduler, QueueFullError
+from .jobs.store import SqliteJobStore
+from .jobs.tracing import chrome_trace
 from .processors.lint import LintJobProcessor
 from .processors.static_analysis import StaticAnalysisJobProcessor
+from .processors.project import ProjectJobProcessor, files_from_tarball, validate_files
+from .processors.composite import AnalyzeAllJobProcessor
+from .processors.findings import TOOL_NAMES
+from .processors.precheck import run_precheck
 from .processors.test_job_processor import TestJobProcessor
+from .watcher import DirectoryWatcher
+from .workers.resources import ResourceLimits
 
 logger = logging.getLogger("quack")
 
+# Job database of processes that share a job queue without naming one with --db
+SHARED_JOB_DB_PATH = os.path.join(tempfile.gettempdir(), "quack", "jobs.db")
+
+
+def default_job_db_path(directory: Optional[str] = None) -> str:
+    """
+    Get the job database of a server that does not share its job queue
+
+    Servers started in the same directory keep their jobs across restarts
+    in one database; servers started elsewhere on the host do not see them.
+
+    Args:
+        directory: Directory the server was started in (default: the cwd)
+
+    Returns:
+        Path of the database below the temporary directory
+    """
+    directory = os.path.abspath(directory or os.getcwd())
+    digest = hashlib.sha256(directory.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), "quack", f"jobs-{digest}.db")
+
+
+# Job database of this process, kept across restarts (set by ``quack.py --db``
+# and to SHARED_JOB_DB_PATH by ``--shared``, ``--workers`` and the ``worker`` command)
+JOB_DB_PATH = default_job_db_path()
+
+# Finished jobs are purged from the job database after this many seconds
+JOB_TTL = 24 * 60 * 60
+
+# Upper bound for the wait_for_jobs timeout
+MAX_WAIT_TIMEOUT = 300.0
+
+# URI template of job resources
+JOB_RESOURCE_URI = "quack://jobs/{job_id}"
+
+# Lint jobs arriving within this many seconds are linted in one pylint run
+LINT_BATCH_WINDOW = 0.02
+
+# Maximum number of lint jobs per pylint run
+LINT_BATCH_SIZE = 16
+
+# Metrics shared by every job manager of this process
+METRICS = Metrics()
+
+# Directories watched from startup (set by ``quack.py --watch``)
+WATCH_PATHS: List[str] = []
+
+# Share the job queue of the job database with other Quack processes (set by
+# ``quack.py --shared``, ``--workers`` and the ``worker`` command)
+SHARE_QUEUE = False
+
+# CPU seconds and address space each job's processes may use; a job over
+# its CPU time is killed and allocations beyond its memory limit fail
+RESOURCE_LIMITS: Dict[JobType, ResourceLimits] = {
+    JobType.LINT: ResourceLimits(cpu_time=60, memory_mb=1024),
+    JobType.STATIC_ANALYSIS: ResourceLimits(cpu_time=60, memory_mb=2048),
+    JobType.TEST: ResourceLimits(cpu_time=60, memory_mb=1024),
+}
+
+
+# Job manager and watchers shared by the sessions of this process: the SSE
+# transport runs the lifespan once per connection
+_process_state: Optional[Dict[str, Any]] = None
+_process_sessions = 0
+
+
+def _open_process_state() -> Dict[str, Any]:
+    """
+    Create the job manager and watchers of this process
+    
+    Returns:
+        Dictionary with the job manager, its broker, the watchers and the
+        subscriptions of every session
+    """
+    # Let enough lint jobs run at once to fill a batch on every worker
+    lint_processor = JobFactory.get_processor(JobType.LINT)
+    scheduler = JobScheduler(concurrency={JobType.LINT: lint_processor.pool.size * LINT_BATCH_SIZE})
+    job_manager = JobManager(
+        scheduler=scheduler, store=SqliteJobStore(JOB_DB_PATH), job_ttl=JOB_TTL, metrics=METRICS
+    )
+    broker = JobBroker(job_manager) if SHARE_QUEUE else None
+    job_manager.resume_interrupted_jobs()
+    if broker is not None:
+        broker.start()
+    logger.info(
+        f"[Server] Job manager initialized (job store: {JOB_DB_PATH}"
+        f"{', shared queue' if broker is not None else ''})"
+    )
+    
+    # Notify sessions subscribed to a job resource when the job finishes
+    subscriptions: List[Dict[str, Set[ServerSession]]] = []  # resource URI -> sessions, per session
+    notifications: Set[asyncio.Task] = set()
+    
+    def notify_subscribers(job: Job) -> None:
+        uri = JOB_RESOURCE_URI.format(job_id=job.id)
+        for session_subscriptions in subscriptions:
+            for session in session_subscriptions.pop(uri, set()):
+                task = asyncio.create_task(session.send_resource_updated(AnyUrl(uri)))
+                notifications.add(task)
+                task.add_done_callback(notifications.discard)
+    
+    job_manager.add_completion_listener(notify_subscribers)
+    
+    # Re-analyse watched directories as files change
+    watchers: Dict[str, DirectoryWatcher] = {}  # root -> watcher
+    for path in WATCH_PATHS:
+        watcher = DirectoryWatcher(path, job_manager)
+        watcher.start()
+        watchers[watcher.root] = watcher
+    
+    return {"job_manager": job_manager, "broker": broker, "subscriptions": subscriptions, "watchers": watchers}
+
+
+async def _close_process_state(state: Dict[str, Any]) -> None:
+    """
+    Stop the job manager and watchers of this process
+    
+    Args:
+        state: Dictionary returned by ``_open_process_state``
+    """
+    logger.info("[Server] Shutting down")
+    for watcher in state["watchers"].values():
+        watcher.close()
+    if state["broker"] is not None:
+        await state["broker"].close()
+    job_manager = state["job_manager"]
+    await job_manager.close()
+    job_manager.documents.close()
+    job_manager.store.close()
+
+
+def _close_processors(processors: List[Any]) -> None:
+    # Worker pools are shared by every session, so they are stopped at exit
+    for processor in processors:
+        processor.close()
+
 
 # Lifespan context manager for initializing the job manager
 @asynccontextmanager
 async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
     """
-    Manage server startup and shutdown lifecycle.
+    Manage the lifecycle of one session.
+    
+    The first session of the process starts the job manager and the last
+    one to end stops it; processors live until the process exits.
     
     Args:
         server: The FastMCP server instance
@@ -31,15 +195,99 @@ async def server_lifespan(server: FastMCP) -> AsyncIterator[Dict[str, Any]]:
     Yields:
         Dictionary with initialized resources
     """
-    # Initialize resources on startup
-    job_manager = JobManager()
-    logger.info("[Server] Job manager initialized")
-    
+    global _process_state, _process_sessions
+    if _process_state is None:
+        _process_state = _open_process_state()
+    state = _process_state
+    _process_sessions += 1
+    # Subscriptions end with the session that made them
+    subscriptions: Dict[str, Set[ServerSession]] = {}  # resource URI -> sessions
+    state["subscriptions"].append(subscriptions)
     try:
-        yield {"job_manager": job_manager}
+        yield {
+            "job_manager": state["job_manager"],
+            "subscriptions": subscriptions,
+            "watchers": state["watchers"]
+        }
     finally:
-        # Clean up on shutdown (if needed)
-        logger.info("[Server] Shutting down")
+        state["subscriptions"].remove(subscriptions)
+        _process_sessions -= 1
+        if _process_sessions == 0:
+            _process_state = None
+            await _close_process_state(state)
+
+
+def job_response(job_manager: JobManager, job: Job) -> Dict[str, Any]:
+    """
+    Build the client-facing description of a job
+    
+    Args:
+        job_manager: The job manager owning the job
+        job: The job to describe
+        
+    Returns:
+        Dictionary with job status and results if available
+    """
+    # Return appropriate response based on job status
+    if job.status == JobStatus.COMPLETED:
+        return {
+            "status": "completed",
+            "job_type": job.job_type.value,
+            "profile": job.options.get("profile", DEFAULT_PROFILE),
+            "results": job.result,
+            "queue_wait_time": job.queue_wait_time,
+            "execution_time": job.execution_time,
+            "cache_hit": job.cache_hit,
+            "usage": job.usage.to_dict() if job.usage is not None else None
+        }
+    elif job.status.is_terminal():
+        # Failed, cancelled or timed out
+        response = {
+            "status": job.status.value,
+            "job_type": job.job_type.value,
+            "error": job.error,
+            "queue_wait_time": job.queue_wait_time,
+            "execution_time": job.execution_time,
+            "usage": job.usage.to_dict() if job.usage is not None else None
+        }
+        if job.quick_result is not None:
+            response["quick_result"] = job.quick_result
+        return response
+    else:
+        # Still in progress
+        response = {
+            "status": job.status.value,
+            "job_type": job.job_type.value,
+            "message": f"Job is {job.status.value}. Please check again later."
+        }
+        queue_position = job_manager.queue_position(job.id)
+        if queue_position is not None:
+            response["queue_position"] = queue_position
+        if job.quick_result is not None:
+            response["quick_result"] = job.quick_result
+        return response
+
+
+def _advertise_subscriptions(mcp: FastMCP) -> None:
+    """
+    Advertise resource subscription support to clients
+    
+    The SDK always reports ``subscribe=False``; flip it since Quack
+    registers subscribe handlers for job resources.
+    
+    Args:
+        mcp: The FastMCP server instance
+    """
+    lowlevel = mcp._mcp_server
+    get_capabilities = lowlevel.get_capabilities
+    
+    def get_capabilities_with_subscribe(*args, **kwargs):
+        capabilities = get_capabilities(*args, **kwargs)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True
+        return capabilities
+    
+    lowlevel.get_capabilities = get_capabilities_with_subscribe
 
 
 def create_server() -> FastMCP:
@@ -53,22 +301,72 @@ def create_server() -> FastMCP:
     mcp = FastMCP("Quack", lifespan=server_lifespan)
     
     # Register processors
-    JobFactory.register_processor(JobType.LINT, LintJobProcessor())
-    JobFactory.register_processor(JobType.STATIC_ANALYSIS, StaticAnalysisJobProcessor())
-    JobFactory.register_processor(JobType.TEST, TestJobProcessor())
+    lint_processor = LintJobProcessor(
+        batch_window=LINT_BATCH_WINDOW,
+        max_batch_size=LINT_BATCH_SIZE,
+        limits=RESOURCE_LIMITS.get(JobType.LINT)
+    )
+    static_processor = StaticAnalysisJobProcessor(limits=RESOURCE_LIMITS.get(JobType.STATIC_ANALYSIS))
+    JobFactory.register_processor(JobType.LINT, lint_processor)
+    JobFactory.register_processor(JobType.STATIC_ANALYSIS, static_processor)
+    test_processor = TestJobProcessor(limits=RESOURCE_LIMITS.get(JobType.TEST))
+    JobFactory.register_processor(JobType.TEST, test_processor)
+    JobFactory.register_processor(JobType.PROJECT, ProjectJobProcessor(lint_processor, static_processor))
+    JobFactory.register_processor(JobType.ANALYZE_ALL, AnalyzeAllJobProcessor({
+        JobType.LINT: lint_processor,
+        JobType.STATIC_ANALYSIS: static_processor,
+        JobType.TEST: test_processor
+    }))
+    METRICS.track_pool(lint_processor.pool)
+    for pool in lint_processor.profile_pools.values():
+        METRICS.track_pool(pool)
+    METRICS.track_pool(test_processor.pool)
+    atexit.register(_close_processors, list(JobFactory.processors.values()))
+    
+    # Prometheus scrape endpoint, served by the SSE app
+    @mcp.custom_route("/metrics", methods=["GET"])
+    async def metrics_endpoint(request: Request) -> PlainTextResponse:
+        return PlainTextResponse(METRICS.render_prometheus(), media_type="text/plain; version=0.0.4")
 
     # Generic job submission tool
     @mcp.tool()
-    async def submit_code(job_type: str, code: str, ctx: Context) -> Dict[str, Any]:
+    async def submit_code(
+        job_type: str,
+        code: str,
+        ctx: Context,
+        priority: int = 0,
+        quick_check: bool = False,
+        file_id: Optional[str] = None,
+        document_id: Optional[str] = None,
+        version: Optional[int] = None,
+        profile: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Submit Python code for analysis
         
+        Code that does not compile fails immediately, without being queued.
+        
         Args:
-            job_type: Type of analysis to perform ("lint" or "static_analysis")
+            job_type: Type of analysis to perform ("lint", "static_analysis", "test" or "analyze_all")
             code: Python code content to analyze
+            priority: Scheduling priority; higher values run first (default: 0)
+            quick_check: Include the result of a fast syntax and pyflakes check
+                in the response, while the full analysis is queued (default: False)
+            file_id: Stable identity of the submitted file (e.g. its path) for
+                test and analyze_all jobs; on resubmission only tests affected
+                by the changes are rerun and previous results are reused
+            document_id: Identity of a document edited over time; successive
+                versions are analysed incrementally, reusing the findings of
+                unchanged top-level functions
+            version: Version of the document, increasing with every edit
+                (default: the next version)
+            profile: Analysis profile: "fast" (errors only, for quick
+                feedback), "standard" (default) or "thorough"; see list_profiles
             
         Returns:
-            Dictionary with job ID for checking results later
+            Dictionary with job ID (and document version) for checking results
+            later, or a rejection with a retry_after hint (in seconds) when the
+            queue is full
         """
         job_manager = ctx.request_context.lifespan_context["job_manager"]
         
@@ -82,73 +380,189 @@ def create_server() -> FastMCP:
                 "message": str(e)
             }
         
+        # Validate profile
+        try:
+            profile_name = get_profile(profile).name
+        except ValueError as e:
+            logger.warning(f"[Server] Invalid profile: {profile}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+        
         # Submit job
-        job = job_manager.submit_job(job_type_enum, code)
+        options: Dict[str, Any] = {"profile": profile_name}
+        if file_id:
+            options["file_id"] = file_id
+        if document_id:
+            options["document_id"] = document_id
+            if version is not None:
+                options["version"] = version
+        try:
+            job = job_manager.submit_job(job_type_enum, code, priority=priority, options=options)
+        except QueueFullError as e:
+            logger.warning(f"[Server] Rejected {job_type} job: queue is full")
+            return {
+                "status": "rejected",
+                "message": str(e),
+                "retry_after": e.retry_after
+            }
+        except StaleVersionError as e:
+            logger.warning(f"[Server] Rejected {job_type} job: {str(e)}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
         
         logger.info(f"[{job.job_type.value}:{job.id}] Submitted new job ({len(code)} bytes)")
         
-        return {
+        if job.status == JobStatus.FAILED:
+            return {
+                "status": "failed",
+                "job_id": job.id,
+                "job_type": job.job_type.value,
+                "error": job.error,
+                "quick_result": job.quick_result
+            }
+        
+        response = {
             "status": "accepted",
             "job_id": job.id,
             "job_type": job.job_type.value,
+            "profile": profile_name,
             "message": f"Code submitted for {job_type}. Use get_job_results to check status."
         }
+        if job.session is not None:
+            response["version"] = job.options["version"]
+        if quick_check and job.quick_result is not None:
+            if job.quick_result.get("pyflakes") is False:
+                # Submission only compiled the code; pyflakes is too slow for the event loop
+                job.quick_result = await asyncio.to_thread(run_precheck, job.document)
+            response["quick_result"] = job.quick_result
+        return response
     
     # Convenience tools for specific types
     @mcp.tool()
-    async def submit_code_for_linting(code: str, ctx: Context) -> Dict[str, Any]:
+    async def submit_code_for_linting(code: str, ctx: Context, profile: Optional[str] = None) -> Dict[str, Any]:
         """
         Submit Python code for linting analysis
         
         Args:
             code: Python code content to analyze
+            profile: Analysis profile ("fast", "standard" or "thorough")
             
         Returns:
             Dictionary with job ID for checking results later
         """
         # Reuse generic submit_code tool with "lint" type
-        return await submit_code("lint", code, ctx)
+        return await submit_code("lint", code, ctx, profile=profile)
     
     @mcp.tool()
-    async def submit_code_for_static_analysis(code: str, ctx: Context) -> Dict[str, Any]:
+    async def submit_code_for_static_analysis(
+        code: str, ctx: Context, profile: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Submit Python code for static type analysis
         
         Args:
             code: Python code content to analyze
+            profile: Analysis profile ("fast", "standard" or "thorough")
             
         Returns:
             Dictionary with job ID for checking results later
         """
         # Reuse generic submit_code tool with "static_analysis" type
-        return await submit_code("static_analysis", code, ctx)
+        return await submit_code("static_analysis", code, ctx, profile=profile)
     
     @mcp.tool()
-    async def submit_code_for_testing(code: str, ctx: Context) -> Dict[str, Any]:
+    async def submit_code_for_testing(code: str, ctx: Context, file_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Submit Python code for testing
         
         Args:
             code: Python code content to analyze
+            file_id: Stable identity of the submitted file (e.g. its path); on
+                resubmission only tests affected by the changes are rerun
             
         Returns:
             Dictionary with job ID for checking results later
         """
         # Reuse generic submit_code tool with "test" type
-        return await submit_code("test", code, ctx)
+        return await submit_code("test", code, ctx, file_id=file_id)
+    
+    @mcp.tool()
+    async def submit_code_for_all_analyses(
+        code: str, ctx: Context, priority: int = 0, profile: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Submit Python code for linting, static type analysis and testing in one job
+        
+        The analyses run concurrently on the same file and their results are
+        returned together, each with its own execution time.
+        
+        Args:
+            code: Python code content to analyze
+            priority: Scheduling priority; higher values run first (default: 0)
+            profile: Analysis profile for the linting and type checking
+                ("fast", "standard" or "thorough")
+            
+        Returns:
+            Dictionary with job ID for checking results later
+        """
+        # Reuse generic submit_code tool with "analyze_all" type
+        return await submit_code("analyze_all", code, ctx, priority=priority, profile=profile)
+    
+    @mcp.tool()
+    async def submit_project(
+        ctx: Context,
+        files: Optional[Dict[str, str]] = None,
+        tarball: Optional[str] = None,
+        priority: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Submit a multi-file Python project for linting and static type analysis
+        
+        All files are analysed together, so imports between them resolve.
+        Results are grouped per file.
+        
+        Args:
+            files: Mapping of relative paths (e.g. "pkg/util.py") to file contents
+            tarball: Base64-encoded tar archive of the project, instead of files
+            priority: Scheduling priority; higher values run first (default: 0)
+            
+        Returns:
+            Dictionary with job ID for checking results later
+        """
+        try:
+            if (files is None) == (tarball is None):
+                raise ValueError("Provide exactly one of files or tarball")
+            project_files = validate_files(files) if files is not None else files_from_tarball(tarball)
+        except ValueError as e:
+            logger.warning(f"[Server] Invalid project: {str(e)}")
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+        
+        return await submit_code("project", ProjectJob.encode_files(project_files), ctx, priority=priority)
 
 
     # Get job results tool
     @mcp.tool()
-    async def get_job_results(job_id: str, ctx: Context) -> Dict[str, Any]:
+    async def get_job_results(job_id: str, ctx: Context, trace: bool = False) -> Dict[str, Any]:
         """
         Get the results of a previously submitted job
         
         Args:
             job_id: ID of the job
+            trace: Include the timings of the job's stages (queueing, file
+                writes, waiting for and starting workers, running the tool,
+                parsing its output)
             
         Returns:
-            Dictionary with job status and results if available
+            Dictionary with job status and results if available, and the
+            job's ``trace`` spans if requested; span offsets are seconds
+            since submission
         """
         job_manager = ctx.request_context.lifespan_context["job_manager"]
         job = job_manager.get_job(job_id)
@@ -161,42 +575,317 @@ def create_server() -> FastMCP:
             }
         
         logger.info(f"[{job.job_type.value}:{job_id}] Status check: {job.status.value}")
+        response = job_response(job_manager, job)
+        if trace:
+            response["trace"] = job.trace.to_list(origin=job.submitted_at)
+        return response
+
+    # Trace export tool
+    @mcp.tool()
+    async def export_job_traces(job_ids: List[str], ctx: Context) -> Dict[str, Any]:
+        """
+        Export the stage timings of jobs as Chrome trace-event JSON
         
-        # Return appropriate response based on job status
-        if job.status == JobStatus.COMPLETED:
+        Save the result to a file and open it in chrome://tracing or
+        https://ui.perfetto.dev to inspect where the time of each job went.
+        
+        Args:
+            job_ids: IDs of the jobs to export
+            
+        Returns:
+            Chrome trace with one process per job, plus the IDs of unknown
+            jobs under ``missing``
+        """
+        job_manager = ctx.request_context.lifespan_context["job_manager"]
+        jobs = []
+        missing = []
+        for job_id in job_ids:
+            job = job_manager.get_job(job_id)
+            if job is None:
+                missing.append(job_id)
+            else:
+                jobs.append(job)
+        
+        trace = chrome_trace(jobs)
+        if missing:
+            trace["missing"] = missing
+        return trace
+
+    # Cancel job tool
+    @mcp.tool()
+    async def cancel_job(job_id: str, ctx: Context) -> Dict[str, Any]:
+        """
+        Cancel a queued or running job, killing any processes it started
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            Dictionary with the job's status after cancellation; jobs that had
+            already finished are returned unchanged
+        """
+        job_manager = ctx.request_context.lifespan_context["job_manager"]
+        job = await job_manager.cancel_job(job_id)
+
+        if not job:
+            logger.warning(f"[Job] Cancel requested for unknown job: {job_id}")
             return {
-                "status": "completed",
-                "job_type": job.job_type.value,
-                "results": job.result,
-                "execution_time": job.execution_time
+                "status": "error",
+                "message": f"No job found with ID: {job_id}"
             }
-        elif job.status == JobStatus.FAILED:
+
+        return job_response(job_manager, job)
+
+    # Long-poll tool
+    @mcp.tool()
+    async def wait_for_jobs(
+        job_ids: List[str],
+        ctx: Context,
+        timeout: float = 30.0,
+        wait_for_all: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Wait until any (or all) of the given jobs have finished, then return their results
+        
+        Args:
+            job_ids: IDs of the jobs to wait for
+            timeout: Maximum seconds to wait (default: 30, at most 300)
+            wait_for_all: Wait for every job instead of the first one to finish
+            
+        Returns:
+            Dictionary with the state of every job, keyed by job ID
+        """
+        job_manager = ctx.request_context.lifespan_context["job_manager"]
+        timeout = max(0.0, min(timeout, MAX_WAIT_TIMEOUT))
+        
+        return_when = asyncio.ALL_COMPLETED if wait_for_all else asyncio.FIRST_COMPLETED
+        jobs = await job_manager.wait_for_jobs(job_ids, timeout=timeout, return_when=return_when)
+        
+        results = {job.id: job_response(job_manager, job) for job in jobs}
+        for job_id in job_ids:
+            if job_id not in results:
+                results[job_id] = {
+                    "status": "error",
+                    "message": f"No job found with ID: {job_id}"
+                }
+        
+        finished = [job.id for job in jobs if job.status.is_terminal()]
+        done = len(finished) == len(jobs) if wait_for_all else bool(finished)
+        return {
+            "status": "completed" if done else "timeout",
+            "finished": finished,
+            "jobs": results
+        }
+    
+    # Job results as subscribable resources
+    @mcp.resource(JOB_RESOURCE_URI, mime_type="application/json")
+    async def job_resource(job_id: str, ctx: Context) -> str:
+        """
+        Status and results of a job. Subscribe to be notified when the job finishes.
+        """
+        job_manager = ctx.request_context.lifespan_context["job_manager"]
+        job = job_manager.get_job(job_id)
+        if not job:
+            return json.dumps({
+                "status": "error",
+                "message": f"No job found with ID: {job_id}"
+            })
+        return json.dumps(job_response(job_manager, job))
+    
+    @mcp._mcp_server.subscribe_resource()
+    async def subscribe_job(uri: AnyUrl) -> None:
+        request_context = mcp._mcp_server.request_context
+        job_id = str(uri).rsplit("/", 1)[-1]
+        job_manager = request_context.lifespan_context["job_manager"]
+        job = job_manager.get_job(job_id)
+        if job is None:
+            raise ValueError(f"No job found with ID: {job_id}")
+        
+        # The job may already be finished
+        if job.status.is_terminal():
+            await request_context.session.send_resource_updated(uri)
+            return
+        subscriptions = request_context.lifespan_context["subscriptions"]
+        subscriptions.setdefault(str(uri), set()).add(request_context.session)
+        logger.debug(f"[Server] Subscribed to {uri}")
+        job_manager.watch_job(job)
+    
+    @mcp._mcp_server.unsubscribe_resource()
+    async def unsubscribe_job(uri: AnyUrl) -> None:
+        request_context = mcp._mcp_server.request_context
+        sessions = request_context.lifespan_context["subscriptions"].get(str(uri))
+        if sessions:
+            sessions.discard(request_context.session)
+    
+    _advertise_subscriptions(mcp)
+    
+    # Watch mode tools
+    @mcp.tool()
+    async def watch_directory(path: str, ctx: Context, job_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Watch a directory and re-analyse its Python files whenever they change on disk
+        
+        Every file is analysed once, then only files whose content changed
+        are re-analysed, after a burst of writes has settled. Read the
+        results with get_file_findings.
+        
+        Args:
+            path: Directory to watch
+            job_types: Analyses to run ("lint", "static_analysis", "test";
+                default: lint and static analysis); tests only run on test modules
+            
+        Returns:
+            Dictionary with the watcher's state
+        """
+        watchers = ctx.request_context.lifespan_context["watchers"]
+        root = os.path.abspath(path)
+        if root in watchers:
+            return {"status": "watching", **watchers[root].summary()}
+        
+        try:
+            types = [JobType.from_string(job_type) for job_type in job_types or ["lint", "static_analysis"]]
+        except ValueError as e:
             return {
-                "status": "failed",
-                "job_type": job.job_type.value,
-                "error": job.error,
-                "execution_time": job.execution_time
+                "status": "error",
+                "message": str(e)
             }
-        else:
-            # Still in progress
+        invalid = [job_type.value for job_type in types if job_type not in TOOL_NAMES]
+        if invalid:
             return {
-                "status": job.status.value,
-                "job_type": job.job_type.value,
-                "message": f"Job is {job.status.value}. Please check again later."
+                "status": "error",
+                "message": f"Cannot watch with job types: {', '.join(invalid)}"
             }
+        
+        watcher = DirectoryWatcher(root, ctx.request_context.lifespan_context["job_manager"], types)
+        try:
+            watcher.start()
+        except ValueError as e:
+            return {
+                "status": "error",
+                "message": str(e)
+            }
+        watchers[watcher.root] = watcher
+        return {"status": "watching", **watcher.summary()}
+    
+    @mcp.tool()
+    async def unwatch_directory(path: str, ctx: Context) -> Dict[str, Any]:
+        """
+        Stop watching a directory and forget the findings of its files
+        
+        Args:
+            path: Directory passed to watch_directory
+            
+        Returns:
+            Dictionary with the status
+        """
+        watcher = ctx.request_context.lifespan_context["watchers"].pop(os.path.abspath(path), None)
+        if watcher is None:
+            return {
+                "status": "error",
+                "message": f"Not watching: {path}"
+            }
+        watcher.close()
+        return {"status": "stopped", "root": watcher.root}
+    
+    @mcp.tool()
+    async def get_file_findings(ctx: Context, path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the latest findings of files in watched directories, without waiting for analysis
+        
+        Args:
+            path: File to get the findings of, absolute or relative to its
+                watched directory; if omitted, every watched file is summarised
+            
+        Returns:
+            For a file: its revision, its status ("analyzing" or "up_to_date"),
+            its findings and the status of each analysis (marked ``stale``
+            while a newer revision is being analysed). Otherwise: the
+            watchers and a summary of every watched file
+        """
+        watchers = ctx.request_context.lifespan_context["watchers"]
+        if path is None:
+            return {
+                "watchers": [watcher.summary() for watcher in watchers.values()],
+                "files": [
+                    state.summary()
+                    for watcher in watchers.values()
+                    for state in sorted(watcher.files.values(), key=lambda state: state.path)
+                ]
+            }
+        
+        for watcher in watchers.values():
+            state = watcher.find(path)
+            if state is not None:
+                return {"root": watcher.root, **state.to_dict()}
+        return {
+            "status": "error",
+            "message": f"Not a watched file: {path}" if watchers else "No directory is being watched"
+        }
+    
+    # Profiles tool
+    @mcp.tool()
+    async def list_profiles(ctx: Context) -> Dict[str, Any]:
+        """
+        List the analysis profiles submissions can pick
+        
+        Returns:
+            Dictionary with each profile's checks, latency target and
+            concurrency limits
+        """
+        job_manager = ctx.request_context.lifespan_context["job_manager"]
+        return {
+            "profiles": [
+                {**profile.to_dict(), "limits": job_manager.scheduler_for(profile.name).get_stats()["limits"]}
+                for profile in PROFILES.values()
+            ]
+        }
+    
+    # Metrics tool
+    @mcp.tool()
+    async def get_metrics(ctx: Context, format: str = "json") -> Dict[str, Any]:
+        """
+        Get counters and latency histograms of the server's job activity
+        
+        Args:
+            ctx: Context object
+            format: "json" for structured metrics, or "prometheus" for the
+                Prometheus text format
+            
+        Returns:
+            Dictionary with submission rate, cache hit rate, per job type
+            queue wait, execution time and result size histograms, and
+            worker pool utilisation
+        """
+        if format == "prometheus":
+            return {"format": "prometheus", "text": METRICS.render_prometheus()}
+        if format != "json":
+            return {
+                "status": "error",
+                "message": f"Invalid metrics format: {format}"
+            }
+        return METRICS.to_dict()
     
     # List jobs tool
     @mcp.tool()
-    async def list_jobs(ctx: Context, job_type: Optional[str] = None) -> Dict[str, Any]:
+    async def list_jobs(
+        ctx: Context,
+        job_type: Optional[str] = None,
+        status: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0
+    ) -> Dict[str, Any]:
         """
-        List all jobs and their statuses
+        List jobs and their statuses, newest first
         
         Args:
             ctx: Context object
             job_type: Optional filter for job type
+            status: Optional filter for job status ("pending", "running", "completed", "failed", "cancelled", "timed_out")
+            limit: Maximum number of jobs to return (default: 50)
+            offset: Number of matching jobs to skip (default: 0)
             
         Returns:
-            Dictionary with list of jobs and their statuses
+            Dictionary with a page of jobs, the number of matching jobs, and job statistics
         """
         job_manager = ctx.request_context.lifespan_context["job_manager"]
         
@@ -211,9 +900,40 @@ def create_server() -> FastMCP:
                     "message": f"Invalid job type: {job_type}"
                 }
         
+        # Convert string status to enum if provided
+        status_enum = None
+        if status:
+            try:
+                status_enum = JobStatus(status.lower())
+            except ValueError:
+                return {
+                    "status": "error",
+                    "message": f"Invalid job status: {status}"
+                }
+        
         return {
-            "jobs": job_manager.list_jobs(job_type_enum),
+            "jobs": job_manager.list_jobs(job_type_enum, status_enum, limit=limit, offset=offset),
+            "total": job_manager.count_jobs(job_type_enum, status_enum),
+            "limit": limit,
+            "offset": offset,
             "stats": job_manager.get_stats()
         }
     
     return mcp
+
+
+async def run_worker(server: FastMCP) -> None:
+    """
+    Run jobs from the shared queue without serving MCP clients, until
+    SIGINT or SIGTERM
+    
+    Args:
+        server: The FastMCP server instance whose processors run the jobs
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, stop.set)
+    async with server_lifespan(server):
+        logger.info("[Server] Running jobs from the shared queue")
+        await stop.wait()
@@ -0,0 +1,95 @@
+"""
+Python files of a directory tree on disk.
+
+Shared by the offline ``analyze`` command and watch mode, which analyse a
+working tree in place rather than submitted code.
+"""
+
+import os
+from typing import List, Optional
+
+# Directories never searched for Python files
+SKIPPED_DIRS = {"__pycache__", "node_modules", "venv", "env", "build", "dist", "site-packages"}
+
+
+def is_skipped_dir(parent: str, name: str) -> bool:
+    """
+    Check whether a directory is left out of analysis
+
+    Args:
+        parent: Directory containing it
+        name: Name of the directory
+
+    Returns:
+        True for hidden directories, virtual environments and build output
+    """
+    return (
+        name.startswith(".") or name in SKIPPED_DIRS
+        or os.path.exists(os.path.join(parent, name, "pyvenv.cfg"))
+    )
+
+
+def is_python_file(path: str) -> bool:
+    """
+    Check whether a path names a Python module
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        True for ``.py`` files
+    """
+    return path.endswith(".py")
+
+
+def is_test_file(path: str) -> bool:
+    """
+    Check whether a file is a pytest test module
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        True for ``test_*.py`` and ``*_test.py`` files
+    """
+    name = os.path.basename(path)
+    return is_python_file(name) and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def discover_files(root: str) -> List[str]:
+    """
+    Find the Python files under a directory
+
+    Hidden directories, virtual environments and build output are skipped.
+
+    Args:
+        root: Directory to search, or a single file
+
+    Returns:
+        Paths of the ``.py`` files, sorted, starting with ``root``
+    """
+    if os.path.isfile(root):
+        return [root]
+    found: List[str] = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if not is_skipped_dir(dirpath, name))
+        found.extend(os.path.join(dirpath, name) for name in sorted(filenames) if is_python_file(name))
+    return found
+
+
+def display_path(path: str, start: Optional[str] = None) -> str:
+    """
+    Format a path for output: relative to a directory if inside it
+
+    Args:
+        path: Path of a file
+        start: Directory to report the path relative to (default: the
+            working directory)
+
+    Returns:
+        The path with forward slashes
+    """
+    relative = os.path.relpath(os.path.abspath(path), start)
+    if relative == ".." or relative.startswith(".." + os.sep):
+        relative = os.path.abspath(path)
+    return relative.replace(os.sep, "/")
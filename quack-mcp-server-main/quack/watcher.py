@@ -0,0 +1,583 @@
+"""
+Watch mode: continuous re-analysis of a working tree.
+
+A ``DirectoryWatcher`` monitors a directory for changes to Python files,
+debounces bursts of writes (editors often save a file in several steps,
+and agents edit several files in a row), and resubmits only the changed
+modules to the job manager. Each file is analysed as a document session
+keyed by its path, so the warm processors re-analyse incrementally. The
+latest findings of every file are kept in memory.
+
+Changes are observed with Linux inotify where available, falling back to
+polling file modification times elsewhere or when inotify cannot be used.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import hashlib
+import logging
+import os
+import struct
+import sys
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .jobs.base import Job
+from .jobs.enums import JobType
+from .jobs.manager import JobManager
+from .jobs.scheduler import QueueFullError
+from .processors.findings import TOOL_NAMES, job_records
+from .tree import discover_files, display_path, is_python_file, is_skipped_dir, is_test_file
+
+logger = logging.getLogger("quack")
+
+# Analyses run on changed files by default
+DEFAULT_WATCH_TYPES = (JobType.LINT, JobType.STATIC_ANALYSIS)
+
+# Seconds without further changes before a burst of changes is analysed
+DEFAULT_DEBOUNCE = 0.2
+
+# Seconds after the first change of a burst by which it is analysed, even if changes continue
+DEFAULT_MAX_DELAY = 2.0
+
+# Seconds between scans of the polling observer
+DEFAULT_POLL_INTERVAL = 0.5
+
+# Jobs a watcher may have queued or running at once, leaving queue room for other clients
+DEFAULT_MAX_PENDING = 32
+
+# inotify event flags (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# struct inotify_event without its variable-length name
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+# Called with the paths that may have changed, or None if the whole tree must be rescanned
+ChangeCallback = Callable[[Optional[Set[str]]], None]
+
+
+def _load_inotify() -> Any:
+    """
+    Load the inotify functions of the C library
+
+    Returns:
+        The C library
+
+    Raises:
+        OSError: If inotify is not available on this platform
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except AttributeError:
+        raise OSError(errno.ENOSYS, "The C library does not provide inotify")
+    return libc
+
+
+class InotifyObserver:
+    """Reports changes under a directory from Linux inotify events"""
+
+    name = "inotify"
+
+    def __init__(self, root: str, on_change: ChangeCallback):
+        """
+        Open an inotify instance
+
+        Args:
+            root: Directory to watch, recursively
+            on_change: Called on the event loop with the paths that may have changed
+
+        Raises:
+            OSError: If inotify is not available
+        """
+        self.root = root
+        self.on_change = on_change
+        self._libc = _load_inotify()
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            code = ctypes.get_errno()
+            raise OSError(code, f"inotify_init1 failed: {os.strerror(code)}")
+        self._dirs: Dict[int, str] = {}  # watch descriptor -> directory
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self) -> None:
+        """
+        Watch every directory of the tree and start reading events
+
+        Raises:
+            OSError: If a directory cannot be watched, e.g. because the
+                limit of inotify watches is reached
+        """
+        try:
+            self._watch_tree(self.root)
+        except OSError:
+            self.close()
+            raise
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self.fd, self._read)
+
+    def _watch_tree(self, top: str) -> List[str]:
+        """
+        Watch a directory and its subdirectories
+
+        Args:
+            top: Directory to watch
+
+        Returns:
+            Python files found in the tree, which a directory moved into
+            the watched tree brings along without events of their own
+        """
+        files: List[str] = []
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [name for name in dirnames if not is_skipped_dir(dirpath, name)]
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                code = ctypes.get_errno()
+                raise OSError(code, f"Cannot watch {dirpath}: {os.strerror(code)}")
+            self._dirs[wd] = dirpath
+            files.extend(os.path.join(dirpath, name) for name in filenames if is_python_file(name))
+        return files
+
+    def _read(self) -> None:
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        changed: Set[str] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + _INOTIFY_EVENT.size:offset + _INOTIFY_EVENT.size + length].rstrip(b"\0"))
+            offset += _INOTIFY_EVENT.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                logger.warning(f"[Watch:{self.root}] inotify queue overflowed; rescanning")
+                self.on_change(None)
+                return
+            if mask & IN_IGNORED:
+                # The directory was removed
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if is_skipped_dir(directory, name):
+                    continue
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        changed.update(self._watch_tree(path))
+                    except OSError as e:
+                        logger.warning(f"[Watch:{self.root}] {str(e)}; changes below it are missed")
+                # A removed or moved-away directory takes its files with it
+                changed.add(path)
+            elif is_python_file(name):
+                changed.add(path)
+        if changed:
+            self.on_change(changed)
+
+    def close(self) -> None:
+        """Stop watching"""
+        if self.fd < 0:
+            return
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.remove_reader(self.fd)
+        os.close(self.fd)
+        self.fd = -1
+
+
+class PollingObserver:
+    """Reports changes under a directory by comparing modification times and sizes"""
+
+    name = "polling"
+
+    def __init__(self, root: str, on_change: ChangeCallback, interval: float = DEFAULT_POLL_INTERVAL):
+        """
+        Initialize the observer
+
+        Args:
+            root: Directory to watch, recursively
+            on_change: Called on the event loop with the paths that changed
+            interval: Seconds between scans
+        """
+        self.root = root
+        self.on_change = on_change
+        self.interval = interval
+        self._snapshot: Dict[str, Tuple[int, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        snapshot: Dict[str, Tuple[int, int]] = {}
+        for path in discover_files(self.root):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def start(self) -> None:
+        """Take the first snapshot and start polling"""
+        self._snapshot = self._scan()
+        self._task = asyncio.create_task(self._poll())
+
+    async def _poll(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            # Scanning a large tree takes a while; keep it off the event loop
+            snapshot = await loop.run_in_executor(None, self._scan)
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                self.on_change(changed)
+
+    def close(self) -> None:
+        """Stop polling"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+def create_observer(
+    root: str,
+    on_change: ChangeCallback,
+    use_inotify: bool = True,
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> Any:
+    """
+    Start the best available observer for a directory
+
+    Args:
+        root: Directory to watch
+        on_change: Called with the paths that may have changed
+        use_inotify: Try inotify before falling back to polling
+        poll_interval: Seconds between scans when polling
+
+    Returns:
+        A started InotifyObserver or PollingObserver
+    """
+    if use_inotify:
+        try:
+            observer = InotifyObserver(root, on_change)
+            observer.start()
+            return observer
+        except OSError as e:
+            logger.info(f"[Watch:{root}] inotify unavailable ({str(e)}); polling every {poll_interval:g}s")
+    observer = PollingObserver(root, on_change, poll_interval)
+    observer.start()
+    return observer
+
+
+class WatchedFile:
+    """Latest findings of one watched file"""
+
+    def __init__(self, path: str, display: str):
+        """
+        Initialize the state of a file that has not been analysed yet
+
+        Args:
+            path: Absolute path of the file
+            display: Path reported in findings, relative to the watched directory
+        """
+        self.path = path
+        self.display_path = display
+        self.content_hash: Optional[str] = None
+        self.revision = 0  # incremented whenever changed content is submitted
+        self.changed_at: Optional[float] = None
+        self.pending: Dict[JobType, str] = {}  # job type -> ID of the job analysing the latest revision
+        # job type -> (revision, finished job, its findings and failures)
+        self.analyses: Dict[JobType, Tuple[int, Job, List[Dict[str, Any]]]] = {}
+
+    def record(self, revision: int, job: Job) -> None:
+        """
+        Record a finished job, unless a newer revision was already recorded
+
+        Args:
+            revision: Revision of the file the job analysed
+            job: The finished job
+        """
+        if self.pending.get(job.job_type) == job.id:
+            del self.pending[job.job_type]
+        recorded = self.analyses.get(job.job_type)
+        if recorded is None or recorded[0] <= revision:
+            self.analyses[job.job_type] = (revision, job, job_records(job, self.display_path))
+
+    @property
+    def records(self) -> List[Dict[str, Any]]:
+        """Findings and failures of the latest analysis of each type"""
+        return [record for _, _, records in self.analyses.values() for record in records]
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarise the file's state
+
+        Returns:
+            Dictionary with the path, revision, status and finding counts by severity
+        """
+        counts: Dict[str, int] = {}
+        for record in self.records:
+            key = record["severity"] if record["kind"] == "finding" else "failed_analyses"
+            counts[key] = counts.get(key, 0) + 1
+        return {
+            "path": self.display_path,
+            "revision": self.revision,
+            "status": "analyzing" if self.pending else "up_to_date",
+            "counts": counts
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Describe the file's latest findings
+
+        Returns:
+            Dictionary with the summary, the findings and failures, and the
+            status of each analysis; analyses of an older revision than the
+            latest are marked ``stale``
+        """
+        records = self.records
+        return {
+            **self.summary(),
+            "changed_at": self.changed_at,
+            "pending": [TOOL_NAMES[job_type] for job_type in self.pending],
+            "analyses": {
+                TOOL_NAMES[job_type]: {
+                    "status": job.status.value,
+                    "revision": revision,
+                    "stale": revision < self.revision,
+                    "completed_at": job.completed_at,
+                    "job_id": job.id
+                }
+                for job_type, (revision, job, _) in self.analyses.items()
+            },
+            "findings": [record for record in records if record["kind"] == "finding"],
+            "failures": [record for record in records if record["kind"] == "failure"]
+        }
+
+
+class DirectoryWatcher:
+    """
+    Re-analyses the Python files of a directory as they change
+
+    Every file is analysed once when watching starts. After that, changes
+    are collected until no further change arrives for ``debounce`` seconds
+    (or ``max_delay`` seconds have passed since the first one), and then
+    only files whose content actually changed are resubmitted.
+    """
+
+    def __init__(
+        self,
+        root: str,
+        job_manager: JobManager,
+        job_types: Iterable[JobType] = DEFAULT_WATCH_TYPES,
+        debounce: float = DEFAULT_DEBOUNCE,
+        max_delay: float = DEFAULT_MAX_DELAY,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        use_inotify: bool = True,
+        poll_interval: float = DEFAULT_POLL_INTERVAL
+    ):
+        """
+        Initialize a watcher
+
+        Args:
+            root: Directory to watch
+            job_manager: Job manager to submit analyses to
+            job_types: Analyses to run; tests only run on test modules
+            debounce: Seconds without changes before a burst is analysed
+            max_delay: Maximum seconds between the first change of a burst and its analysis
+            max_pending: Maximum number of this watcher's jobs queued or running at once
+            use_inotify: Use inotify when available, rather than polling
+            poll_interval: Seconds between scans when polling
+        """
+        self.root = os.path.abspath(root)
+        self.job_manager = job_manager
+        self.job_types = tuple(job_types)
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.use_inotify = use_inotify
+        self.poll_interval = poll_interval
+        self.files: Dict[str, WatchedFile] = {}  # absolute path -> state
+        self.observer: Any = None
+        self.events = 0
+        self.batches = 0
+        self.submitted = 0
+        self.unchanged = 0
+        self._dirty: Set[str] = set()
+        self._first_change: Optional[float] = None
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(max_pending)
+        self._jobs: Dict[str, Tuple[WatchedFile, int]] = {}  # job ID -> (file, revision analysed)
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """
+        Start observing the directory and analyse every file in it
+
+        Raises:
+            ValueError: If the root is not a directory
+        """
+        if not os.path.isdir(self.root):
+            raise ValueError(f"Not a directory: {self.root}")
+        self.job_manager.add_completion_listener(self._job_finished)
+        self.observer = create_observer(self.root, self._changed, self.use_inotify, self.poll_interval)
+        self._changed(set(discover_files(self.root)))
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"[Watch:{self.root}] Watching with {self.observer.name}")
+
+    def close(self) -> None:
+        """Stop watching; results of jobs still running are discarded"""
+        if self.observer is not None:
+            self.observer.close()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._jobs.clear()
+
+    def _changed(self, paths: Optional[Set[str]]) -> None:
+        """Mark paths as changed; a directory stands for the known files below it"""
+        if paths is None:
+            paths = set(self.files) | set(discover_files(self.root))
+        for path in paths:
+            if is_python_file(path):
+                self._dirty.add(path)
+            else:
+                prefix = path + os.sep
+                self._dirty.update(known for known in self.files if known.startswith(prefix))
+        self.events += 1
+        if self._first_change is None:
+            self._first_change = time.monotonic()
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            # Wait for a quiet period, but not past the burst's maximum delay
+            while True:
+                self._wakeup.clear()
+                remaining = self._first_change + self.max_delay - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), min(self.debounce, remaining))
+                except asyncio.TimeoutError:
+                    break
+            self._wakeup.clear()
+            batch, self._dirty, self._first_change = self._dirty, set(), None
+            self.batches += 1
+            try:
+                await self._analyze(sorted(batch))
+            except Exception as e:
+                logger.error(f"[Watch:{self.root}] Failed to analyse changes: {str(e)}", exc_info=True)
+
+    async def _analyze(self, paths: List[str]) -> None:
+        """Submit the files whose content changed"""
+        for path in paths:
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                if self.files.pop(path, None) is not None:
+                    logger.debug(f"[Watch:{self.root}] {path} was removed")
+                continue
+            except OSError as e:
+                logger.warning(f"[Watch:{self.root}] Cannot read {path}: {str(e)}")
+                continue
+
+            state = self.files.get(path)
+            if state is None:
+                state = self.files[path] = WatchedFile(path, display_path(path, self.root))
+            content_hash = hashlib.sha256(data).hexdigest()
+            if content_hash == state.content_hash:
+                # Saved without changes, or changed and changed back
+                self.unchanged += 1
+                continue
+            try:
+                code = data.decode("utf-8")
+            except UnicodeDecodeError:
+                logger.warning(f"[Watch:{self.root}] {path} is not UTF-8; skipped")
+                continue
+            state.content_hash = content_hash
+            state.revision += 1
+            state.changed_at = time.time()
+            for job_type in self.job_types:
+                if job_type == JobType.TEST and not is_test_file(path):
+                    continue
+                await self._submit(state, job_type, code)
+
+    async def _submit(self, state: WatchedFile, job_type: JobType, code: str) -> None:
+        """Submit one analysis of a file, waiting while the watcher or the queue is at capacity"""
+        while True:
+            await self._slots.acquire()
+            try:
+                job = self.job_manager.submit_job(job_type, code, options={"document_id": state.path})
+                break
+            except QueueFullError as e:
+                self._slots.release()
+                await asyncio.sleep(min(e.retry_after, 1.0))
+        self.submitted += 1
+        state.pending[job_type] = job.id
+        self._jobs[job.id] = (state, state.revision)
+        if job.status.is_terminal():
+            # Served from the cache or failed its precheck without being queued
+            self._job_finished(job)
+
+    def _job_finished(self, job: Job) -> None:
+        watched = self._jobs.pop(job.id, None)
+        if watched is None:
+            return
+        self._slots.release()
+        state, revision = watched
+        # A file removed (and perhaps recreated) since does not take old results
+        if self.files.get(state.path) is state:
+            state.record(revision, job)
+
+    def find(self, path: str) -> Optional[WatchedFile]:
+        """
+        Look up a watched file
+
+        Args:
+            path: Absolute path, or path relative to the watched directory
+
+        Returns:
+            The file's state, or None if it is not a watched file
+        """
+        return self.files.get(os.path.normpath(os.path.join(self.root, path)))
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarise the watcher's activity
+
+        Returns:
+            Dictionary with the root, observer, number of files and of
+            files being analysed, and counters of events, debounced
+            batches, submitted jobs and saves skipped as unchanged
+        """
+        return {
+            "root": self.root,
+            "observer": self.observer.name if self.observer is not None else None,
+            "analyses": [TOOL_NAMES[job_type] for job_type in self.job_types],
+            "files": len(self.files),
+            "analyzing": sum(1 for state in self.files.values() if state.pending),
+            "events": self.events,
+            "batches": self.batches,
+            "jobs_submitted": self.submitted,
+            "unchanged_skipped": self.unchanged
+        }
@@ -0,0 +1,6 @@
+"""
+Long-lived worker processes for the Quack MCP server.
+
+This module contains the worker pool and the worker entry points that
+keep analysis tools preloaded between jobs.
+"""
@@ -0,0 +1,407 @@
+"""
+Pool of long-lived mypy daemons (dmypy).
+
+Each distinct set of mypy flags gets its own daemons. Every daemon keeps a
+persistent cache directory, so typeshed and the standard library are
+analysed once and reused across jobs and server restarts.
+"""
+
+import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import math
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .resources import ResourceLimits, reset_peak_rss
+
+logger = logging.getLogger("quack")
+
+# Persistent cache shared across server restarts
+DEFAULT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "quack", "mypy-cache")
+
+
+class DaemonError(Exception):
+    """Raised when a mypy daemon cannot be started or stops responding"""
+
+
+class DaemonTimeoutError(DaemonError):
+    """Raised when a check exceeds its timeout; the daemon has been killed"""
+
+
+def _process_usage(pid: int) -> Optional[Tuple[float, int]]:
+    """
+    Read the CPU time and peak RSS of a process that is not our child
+
+    Returns:
+        Tuple of (CPU seconds, peak RSS in kilobytes), or None where /proc
+        is not available
+    """
+    try:
+        with open(f"/proc/{pid}/stat", encoding="utf-8") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/status", encoding="utf-8") as f:
+            peak_rss_kb = next((int(line.split()[1]) for line in f if line.startswith("VmHWM:")), 0)
+    except (OSError, IndexError, ValueError):
+        return None
+    # utime and stime, the 14th and 15th fields, in clock ticks
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK"), peak_rss_kb
+
+
+class DmypyDaemon:
+    """A single dmypy daemon with its own status file and cache directory"""
+
+    def __init__(
+        self,
+        flags: Tuple[str, ...],
+        status_file: str,
+        cache_dir: str,
+        idle_timeout: int,
+        memory_mb: Optional[int] = None
+    ):
+        """
+        Initialize a daemon handle; the daemon itself is started lazily
+
+        Args:
+            flags: mypy command line flags for this daemon
+            status_file: Path of the dmypy status file
+            cache_dir: Persistent mypy cache directory
+            idle_timeout: Seconds of inactivity after which the daemon exits on its own
+            memory_mb: Address space limit of the daemon (None for no limit)
+        """
+        self.flags = flags
+        self.status_file = status_file
+        self.cache_dir = cache_dir
+        self.idle_timeout = idle_timeout
+        self.memory_mb = memory_mb
+        self.started = False
+        self.restarts = 0
+
+    def start(self) -> None:
+        """
+        Start the daemon process
+
+        Raises:
+            DaemonError: If the daemon fails to start
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        try:
+            result = subprocess.run(
+                [
+                    sys.executable, "-m", "mypy.dmypy", "--status-file", self.status_file,
+                    "start", "--timeout", str(self.idle_timeout),
+                    "--", *self.flags, "--cache-dir", self.cache_dir
+                ],
+                capture_output=True,
+                text=True,
+                timeout=60,
+                check=False,
+                # The daemon forks from this process and inherits the limit
+                preexec_fn=ResourceLimits(memory_mb=self.memory_mb).apply if self.memory_mb else None
+            )
+        except (OSError, subprocess.TimeoutExpired) as e:
+            raise DaemonError(f"Could not start dmypy: {str(e)}")
+        if result.returncode != 0:
+            raise DaemonError(f"Could not start dmypy: {result.stderr.strip() or result.stdout.strip()}")
+        self.started = True
+        logger.info(f"[dmypy] Started daemon ({self.status_file})")
+
+    def stop(self) -> None:
+        """Stop the daemon if it is running"""
+        if not self.started:
+            return
+        self.started = False
+        try:
+            from mypy.dmypy.client import request
+            request(self.status_file, "stop", timeout=5)
+        except Exception as e:
+            logger.debug(f"[dmypy] Failed to stop daemon cleanly: {str(e)}")
+        try:
+            os.unlink(self.status_file)
+        except OSError:
+            pass
+
+    def kill(self) -> None:
+        """
+        Kill the daemon and its process group
+
+        A daemon busy with a check does not answer a stop request, so it is
+        killed using the PID from its status file.
+        """
+        self.started = False
+        pid = self.pid()
+        if pid is None:
+            return
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+        try:
+            os.unlink(self.status_file)
+        except OSError:
+            pass
+        logger.info(f"[dmypy] Killed daemon {pid} ({self.status_file})")
+
+    def pid(self) -> Optional[int]:
+        """
+        Get the process ID of the daemon from its status file
+
+        Returns:
+            The PID, or None if the daemon is not running
+        """
+        try:
+            with open(self.status_file, encoding="utf-8") as f:
+                return int(json.load(f)["pid"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def check(self, paths: List[str], timeout: float) -> Dict[str, Any]:
+        """
+        Type-check files, restarting the daemon once if it has died
+
+        Args:
+            paths: Files to check
+            timeout: Seconds to wait for the daemon
+
+        Returns:
+            dmypy response with ``out``, ``err`` and ``status`` keys, and
+            the check's ``usage`` where it can be measured
+
+        Raises:
+            DaemonTimeoutError: If the check did not finish in time
+            DaemonError: If the daemon cannot produce a result
+        """
+        if not self.started:
+            self.start()
+        started_at = time.monotonic()
+        pid = self.pid()
+        if pid is not None:
+            # Report the peak of this check, not of the daemon's lifetime
+            reset_peak_rss(pid)
+        before = _process_usage(pid) if pid is not None else None
+        response = self._request_check(paths, timeout)
+        if "error" in response and time.monotonic() - started_at >= timeout:
+            # The daemon keeps checking after the client gives up
+            self.kill()
+            raise DaemonTimeoutError(f"dmypy check timed out after {timeout:g} seconds")
+        if "error" in response and not self.started:
+            raise DaemonError("dmypy daemon was killed during the check")
+        if "error" in response:
+            logger.warning(f"[dmypy] Daemon failed ({response['error']}), restarting")
+            self.kill()
+            self.restarts += 1
+            self.start()
+            response = self._request_check(paths, timeout)
+            if "error" in response:
+                raise DaemonError(f"dmypy failed: {response['error']}")
+            before = None
+        after = _process_usage(pid) if before is not None else None
+        if before is not None and after is not None:
+            response["usage"] = {
+                "cpu_time": after[0] - before[0],
+                "peak_rss_kb": after[1],
+                "output_bytes": len(response.get("out", "")) + len(response.get("err", ""))
+            }
+        return response
+
+    def _request_check(self, paths: List[str], timeout: float) -> Dict[str, Any]:
+        from mypy.dmypy.client import request
+        try:
+            return request(
+                self.status_file, "check", timeout=math.ceil(timeout),
+                files=list(paths), export_types=False, is_tty=False, terminal_width=80
+            )
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {str(e)}"}
+
+
+class _Claim:
+    """A check that can be cancelled while a daemon runs it"""
+
+    def __init__(self):
+        self.cancelled = False
+        self.daemon: Optional[DmypyDaemon] = None
+        self._lock = threading.Lock()
+
+    def claim(self, daemon: DmypyDaemon) -> bool:
+        """
+        Record the daemon running the check
+
+        Returns:
+            False if the check was cancelled before it started
+        """
+        with self._lock:
+            self.daemon = daemon
+            return not self.cancelled
+
+    def finish(self) -> None:
+        """Record that the check no longer uses its daemon, before the daemon runs another one"""
+        with self._lock:
+            self.daemon = None
+
+    def cancel(self) -> None:
+        """Cancel the check, killing the daemon running it unless it has finished"""
+        with self._lock:
+            self.cancelled = True
+            if self.daemon is not None:
+                self.daemon.kill()
+
+
+class DmypyBackend:
+    """
+    Routes type-check requests to warm dmypy daemons
+
+    Daemons are grouped by mypy flags. Each group has up to
+    ``daemons_per_config`` daemons; a daemon handles one check at a time.
+    """
+
+    def __init__(
+        self,
+        daemons_per_config: int = 1,
+        cache_dir: Optional[str] = None,
+        idle_timeout: int = 1800,
+        limits: Optional[ResourceLimits] = None
+    ):
+        """
+        Initialize a new dmypy backend
+
+        Args:
+            daemons_per_config: Number of daemons for each set of flags
+            cache_dir: Persistent mypy cache directory (default: system temp dir)
+            idle_timeout: Seconds of inactivity after which a daemon exits on its own
+            limits: Resource limits; daemons are long-lived, so only the
+                memory limit applies to them
+        """
+        if daemons_per_config < 1:
+            raise ValueError(f"Need at least one daemon per configuration, got {daemons_per_config}")
+        self.daemons_per_config = daemons_per_config
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.idle_timeout = idle_timeout
+        self.memory_mb = limits.memory_mb if limits is not None else None
+        self.state_dir: Optional[str] = None
+        self._lock = threading.Lock()
+        self._daemons: List[DmypyDaemon] = []
+        self._idle: Dict[Tuple[str, ...], "queue.Queue[DmypyDaemon]"] = {}
+        self._executor = ThreadPoolExecutor(thread_name_prefix="quack-dmypy")
+
+    async def check(self, paths: List[str], flags: Tuple[str, ...], timeout: float = 30.0) -> Dict[str, Any]:
+        """
+        Type-check files on a daemon configured with the given flags
+
+        Args:
+            paths: Files to check
+            flags: mypy command line flags
+            timeout: Seconds to wait for the result
+
+        Returns:
+            dmypy response with ``out``, ``err`` and ``status`` keys, and
+            ``timing`` (wall-clock times the check was submitted, got a
+            daemon, had the daemon started and finished)
+
+        Raises:
+            DaemonTimeoutError: If the check did not finish in time
+            DaemonError: If no daemon can produce a result
+
+        Cancelling the awaiting task kills the daemon running the check.
+        """
+        loop = asyncio.get_running_loop()
+        claim = _Claim()
+        try:
+            return await loop.run_in_executor(
+                self._executor, self._check, list(paths), tuple(flags), timeout, claim, time.time()
+            )
+        except asyncio.CancelledError:
+            claim.cancel()
+            raise
+
+    def _check(
+        self,
+        paths: List[str],
+        flags: Tuple[str, ...],
+        timeout: float,
+        claim: "_Claim",
+        submitted: float
+    ) -> Dict[str, Any]:
+        idle = self._idle_queue(flags)
+        daemon = idle.get()
+        timing: Dict[str, Any] = {"submitted": submitted, "acquired": time.time(), "spawned": None}
+        try:
+            if not claim.claim(daemon):
+                raise DaemonError("Check was cancelled")
+            if not daemon.started:
+                daemon.start()
+                timing["spawned"] = time.time()
+            response = daemon.check(paths, timeout)
+            timing["finished"] = time.time()
+            response["timing"] = timing
+            return response
+        finally:
+            # A cancellation arriving from now on must not kill the daemon's next check
+            claim.finish()
+            idle.put(daemon)
+
+    def _idle_queue(self, flags: Tuple[str, ...]) -> "queue.Queue[DmypyDaemon]":
+        with self._lock:
+            idle = self._idle.get(flags)
+            if idle is None:
+                if self.state_dir is None:
+                    self.state_dir = tempfile.mkdtemp(prefix="quack-dmypy-")
+                    # Daemons outlive the server process unless stopped explicitly
+                    atexit.register(self.close)
+                config_id = hashlib.sha256("\0".join(flags).encode("utf-8")).hexdigest()[:12]
+                idle = queue.Queue()
+                for index in range(self.daemons_per_config):
+                    daemon = DmypyDaemon(
+                        flags,
+                        status_file=os.path.join(self.state_dir, f"{config_id}-{index}.json"),
+                        cache_dir=os.path.join(self.cache_dir, f"{config_id}-{index}"),
+                        idle_timeout=self.idle_timeout,
+                        memory_mb=self.memory_mb
+                    )
+                    self._daemons.append(daemon)
+                    idle.put(daemon)
+                self._idle[flags] = idle
+            return idle
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the daemons
+
+        Returns:
+            Dictionary with daemon statistics
+        """
+        with self._lock:
+            return {
+                "configurations": len(self._idle),
+                "daemons": len(self._daemons),
+                "running": sum(1 for daemon in self._daemons if daemon.started),
+                "restarts": sum(daemon.restarts for daemon in self._daemons)
+            }
+
+    def close(self) -> None:
+        """Stop all daemons and remove their status files"""
+        self._executor.shutdown(wait=True)
+        atexit.unregister(self.close)
+        with self._lock:
+            for daemon in self._daemons:
+                daemon.stop()
+            self._daemons.clear()
+            self._idle.clear()
+            if self.state_dir is not None:
+                shutil.rmtree(self.state_dir, ignore_errors=True)
+                self.state_dir = None
+        self._executor = ThreadPoolExecutor(thread_name_prefix="quack-dmypy")
@@ -0,0 +1,386 @@
+"""
+Pool of long-lived worker processes that accept jobs over a pipe.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .resources import ResourceLimits
+
+logger = logging.getLogger("quack")
+
+# Directory containing the quack package, so workers can import it from any cwd
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent.parent)
+
+
+class WorkerError(Exception):
+    """Raised when a worker process dies or violates the protocol"""
+
+
+class WorkerTimeoutError(WorkerError):
+    """Raised when a worker does not answer in time and has been killed"""
+
+
+class WorkerLimitError(WorkerError):
+    """Raised when a worker was killed for exceeding its CPU time limit"""
+
+
+class Worker:
+    """A single worker process speaking line-delimited JSON"""
+
+    def __init__(self, module: str, name: str):
+        """
+        Start a new worker process and wait until it is ready
+
+        Args:
+            module: Python module to run with ``python -m``
+            name: Name used in log messages
+        """
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+        self.name = name
+        self.jobs_done = 0
+        self.rss_kb = 0
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", module],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            env=env,
+            # Own process group, so the worker can be killed with everything it started
+            start_new_session=True
+        )
+        logger.debug(f"[Pool:{name}] Started worker with PID: {self.process.pid}")
+        try:
+            self._read_response()
+        except WorkerError:
+            self.stop()
+            raise
+
+    @property
+    def pid(self) -> int:
+        """Process ID of the worker"""
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        """
+        Check whether the worker process is still running
+
+        Returns:
+            True if the process has not exited
+        """
+        return self.process.poll() is None
+
+    def request(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Send a request and block until the response arrives
+
+        Args:
+            payload: JSON-serialisable request
+            timeout: Seconds to wait before killing the worker (None to wait forever)
+
+        Returns:
+            The worker's response dictionary
+
+        Raises:
+            WorkerTimeoutError: If the worker was killed after the timeout
+            WorkerError: If the worker dies or returns garbage
+        """
+        try:
+            self.process.stdin.write(json.dumps(payload) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerError(f"Worker {self.pid} is not accepting jobs: {str(e)}")
+
+        timed_out = threading.Event()
+        timer = None
+        if timeout is not None:
+            def kill() -> None:
+                timed_out.set()
+                self.kill()
+
+            timer = threading.Timer(timeout, kill)
+            timer.start()
+        try:
+            response = self._read_response()
+        except WorkerError:
+            if timed_out.is_set():
+                raise WorkerTimeoutError(f"Worker {self.pid} timed out after {timeout:g} seconds")
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+        self.jobs_done += 1
+        return response
+
+    def _read_response(self) -> Dict[str, Any]:
+        line = self.process.stdout.readline()
+        if not line:
+            returncode = self.process.wait()
+            if returncode == -signal.SIGXCPU:
+                raise WorkerLimitError(f"Worker {self.pid} exceeded its CPU time limit")
+            raise WorkerError(f"Worker {self.pid} exited with code {returncode}")
+        try:
+            response = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise WorkerError(f"Worker {self.pid} sent invalid response: {str(e)}")
+        self.rss_kb = response.get("rss_kb", self.rss_kb)
+        if "usage" in response:
+            response["usage"]["output_bytes"] = len(line)
+        return response
+
+    def kill(self) -> None:
+        """Kill the worker and every process it started"""
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            # Already gone; make sure the worker itself is reaped
+            self.process.kill()
+
+    def stop(self) -> None:
+        """Ask the worker to exit by closing its stdin, killing it if needed"""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=5)
+        except Exception:
+            self.kill()
+            self.process.wait()
+        finally:
+            self._close_pipes()
+        logger.debug(f"[Pool:{self.name}] Stopped worker {self.pid} after {self.jobs_done} jobs")
+
+    def _close_pipes(self) -> None:
+        for pipe in (self.process.stdin, self.process.stdout, self.process.stderr):
+            if pipe is None:
+                continue
+            try:
+                pipe.close()
+            except OSError:
+                # Unflushed input for a worker that has exited; the pipe is closed regardless
+                pass
+
+
+class _Request:
+    """A pool request that can be cancelled while a worker serves it"""
+
+    def __init__(self):
+        self.cancelled = False
+        self.worker: Optional[Worker] = None
+        self.submitted = time.time()
+        self._lock = threading.Lock()
+
+    def claim(self, worker: Worker) -> bool:
+        """
+        Record the worker serving the request
+
+        Returns:
+            False if the request was cancelled before it started
+        """
+        with self._lock:
+            self.worker = worker
+            return not self.cancelled
+
+    def finish(self) -> None:
+        """Record that the request no longer uses its worker, before the worker serves another one"""
+        with self._lock:
+            self.worker = None
+
+    def cancel(self) -> None:
+        """Cancel the request, killing the worker serving it unless it has finished"""
+        with self._lock:
+            self.cancelled = True
+            if self.worker is not None:
+                self.worker.kill()
+
+
+class WorkerPool:
+    """
+    Pool of pre-warmed worker processes
+
+    Jobs are handed to idle workers over a pipe. Each worker is recycled
+    after serving ``max_jobs_per_worker`` jobs or once its peak RSS exceeds
+    ``max_memory_mb``. Blocking pipe I/O runs on a dedicated thread per
+    worker, so awaiting a job never blocks the event loop and the pool can
+    be shared by several event loops.
+    """
+
+    def __init__(
+        self,
+        module: str,
+        size: int = 2,
+        max_jobs_per_worker: int = 100,
+        max_memory_mb: Optional[int] = 512,
+        name: Optional[str] = None,
+        limits: Optional[ResourceLimits] = None
+    ):
+        """
+        Initialize a new worker pool
+
+        Workers are started lazily on first use.
+
+        Args:
+            module: Worker module to run with ``python -m``
+            size: Number of worker processes
+            max_jobs_per_worker: Recycle a worker after this many jobs
+            max_memory_mb: Recycle a worker whose peak RSS exceeds this (None to disable)
+            name: Name used in log messages
+            limits: CPU time and memory limits applied to each job (None for no limits)
+        """
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+        self.module = module
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_memory_mb = max_memory_mb
+        self.name = name or module.rsplit(".", 1)[-1]
+        self.limits = limits
+        self.jobs_served = 0
+        self.workers_started = 0
+        self.workers_recycled = 0
+        self.busy = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+        self._idle: "queue.Queue[Optional[Worker]]" = queue.Queue()
+        for _ in range(size):
+            self._idle.put(None)
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"quack-{self.name}")
+
+    async def submit(self, payload: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Run a job on the next idle worker
+
+        Args:
+            payload: JSON-serialisable request for the worker
+            timeout: Seconds the worker may spend on the job before it is
+                killed (None for no limit); time spent waiting for an idle
+                worker does not count
+
+        Returns:
+            The worker's response dictionary, with the job's ``usage``
+            (CPU seconds, peak RSS and response size) and ``timing``
+            (wall-clock times the request was submitted, got a worker, had
+            a new worker started and finished, and the seconds the worker's
+            handler took)
+
+        Raises:
+            WorkerTimeoutError: If the job exceeded the timeout
+            WorkerLimitError: If the job exceeded the CPU time limit
+            WorkerError: If the worker dies while processing the job
+
+        Cancelling the awaiting task kills the worker serving the job, so a
+        cancelled job never keeps a worker busy.
+        """
+        if self.limits is not None:
+            payload = {**payload, "limits": self.limits.to_dict()}
+        loop = asyncio.get_running_loop()
+        request = _Request()
+        try:
+            return await loop.run_in_executor(self._executor, self._run, payload, timeout, request)
+        except asyncio.CancelledError:
+            request.cancel()
+            raise
+
+    def _run(
+        self,
+        payload: Dict[str, Any],
+        timeout: Optional[float] = None,
+        request: Optional[_Request] = None
+    ) -> Dict[str, Any]:
+        submitted = request.submitted if request is not None else time.time()
+        worker = self._idle.get()
+        started = time.monotonic()
+        timing: Dict[str, Any] = {"submitted": submitted, "acquired": time.time(), "spawned": None}
+        with self._lock:
+            self.busy += 1
+        try:
+            if worker is None or not worker.is_alive():
+                if worker is not None:
+                    # Reap the dead worker and close its pipes
+                    worker.stop()
+                worker = self._start_worker()
+                timing["spawned"] = time.time()
+            if request is not None and not request.claim(worker):
+                return {"ok": False, "error": "Request was cancelled"}
+            try:
+                response = worker.request(payload, timeout)
+            except WorkerError:
+                worker.stop()
+                worker = None
+                raise
+            timing["finished"] = time.time()
+            timing["handler"] = response.pop("elapsed", None)
+            response["timing"] = timing
+            with self._lock:
+                self.jobs_served += 1
+            if self._should_recycle(worker):
+                worker.stop()
+                worker = None
+                with self._lock:
+                    self.workers_recycled += 1
+            return response
+        finally:
+            with self._lock:
+                self.busy -= 1
+                self.busy_seconds += time.monotonic() - started
+            if request is not None:
+                # A cancellation arriving from now on must not kill the worker's next job
+                request.finish()
+            self._idle.put(worker)
+
+    def _start_worker(self) -> Worker:
+        worker = Worker(self.module, self.name)
+        with self._lock:
+            self.workers_started += 1
+        return worker
+
+    def _should_recycle(self, worker: Worker) -> bool:
+        if worker.jobs_done >= self.max_jobs_per_worker:
+            logger.debug(f"[Pool:{self.name}] Recycling worker {worker.pid} after {worker.jobs_done} jobs")
+            return True
+        if self.max_memory_mb is not None and worker.rss_kb > self.max_memory_mb * 1024:
+            logger.info(f"[Pool:{self.name}] Recycling worker {worker.pid} using {worker.rss_kb // 1024} MB")
+            return True
+        return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the pool
+
+        Returns:
+            Dictionary with pool statistics
+        """
+        with self._lock:
+            return {
+                "size": self.size,
+                "busy": self.busy,
+                "busy_seconds": round(self.busy_seconds, 3),
+                "jobs_served": self.jobs_served,
+                "workers_started": self.workers_started,
+                "workers_recycled": self.workers_recycled
+            }
+
+    def close(self) -> None:
+        """Stop all idle workers and shut down the executor"""
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.stop()
+        for _ in range(self.size):
+            self._idle.put(None)
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix=f"quack-{self.name}")
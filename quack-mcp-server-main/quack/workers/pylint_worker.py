@@ -0,0 +1,91 @@
+"""
+Pylint worker process.
+
+Run with ``python -m quack.workers.pylint_worker``. The worker imports
+pylint and astroid once, lints a small warm-up module so the builtins are
+cached, and then serves lint requests over stdin/stdout.
+
+Request format::
+
+    {"paths": ["/tmp/x.py"], "args": ["--disable=C"]}
+
+Response format::
+
+    {"ok": true, "output": "<pylint JSON report>"}
+"""
+
+import io
+import os
+import tempfile
+from typing import Any, Dict, List
+
+import astroid
+from pylint.lint import Run
+from pylint.reporters import JSONReporter
+
+from quack.workers.worker import serve
+
+
+def _forget_modules(paths: List[str]) -> None:
+    """
+    Drop linted modules from the astroid cache
+
+    Jobs reuse file names, so a cached module must never outlive its job.
+
+    Args:
+        paths: Files or directories that were linted
+    """
+    roots = [os.path.abspath(path) for path in paths]
+    cache = astroid.MANAGER.astroid_cache
+    for name, module in list(cache.items()):
+        module_file = getattr(module, "file", None)
+        if not module_file:
+            continue
+        module_file = os.path.abspath(module_file)
+        if any(module_file == root or module_file.startswith(root + os.sep) for root in roots):
+            del cache[name]
+
+
+def run_pylint(paths: List[str], args: List[str]) -> str:
+    """
+    Run pylint in-process with the JSON reporter
+
+    Args:
+        paths: Files or directories to lint
+        args: Extra pylint command line arguments
+
+    Returns:
+        The JSON report produced by pylint
+    """
+    output = io.StringIO()
+    try:
+        Run([*args, *paths], reporter=JSONReporter(output), exit=False)
+    finally:
+        _forget_modules(paths)
+    return output.getvalue()
+
+
+def handle(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Handle a single lint request
+
+    Args:
+        request: Dictionary with ``paths`` and optional ``args``
+
+    Returns:
+        Response dictionary with the pylint JSON output
+    """
+    return {"ok": True, "output": run_pylint(request["paths"], request.get("args", []))}
+
+
+def warmup() -> None:
+    """Lint a trivial module so astroid loads the builtins before the first job"""
+    with tempfile.TemporaryDirectory(prefix="quack-warmup-") as temp_dir:
+        path = os.path.join(temp_dir, "warmup.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('"""Warm-up module."""\nimport os\nprint(os.getcwd())\n')
+        run_pylint([path], [])
+
+
+if __name__ == "__main__":
+    serve(handle, warmup)
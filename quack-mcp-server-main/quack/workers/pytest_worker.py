@@ -0,0 +1,270 @@
+"""
+Pytest worker process.
+
+Run with ``python -m quack.workers.pytest_worker``. The worker imports
+pytest once, runs a small warm-up session, and then runs each test request
+in a child forked from the warm process, collecting per-test results with
+a plugin. Whatever a test changes in the interpreter (module attributes,
+environment variables, the working directory) dies with the child.
+
+Request format::
+
+    {"paths": ["/tmp/ws/submission.py::test_a"], "rootdir": "/tmp/ws",
+     "deselect": ["submission.py::test_b"], "trace": true}
+
+Response format::
+
+    {"ok": true, "exit_code": 1, "tests": [...], "collection_errors": [...]}
+
+Each test is reported as ``{"nodeid", "name", "outcome", "duration",
+"message"}`` where outcome is one of passed, failed, error, skipped,
+xfailed or xpassed. With ``trace`` set, each test also reports the
+``lines`` of the tested files it executed, for test impact analysis.
+"""
+
+import contextlib
+import io
+import json
+import os
+import signal
+import sys
+import tempfile
+import traceback
+from typing import Any, Dict, List, Optional, Set
+
+import pytest
+
+from quack.workers.worker import serve
+
+# Options for every run; conftest.py files outside the workspace are
+# ignored via --confcutdir
+PYTEST_ARGS = ["-p", "no:cacheprovider", "-q", "--import-mode=importlib", "--tb=short"]
+
+
+class ResultCollector:
+    """Pytest plugin recording the outcome of every test"""
+
+    def __init__(self):
+        self.tests: Dict[str, Dict[str, Any]] = {}
+        self.collection_errors: List[Dict[str, Any]] = []
+
+    def pytest_collectreport(self, report) -> None:
+        if report.failed:
+            self.collection_errors.append({"nodeid": report.nodeid, "message": report.longreprtext})
+
+    def pytest_runtest_logreport(self, report) -> None:
+        test = self.tests.setdefault(report.nodeid, {
+            "nodeid": report.nodeid,
+            "name": report.nodeid.split("::", 1)[-1],
+            "outcome": "passed",
+            "duration": 0.0,
+            "message": None
+        })
+        test["duration"] += report.duration
+
+        outcome: Optional[str] = None
+        if hasattr(report, "wasxfail"):
+            outcome = "xfailed" if report.skipped else "xpassed"
+        elif report.when == "call":
+            outcome = report.outcome
+        elif report.failed:
+            # Failures in fixtures are errors rather than test failures
+            outcome = "error"
+        elif report.skipped:
+            outcome = "skipped"
+
+        if outcome is not None and test["outcome"] in ("passed", "xpassed"):
+            test["outcome"] = outcome
+        if report.skipped and isinstance(report.longrepr, tuple):
+            # (path, line, reason) for skipped tests
+            test["message"] = test["message"] or report.longrepr[2]
+        elif report.failed or report.skipped:
+            test["message"] = test["message"] or report.longreprtext or None
+
+
+class LineTracer:
+    """Pytest plugin recording the lines of the tested files each test executes"""
+
+    def __init__(self, files: List[str]):
+        self.files = {os.path.abspath(path) for path in files}
+        self.lines: Dict[str, List[int]] = {}
+        self._current: Set[int] = set()
+        self._traced: Dict[str, bool] = {}
+
+    def _trace(self, frame, event, arg):
+        filename = frame.f_code.co_filename
+        traced = self._traced.get(filename)
+        if traced is None:
+            traced = self._traced[filename] = os.path.abspath(filename) in self.files
+        if not traced:
+            # Do not trace lines of other files, such as pytest's own code
+            return None
+        if event == "line":
+            self._current.add(frame.f_lineno)
+        return self._trace
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item, nextitem):
+        # Covers setup, call and teardown, so fixtures count as executed
+        self._current = set()
+        sys.settrace(self._trace)
+        try:
+            yield
+        finally:
+            sys.settrace(None)
+            self.lines[item.nodeid] = sorted(self._current)
+
+
+class Deselector:
+    """Pytest plugin deselecting tests by exact node ID"""
+
+    def __init__(self, nodeids: List[str]):
+        self.nodeids = set(nodeids)
+
+    def pytest_collection_modifyitems(self, config, items) -> None:
+        # Unlike --deselect, which matches prefixes (test_a would deselect test_ab)
+        deselected = [item for item in items if item.nodeid in self.nodeids]
+        if deselected:
+            items[:] = [item for item in items if item.nodeid not in self.nodeids]
+            config.hook.pytest_deselected(items=deselected)
+
+
+def _forget_modules(roots: List[str]) -> None:
+    """
+    Drop modules imported from the tested files
+
+    Jobs reuse module names, so an imported module must never outlive its job.
+
+    Args:
+        roots: Directories containing the tested files
+    """
+    roots = [os.path.abspath(root) for root in roots]
+    for name, module in list(sys.modules.items()):
+        module_file = getattr(module, "__file__", None)
+        if not module_file:
+            continue
+        module_file = os.path.abspath(module_file)
+        if any(module_file.startswith(root + os.sep) for root in roots):
+            del sys.modules[name]
+
+
+def run_pytest(
+    paths: List[str],
+    rootdir: str,
+    args: List[str],
+    deselect: Optional[List[str]] = None,
+    trace: bool = False
+) -> Dict[str, Any]:
+    """
+    Run pytest in-process
+
+    Args:
+        paths: Files or node IDs to run
+        rootdir: Directory holding the tested files
+        args: Extra pytest command line arguments
+        deselect: Node IDs, relative to rootdir, of tests not to run
+        trace: Record the lines of the tested files each test executes
+
+    Returns:
+        Response dictionary with the exit code and per-test results
+    """
+    collector = ResultCollector()
+    plugins: List[Any] = [collector]
+    if deselect:
+        plugins.append(Deselector(deselect))
+    tracer = None
+    if trace:
+        tracer = LineTracer([path.split("::", 1)[0] for path in paths])
+        plugins.append(tracer)
+    try:
+        # The terminal report is not needed; results come from the collector
+        with contextlib.redirect_stdout(io.StringIO()):
+            exit_code = pytest.main(
+                [*PYTEST_ARGS, f"--rootdir={rootdir}", f"--confcutdir={rootdir}", *args, *paths],
+                plugins=plugins
+            )
+    finally:
+        _forget_modules([rootdir])
+    tests = list(collector.tests.values())
+    if tracer is not None:
+        for test in tests:
+            test["lines"] = tracer.lines.get(test["nodeid"], [])
+    return {
+        "ok": True,
+        "exit_code": int(exit_code),
+        "tests": tests,
+        "collection_errors": collector.collection_errors
+    }
+
+
+def handle(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Handle a single test request in a forked child
+
+    Args:
+        request: Dictionary with ``paths``, ``rootdir`` and optional ``args``,
+            ``deselect`` and ``trace``
+
+    Returns:
+        Response dictionary with the test results
+
+    Raises:
+        RuntimeError: If the child exited without sending a response
+
+    A child killed by a signal, e.g. for exceeding its CPU time limit,
+    kills the worker with the same signal.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            # Output written straight to file descriptor 1 must not reach the protocol stream
+            os.dup2(2, 1)
+            try:
+                response = run_pytest(
+                    request["paths"],
+                    request["rootdir"],
+                    request.get("args", []),
+                    deselect=request.get("deselect"),
+                    trace=request.get("trace", False)
+                )
+            except Exception as e:
+                traceback.print_exc()
+                response = {"ok": False, "error": f"{type(e).__name__}: {str(e)}"}
+            with os.fdopen(write_fd, "w", encoding="utf-8") as f:
+                json.dump(response, f)
+        finally:
+            # Skip atexit handlers and buffered output inherited from the worker
+            os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, encoding="utf-8") as f:
+        data = f.read()
+    _, status, usage = os.wait4(pid, 0)
+    if not data and os.WIFSIGNALED(status):
+        # Die of the same signal, so the pool sees a run killed for its limits as before
+        signum = os.WTERMSIG(status)
+        signal.signal(signum, signal.SIG_DFL)
+        os.kill(os.getpid(), signum)
+    if not data:
+        raise RuntimeError(f"Test run exited with status {os.waitstatus_to_exitcode(status)} without a result")
+    response = json.loads(data)
+    # Peak of the child and the processes it waited for, in kilobytes on Linux
+    response["usage"] = {"peak_rss_kb": usage.ru_maxrss}
+    return response
+
+
+def warmup() -> None:
+    """Run a trivial test so pytest's plugins and assertion rewriting are loaded"""
+    with tempfile.TemporaryDirectory(prefix="quack-warmup-") as temp_dir:
+        path = os.path.join(temp_dir, "test_warmup.py")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("def test_warmup():\n    assert [1] == [1]\n")
+        run_pytest([path], temp_dir, [])
+
+
+if __name__ == "__main__":
+    # Workspaces are short-lived and file names are reused; never cache bytecode
+    sys.dont_write_bytecode = True
+    serve(handle, warmup)
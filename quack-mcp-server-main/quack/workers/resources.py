@@ -0,0 +1,177 @@
+"""
+Resource limits and accounting for analysis processes.
+
+Limits are applied as soft rlimits, so they can be tightened for one job
+and lifted again afterwards by a long-lived worker. Processes started by
+the analysed code inherit them.
+"""
+
+import math
+import os
+import resource
+import signal
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class ResourceLimits:
+    """CPU time and memory a single job may use"""
+    # CPU seconds per job; the process gets SIGXCPU once it has used more
+    cpu_time: Optional[int] = None
+    # Address space per process in megabytes; allocations beyond it fail
+    memory_mb: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Convert the limits to a dictionary sent to worker processes
+
+        Returns:
+            Dictionary with ``cpu_time`` and ``memory_mb``
+        """
+        return {"cpu_time": self.cpu_time, "memory_mb": self.memory_mb}
+
+    def apply(self) -> None:
+        """Apply the limits to the current process, e.g. as a ``preexec_fn``"""
+        apply_limits(self.to_dict())
+
+
+def cpu_seconds() -> float:
+    """
+    Get the CPU time used by this process and its finished children
+
+    Returns:
+        User plus system time in seconds
+    """
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def reset_peak_rss(pid: Optional[int] = None) -> bool:
+    """
+    Reset the peak resident set size (VmHWM) of a process to its current RSS
+
+    Lets a long-lived process report the peak of each request rather than
+    of its whole lifetime.
+
+    Args:
+        pid: Process to reset (default: this process)
+
+    Returns:
+        True if the peak was reset, False where ``/proc/<pid>/clear_refs``
+        is not available
+    """
+    try:
+        with open(f"/proc/{pid if pid is not None else 'self'}/clear_refs", "w", encoding="utf-8") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def _set_soft_limit(limit: int, value: Optional[int]) -> None:
+    _, hard = resource.getrlimit(limit)
+    if value is None or (hard != resource.RLIM_INFINITY and value > hard):
+        value = hard
+    resource.setrlimit(limit, (value, hard))
+
+
+def apply_limits(limits: Optional[Dict[str, Any]]) -> None:
+    """
+    Set the soft CPU and memory limits of the current process
+
+    The CPU limit counts from the time already used, so a long-lived worker
+    can apply it per job. Missing limits are lifted up to the hard limit.
+
+    Args:
+        limits: Dictionary with optional ``cpu_time`` and ``memory_mb``, or
+            None to lift both limits
+    """
+    limits = limits or {}
+    cpu_time = limits.get("cpu_time")
+    memory_mb = limits.get("memory_mb")
+    if cpu_time is not None:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        cpu_time += math.ceil(usage.ru_utime + usage.ru_stime)
+    _set_soft_limit(resource.RLIMIT_CPU, cpu_time)
+    _set_soft_limit(resource.RLIMIT_AS, memory_mb * 1024 * 1024 if memory_mb is not None else None)
+
+
+class MeasuredProcess:
+    """
+    A subprocess whose resource usage is collected when it exits
+
+    The process runs in its own process group with its output spooled to
+    temporary files; ``wait`` reaps it with ``os.wait4`` to get the CPU time
+    and peak RSS of the process and the children it waited for.
+    """
+
+    def __init__(self, args: List[str], limits: Optional[ResourceLimits] = None, cwd: Optional[str] = None):
+        """
+        Start the process
+
+        Args:
+            args: Command line
+            limits: CPU time and memory limits for the process
+            cwd: Working directory
+
+        Raises:
+            OSError: If the process cannot be started
+        """
+        self.stdout = tempfile.TemporaryFile()
+        self.stderr = tempfile.TemporaryFile()
+        try:
+            self.process = subprocess.Popen(
+                args,
+                stdout=self.stdout,
+                stderr=self.stderr,
+                cwd=cwd,
+                start_new_session=True,
+                preexec_fn=limits.apply if limits is not None else None
+            )
+        except BaseException:
+            self.stdout.close()
+            self.stderr.close()
+            raise
+
+    @property
+    def pid(self) -> int:
+        """Process ID"""
+        return self.process.pid
+
+    def wait(self) -> Tuple[int, bytes, bytes, Dict[str, Any]]:
+        """
+        Wait for the process to exit; blocks, so run it on a thread
+
+        Returns:
+            Tuple of (exit code, stdout, stderr, usage) where usage holds
+            ``cpu_time``, ``peak_rss_kb`` and ``output_bytes``
+        """
+        try:
+            _, status, rusage = os.wait4(self.process.pid, 0)
+            self.process.returncode = os.waitstatus_to_exitcode(status)
+            outputs = []
+            for spool in (self.stdout, self.stderr):
+                spool.seek(0)
+                outputs.append(spool.read())
+        finally:
+            self.stdout.close()
+            self.stderr.close()
+        usage = {
+            "cpu_time": rusage.ru_utime + rusage.ru_stime,
+            "peak_rss_kb": rusage.ru_maxrss,
+            "output_bytes": len(outputs[0]) + len(outputs[1])
+        }
+        return self.process.returncode, outputs[0], outputs[1], usage
+
+    def kill(self) -> None:
+        """Kill the process and everything it started; ``wait`` then returns"""
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
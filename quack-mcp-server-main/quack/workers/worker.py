@@ -0,0 +1,84 @@
+"""
+Worker-side request loop shared by all Quack worker processes.
+
+A worker reads one JSON request per line from stdin and writes one JSON
+response per line to stdout. Anything the analysis tool prints is
+redirected to stderr so it cannot corrupt the protocol stream.
+"""
+
+import json
+import resource
+import sys
+import time
+import traceback
+from typing import Any, Callable, Dict, Optional
+
+from .resources import apply_limits, cpu_seconds, reset_peak_rss
+
+Handler = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+def peak_rss_kb() -> int:
+    """
+    Get the peak resident set size of this process since the last
+    ``reset_peak_rss``
+
+    Returns:
+        Peak RSS in kilobytes; the lifetime peak where /proc is not available
+    """
+    try:
+        with open("/proc/self/status", encoding="utf-8") as f:
+            return next(int(line.split()[1]) for line in f if line.startswith("VmHWM:"))
+    except (OSError, StopIteration, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def serve(handler: Handler, warmup: Optional[Callable[[], None]] = None) -> None:
+    """
+    Serve requests until stdin is closed
+
+    Args:
+        handler: Function turning a request dictionary into a response dictionary
+        warmup: Optional function run once before the first request
+    """
+    protocol_out = sys.stdout
+    sys.stdout = sys.stderr
+
+    if warmup is not None:
+        try:
+            warmup()
+        except Exception:
+            traceback.print_exc()
+
+    # Tell the pool we are ready to accept jobs
+    protocol_out.write(json.dumps({"ok": True, "ready": True, "rss_kb": peak_rss_kb()}) + "\n")
+    protocol_out.flush()
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        started = cpu_seconds()
+        wall_started = time.perf_counter()
+        reset_peak_rss()
+        try:
+            request = json.loads(line)
+            # Limits for this request only, inherited by processes it starts
+            apply_limits(request.pop("limits", None))
+            try:
+                response = handler(request)
+            finally:
+                apply_limits(None)
+        except Exception as e:
+            traceback.print_exc()
+            response = {"ok": False, "error": f"{type(e).__name__}: {str(e)}"}
+        # Wall time of the handler, so the pool can tell tool time from pipe overhead
+        response["elapsed"] = time.perf_counter() - wall_started
+        response["rss_kb"] = peak_rss_kb()
+        # Handlers report the peak RSS of the processes they started for the request
+        handler_usage = response.get("usage") or {}
+        response["usage"] = {
+            "cpu_time": cpu_seconds() - started,
+            "peak_rss_kb": max(response["rss_kb"], handler_usage.get("peak_rss_kb", 0))
+        }
+        protocol_out.write(json.dumps(response) + "\n")
+        protocol_out.flush()
@@ -0,0 +1,80 @@
+"""
+Test for the load-generation benchmark.
+
+This file tests the corpus, the statistics and a short run over stdio.
+"""
+
+import ast
+import json
+import pytest
+
+from benchmarks.load import (
+    RunResult, Sample, build_corpus, compare_reports, main, percentile, summarize, synthetic_module
+)
+
+
+@pytest.mark.parametrize("lines", [1, 10, 137, 1000])
+def test_synthetic_module_has_requested_length(lines):
+    """Test that synthetic modules are valid Python of exactly the requested length."""
+    code = synthetic_module(lines)
+    assert code.count("\n") == lines
+    ast.parse(code)
+
+
+def test_corpus_includes_examples_and_synthetic_files():
+    """Test that the corpus holds tests/examples and one file per size."""
+    corpus = build_corpus([10, 50])
+    names = [corpus_file.name for corpus_file in corpus]
+    assert "examples/example_code.py" in names
+    assert names[-2:] == ["synthetic_10.py", "synthetic_50.py"]
+
+
+def test_percentiles_and_summary():
+    """Test interpolated percentiles and the per-type summary."""
+    assert percentile([], 50) == 0.0
+    assert percentile([4, 1, 3, 2], 50) == 2.5
+    assert percentile(list(range(101)), 99) == 99
+
+    run = RunResult("stdio", duration=2.0, server_rss_kb=[100, 300, 200], tree_rss_kb=[150, 450, 350])
+    run.samples = [Sample("lint", "a.py", "completed", 0.5), Sample("static_analysis", "a.py", "failed", 1.5, 2)]
+    summary = summarize(run)
+
+    assert summary["throughput"] == 1.0
+    assert summary["statuses"] == {"completed": 1, "failed": 1}
+    assert summary["rejections"] == 2
+    assert summary["latency"]["p50"] == 1.0
+    assert summary["by_job_type"]["lint"]["latency"]["max"] == 0.5
+    assert summary["server_rss_kb"] == {"peak": 300, "final": 200}
+
+
+def test_compare_reports_flags_regressions():
+    """Test that slower latency and lower throughput count as regressions."""
+    baseline = {"transports": {"sse": {"throughput": 10.0, "latency": {"p50": 1.0, "p95": 2.0, "p99": 0}}}}
+    current = {"transports": {
+        "sse": {"throughput": 8.0, "latency": {"p50": 0.5, "p95": 3.0, "p99": 1.0}},
+        "stdio": {"throughput": 1.0}
+    }}
+
+    rows = {row["metric"]: row for row in compare_reports(baseline, current)}
+
+    assert set(rows) == {"throughput", "latency.p50", "latency.p95"}
+    assert rows["throughput"]["regression"] == 20.0
+    assert rows["latency.p50"]["regression"] == -50.0
+    assert rows["latency.p95"]["change"] == 50.0
+
+
+def test_stdio_run_writes_report(tmp_path):
+    """Test a short benchmark over stdio end to end."""
+    output = tmp_path / "report.json"
+    status = main([
+        "--transport", "stdio", "--clients", "2", "--jobs", "2", "--sizes", "10",
+        "--no-examples", "--job-types", "lint", "--warmup", "0", "--output", str(output)
+    ])
+
+    report = json.loads(output.read_text())
+    summary = report["transports"]["stdio"]
+    assert status == 0
+    assert summary["jobs"] == 4
+    assert summary["statuses"] == {"completed": 4}
+    assert summary["latency"]["p99"] > 0
+    assert report["config"]["corpus"] == {"synthetic_10.py": 10}
@@ -0,0 +1,110 @@
+"""
+Micro-benchmarks for the Python-side work of the processors.
+
+This file feeds synthetic pylint and mypy output with 10, 1k and 100k
+messages through parsing, categorisation and line content attachment.
+Compare runs with ``--benchmark-autosave`` and ``--benchmark-compare``.
+"""
+
+import json
+import time
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from benchmarks.load import synthetic_module
+from quack.jobs.source import SourceDocument
+from quack.processors.lint import add_line_content, categorize_messages, split_messages
+from quack.processors.static_analysis import mypy_issues
+
+MESSAGE_COUNTS = [10, 1000, 100000]
+
+# Lines of the module the synthetic messages point into
+SOURCE_LINES = 1000
+
+# Pylint message types, in rotation
+MESSAGE_TYPES = ("error", "warning", "convention", "refactor")
+
+DOCUMENT = SourceDocument(synthetic_module(SOURCE_LINES))
+
+
+def pylint_output(count: int, paths=("/tmp/submission.py",)) -> str:
+    """Build a pylint JSON report with the given number of messages."""
+    return json.dumps([
+        {
+            "type": MESSAGE_TYPES[i % len(MESSAGE_TYPES)],
+            "module": "submission",
+            "obj": f"compute_{i % 50}",
+            "line": i % SOURCE_LINES + 1,
+            "column": 4,
+            "endLine": i % SOURCE_LINES + 1,
+            "endColumn": 10,
+            "path": paths[i % len(paths)],
+            "symbol": "unused-variable",
+            "message": f"Unused variable 'unused_{i}'",
+            "message-id": "W0612"
+        }
+        for i in range(count)
+    ])
+
+
+def mypy_output(count: int) -> str:
+    """Build mypy output with the given number of issues."""
+    return "\n".join(
+        f"/tmp/submission.py:{i % SOURCE_LINES + 1}:5: error: Incompatible return value type "
+        f"(got \"str\", expected \"int\")  [return-value]"
+        for i in range(count)
+    )
+
+
+def parse_pylint(output: str):
+    """Python-side work of a lint job after pylint has run."""
+    messages = json.loads(output)
+    add_line_content(messages, DOCUMENT)
+    return categorize_messages(messages)
+
+
+@pytest.mark.parametrize("count", MESSAGE_COUNTS)
+def test_pylint_output_processing(benchmark, count):
+    """Benchmark parsing, line content and categorisation of pylint output."""
+    output = pylint_output(count)
+    result = benchmark(parse_pylint, output)
+    assert result["summary"]["total_issues"] == count
+    assert result["errors"][0]["line_content"] == DOCUMENT.line(1)
+
+
+@pytest.mark.parametrize("count", MESSAGE_COUNTS)
+def test_pylint_batch_split(benchmark, count):
+    """Benchmark splitting the report of a 16-file batch by file."""
+    paths = [f"/tmp/batch/submission_{i}.py" for i in range(16)]
+    output = pylint_output(count, paths)
+    by_path = benchmark(split_messages, output, paths)
+    assert sum(len(messages) for messages in by_path.values()) == count
+
+
+@pytest.mark.parametrize("count", MESSAGE_COUNTS)
+def test_mypy_output_processing(benchmark, count):
+    """Benchmark parsing mypy output and attaching line content."""
+    output = mypy_output(count)
+    issues = benchmark(mypy_issues, output, DOCUMENT)
+    assert len(issues) == count
+    assert issues[-1]["line_content"] == DOCUMENT.line((count - 1) % SOURCE_LINES + 1)
+
+
+@pytest.mark.parametrize("name, run", [
+    ("pylint", lambda count: parse_pylint(pylint_output(count))),
+    ("mypy", lambda count: mypy_issues(mypy_output(count), DOCUMENT)),
+])
+def test_hot_paths_scale_linearly(name, run):
+    """Test that 100x more messages take far less than 10,000x longer, catching quadratic work."""
+    def best_of(count: int, rounds: int) -> float:
+        timings = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            run(count)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    small = best_of(1000, 5)
+    large = best_of(100000, 2)
+    assert large / small < 1000, f"{name}: 100k messages took {large / small:.0f}x as long as 1k"
@@ -0,0 +1,154 @@
+"""
+Test for the offline analyze command.
+
+This file tests file discovery, the conversion of results to findings and
+the JSON Lines and SARIF output of analyses run over a directory tree.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import subprocess
+
+from quack.cli import JsonLinesWriter, add_arguments, analyze, changed_files, run
+from quack.jobs.base import LintJob, StaticAnalysisJob
+from quack.jobs.enums import JobType
+from quack.jobs.factory import JobFactory
+from quack.processors.findings import job_findings
+from quack.tree import discover_files
+
+MODULE = '''"""Example module."""
+import os
+
+
+def double(x: int) -> str:
+    """Double a number."""
+    return x * 2
+'''
+
+
+def make_tree(root):
+    """Create a small package with a module, a syntax error and files that are skipped."""
+    (root / "pkg").mkdir()
+    (root / "pkg" / "__init__.py").write_text('"""Package."""\n')
+    (root / "pkg" / "mod.py").write_text(MODULE)
+    (root / "pkg" / "bad.py").write_text("def broken(:\n")
+    (root / ".venv").mkdir()
+    (root / ".venv" / "lib.py").write_text("x = 1\n")
+    (root / "env").mkdir()
+    (root / "env" / "pyvenv.cfg").write_text("home = /usr\n")
+    (root / "env" / "site.py").write_text("x = 1\n")
+    (root / "notes.txt").write_text("not python\n")
+
+
+def parse(argv):
+    """Parse the arguments of the analyze command."""
+    parser = argparse.ArgumentParser()
+    add_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def test_discover_files_skips_hidden_and_virtual_environments(tmp_path):
+    """Test that only Python files outside hidden directories and virtual environments are found."""
+    make_tree(tmp_path)
+
+    assert discover_files(str(tmp_path)) == [
+        str(tmp_path / "pkg" / "__init__.py"),
+        str(tmp_path / "pkg" / "bad.py"),
+        str(tmp_path / "pkg" / "mod.py")
+    ]
+    assert discover_files(str(tmp_path / "pkg" / "mod.py")) == [str(tmp_path / "pkg" / "mod.py")]
+
+
+def test_changed_files_between_revisions(tmp_path, monkeypatch):
+    """Test that only Python files added or modified since a revision are selected."""
+    def git(*args):
+        subprocess.run(["git", "-c", "user.name=quack", "-c", "user.email=quack@example.com", *args],
+                       cwd=tmp_path, check=True, capture_output=True)
+
+    make_tree(tmp_path)
+    git("init", "-q")
+    git("add", "pkg")
+    git("commit", "-q", "-m", "initial")
+    (tmp_path / "pkg" / "mod.py").write_text(MODULE + "\nVALUE = 1\n")
+    (tmp_path / "pkg" / "new.py").write_text("x = 1\n")
+    (tmp_path / "pkg" / "bad.py").unlink()
+    git("add", "-A", "pkg")
+    git("commit", "-q", "-m", "change")
+    monkeypatch.chdir(tmp_path)
+
+    assert changed_files(".", "HEAD~1") == ["pkg/mod.py", "pkg/new.py"]
+    assert changed_files(".", "HEAD~1", "HEAD~1") == []
+
+
+def test_job_findings_normalise_lint_and_mypy_results():
+    """Test that pylint messages and mypy issues become findings of the same shape."""
+    lint_job = LintJob("lint-1", MODULE)
+    lint_job.result = {"conventions": [], "refactors": [], "errors": [], "warnings": [{
+        "type": "warning", "line": 2, "column": 0, "symbol": "unused-import",
+        "message-id": "W0611", "message": "Unused import os"
+    }]}
+    static_job = StaticAnalysisJob("mypy-1", MODULE)
+    static_job.result = {"issues": [{
+        "line": 7, "column": 12, "error_code": "return-value",
+        "message": 'error: Incompatible return value type (got "int", expected "str")  [return-value]'
+    }]}
+
+    assert job_findings(lint_job, "pkg/mod.py") == [{
+        "kind": "finding", "path": "pkg/mod.py", "line": 2, "column": 1, "tool": "pylint",
+        "rule": "unused-import", "severity": "warning", "message": "Unused import os"
+    }]
+    assert job_findings(static_job, "pkg/mod.py") == [{
+        "kind": "finding", "path": "pkg/mod.py", "line": 7, "column": 12, "tool": "mypy",
+        "rule": "return-value", "severity": "error",
+        "message": 'Incompatible return value type (got "int", expected "str")'
+    }]
+
+
+def test_analyze_streams_findings_of_every_file(tmp_path, monkeypatch):
+    """Test that lint and mypy run in place, syntax errors are reported once and processors are restored."""
+    make_tree(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    registered = dict(JobFactory.processors)
+    output = io.StringIO()
+
+    counts = asyncio.run(analyze(
+        discover_files("."), [JobType.LINT, JobType.STATIC_ANALYSIS], JsonLinesWriter(output), jobs=1
+    ))
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert counts == {"files": 3, "findings": len(records), "failures": 0}
+    found = {(record["path"], record["tool"], record["rule"], record["line"]) for record in records}
+    assert ("pkg/bad.py", "python", "syntax-error", 1) in found
+    assert ("pkg/mod.py", "pylint", "unused-import", 2) in found
+    assert ("pkg/mod.py", "mypy", "return-value", 7) in found
+    assert [record["path"] for record in records].count("pkg/bad.py") == 1
+    assert JobFactory.processors == registered
+
+
+def test_run_writes_sarif(tmp_path, monkeypatch):
+    """Test that the command writes a valid SARIF log and exits with 1 when there are findings."""
+    make_tree(tmp_path)
+    monkeypatch.chdir(tmp_path)
+
+    status = run(parse(["pkg/mod.py", "--tools", "lint", "--format", "sarif", "--output", "out.sarif", "-j", "1"]))
+
+    assert status == 1
+    log = json.loads((tmp_path / "out.sarif").read_text())
+    sarif_run = log["runs"][0]
+    assert log["version"] == "2.1.0"
+    assert "pylint" in sarif_run["tool"]["driver"]["properties"]["tools"]
+    assert sarif_run["invocations"][0]["executionSuccessful"] is True
+    result = next(result for result in sarif_run["results"] if result["ruleId"] == "pylint/unused-import")
+    assert result["level"] == "warning"
+    assert result["locations"][0]["physicalLocation"] == {
+        "artifactLocation": {"uri": "pkg/mod.py"},
+        "region": {"startLine": 2, "startColumn": 1}
+    }
+
+
+def test_run_rejects_unknown_tools(tmp_path, capsys):
+    """Test that an unknown analysis is an error."""
+    assert run(parse([str(tmp_path), "--tools", "lint,coverage"])) == 2
+    assert "Unknown tool: coverage" in capsys.readouterr().err
@@ -0,0 +1,104 @@
+"""
+Test for job cancellation and deadlines.
+
+This file tests that cancelled and overdue jobs reach a terminal status
+and release their concurrency slot.
+"""
+
+import asyncio
+import time
+import pytest
+
+from quack.jobs.base import JobProcessor
+from quack.jobs.enums import JobStatus, JobType
+from quack.jobs.factory import JobFactory
+from quack.jobs.manager import JobManager
+from quack.jobs.scheduler import JobScheduler
+
+
+class HangingProcessor(JobProcessor):
+    """Processor that never finishes unless the code says so."""
+
+    cacheable = False
+
+    async def process(self, job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        if job.code != "quick":
+            await asyncio.sleep(60)
+        job.result = {"status": "success"}
+        job.status = JobStatus.COMPLETED
+        job.completed_at = time.time()
+
+
+@pytest.fixture(autouse=True)
+def processor(monkeypatch):
+    """Register a hanging processor for lint jobs."""
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, HangingProcessor())
+
+
+async def wait_for(jobs):
+    while not all(job.status.is_terminal() for job in jobs):
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_deadline_times_out_job_and_frees_slot():
+    """Test that a job past its deadline is timed out and the next one runs."""
+    manager = JobManager(
+        scheduler=JobScheduler(concurrency={JobType.LINT: 1}),
+        deadlines={JobType.LINT: 0.1}
+    )
+
+    hanging = manager.submit_job(JobType.LINT, "hang")
+    quick = manager.submit_job(JobType.LINT, "quick")
+    await asyncio.wait_for(wait_for([hanging, quick]), 5)
+
+    assert hanging.status == JobStatus.TIMED_OUT
+    assert "deadline" in hanging.error
+    assert quick.status == JobStatus.COMPLETED
+    assert manager.scheduler.running[JobType.LINT] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_running_job():
+    """Test that cancelling a running job frees its slot before returning."""
+    manager = JobManager(scheduler=JobScheduler(concurrency={JobType.LINT: 1}))
+
+    running = manager.submit_job(JobType.LINT, "hang")
+    await asyncio.sleep(0.05)
+    job = await manager.cancel_job(running.id)
+
+    assert job is running
+    assert job.status == JobStatus.CANCELLED
+    assert manager.scheduler.running[JobType.LINT] == 0
+    assert manager.list_jobs(status=JobStatus.CANCELLED)[0]["job_id"] == job.id
+
+
+@pytest.mark.asyncio
+async def test_cancel_queued_job():
+    """Test that a queued job is removed from the queue and never runs."""
+    manager = JobManager(scheduler=JobScheduler(concurrency={JobType.LINT: 1}))
+
+    running = manager.submit_job(JobType.LINT, "hang")
+    queued = manager.submit_job(JobType.LINT, "quick")
+    job = await manager.cancel_job(queued.id)
+
+    assert job.status == JobStatus.CANCELLED
+    assert job.started_at is None
+    assert manager.queue_position(queued.id) is None
+
+    await manager.cancel_job(running.id)
+    assert manager.scheduler.running[JobType.LINT] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancel_finished_or_unknown_job():
+    """Test that finished jobs are left alone and unknown jobs are reported."""
+    manager = JobManager()
+
+    job = manager.submit_job(JobType.LINT, "quick")
+    await wait_for([job])
+
+    assert (await manager.cancel_job(job.id)).status == JobStatus.COMPLETED
+    assert await manager.cancel_job("missing") is None
@@ -0,0 +1,84 @@
+"""
+Test for document sessions.
+
+This file tests versioning of documents and the detection of unchanged functions.
+"""
+
+import os
+
+import pytest
+
+from quack.jobs.documents import DocumentSessions, StaleVersionError, unchanged_functions
+from quack.jobs.enums import JobType
+from quack.jobs.source import SourceDocument
+from quack.jobs.workspaces import WorkspaceManager
+
+
+def test_sessions_number_versions():
+    """Test that versions are numbered automatically and stale versions are rejected."""
+    sessions = DocumentSessions()
+    
+    assert sessions.update("a.py", None, SourceDocument("x = 1\n")).version == 1
+    assert sessions.update("a.py", None, SourceDocument("x = 1\n")).version == 1
+    assert sessions.update("a.py", None, SourceDocument("x = 2\n")).version == 2
+    assert sessions.update("a.py", 5, SourceDocument("x = 3\n")).version == 5
+    with pytest.raises(StaleVersionError):
+        sessions.update("a.py", 4, SourceDocument("x = 4\n"))
+    with pytest.raises(StaleVersionError):
+        sessions.update("a.py", 5, SourceDocument("x = 4\n"))
+    sessions.close()
+
+
+def test_sessions_keep_newest_result_and_evict_least_recent():
+    """Test that older results never replace newer ones, and that sessions are bounded."""
+    sessions = DocumentSessions(max_documents=1)
+    session = sessions.update("a.py", 2, SourceDocument("x = 2\n"))
+    session.record(JobType.LINT, 2, SourceDocument("x = 2\n"), {"version": 2})
+    session.record(JobType.LINT, 1, SourceDocument("x = 1\n"), {"version": 1})
+    path = session.path(JobType.LINT)
+    
+    assert session.previous(JobType.LINT)[1] == {"version": 2}
+    sessions.update("b.py", None, SourceDocument("y = 1\n"))
+    assert sessions.get("a.py") is None
+    assert session.workspace is None
+    assert not os.path.exists(path)
+    sessions.close()
+
+
+def test_evicted_session_keeps_its_workspace_until_its_jobs_finish(tmp_path):
+    """Test that an evicted session with a queued job keeps its file, and its workspace counts against the budget."""
+    workspaces = WorkspaceManager(root=str(tmp_path / "ws"), disk_root=str(tmp_path / "disk"))
+    sessions = DocumentSessions(max_documents=1, workspaces=workspaces)
+    session = sessions.update("a.py", None, SourceDocument("x = 1\n"))
+    path = session.path(JobType.LINT)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("x = 1\n")
+    session.add_job()
+    assert workspaces.reserved == len("x = 1\n")
+    
+    sessions.update("b.py", None, SourceDocument("y = 1\n"))
+    assert sessions.get("a.py") is None
+    assert os.path.exists(path)
+    
+    session.finish_job()
+    assert session.workspace is None
+    assert not os.path.exists(path)
+    assert workspaces.reserved == 0
+    sessions.close()
+    workspaces.close()
+
+
+def test_unchanged_functions_follow_moved_definitions():
+    """Test that functions are matched by name and source, wherever they moved."""
+    old = SourceDocument("def f():\n    return 1\n\ndef g():\n    return 2\n")
+    new = SourceDocument("def e():\n    return 0\n\ndef f():\n    return 1\n\ndef g():\n    return 3\n")
+    
+    assert unchanged_functions(old, new) == {"f": ((1, 2), (4, 5))}
+
+
+def test_module_level_change_invalidates_every_function():
+    """Test that no function is reused once an import or global has changed."""
+    old = SourceDocument("import os\n\ndef helper():\n    return os.getcwd()\n")
+    new = SourceDocument("\n\ndef helper():\n    return os.getcwd()\n")
+    
+    assert unchanged_functions(old, new) == {}
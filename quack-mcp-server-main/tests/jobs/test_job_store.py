@@ -0,0 +1,182 @@
+"""
+Test for the job stores.
+
+This file tests the SQLite job store and its use by the job manager.
+"""
+
+import asyncio
+import time
+import pytest
+
+from quack.jobs.base import JobProcessor, LintJob, StaticAnalysisJob
+from quack.jobs.enums import JobStatus, JobType
+from quack.jobs.factory import JobFactory
+from quack.jobs.manager import JobManager
+from quack.jobs.scheduler import JobScheduler
+from quack.jobs.store import SqliteJobStore
+
+
+def finished(job, status=JobStatus.COMPLETED, completed_at=None):
+    """Mark a job as finished."""
+    job.status = status
+    job.started_at = job.submitted_at
+    job.completed_at = completed_at or time.time()
+    if status == JobStatus.COMPLETED:
+        job.result = {"status": "success", "issues": []}
+    else:
+        job.error = "boom"
+    return job
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a fresh job database."""
+    return str(tmp_path / "jobs.db")
+
+
+def test_store_survives_restart(db_path):
+    """Test that finished jobs can be read back by a new store."""
+    store = SqliteJobStore(db_path)
+    job = finished(LintJob("job-1", "x = 1\n"))
+    job.options = {"file_id": "x.py"}
+    store.add(job)
+    store.close()
+
+    store = SqliteJobStore(db_path)
+    restored = store.get("job-1")
+
+    assert restored is not None
+    assert isinstance(restored, LintJob)
+    assert restored.status == JobStatus.COMPLETED
+    assert restored.result == job.result
+    assert restored.code == "x = 1\n"
+    assert restored.options == {"file_id": "x.py"}
+    store.close()
+
+
+def test_store_lists_with_filters_and_pagination(db_path):
+    """Test listing by type and status, newest first, in pages."""
+    store = SqliteJobStore(db_path, hot_size=2)
+    for i in range(6):
+        job = LintJob(f"lint-{i}", "x = 1\n") if i % 2 == 0 else StaticAnalysisJob(f"mypy-{i}", "x = 1\n")
+        job.submitted_at = 1000.0 + i
+        store.add(finished(job, JobStatus.COMPLETED if i < 4 else JobStatus.FAILED))
+    pending = LintJob("pending", "x = 1\n")
+    pending.submitted_at = 2000.0
+    store.add(pending)
+
+    assert [job.id for job in store.list(limit=3)] == ["pending", "mypy-5", "lint-4"]
+    assert [job.id for job in store.list(limit=2, offset=3)] == ["mypy-3", "lint-2"]
+    assert [job.id for job in store.list(job_type=JobType.LINT, status=JobStatus.COMPLETED)] == ["lint-2", "lint-0"]
+    assert store.count(status=JobStatus.FAILED) == 2
+    assert store.count(job_type=JobType.LINT) == 4
+    assert store.counts_by("status") == {"completed": 4, "failed": 2, "pending": 1}
+    assert len(store.recent) == 2
+    store.close()
+
+
+def test_store_purges_expired_jobs(db_path):
+    """Test that only finished jobs older than the cut-off are purged."""
+    store = SqliteJobStore(db_path)
+    store.add(finished(LintJob("old", "x = 1\n"), completed_at=100.0))
+    store.add(finished(LintJob("new", "x = 1\n")))
+    store.add(LintJob("pending", "x = 1\n"))
+
+    assert store.purge(older_than=1000.0) == 1
+    assert store.get("old") is None
+    assert store.get("new") is not None
+    assert store.get("pending") is not None
+    store.close()
+
+
+def test_store_aggregates_usage_per_type(db_path):
+    """Test that resource usage is persisted and aggregated by job type."""
+    store = SqliteJobStore(db_path)
+    for i, cpu_time in enumerate([1.0, 3.0]):
+        job = finished(LintJob(f"lint-{i}", "x = 1\n"))
+        job.record_usage({"cpu_time": cpu_time, "peak_rss_kb": 1000 * (i + 1), "output_bytes": 10})
+        store.add(job)
+    store.add(finished(StaticAnalysisJob("cached", "x = 1\n")))
+    store.close()
+
+    store = SqliteJobStore(db_path)
+    assert store.get("lint-1").usage.peak_rss_kb == 2000
+    assert store.get("cached").usage is None
+    assert store.usage_by_type() == {
+        "lint": {
+            "jobs": 2,
+            "cpu_time": 4.0,
+            "avg_cpu_time": 2.0,
+            "max_cpu_time": 3.0,
+            "max_peak_rss_kb": 2000,
+            "output_bytes": 20
+        }
+    }
+    store.close()
+
+
+class QuickProcessor(JobProcessor):
+    """Processor that completes immediately."""
+
+    cacheable = False
+
+    async def process(self, job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        job.result = {"status": "success"}
+        job.status = JobStatus.COMPLETED
+        job.completed_at = time.time()
+
+
+@pytest.mark.asyncio
+async def test_manager_resumes_interrupted_jobs(db_path, monkeypatch):
+    """Test that jobs pending at shutdown are run after a restart."""
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, QuickProcessor())
+    store = SqliteJobStore(db_path)
+    store.add(LintJob("interrupted", "x = 1\n"))
+    store.close()
+
+    manager = JobManager(store=SqliteJobStore(db_path))
+    assert manager.resume_interrupted_jobs() == 1
+    while not manager.get_job("interrupted").status.is_terminal():
+        await asyncio.sleep(0.01)
+
+    manager.store.close()
+    store = SqliteJobStore(db_path)
+    assert store.get("interrupted").status == JobStatus.COMPLETED
+    store.close()
+
+
+class HangingProcessor(JobProcessor):
+    """Processor that never finishes."""
+
+    async def process(self, job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        await asyncio.sleep(60)
+
+
+@pytest.mark.asyncio
+async def test_closed_manager_returns_unfinished_jobs(db_path, monkeypatch):
+    """Test that a manager closed in a running process leaves no jobs owned by it."""
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, HangingProcessor())
+    manager = JobManager(
+        store=SqliteJobStore(db_path), scheduler=JobScheduler(concurrency={JobType.LINT: 1})
+    )
+    running = manager.submit_job(JobType.LINT, "x = 1\n")
+    queued = manager.submit_job(JobType.LINT, "x = 2\n")
+    await asyncio.sleep(0.01)
+    assert running.status == JobStatus.RUNNING
+
+    await manager.close()
+    manager.store.close()
+
+    # A new manager in the same process takes both jobs over
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, QuickProcessor())
+    manager = JobManager(store=SqliteJobStore(db_path))
+    assert manager.resume_interrupted_jobs() == 2
+    for job_id in (running.id, queued.id):
+        while not manager.get_job(job_id).status.is_terminal():
+            await asyncio.sleep(0.01)
+        assert manager.get_job(job_id).status == JobStatus.COMPLETED
+    manager.store.close()
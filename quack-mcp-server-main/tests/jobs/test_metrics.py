@@ -0,0 +1,93 @@
+"""
+Test for job metrics.
+
+This file tests the histograms, counters and Prometheus rendering.
+"""
+
+import asyncio
+import time
+import pytest
+
+from quack.jobs.base import JobProcessor
+from quack.jobs.enums import JobStatus, JobType
+from quack.jobs.factory import JobFactory
+from quack.jobs.manager import JobManager
+from quack.jobs.metrics import Histogram, Metrics
+from quack.jobs.scheduler import JobScheduler, QueueFullError
+
+
+class QuickProcessor(JobProcessor):
+    """Processor that completes after a short sleep."""
+
+    async def process(self, job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        await asyncio.sleep(0.02)
+        job.result = {"status": "success", "code": job.code}
+        job.status = JobStatus.COMPLETED
+        job.completed_at = time.time()
+
+
+@pytest.fixture(autouse=True)
+def processor(monkeypatch):
+    """Register a quick processor for lint jobs."""
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, QuickProcessor())
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test that observations land in the first bucket whose bound they do not exceed."""
+    histogram = Histogram([1, 2.5])
+    for value in (0.5, 1, 2, 10):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [("1", 2), ("2.5", 3), ("+Inf", 4)]
+    assert histogram.to_dict()["sum"] == 13.5
+
+
+@pytest.mark.asyncio
+async def test_manager_reports_jobs_to_metrics():
+    """Test counters, cache hit rate and histograms after a few jobs."""
+    metrics = Metrics()
+    manager = JobManager(scheduler=JobScheduler(concurrency={JobType.LINT: 1}, max_queue_depth=2), metrics=metrics)
+
+    jobs = [manager.submit_job(JobType.LINT, f"x = {i}\n") for i in range(3)]
+    assert manager.submit_job(JobType.LINT, "x = 0\n") is jobs[0]
+    with pytest.raises(QueueFullError):
+        manager.submit_job(JobType.LINT, "x = 3\n")
+    assert metrics.to_dict()["jobs"]["lint"]["queued"] == 2
+
+    while not all(job.status.is_terminal() for job in jobs):
+        await asyncio.sleep(0.01)
+    manager.submit_job(JobType.LINT, "x = 1\n")
+
+    stats = metrics.to_dict()
+    lint = stats["jobs"]["lint"]
+    assert lint["submitted"] == 6
+    assert lint["rejected"] == 1
+    assert lint["finished"] == {"completed": 4}
+    assert lint["queued"] == 0
+    assert lint["execution_seconds"]["count"] == 3
+    assert lint["execution_seconds"]["buckets"]["0.01"] == 0
+    assert lint["queue_wait_seconds"]["count"] == 3
+    assert lint["result_bytes"]["count"] == 3
+    assert stats["cache"] == {"hit": 1, "miss": 4, "coalesced": 1, "hit_rate": 0.3333}
+    assert stats["submissions_per_second"] > 0
+
+
+@pytest.mark.asyncio
+async def test_prometheus_rendering():
+    """Test that metrics render in the Prometheus text format."""
+    metrics = Metrics()
+    manager = JobManager(metrics=metrics)
+
+    job = manager.submit_job(JobType.LINT, "x = 1\n")
+    while not job.status.is_terminal():
+        await asyncio.sleep(0.01)
+
+    text = metrics.render_prometheus()
+    assert "# TYPE quack_job_execution_seconds histogram" in text
+    assert 'quack_jobs_submitted_total{job_type="lint"} 1' in text
+    assert 'quack_jobs_finished_total{job_type="lint",status="completed"} 1' in text
+    assert 'quack_job_execution_seconds_bucket{job_type="lint",le="+Inf"} 1' in text
+    assert 'quack_job_execution_seconds_count{job_type="lint"} 1' in text
+    assert text.endswith("\n")
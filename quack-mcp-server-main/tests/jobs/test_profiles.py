@@ -0,0 +1,137 @@
+"""
+Test for analysis profiles.
+
+This file tests that jobs of each profile are scheduled in their own pool,
+cached apart and reported separately in the metrics.
+"""
+
+import asyncio
+import time
+import pytest
+
+from quack.jobs.base import JobProcessor
+from quack.jobs.enums import JobStatus, JobType
+from quack.jobs.factory import JobFactory
+from quack.jobs.manager import JobManager
+from quack.jobs.profiles import DEFAULT_PROFILE, get_profile
+from quack.jobs.scheduler import JobScheduler
+
+
+class SleepingProcessor(JobProcessor):
+    """Cacheable processor that sleeps for the number of seconds given as code"""
+
+    def __init__(self):
+        self.runs = 0
+
+    def tool_info(self):
+        return {"tool": "sleep"}
+
+    async def process(self, job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        self.runs += 1
+        await asyncio.sleep(float(job.code))
+        job.result = {"profile": job.options.get("profile", DEFAULT_PROFILE)}
+        job.status = JobStatus.COMPLETED
+        job.completed_at = time.time()
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    """Register a sleeping processor for lint jobs."""
+    processor = SleepingProcessor()
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, processor)
+    return processor
+
+
+async def wait_for(jobs):
+    while not all(job.status.is_terminal() for job in jobs):
+        await asyncio.sleep(0.01)
+
+
+def test_get_profile():
+    """Test that profiles are looked up by name, with standard as the default."""
+    assert get_profile(None).name == DEFAULT_PROFILE
+    assert get_profile("FAST").name == "fast"
+    assert "--errors-only" in get_profile("fast").pylint_args
+    with pytest.raises(ValueError, match="Valid profiles are: fast, standard, thorough"):
+        get_profile("exhaustive")
+
+
+@pytest.mark.asyncio
+async def test_fast_jobs_do_not_wait_for_standard_jobs(processor):
+    """Test that each profile has its own concurrency pool."""
+    manager = JobManager(scheduler=JobScheduler(concurrency={JobType.LINT: 1}))
+
+    slow = [manager.submit_job(JobType.LINT, f"0.{i}{i}") for i in range(1, 4)]
+    fast = manager.submit_job(JobType.LINT, "0.01", options={"profile": "fast"})
+    await wait_for([fast])
+
+    assert all(not job.status.is_terminal() for job in slow[1:])
+    assert fast.queue_wait_time < 0.05
+    assert fast.options == {"profile": "fast"}
+    assert fast.to_dict()["profile"] == "fast"
+    stats = manager.get_stats()
+    assert stats["scheduler"]["limits"]["lint"] == 1
+    assert stats["profiles"]["fast"]["limits"]["lint"] == get_profile("fast").concurrency[JobType.LINT]
+
+    await wait_for(slow)
+    assert manager.queue_position(slow[-1].id) is None
+
+
+@pytest.mark.asyncio
+async def test_profiles_are_cached_apart(processor):
+    """Test that the same code is cached per profile, and naming the default profile changes nothing."""
+    manager = JobManager()
+
+    first = [
+        manager.submit_job(JobType.LINT, "0", options={"profile": profile})
+        for profile in ("fast", "standard", "thorough")
+    ]
+    await wait_for(first)
+    again = [
+        manager.submit_job(JobType.LINT, "0", options={"profile": "fast"}),
+        manager.submit_job(JobType.LINT, "0")
+    ]
+
+    assert processor.runs == 3
+    assert [job.result["profile"] for job in first] == ["fast", "standard", "thorough"]
+    assert all(job.cache_hit for job in again)
+    assert [job.result["profile"] for job in again] == ["fast", "standard"]
+    with pytest.raises(ValueError):
+        manager.submit_job(JobType.LINT, "0", options={"profile": "exhaustive"})
+
+
+@pytest.mark.asyncio
+async def test_document_sessions_are_kept_per_profile(processor):
+    """Test that versions of a document are numbered separately for each profile."""
+    manager = JobManager()
+
+    jobs = [
+        manager.submit_job(JobType.LINT, "0", options={"document_id": "doc.py"}),
+        manager.submit_job(JobType.LINT, "0.0", options={"document_id": "doc.py"}),
+        manager.submit_job(JobType.LINT, "0", options={"document_id": "doc.py", "profile": "fast"})
+    ]
+    await wait_for(jobs)
+
+    assert [job.options["version"] for job in jobs] == [1, 2, 1]
+    assert jobs[0].session is not jobs[2].session
+    manager.documents.close()
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_latency_per_profile(processor):
+    """Test that the latency of each profile is measured against its target."""
+    manager = JobManager()
+
+    jobs = [manager.submit_job(JobType.LINT, f"0.00{i}", options={"profile": "fast"}) for i in range(3)]
+    jobs.append(manager.submit_job(JobType.LINT, "0.001"))
+    await wait_for(jobs)
+
+    profiles = manager.metrics.to_dict()["profiles"]
+    assert profiles["fast"]["latency_target"] == get_profile("fast").latency_target
+    assert profiles["fast"]["jobs"]["lint"]["latency_seconds"]["count"] == 3
+    assert profiles["fast"]["jobs"]["lint"]["within_target"] == 1.0
+    assert profiles["standard"]["jobs"]["lint"]["latency_seconds"]["count"] == 1
+    text = manager.metrics.render_prometheus()
+    assert 'quack_job_latency_seconds_count{profile="fast",job_type="lint"} 3' in text
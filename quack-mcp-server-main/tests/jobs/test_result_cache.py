@@ -0,0 +1,99 @@
+"""
+Test for the result cache.
+
+This file tests result caching and coalescing of identical submissions.
+"""
+
+import asyncio
+import time
+import pytest
+
+from quack.jobs.base import JobProcessor
+from quack.jobs.cache import ResultCache, cache_key
+from quack.jobs.enums import JobStatus, JobType
+from quack.jobs.factory import JobFactory
+from quack.jobs.manager import JobManager
+
+
+class CountingProcessor(JobProcessor):
+    """Processor that records how often it runs."""
+
+    def __init__(self):
+        self.runs = 0
+
+    async def process(self, job) -> None:
+        self.runs += 1
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        await asyncio.sleep(0.05)
+        job.result = {"status": "success", "length": len(job.code)}
+        job.status = JobStatus.COMPLETED
+        job.completed_at = time.time()
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    """Register a counting processor for lint jobs."""
+    processor = CountingProcessor()
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, processor)
+    return processor
+
+
+def test_cache_key_depends_on_all_inputs():
+    """Test that job type, code and tool info all change the key."""
+    base = cache_key("lint", "x = 1\n", {"pylint": "1.0"})
+    assert base == cache_key("lint", "x = 1\n", {"pylint": "1.0"})
+    assert base != cache_key("static_analysis", "x = 1\n", {"pylint": "1.0"})
+    assert base != cache_key("lint", "x = 2\n", {"pylint": "1.0"})
+    assert base != cache_key("lint", "x = 1\n", {"pylint": "2.0"})
+
+
+def test_cache_lru_and_ttl():
+    """Test that the cache evicts least recently used and expired entries."""
+    cache = ResultCache(max_entries=2, ttl=60)
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    cache.get("a")
+    cache.put("c", {"n": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+
+    cache.ttl = 0
+    time.sleep(0.01)
+    assert cache.get("a") is None
+
+
+def test_cache_disk_tier_survives_restart(tmp_path):
+    """Test that results written to disk are found by a new cache."""
+    ResultCache(disk_dir=str(tmp_path)).put("key", {"n": 1})
+
+    cache = ResultCache(disk_dir=str(tmp_path))
+
+    assert cache.get("key") == {"n": 1}
+    assert cache.get_stats()["disk_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_identical_submissions_are_coalesced_and_cached(processor):
+    """Test that resubmitted code never starts a second processing run."""
+    manager = JobManager()
+
+    first = manager.submit_job(JobType.LINT, "x = 1\n")
+    second = manager.submit_job(JobType.LINT, "x = 1\n")
+    assert second is first
+
+    while not first.status.is_terminal():
+        await asyncio.sleep(0.01)
+    third = manager.submit_job(JobType.LINT, "x = 1\n")
+
+    assert processor.runs == 1
+    assert third.id != first.id
+    assert third.cache_hit
+    assert third.status == JobStatus.COMPLETED
+    assert third.result == first.result
+
+    stats = manager.get_stats()["cache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 1
@@ -0,0 +1,99 @@
+"""
+Test for the job scheduler.
+
+This file tests concurrency limits, priorities and backpressure.
+"""
+
+import asyncio
+import time
+import pytest
+
+from quack.jobs.base import JobProcessor
+from quack.jobs.enums import JobStatus, JobType
+from quack.jobs.factory import JobFactory
+from quack.jobs.manager import JobManager
+from quack.jobs.scheduler import JobScheduler, QueueFullError
+
+
+class SlowProcessor(JobProcessor):
+    """Processor that records concurrency and completion order."""
+
+    cacheable = False
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+        self.order = []
+
+    async def process(self, job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.05)
+        self.running -= 1
+        self.order.append(job.code)
+        job.result = {"status": "success"}
+        job.status = JobStatus.COMPLETED
+        job.completed_at = time.time()
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    """Register a slow processor for lint jobs."""
+    processor = SlowProcessor()
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, processor)
+    return processor
+
+
+async def wait_for(jobs):
+    while not all(job.status.is_terminal() for job in jobs):
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_is_respected(processor):
+    """Test that no more than the configured number of jobs run at once."""
+    manager = JobManager(scheduler=JobScheduler(concurrency={JobType.LINT: 2}))
+
+    jobs = [manager.submit_job(JobType.LINT, f"x = {i}\n") for i in range(6)]
+    await wait_for(jobs)
+
+    assert processor.max_running == 2
+    assert all(job.queue_wait_time is not None for job in jobs)
+    assert jobs[-1].queue_wait_time > jobs[0].queue_wait_time
+
+
+@pytest.mark.asyncio
+async def test_higher_priority_runs_first(processor):
+    """Test that queued jobs are started in priority order."""
+    manager = JobManager(scheduler=JobScheduler(concurrency={JobType.LINT: 1}))
+
+    jobs = [
+        manager.submit_job(JobType.LINT, "first"),
+        manager.submit_job(JobType.LINT, "low", priority=0),
+        manager.submit_job(JobType.LINT, "high", priority=5),
+    ]
+    assert manager.queue_position(jobs[2].id) == 0
+    assert manager.queue_position(jobs[1].id) == 1
+    assert manager.queue_position(jobs[0].id) is None
+
+    await wait_for(jobs)
+
+    assert processor.order == ["first", "high", "low"]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_with_retry_hint(processor):
+    """Test that submissions beyond the queue depth are rejected."""
+    manager = JobManager(scheduler=JobScheduler(concurrency={JobType.LINT: 1}, max_queue_depth=2))
+
+    jobs = [manager.submit_job(JobType.LINT, f"x = {i}\n") for i in range(3)]
+    with pytest.raises(QueueFullError) as excinfo:
+        manager.submit_job(JobType.LINT, "x = 99\n")
+
+    assert excinfo.value.retry_after >= 1
+    assert manager.count_jobs() == 3
+    assert manager.get_stats()["scheduler"]["rejected"] == 1
+
+    await wait_for(jobs)
@@ -0,0 +1,194 @@
+"""
+Test for the job queue shared through the SQLite job store.
+
+This file tests that processes sharing a job database run each other's
+jobs, answer for them and cancel them, and take over jobs of exited processes.
+"""
+
+import asyncio
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+import pytest
+
+from quack.jobs.base import JobProcessor, LintJob
+from quack.jobs.broker import JobBroker
+from quack.jobs.enums import JobStatus, JobType
+from quack.jobs.factory import JobFactory
+from quack.jobs.manager import JobManager
+from quack.jobs.scheduler import JobScheduler, QueueFullError
+from quack.jobs.store import SqliteJobStore
+
+
+class HangingProcessor(JobProcessor):
+    """Processor that never finishes unless the code says so."""
+
+    async def process(self, job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        if job.code != "quick":
+            await asyncio.sleep(60)
+        job.result = {"status": "success", "code": job.code}
+        job.status = JobStatus.COMPLETED
+        job.completed_at = time.time()
+
+
+@pytest.fixture(autouse=True)
+def processor(monkeypatch):
+    """Register a hanging processor for lint jobs."""
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, HangingProcessor())
+
+
+@pytest.fixture
+def processes(tmp_path):
+    """A front end that only submits jobs and a worker that runs them, sharing one database."""
+    path = str(tmp_path / "jobs.db")
+    front = JobManager(store=SqliteJobStore(path, worker="front"))
+    worker = JobManager(store=SqliteJobStore(path, worker="worker"))
+    brokers = JobBroker(front, execute=False), JobBroker(worker)
+    yield brokers
+    front.store.close()
+    worker.store.close()
+
+
+async def wait_for(manager, job_id):
+    while not manager.get_job(job_id).status.is_terminal():
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_jobs_submitted_by_another_process(processes):
+    """Test that a job submitted to one process is run by another and answered by both."""
+    front, worker = processes
+    job = front.manager.submit_job(JobType.LINT, "quick")
+    waiting = asyncio.create_task(front.manager.wait_for_jobs([job.id], timeout=5))
+
+    assert job.worker is None
+    assert worker.manager.get_job(job.id).status == JobStatus.PENDING
+    await worker.poll()
+    await asyncio.wait_for(wait_for(worker.manager, job.id), 5)
+    await front.poll()
+
+    assert job.status == JobStatus.COMPLETED
+    assert job.worker == "worker"
+    assert job.result == {"status": "success", "code": "quick"}
+    assert (await waiting)[0].status == JobStatus.COMPLETED
+    assert worker.manager.get_job(job.id).result == job.result
+    # Served from the front end's cache without reaching the queue
+    assert front.manager.submit_job(JobType.LINT, "quick").cache_hit
+    assert front.get_stats()["finished_elsewhere"] == 1
+    assert worker.get_stats()["claimed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelling_jobs_of_other_processes(processes):
+    """Test that queued jobs are cancelled at once and claimed ones by their worker."""
+    front, worker = processes
+    queued = front.manager.submit_job(JobType.LINT, "hang 1")
+    assert (await front.manager.cancel_job(queued.id)).status == JobStatus.CANCELLED
+    assert worker.manager.get_job(queued.id).status == JobStatus.CANCELLED
+
+    running = front.manager.submit_job(JobType.LINT, "hang 2")
+    await worker.poll()
+    assert (await front.manager.cancel_job(running.id)).status == JobStatus.PENDING
+    await worker.poll()
+    await front.poll()
+
+    assert running.status == JobStatus.CANCELLED
+    assert worker.manager.get_job(running.id).status == JobStatus.CANCELLED
+
+
+@pytest.mark.asyncio
+async def test_shared_queue_rejects_submissions_beyond_its_depth(tmp_path):
+    """Test that the number of unclaimed jobs is bounded."""
+    manager = JobManager(store=SqliteJobStore(str(tmp_path / "jobs.db")))
+    JobBroker(manager, max_queue_depth=1, execute=False)
+    manager.submit_job(JobType.LINT, "hang 1")
+
+    with pytest.raises(QueueFullError):
+        manager.submit_job(JobType.LINT, "hang 2")
+    manager.store.close()
+
+
+@pytest.mark.asyncio
+async def test_jobs_of_exited_processes_return_to_the_queue(tmp_path):
+    """Test that only jobs of exited processes on this host are taken over."""
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    path = str(tmp_path / "jobs.db")
+    store = SqliteJobStore(path)
+    for job_id, worker in (("orphaned", f"{socket.gethostname()}:{exited.pid}"), ("elsewhere", "elsewhere:1")):
+        job = LintJob(job_id, "quick")
+        job.worker = worker
+        store.add(job)
+    store.close()
+
+    manager = JobManager(store=SqliteJobStore(path, worker="worker"))
+    broker = JobBroker(manager)
+    await broker.poll()
+    await asyncio.wait_for(wait_for(manager, "orphaned"), 5)
+
+    assert manager.get_job("orphaned").worker == "worker"
+    assert manager.get_job("elsewhere").status == JobStatus.PENDING
+    assert manager.store.interrupted() == []
+    manager.store.close()
+
+
+@pytest.mark.asyncio
+async def test_workers_claim_for_the_free_slots_of_each_profile(tmp_path):
+    """Test that a full default scheduler does not keep jobs of other profiles from being claimed."""
+    path = str(tmp_path / "jobs.db")
+    front = JobManager(store=SqliteJobStore(path, worker="front"))
+    worker = JobManager(
+        scheduler=JobScheduler(concurrency={JobType.LINT: 1}), store=SqliteJobStore(path, worker="worker")
+    )
+    JobBroker(front, execute=False)
+    broker = JobBroker(worker)
+
+    standard = [front.submit_job(JobType.LINT, f"hang {index}") for index in range(2)]
+    fast = front.submit_job(JobType.LINT, "quick", options={"profile": "fast"})
+    await broker.poll()
+    await asyncio.wait_for(wait_for(worker, fast.id), 5)
+
+    assert worker.get_job(fast.id).status == JobStatus.COMPLETED
+    assert worker.get_job(standard[0].id).worker == "worker"
+    # The default scheduler has one slot, so the second standard job stays in the shared queue
+    assert worker.get_job(standard[1].id).worker is None
+    await worker.cancel_job(standard[0].id)
+    front.store.close()
+    worker.store.close()
+
+
+def test_claiming_does_not_wait_for_a_locked_database(tmp_path):
+    """Test that a process claims nothing rather than wait while another holds the write lock."""
+    path = str(tmp_path / "jobs.db")
+    store = SqliteJobStore(path, worker="worker")
+    store.add(LintJob("queued", "quick"))
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+
+    started = time.monotonic()
+    assert store.claim(JobType.LINT, 1) == []
+    assert time.monotonic() - started < 1
+
+    other.execute("ROLLBACK")
+    other.close()
+    assert [job.id for job in store.claim(JobType.LINT, 1)] == ["queued"]
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_other_processes_see_claimed_jobs_running(processes):
+    """Test that a job's start is written to the job database, not only its end."""
+    front, worker = processes
+    job = front.manager.submit_job(JobType.LINT, "hang")
+    await worker.poll()
+    while worker.manager.get_job(job.id).status == JobStatus.PENDING:
+        await asyncio.sleep(0.01)
+    await front.poll()
+
+    assert job.status == JobStatus.RUNNING
+    assert job.started_at is not None
+    await worker.manager.cancel_job(job.id)
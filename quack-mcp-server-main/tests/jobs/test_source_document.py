@@ -0,0 +1,53 @@
+"""
+Test for the shared source document.
+
+This file tests the line index and lazy parsing of submitted code.
+"""
+
+import pytest
+
+from quack.jobs.base import LintJob
+from quack.jobs.source import SourceDocument
+
+
+def test_line_lookup():
+    """Test that lines are looked up by one-based number, like tool output."""
+    document = SourceDocument("a = 1\r\nb = 2\rc = 3\nd = '\x0c'\n")
+
+    assert document.line_count == 4
+    assert [document.line(i) for i in range(0, 6)] == [None, "a = 1", "b = 2", "c = 3", "d = '\x0c'", None]
+
+
+def test_offsets_and_positions():
+    """Test conversion between offsets and (line, column) positions."""
+    text = "x = 1\ny = 2\n"
+    document = SourceDocument(text)
+
+    assert document.offset(2, 4) == text.index("2")
+    assert document.position(text.index("2")) == (2, 4)
+    assert document.position(0) == (1, 0)
+    with pytest.raises(IndexError):
+        document.offset(3)
+
+
+def test_lazy_parse():
+    """Test that the AST, tokens and hash are available and cached."""
+    document = SourceDocument("def f(x):\n    return x\n")
+
+    assert document.syntax_error is None
+    assert document.ast is document.ast
+    assert document.ast.body[0].name == "f"
+    assert document.tokens[0].string == "def"
+    assert len(document.content_hash) == 64
+
+    broken = SourceDocument("def f(:\n")
+    assert broken.ast is None
+    assert broken.syntax_error.lineno == 1
+
+
+def test_job_shares_document():
+    """Test that a job builds its document once."""
+    job = LintJob("job-1", "x = 1\n")
+
+    assert job.document is job.document
+    assert job.document.line(1) == "x = 1"
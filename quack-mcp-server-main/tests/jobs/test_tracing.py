@@ -0,0 +1,105 @@
+"""
+Test for job tracing.
+
+This file tests spans, worker timings and the Chrome trace export.
+"""
+
+import json
+import pytest
+
+from quack.jobs.base import LintJob
+from quack.jobs.enums import JobStatus, JobType
+from quack.jobs.factory import JobFactory
+from quack.jobs.manager import JobManager
+from quack.jobs.store import SqliteJobStore
+from quack.jobs.tracing import Trace, chrome_trace
+from quack.processors.lint import LintJobProcessor
+
+
+def test_span_is_recorded_when_the_block_raises():
+    """Test that a failing stage still records its span and attributes."""
+    trace = Trace()
+    with pytest.raises(ValueError):
+        with trace.span("parse_output", output_bytes=3) as span:
+            span["messages"] = 1
+            raise ValueError("bad output")
+
+    assert [span.to_dict() for span in trace.spans] == [{
+        "name": "parse_output",
+        "start": trace.spans[0].start,
+        "duration": round(trace.spans[0].duration, 6),
+        "attributes": {"output_bytes": 3, "messages": 1}
+    }]
+
+
+def test_worker_timing_becomes_spans():
+    """Test that a worker response's timing is split into wait, spawn and run spans."""
+    trace = Trace()
+    trace.add_timing("pylint", {"submitted": 10.0, "acquired": 10.5, "spawned": 11.0, "finished": 13.0, "handler": 1.5})
+    trace.add_timing("pylint", None)
+
+    spans = trace.to_list(origin=10.0)
+    assert [(span["name"], span["offset"], span["duration"]) for span in spans] == [
+        ("wait_for_worker", 0.0, 0.5),
+        ("spawn_worker", 0.5, 0.5),
+        ("pylint", 1.0, 2.0)
+    ]
+    assert spans[2]["attributes"] == {"overhead": 0.5}
+
+
+def test_chrome_trace_export():
+    """Test that traces export as complete events with one process per job and one thread per lane."""
+    job = LintJob("job-1", "x = 1\n")
+    job.trace.add("queued", 1.0, 1.25)
+    sub_trace = Trace()
+    sub_trace.add("pytest", 1.5, 2.0, lane=1)
+    job.trace.merge(sub_trace, prefix="test", lane_offset=100)
+
+    trace = json.loads(json.dumps(chrome_trace([job])))
+
+    events = trace["traceEvents"]
+    assert events[0] == {"name": "process_name", "ph": "M", "pid": 1, "tid": 0, "args": {"name": "lint:job-1"}}
+    assert [event["tid"] for event in events if event["name"] == "thread_name"] == [0, 101]
+    complete = [event for event in events if event["ph"] == "X"]
+    assert [(event["name"], event["ts"], event["dur"], event["tid"]) for event in complete] == [
+        ("queued", 1000000.0, 250000.0, 0),
+        ("test.pytest", 1500000.0, 500000.0, 101)
+    ]
+
+
+def test_store_persists_traces(tmp_path):
+    """Test that traces survive a restart of the job store."""
+    store = SqliteJobStore(str(tmp_path / "jobs.db"))
+    job = LintJob("job-1", "x = 1\n")
+    with job.trace.span("write_file", path="x.py"):
+        pass
+    job.trace.add("pytest", 2.0, 3.0, lane=2)
+    job.status = JobStatus.COMPLETED
+    store.add(job)
+    store.close()
+
+    store = SqliteJobStore(str(tmp_path / "jobs.db"))
+    assert store.get("job-1").trace.to_list() == job.trace.to_list()
+    store.close()
+
+
+@pytest.mark.asyncio
+async def test_lint_job_records_stage_spans(monkeypatch):
+    """Test that a lint job run by the manager records each of its stages."""
+    processor = LintJobProcessor(pool_size=1)
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, processor)
+    manager = JobManager()
+    try:
+        job = manager.submit_job(JobType.LINT, "import os\n")
+        await manager.wait_for_jobs([job.id], timeout=60)
+    finally:
+        processor.close()
+
+    assert job.status == JobStatus.COMPLETED
+    names = [span["name"] for span in job.trace.to_list()]
+    for name in ("precheck", "queued", "process", "write_file", "pylint_request", "wait_for_worker",
+                 "spawn_worker", "pylint", "parse_output", "add_line_content", "categorize"):
+        assert name in names
+    spans = {span.name: span for span in job.trace.spans}
+    assert spans["process"].start <= spans["pylint"].start
+    assert spans["pylint"].start + spans["pylint"].duration <= spans["process"].start + spans["process"].duration
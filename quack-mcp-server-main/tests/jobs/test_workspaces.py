@@ -0,0 +1,66 @@
+"""
+Test for job workspaces.
+
+This file tests reuse of workspaces, the size budget and removal of leftovers.
+"""
+
+import os
+import subprocess
+import sys
+
+from quack.jobs.workspaces import WorkspaceManager, remove_stale, write_module
+
+
+def test_released_workspaces_are_emptied_and_reused_under_new_paths(tmp_path):
+    """Test that a reused workspace is empty and never has a path used before."""
+    manager = WorkspaceManager(root=str(tmp_path / "memory"), disk_root=str(tmp_path / "disk"))
+    first = manager.acquire(10)
+    path = write_module(first, "x = 1\n")
+    os.makedirs(os.path.join(first, "pkg"))
+    manager.release(first)
+
+    second = manager.acquire(10)
+
+    assert second != first
+    assert not os.path.exists(path)
+    assert os.listdir(second) == []
+    assert os.path.basename(path) == f"{os.path.basename(first)}.py"
+    stats = manager.get_stats()
+    assert (stats["created"], stats["reused"], stats["in_use"]) == (1, 1, 1)
+    manager.close()
+    assert not os.path.exists(manager.directory)
+
+
+def test_workspaces_beyond_budget_go_to_disk(tmp_path):
+    """Test that workspaces exceeding the budget are created on disk and not reused."""
+    manager = WorkspaceManager(root=str(tmp_path / "memory"), budget=100, disk_root=str(tmp_path / "disk"))
+    within = manager.acquire(60)
+    beyond = manager.acquire(60)
+
+    assert within.startswith(manager.directory)
+    assert beyond.startswith(manager.disk_directory)
+    assert manager.get_stats()["reserved_bytes"] == 60
+    manager.release(beyond)
+    manager.release(within)
+
+    assert not os.path.exists(beyond)
+    stats = manager.get_stats()
+    assert (stats["overflowed"], stats["idle"], stats["reserved_bytes"], stats["peak_reserved_bytes"]) == (1, 1, 0, 60)
+    manager.close()
+
+
+def test_startup_removes_workspaces_of_exited_processes(tmp_path):
+    """Test that directories of dead processes are removed and live ones are kept."""
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    root = tmp_path / "memory"
+    os.makedirs(root / str(exited.pid) / "ws_1")
+    os.makedirs(root / str(os.getppid()))
+    os.makedirs(root / "notes")
+
+    manager = WorkspaceManager(root=str(root), disk_root=str(tmp_path / "disk"))
+
+    assert manager.stale_removed == 1
+    assert sorted(os.listdir(root)) == sorted([str(os.getppid()), str(os.getpid()), "notes"])
+    assert remove_stale(str(root)) == 0
+    manager.close()
@@ -0,0 +1,74 @@
+"""
+Test for the analyze_all processor.
+
+This file tests running several processors over one shared workspace.
+"""
+
+import asyncio
+import pytest
+
+from quack.processors.composite import AnalyzeAllJobProcessor
+from quack.processors.lint import LintJobProcessor
+from quack.processors.static_analysis import StaticAnalysisJobProcessor
+from quack.processors.test_job_processor import TestJobProcessor
+from quack.jobs.enums import JobStatus, JobType
+from quack.jobs.base import AnalyzeAllJob, JobProcessor
+
+CODE = '''"""Example module."""
+
+
+def add(a: int, b: int) -> int:
+    """Add two numbers."""
+    return a + b
+
+
+def test_add() -> None:
+    """Test add."""
+    assert add(2, 3) == 5
+    total: str = add(2, 3)
+'''
+
+
+@pytest.fixture
+def processors(tmp_path):
+    """Create the processors run by analyze_all jobs."""
+    processors = {
+        JobType.LINT: LintJobProcessor(pool_size=1),
+        JobType.STATIC_ANALYSIS: StaticAnalysisJobProcessor(cache_dir=str(tmp_path / "cache")),
+        JobType.TEST: TestJobProcessor(pool_size=1)
+    }
+    yield processors
+    for processor in processors.values():
+        processor.close()
+
+
+def test_analyze_all_merges_results(processors):
+    """Test that every processor runs and reports its result and timing."""
+    job = AnalyzeAllJob("analyze-1", CODE)
+
+    asyncio.run(AnalyzeAllJobProcessor(processors).process(job))
+
+    assert job.status == JobStatus.COMPLETED, job.error
+    analyses = job.result["analyses"]
+    assert set(analyses) == {"lint", "static_analysis", "test"}
+    for analysis in analyses.values():
+        assert analysis["status"] == "completed"
+        assert analysis["execution_time"] > 0
+    assert analyses["static_analysis"]["results"]["issues"][0]["line_content"] == "    total: str = add(2, 3)"
+    assert analyses["test"]["results"]["summary"]["passed"] == 1
+
+
+def test_analyze_all_reports_failed_processor(processors):
+    """Test that a processor without shared-file support is reported as failed."""
+    class ProcessOnly(TestJobProcessor):
+        process_file = JobProcessor.process_file
+
+    processors[JobType.TEST] = ProcessOnly()
+    job = AnalyzeAllJob("analyze-2", CODE)
+
+    asyncio.run(AnalyzeAllJobProcessor(processors).process(job))
+
+    assert job.status == JobStatus.COMPLETED
+    assert job.result["status"] == "partial"
+    assert job.result["summary"]["failed"] == ["test"]
+    assert "cannot process a shared file" in job.result["analyses"]["test"]["error"]
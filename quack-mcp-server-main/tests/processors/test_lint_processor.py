@@ -10,6 +10,7 @@ from pathlib import Path
 from quack.processors.lint import LintJobProcessor
 from quack.jobs.enums import JobStatus, JobType
 from quack.jobs.base import LintJob
+from quack.workers.pool import WorkerTimeoutError
 
 def test_lint_processor_initialization():
     """Test that the lint processor can be initialized."""
@@ -44,3 +45,187 @@ def test_lint_processor_process():
     
     # We expect issues in the example code
     assert result["summary"]["total_issues"] > 0
+
+def test_lint_processor_batches_jobs():
+    """Test that batched jobs get the same results as separately linted jobs."""
+    snippets = [f"import os\nx{i} = undefined_{i}\n" for i in range(6)] + ["def broken(:\n"]
+    
+    def lint_all(processor):
+        import asyncio
+        jobs = [LintJob(job_id=f"batch-{i}", code=code) for i, code in enumerate(snippets)]
+        
+        async def run():
+            await asyncio.gather(*(processor.process(job) for job in jobs))
+        
+        asyncio.run(run())
+        processor.close()
+        return jobs
+    
+    batched_processor = LintJobProcessor(pool_size=1, batch_window=0.05, max_batch_size=4)
+    batched = lint_all(batched_processor)
+    separate = lint_all(LintJobProcessor(pool_size=1))
+    
+    assert batched_processor.get_stats()["batches"] == 2
+    for batched_job, separate_job in zip(batched, separate):
+        assert batched_job.status == JobStatus.COMPLETED
+        assert batched_job.result["summary"] == separate_job.result["summary"]
+    assert batched[-1].result["errors"][0]["symbol"] == "syntax-error"
+
+class FakePool:
+    """Pool answering lint requests without pylint, timing out on files marked slow."""
+    
+    def __init__(self, hang=False):
+        self.hang = hang
+        self.requests = []
+        self.cancelled = 0
+    
+    async def submit(self, payload, timeout=None):
+        import asyncio
+        self.requests.append(len(payload["paths"]))
+        try:
+            if self.hang:
+                await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if any("slow" in Path(path).read_text() for path in payload["paths"]):
+            raise WorkerTimeoutError("Worker timed out")
+        return {"ok": True, "output": "[]"}
+
+def lint_with_fake_pool(pool, snippets, cancel=False):
+    """Lint snippets in one batch on a fake pool, optionally cancelling them while pylint runs."""
+    import asyncio
+    processor = LintJobProcessor(pool_size=1, batch_window=0.01)
+    processor.pool.close()
+    processor.pool = pool
+    jobs = [LintJob(job_id=f"fake-{i}", code=code) for i, code in enumerate(snippets)]
+    
+    async def run():
+        tasks = [asyncio.create_task(processor.process(job)) for job in jobs]
+        if cancel:
+            while not pool.requests:
+                await asyncio.sleep(0.01)
+            for task in tasks:
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.sleep(0.05)
+        # Before the loop closes, which would cancel any run still going
+        return pool.cancelled
+    
+    cancelled = asyncio.run(run())
+    return processor, jobs, cancelled
+
+def test_lint_processor_relints_files_of_timed_out_batch_alone():
+    """Test that one slow file only times out its own job."""
+    processor, jobs, _ = lint_with_fake_pool(FakePool(), ["x = 1\n", "slow = 1\n", "y = 2\n"])
+    
+    assert [job.status for job in jobs] == [JobStatus.COMPLETED, JobStatus.TIMED_OUT, JobStatus.COMPLETED]
+    assert processor.pool.requests == [3, 1, 1, 1]
+    assert processor.get_stats()["batch_retries"] == 1
+
+def test_lint_processor_stops_batch_of_cancelled_jobs():
+    """Test that cancelling every job of a batch stops its pylint run."""
+    pool = FakePool(hang=True)
+    processor, jobs, cancelled = lint_with_fake_pool(pool, ["x = 1\n", "y = 2\n"], cancel=True)
+    
+    assert pool.requests == [2]
+    assert cancelled == 1
+
+def test_lint_processor_reuses_findings_of_unchanged_functions():
+    """Test that incremental linting of a document matches a full run."""
+    import asyncio
+    from quack.jobs.documents import DocumentSessions
+    from quack.jobs.source import SourceDocument
+    
+    helpers = "\n\n".join(
+        f"def helper_{i}(values):\n    unused = os.getcwd()\n    return sum(values) * {i}\n" for i in range(3)
+    )
+    versions = [
+        f"import os\n\n\n{helpers}\n\ndef target(x):\n    return x + 1\n",
+        f"import os\n\n\n{helpers}\n\ndef target(x):\n    return x + undefined_name\n"
+    ]
+    sessions = DocumentSessions()
+    processor = LintJobProcessor(pool_size=1)
+    
+    def messages(result):
+        return sorted(
+            (message["line"], message["symbol"], message["obj"])
+            for category in ("errors", "warnings", "refactors", "conventions")
+            for message in result[category]
+        )
+    
+    try:
+        for version, code in enumerate(versions, 1):
+            job = LintJob(job_id=f"doc-{version}", code=code)
+            job.options = {"document_id": "doc.py", "version": version}
+            job.session = sessions.update("doc.py", version, SourceDocument(code))
+            full = LintJob(job_id=f"full-{version}", code=code)
+            asyncio.run(processor.process(job))
+            asyncio.run(processor.process(full))
+            
+            assert job.status == JobStatus.COMPLETED
+            assert messages(job.result) == messages(full.result)
+        
+        assert job.result["incremental"]["reused_functions"] == ["helper_0", "helper_1", "helper_2"]
+        assert job.result["errors"][0]["line_content"] == "    return x + undefined_name"
+    finally:
+        processor.close()
+        sessions.close()
+
+def test_lint_processor_relints_functions_after_module_level_change():
+    """Test that removing an import a reused function needs is reported as in a full run."""
+    import asyncio
+    from quack.jobs.documents import DocumentSessions
+    from quack.jobs.source import SourceDocument
+    
+    versions = [
+        "import os\n\n\ndef helper():\n    return os.getcwd()\n",
+        "\n\n\ndef helper():\n    return os.getcwd()\n"
+    ]
+    sessions = DocumentSessions()
+    processor = LintJobProcessor(pool_size=1)
+    try:
+        for version, code in enumerate(versions, 1):
+            job = LintJob(job_id=f"module-{version}", code=code)
+            job.options = {"document_id": "module.py", "version": version}
+            job.session = sessions.update("module.py", version, SourceDocument(code))
+            asyncio.run(processor.process(job))
+        
+        assert job.result["incremental"]["reused_functions"] == []
+        assert [(message["line"], message["symbol"]) for message in job.result["errors"]] == [
+            (5, "undefined-variable")
+        ]
+    finally:
+        processor.close()
+        sessions.close()
+
+def test_lint_processor_applies_profiles():
+    """Test that fast jobs only report errors, on their own workers, and thorough jobs load extensions."""
+    import asyncio
+    
+    code = '"""Module."""\nimport os\n\n\ndef double(x):\n    """Double x."""\n    value = 1\n    value = "s"\n    return undefined_name + x\n'
+    processor = LintJobProcessor(pool_size=1, batch_window=0.02)
+    
+    async def run():
+        jobs = {}
+        for profile in ("fast", "standard", "thorough"):
+            jobs[profile] = LintJob(job_id=f"profile-{profile}", code=code)
+            jobs[profile].options = {"profile": profile}
+        await asyncio.gather(*(processor.process(job) for job in jobs.values()))
+        return {profile: {
+            message["symbol"]
+            for category in ("errors", "warnings", "refactors", "conventions")
+            for message in job.result[category]
+        } for profile, job in jobs.items()}
+    
+    try:
+        symbols = asyncio.run(run())
+    finally:
+        processor.close()
+    
+    assert symbols["fast"] == {"undefined-variable"}
+    assert {"undefined-variable", "unused-import"} <= symbols["standard"]
+    assert "redefined-variable-type" not in symbols["standard"]
+    assert symbols["standard"] | {"redefined-variable-type"} <= symbols["thorough"]
+    assert processor.pool_for("fast").get_stats()["jobs_served"] == 1
+    assert processor.pool_for("thorough") is processor.pool
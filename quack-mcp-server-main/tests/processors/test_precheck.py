@@ -0,0 +1,71 @@
+"""
+Test for the in-process precheck.
+
+This file tests the syntax and pyflakes checks run before jobs are queued.
+"""
+
+import pytest
+
+from quack.processors.lint import LintJobProcessor
+from quack.processors.precheck import run_precheck
+from quack.jobs.enums import JobStatus, JobType
+from quack.jobs.factory import JobFactory
+from quack.jobs.manager import JobManager
+from quack.jobs.source import SourceDocument
+
+
+def test_precheck_reports_syntax_error():
+    """Test that a parse error is reported with its position."""
+    result = run_precheck(SourceDocument("x = 1\ndef broken(:\n    pass\n"))
+
+    assert result["status"] == "syntax_error"
+    assert result["syntax_error"]["line"] == 2
+    assert result["syntax_error"]["line_content"] == "def broken(:"
+
+
+def test_precheck_reports_compile_error():
+    """Test that errors raised only by the compiler are caught too."""
+    result = run_precheck(SourceDocument("return 1\n"))
+
+    assert result["status"] == "syntax_error"
+    assert "outside function" in result["syntax_error"]["message"]
+
+
+def test_precheck_runs_pyflakes():
+    """Test that pyflakes findings are returned for valid code."""
+    result = run_precheck(SourceDocument("import os\n\ndef f():\n    return undefined_name\n"))
+
+    assert result["status"] == "success"
+    assert [issue["type"] for issue in result["issues"]] == ["UnusedImport", "UndefinedName"]
+    assert result["issues"][1]["line_content"] == "    return undefined_name"
+
+
+@pytest.mark.asyncio
+async def test_manager_fails_fast_on_syntax_error(monkeypatch):
+    """Test that code that does not compile is failed without being queued."""
+    processor = LintJobProcessor(pool_size=1)
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, processor)
+    manager = JobManager()
+
+    job = manager.submit_job(JobType.LINT, "def broken(:\n")
+
+    assert job.status == JobStatus.FAILED
+    assert job.error.startswith("Syntax error:")
+    assert job.quick_result["syntax_error"]["line"] == 1
+    assert manager.scheduler.get_stats()["running"] == {}
+    assert processor.pool.get_stats()["workers_started"] == 0
+    processor.close()
+
+
+@pytest.mark.asyncio
+async def test_manager_only_compiles_on_submission(monkeypatch):
+    """Test that submitting a job does not run pyflakes on the event loop."""
+    processor = LintJobProcessor(pool_size=1)
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, processor)
+    manager = JobManager()
+
+    job = manager.submit_job(JobType.LINT, "import os\n")
+
+    assert job.quick_result == {"status": "success", "syntax_error": None, "pyflakes": False, "issues": []}
+    await manager.cancel_job(job.id)
+    processor.close()
@@ -0,0 +1,102 @@
+"""
+Test for the project processor.
+
+This file tests analysing multi-file projects in one workspace.
+"""
+
+import asyncio
+import base64
+import io
+import tarfile
+import pytest
+
+from quack.processors.lint import LintJobProcessor
+from quack.processors.static_analysis import StaticAnalysisJobProcessor
+from quack.processors.project import ProjectJobProcessor, files_from_tarball, validate_files
+from quack.jobs.enums import JobStatus
+from quack.jobs.base import ProjectJob
+
+PROJECT = {
+    "pkg/__init__.py": "",
+    "pkg/util.py": '"""Utilities."""\n\n\ndef double(value: int) -> int:\n    """Double a value."""\n    return value * 2\n',
+    "pkg/main.py": '"""Entry point."""\nfrom pkg.util import double\n\nRESULT: str = double(2)\n',
+}
+
+
+@pytest.fixture
+def processor(tmp_path):
+    """Create a project processor with its own lint and mypy backends."""
+    lint_processor = LintJobProcessor(pool_size=1)
+    static_processor = StaticAnalysisJobProcessor(cache_dir=str(tmp_path / "cache"))
+    yield ProjectJobProcessor(lint_processor, static_processor)
+    lint_processor.close()
+    static_processor.close()
+
+
+def test_project_processor_groups_results_per_file(processor):
+    """Test that cross-module type errors are found and reported per file."""
+    job = ProjectJob("project-1", ProjectJob.encode_files(PROJECT))
+
+    asyncio.run(processor.process(job))
+
+    assert job.status == JobStatus.COMPLETED, job.error
+    assert sorted(job.result["files"]) == sorted(PROJECT)
+    assert job.result["summary"]["file_count"] == 3
+
+    issues = job.result["files"]["pkg/main.py"]["static_analysis"]["issues"]
+    assert len(issues) == 1
+    assert issues[0]["line"] == 4
+    assert issues[0]["line_content"] == "RESULT: str = double(2)"
+    assert job.result["files"]["pkg/util.py"]["static_analysis"]["issues"] == []
+    assert job.result["summary"]["type_issue_count"] == 1
+
+
+def test_project_processor_maps_mypy_paths_relative_to_cwd(processor, monkeypatch):
+    """Test that issues are kept when mypy reports paths relative to its working directory."""
+    monkeypatch.chdir(processor.lint_processor.workspaces.directory)
+    job = ProjectJob("project-2", ProjectJob.encode_files(PROJECT))
+
+    asyncio.run(processor.process(job))
+
+    assert job.status == JobStatus.COMPLETED, job.error
+    issues = job.result["files"]["pkg/main.py"]["static_analysis"]["issues"]
+    assert [issue["line"] for issue in issues] == [4]
+
+
+def test_project_processor_uses_profile_pylint_args(processor):
+    """Test that the project's profile selects the pylint checks."""
+    files = {**PROJECT, "pkg/names.py": "value = 1\n"}
+    conventions = {}
+    for profile in ("standard", "fast"):
+        job = ProjectJob(f"project-{profile}", ProjectJob.encode_files(files))
+        job.options["profile"] = profile
+
+        asyncio.run(processor.process(job))
+
+        assert job.status == JobStatus.COMPLETED, job.error
+        conventions[profile] = job.result["files"]["pkg/names.py"]["lint"]["conventions"]
+
+    assert conventions["standard"]
+    assert conventions["fast"] == []
+
+
+def test_files_from_tarball():
+    """Test that a tarball is read without extracting it to disk."""
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode="w:gz") as archive:
+        for path, source in PROJECT.items():
+            data = source.encode("utf-8")
+            info = tarfile.TarInfo(path)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+    files = files_from_tarball(base64.b64encode(buf.getvalue()).decode("ascii"))
+
+    assert files == PROJECT
+
+
+@pytest.mark.parametrize("path", ["/etc/passwd.py", "../escape.py", "pkg/../../escape.py", "notes.txt"])
+def test_validate_files_rejects_unsafe_paths(path):
+    """Test that paths outside the project or non-Python files are rejected."""
+    with pytest.raises(ValueError):
+        validate_files({path: "x = 1\n"})
@@ -40,3 +40,81 @@ def test_static_analysis_processor_process():
     
     # We expect issues in the example code
     assert len(result["issues"]) > 0
+
+def test_static_analysis_processor_without_daemon():
+    """Test that the cold mypy subprocess path still works."""
+    example_code_path = Path(__file__).parent.parent / "examples" / "example_code.py"
+    with open(example_code_path, "r") as f:
+        code = f.read()
+    
+    job = StaticAnalysisJob(job_id="test-job-3", code=code)
+    
+    processor = StaticAnalysisJobProcessor(use_daemon=False)
+    import asyncio
+    asyncio.run(processor.process(job))
+    
+    assert job.status == JobStatus.COMPLETED
+    assert len(job.result["issues"]) > 0
+    assert job.usage.cpu_time > 0
+    assert job.usage.peak_rss_kb > 0
+
+def test_static_analysis_processor_document_session():
+    """Test that versions of a document are checked at one stable path."""
+    from quack.jobs.documents import DocumentSessions
+    from quack.jobs.source import SourceDocument
+    import asyncio
+    
+    versions = ["def f(x: int) -> int:\n    return x\n", "def f(x: int) -> str:\n    return x\n"]
+    sessions = DocumentSessions()
+    processor = StaticAnalysisJobProcessor()
+    try:
+        for version, code in enumerate(versions, 1):
+            job = StaticAnalysisJob(job_id=f"doc-{version}", code=code)
+            job.options = {"document_id": "doc.py", "version": version}
+            job.session = sessions.update("doc.py", version, SourceDocument(code))
+            asyncio.run(processor.process(job))
+            assert job.status == JobStatus.COMPLETED
+        
+        assert job.result["incremental"] == {"document_id": "doc.py", "version": 2}
+        assert [issue["line"] for issue in job.result["issues"]] == [2]
+        assert job.session.previous(JobType.STATIC_ANALYSIS)[1] is job.result
+    finally:
+        processor.close()
+        sessions.close()
+
+def test_mypy_issues_keep_message_and_code_of_the_checked_file():
+    """Test that issues keep mypy's full message and code, and issues in imported modules are dropped."""
+    from quack.processors.static_analysis import mypy_issues
+    from quack.jobs.source import SourceDocument
+    
+    output = (
+        '/repo/pkg/mod.py:2:12: error: Incompatible return value type (got "int", expected "str")  [return-value]\n'
+        '/repo/pkg/other.py:1:1: error: Name "y" is not defined  [name-defined]'
+    )
+    issues = mypy_issues(output, SourceDocument("def f() -> str:\n    return 1\n"), path="/repo/pkg/mod.py")
+    
+    assert issues == [{
+        "line": 2,
+        "column": 12,
+        "message": 'error: Incompatible return value type (got "int", expected "str")  [return-value]',
+        "error_code": "return-value",
+        "line_content": "    return 1"
+    }]
+
+def test_static_analysis_processor_thorough_profile_is_strict():
+    """Test that thorough jobs are checked with strict mypy on daemons of their own."""
+    import asyncio
+    
+    code = "def double(x):\n    return x * 2\n"
+    processor = StaticAnalysisJobProcessor()
+    jobs = [StaticAnalysisJob(job_id=f"profile-{profile}", code=code) for profile in ("standard", "thorough")]
+    jobs[1].options = {"profile": "thorough"}
+    try:
+        for job in jobs:
+            asyncio.run(processor.process(job))
+    finally:
+        processor.close()
+    
+    assert jobs[0].status == JobStatus.COMPLETED
+    assert jobs[0].result["issues"] == []
+    assert [issue["error_code"] for issue in jobs[1].result["issues"]] == ["no-untyped-def"]
@@ -0,0 +1,64 @@
+"""
+Test for test impact analysis.
+
+This file tests how edits are mapped to the tests that must be rerun.
+"""
+
+from quack.jobs.source import SourceDocument
+from quack.processors.test_impact import ImpactMap, changed_functions, executed_functions
+
+SOURCE = """import math
+
+def area(r):
+    return math.pi * r * r
+
+class TestArea:
+    def test_unit(self):
+        assert area(1) == math.pi
+
+def test_zero():
+    assert area(0) == 0
+"""
+
+
+def test_changed_functions_in_method():
+    """Test that an edit inside a method marks only that method."""
+    new = SOURCE.replace("area(1) == math.pi", "area(1) > 3")
+
+    assert changed_functions(SourceDocument(SOURCE), SourceDocument(new)) == {"TestArea.test_unit"}
+
+
+def test_changed_functions_ignores_new_definitions():
+    """Test that adding a top-level test changes no existing function."""
+    new = SOURCE + "\ndef test_one():\n    assert area(1) > 3\n"
+
+    assert changed_functions(SourceDocument(SOURCE), SourceDocument(new)) == {"test_one"}
+
+
+def test_module_level_change_reruns_everything():
+    """Test that module-level and fixture edits invalidate every test."""
+    document = SourceDocument(SOURCE)
+    fixture = SOURCE.replace("def area(r):", "@pytest.fixture\ndef area(r):")
+
+    assert changed_functions(document, SourceDocument(SOURCE.replace("import math", "import cmath as math"))) is None
+    assert changed_functions(document, SourceDocument(fixture)) is None
+
+
+def test_impact_map_reuses_unaffected_passing_tests():
+    """Test that only passing tests that executed no changed function are reused."""
+    document = SourceDocument(SOURCE)
+    functions = executed_functions(document, {
+        "submission.py::TestArea::test_unit": [4, 8],
+        "submission.py::test_zero": [11]
+    })
+    tests = {
+        "submission.py::TestArea::test_unit": {"outcome": "passed"},
+        "submission.py::test_zero": {"outcome": "failed"}
+    }
+    impact_map = ImpactMap(document, tests, functions)
+
+    assert functions["submission.py::TestArea::test_unit"] == ["TestArea.test_unit", "area"]
+    edited = SourceDocument(SOURCE.replace("area(0) == 0", "area(0) == 0.0"))
+    assert list(impact_map.reusable(edited, ["TestArea", "test_zero"])) == ["submission.py::TestArea::test_unit"]
+    edited = SourceDocument(SOURCE.replace("* r * r", "* r ** 2"))
+    assert impact_map.reusable(edited, ["TestArea", "test_zero"]) == {}
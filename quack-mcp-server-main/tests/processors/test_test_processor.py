@@ -10,6 +10,8 @@ import asyncio
 
 # Import the module to be tested (make sure the processors directory is in PYTHONPATH)
 from quack.processors.test_job_processor import TestJobProcessor
+from quack.jobs.base import TestJob
+from quack.jobs.enums import JobStatus
 
 # Create an instance of TestJobProcessor
 test_job_processor = TestJobProcessor()
@@ -138,3 +140,68 @@ async def test_async_valid_submission(temp_submission_file):
     result = await test_job_processor.run_pytest_async(file_path)
     assert result.get("failed") == 0, f"Expected 0 failures in async execution, got: {result}"
     os.remove(file_path)
+
+@pytest.fixture
+def pooled_processor():
+    """Create a test processor with its own pytest workers."""
+    processor = TestJobProcessor(pool_size=2, timeout=5, shard_size=10)
+    yield processor
+    processor.close()
+
+def test_job_results_per_test(pooled_processor):
+    job = TestJob("test-job-1", failing_submission)
+    asyncio.run(pooled_processor.process(job))
+    assert job.status == JobStatus.COMPLETED, job.error
+    assert job.result["summary"]["failed"] == 1
+    test = job.result["tests"][0]
+    assert test["name"] == "test_add"
+    assert test["outcome"] == "failed"
+    assert test["duration"] > 0
+    assert "2 + 3 should equal 6" in test["message"]
+
+def test_job_sharded_across_workers(pooled_processor):
+    code = "\n".join(f"def test_{i}():\n    assert {i} == {i}\n" for i in range(25))
+    job = TestJob("test-job-2", code)
+    asyncio.run(pooled_processor.process(job))
+    assert job.result["shards"] == 2
+    assert job.result["summary"]["total"] == 25
+    assert job.result["summary"]["passed"] == 25
+    assert pooled_processor.pool.get_stats()["workers_started"] == 2
+
+def test_job_timeout_kills_worker(pooled_processor):
+    pooled_processor.timeout = 1
+    job = TestJob("test-job-3", "import time\n\ndef test_slow():\n    time.sleep(30)\n")
+    asyncio.run(pooled_processor.process(job))
+    assert job.status == JobStatus.TIMED_OUT
+    assert "timed out" in job.error
+    assert job.execution_time < 10
+
+impact_submission = '''
+def add(a, b):
+    return a + b
+
+def mul(a, b):
+    return a * b
+
+def test_add():
+    assert add(1, 2) == 3
+
+def test_mul():
+    assert mul(2, 3) == 6
+'''
+
+def test_job_reruns_only_affected_tests(pooled_processor):
+    first = TestJob("test-job-4", impact_submission)
+    first.options = {"file_id": "calc.py"}
+    asyncio.run(pooled_processor.process(first))
+    assert first.result["impact"]["mode"] == "full"
+    assert "lines" not in first.result["tests"][0]
+
+    second = TestJob("test-job-5", impact_submission.replace("return a * b", "return a * b + 1"))
+    second.options = {"file_id": "calc.py"}
+    asyncio.run(pooled_processor.process(second))
+    assert second.result["impact"] == {"file_id": "calc.py", "mode": "incremental", "rerun": 1, "reused": 1}
+    tests = {test["name"]: test for test in second.result["tests"]}
+    assert tests["test_add"]["reused"] is True
+    assert tests["test_mul"]["outcome"] == "failed"
+    assert "reused" not in tests["test_mul"]
@@ -0,0 +1,51 @@
+"""
+Integration test for analysis profiles.
+
+This test connects an in-memory MCP client to the Quack server and lints
+code with the fast profile.
+"""
+
+import json
+import pytest
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+import quack.server
+from quack.server import create_server
+
+CODE = '"""Module."""\nimport os\n\nprint(undefined_name)\n'
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Create a Quack server with a private job database."""
+    monkeypatch.setattr(quack.server, "JOB_DB_PATH", str(tmp_path / "jobs.db"))
+    return create_server()
+
+
+async def call(client, tool, arguments=None):
+    response = await client.call_tool(tool, arguments or {})
+    return json.loads(response.content[0].text)
+
+
+@pytest.mark.asyncio
+async def test_fast_profile_reports_errors_only(server):
+    """Test that a fast lint job only reports errors and its latency is reported per profile."""
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        profiles = await call(client, "list_profiles")
+        assert [profile["name"] for profile in profiles["profiles"]] == ["fast", "standard", "thorough"]
+
+        submitted = await call(client, "submit_code_for_linting", {"code": CODE, "profile": "fast"})
+        assert submitted["profile"] == "fast"
+        data = await call(client, "wait_for_jobs", {"job_ids": [submitted["job_id"]], "timeout": 60})
+        result = data["jobs"][submitted["job_id"]]
+
+        metrics = await call(client, "get_metrics")
+        invalid = await call(client, "submit_code", {"job_type": "lint", "code": CODE, "profile": "exhaustive"})
+
+    assert result["status"] == "completed"
+    assert result["profile"] == "fast"
+    assert result["results"]["summary"]["total_issues"] == 1
+    assert result["results"]["errors"][0]["symbol"] == "undefined-variable"
+    assert metrics["profiles"]["fast"]["jobs"]["lint"]["latency_seconds"]["count"] >= 1
+    assert invalid["status"] == "error"
@@ -0,0 +1,35 @@
+"""
+Integration test for the quick check of submissions.
+
+This test connects an in-memory MCP client to the Quack server and asks
+for the quick result of a submission.
+"""
+
+import json
+import pytest
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+import quack.server
+from quack.server import create_server
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Create a Quack server with a private job database."""
+    monkeypatch.setattr(quack.server, "JOB_DB_PATH", str(tmp_path / "jobs.db"))
+    return create_server()
+
+
+@pytest.mark.asyncio
+async def test_quick_check_reports_pyflakes_issues(server):
+    """Test that pyflakes runs for submissions asking for a quick check."""
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        response = await client.call_tool(
+            "submit_code", {"job_type": "lint", "code": "import os\n", "quick_check": True}
+        )
+        data = json.loads(response.content[0].text)
+        await client.call_tool("wait_for_jobs", {"job_ids": [data["job_id"]], "timeout": 30})
+
+    assert data["quick_result"]["pyflakes"] is True
+    assert [issue["type"] for issue in data["quick_result"]["issues"]] == ["UnusedImport"]
@@ -85,3 +85,27 @@ async def test_job_listing(job_manager):
     # Verify we have stats
     assert 'by_status' in stats, "No status stats returned"
     assert 'by_type' in stats, "No type stats returned"
+
+def test_metrics_route():
+    """Test that the SSE app serves Prometheus metrics at /metrics."""
+    from starlette.testclient import TestClient
+    from quack.server import create_server
+
+    with TestClient(create_server().sse_app()) as client:
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE quack_job_execution_seconds histogram" in response.text
+    assert 'quack_pool_workers{pool="pylint"}' in response.text
+
+
+def test_default_job_database_is_per_directory(tmp_path):
+    """Test that servers started in different directories do not share a job database."""
+    from quack.server import SHARED_JOB_DB_PATH, default_job_db_path
+
+    first, second = tmp_path / "first", tmp_path / "second"
+
+    assert default_job_db_path(str(first)) == default_job_db_path(str(first))
+    assert default_job_db_path(str(first)) != default_job_db_path(str(second))
+    assert SHARED_JOB_DB_PATH not in (default_job_db_path(str(first)), default_job_db_path(str(second)))
@@ -0,0 +1,150 @@
+"""
+Integration test for job completion waiting and notifications.
+
+This test connects an in-memory MCP client to the Quack server.
+"""
+
+import asyncio
+import json
+import os
+import pytest
+
+from mcp import types
+from mcp.shared.exceptions import McpError
+from mcp.shared.memory import create_connected_server_and_client_session
+from pydantic import AnyUrl
+
+import quack.server
+from quack.jobs.workspaces import shared_workspaces
+from quack.server import create_server
+
+CODE = "import os\n"
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Create a Quack server with a private job database."""
+    monkeypatch.setattr(quack.server, "JOB_DB_PATH", str(tmp_path / "jobs.db"))
+    return create_server()
+
+
+async def submit(client, job_type, code=CODE):
+    response = await client.call_tool("submit_code", {"job_type": job_type, "code": code})
+    return json.loads(response.content[0].text)["job_id"]
+
+
+@pytest.mark.asyncio
+async def test_wait_for_jobs_returns_results(server):
+    """Test that wait_for_jobs returns once all jobs have finished."""
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        job_ids = [await submit(client, "lint"), await submit(client, "lint", "x = 1\n")]
+
+        response = await client.call_tool("wait_for_jobs", {"job_ids": job_ids, "wait_for_all": True})
+        data = json.loads(response.content[0].text)
+
+    assert data["status"] == "completed"
+    assert sorted(data["finished"]) == sorted(job_ids)
+    for job_id in job_ids:
+        assert data["jobs"][job_id]["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_wait_for_jobs_times_out(server):
+    """Test that wait_for_jobs reports unknown jobs and honours the timeout."""
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        response = await client.call_tool("wait_for_jobs", {"job_ids": ["missing"], "timeout": 0.1})
+        data = json.loads(response.content[0].text)
+
+    assert data["jobs"]["missing"]["status"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_job_resource_sends_update_notification(server):
+    """Test that subscribing to a job resource delivers a resource-updated notification."""
+    updated = asyncio.Event()
+    updated_uris = []
+
+    async def message_handler(message):
+        if isinstance(message, types.ServerNotification) and isinstance(message.root, types.ResourceUpdatedNotification):
+            updated_uris.append(str(message.root.params.uri))
+            updated.set()
+
+    async with create_connected_server_and_client_session(
+        server._mcp_server, message_handler=message_handler
+    ) as client:
+        job_id = await submit(client, "lint", "y = 2\n")
+        uri = f"quack://jobs/{job_id}"
+        await client.subscribe_resource(AnyUrl(uri))
+
+        await asyncio.wait_for(updated.wait(), timeout=30)
+        contents = await client.read_resource(AnyUrl(uri))
+
+    assert updated_uris == [uri]
+    assert json.loads(contents.contents[0].text)["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_job_trace_and_export(server):
+    """Test that job results include stage spans on request and export as a Chrome trace."""
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        job_id = await submit(client, "lint")
+        await client.call_tool("wait_for_jobs", {"job_ids": [job_id]})
+
+        response = await client.call_tool("get_job_results", {"job_id": job_id})
+        assert "trace" not in json.loads(response.content[0].text)
+        response = await client.call_tool("get_job_results", {"job_id": job_id, "trace": True})
+        spans = json.loads(response.content[0].text)["trace"]
+
+        response = await client.call_tool("export_job_traces", {"job_ids": [job_id, "missing"]})
+        exported = json.loads(response.content[0].text)
+
+    assert "pylint" in [span["name"] for span in spans]
+    assert all(span["offset"] >= 0 for span in spans)
+    assert exported["missing"] == ["missing"]
+    assert len([event for event in exported["traceEvents"] if event["ph"] == "X"]) == len(spans)
+
+
+@pytest.mark.asyncio
+async def test_sessions_share_the_job_manager(server):
+    """Test that a session ending leaves the jobs and workers of other sessions running."""
+    async with create_connected_server_and_client_session(server._mcp_server) as first:
+        async with create_connected_server_and_client_session(server._mcp_server) as second:
+            job_id = await submit(second, "lint", "z = 3\n")
+        # The first session sees the second session's job and can still lint
+        response = await first.call_tool("wait_for_jobs", {"job_ids": [job_id], "timeout": 30})
+        data = json.loads(response.content[0].text)
+        other_id = await submit(first, "lint")
+        response = await first.call_tool("wait_for_jobs", {"job_ids": [other_id], "timeout": 30})
+
+    assert data["jobs"][job_id]["status"] == "completed"
+    assert json.loads(response.content[0].text)["jobs"][other_id]["status"] == "completed"
+    assert quack.server._process_state is None
+
+
+@pytest.mark.asyncio
+async def test_session_end_keeps_shared_workspaces(server):
+    """Test that workspaces shared by the process outlive a session."""
+    workspaces = shared_workspaces()
+    workspace = workspaces.acquire(10)
+    with open(os.path.join(workspace, "module.py"), "w") as f:
+        f.write(CODE)
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        await submit(client, "lint")
+
+    assert os.path.isfile(os.path.join(workspace, "module.py"))
+    workspaces.release(workspace)
+
+
+@pytest.mark.asyncio
+async def test_subscriptions_are_not_kept_for_unknown_jobs_or_closed_sessions(server):
+    """Test that unknown jobs cannot be subscribed to and subscriptions end with their session."""
+    async with create_connected_server_and_client_session(server._mcp_server) as first:
+        with pytest.raises(McpError, match="No job found"):
+            await first.subscribe_resource(AnyUrl("quack://jobs/missing"))
+        async with create_connected_server_and_client_session(server._mcp_server) as second:
+            job_id = await submit(second, "lint", "w = 4\n")
+            await second.subscribe_resource(AnyUrl(f"quack://jobs/{job_id}"))
+            assert len(quack.server._process_state["subscriptions"]) == 2
+        subscriptions = list(quack.server._process_state["subscriptions"])
+
+    assert subscriptions == [{}]
@@ -0,0 +1,72 @@
+"""
+Integration test for the watch mode tools.
+
+This test connects an in-memory MCP client to the Quack server and watches
+a temporary directory with the real pylint processor.
+"""
+
+import asyncio
+import json
+import pytest
+
+from mcp.shared.memory import create_connected_server_and_client_session
+
+import quack.server
+from quack.server import create_server
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """Create a Quack server with a private job database."""
+    monkeypatch.setattr(quack.server, "JOB_DB_PATH", str(tmp_path / "jobs.db"))
+    return create_server()
+
+
+async def call(client, tool, arguments=None):
+    response = await client.call_tool(tool, arguments or {})
+    return json.loads(response.content[0].text)
+
+
+@pytest.mark.asyncio
+async def test_watch_directory_serves_latest_findings(server, tmp_path):
+    """Test that findings of a watched file follow its changes on disk."""
+    project = tmp_path / "project"
+    project.mkdir()
+    (project / "mod.py").write_text('"""Module."""\nimport os\n')
+
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        data = await call(client, "watch_directory", {"path": str(project), "job_types": ["lint"]})
+        assert data["status"] == "watching"
+
+        for _ in range(300):
+            data = await call(client, "get_file_findings", {"path": "mod.py"})
+            if data["status"] == "up_to_date":
+                break
+            await asyncio.sleep(0.05)
+        assert data["revision"] == 1
+        assert "unused-import" in [finding["rule"] for finding in data["findings"]]
+
+        (project / "mod.py").write_text('"""Module."""\n')
+        for _ in range(300):
+            data = await call(client, "get_file_findings", {"path": str(project / "mod.py")})
+            if data["revision"] == 2 and data["status"] == "up_to_date":
+                break
+            await asyncio.sleep(0.05)
+        assert data["findings"] == []
+
+        summary = await call(client, "get_file_findings")
+        assert [state["path"] for state in summary["files"]] == ["mod.py"]
+
+        assert (await call(client, "unwatch_directory", {"path": str(project)}))["status"] == "stopped"
+        data = await call(client, "get_file_findings", {"path": "mod.py"})
+        assert data["status"] == "error"
+
+
+@pytest.mark.asyncio
+async def test_watch_directory_rejects_invalid_requests(server, tmp_path):
+    """Test that unknown job types and missing directories are errors."""
+    async with create_connected_server_and_client_session(server._mcp_server) as client:
+        data = await call(client, "watch_directory", {"path": str(tmp_path), "job_types": ["coverage"]})
+        assert data["status"] == "error"
+        data = await call(client, "watch_directory", {"path": str(tmp_path / "missing")})
+        assert data["status"] == "error"
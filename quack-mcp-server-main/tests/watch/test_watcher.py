@@ -0,0 +1,113 @@
+"""
+Test for watch mode.
+
+This file tests that watched files are re-analysed after bursts of
+changes settle, with inotify and with the polling fallback.
+"""
+
+import asyncio
+import sys
+import time
+import pytest
+
+from quack.jobs.base import JobProcessor
+from quack.jobs.enums import JobStatus, JobType
+from quack.jobs.factory import JobFactory
+from quack.jobs.manager import JobManager
+from quack.watcher import DirectoryWatcher, InotifyObserver, PollingObserver
+
+
+class RecordingProcessor(JobProcessor):
+    """Lint processor reporting the first line of each file as a warning"""
+
+    cacheable = False
+
+    def __init__(self):
+        self.codes = []
+
+    async def process(self, job):
+        self.codes.append(job.code)
+        job.status = JobStatus.COMPLETED
+        job.result = {"errors": [], "refactors": [], "conventions": [], "warnings": [{
+            "type": "warning", "line": 1, "column": 0, "symbol": "first-line", "message": job.code.splitlines()[0]
+        }]}
+        job.completed_at = time.time()
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    """Register a recording lint processor."""
+    processor = RecordingProcessor()
+    monkeypatch.setitem(JobFactory.processors, JobType.LINT, processor)
+    return processor
+
+
+async def until(predicate, timeout=10.0):
+    """Wait until the predicate holds."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.02)
+
+
+def findings(watcher, path):
+    """Messages of the findings of a watched file."""
+    state = watcher.find(path)
+    return None if state is None else [finding["message"] for finding in state.to_dict()["findings"]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("use_inotify", [True, False])
+async def test_burst_of_writes_is_analysed_once(tmp_path, processor, use_inotify):
+    """Test that several quick writes to a file lead to one analysis of its final content."""
+    (tmp_path / "mod.py").write_text("x = 0\n")
+    watcher = DirectoryWatcher(
+        str(tmp_path), JobManager(), [JobType.LINT], debounce=0.3, use_inotify=use_inotify, poll_interval=0.05
+    )
+    watcher.start()
+    try:
+        if use_inotify and sys.platform.startswith("linux"):
+            assert isinstance(watcher.observer, InotifyObserver)
+        else:
+            assert isinstance(watcher.observer, PollingObserver)
+        await until(lambda: findings(watcher, "mod.py") == ["x = 0"])
+
+        for value in range(1, 6):
+            (tmp_path / "mod.py").write_text(f"x = {value}\n")
+            await asyncio.sleep(0.02)
+        await until(lambda: findings(watcher, "mod.py") == ["x = 5"])
+        await asyncio.sleep(0.5)
+    finally:
+        watcher.close()
+
+    assert processor.codes == ["x = 0\n", "x = 5\n"]
+    state = watcher.find(str(tmp_path / "mod.py")).to_dict()
+    assert state["revision"] == 2
+    assert state["status"] == "up_to_date"
+    assert state["analyses"]["pylint"]["stale"] is False
+
+
+@pytest.mark.asyncio
+async def test_only_changed_modules_are_reanalysed(tmp_path, processor):
+    """Test that unchanged saves are skipped and new, moved and deleted files are tracked."""
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "b.py").write_text("b = 1\n")
+    watcher = DirectoryWatcher(str(tmp_path), JobManager(), [JobType.LINT], debounce=0.05)
+    watcher.start()
+    try:
+        await until(lambda: len(processor.codes) == 2 and not watcher.summary()["analyzing"])
+
+        # Rewriting the same content does not resubmit the file
+        (tmp_path / "a.py").write_text("a = 1\n")
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / "c.py").write_text("c = 1\n")
+        await until(lambda: watcher.find("pkg/c.py") is not None and findings(watcher, "pkg/c.py") == ["c = 1"])
+        assert watcher.summary()["unchanged_skipped"] >= 1
+
+        (tmp_path / "b.py").unlink()
+        await until(lambda: watcher.find("b.py") is None)
+    finally:
+        watcher.close()
+
+    assert sorted(processor.codes) == ["a = 1\n", "b = 1\n", "c = 1\n"]
+    assert sorted(watcher.files) == [str(tmp_path / "a.py"), str(tmp_path / "pkg" / "c.py")]
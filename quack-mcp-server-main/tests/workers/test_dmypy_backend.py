@@ -0,0 +1,90 @@
+"""
+Test for the dmypy backend.
+
+This file tests the warm mypy daemons used for static analysis.
+"""
+
+import asyncio
+import gc
+import json
+import os
+import signal
+import tempfile
+import weakref
+import pytest
+
+from quack.workers.dmypy import DmypyBackend, _Claim
+from quack.processors.static_analysis import MYPY_FLAGS
+
+BAD_CODE = 'def add(a: int, b: int) -> int:\n    return a + b\n\nadd("5", 10)\n'
+
+
+@pytest.fixture
+def code_file():
+    """Create a temporary Python file with a type error."""
+    fd, path = tempfile.mkstemp(suffix=".py", text=True)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(BAD_CODE)
+    yield path
+    os.remove(path)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    """Create a dmypy backend with a private cache directory."""
+    backend = DmypyBackend(cache_dir=str(tmp_path / "cache"))
+    yield backend
+    backend.close()
+
+
+def test_daemon_reports_type_errors(backend, code_file):
+    """Test that repeated checks on a warm daemon report the type error."""
+    async def run_checks():
+        return [await backend.check([code_file], MYPY_FLAGS) for _ in range(2)]
+
+    responses = asyncio.run(run_checks())
+
+    for response in responses:
+        assert "arg-type" in response["out"]
+    assert backend.get_stats()["daemons"] == 1
+
+
+def test_daemon_restarts_after_crash(backend, code_file):
+    """Test that a killed daemon is restarted transparently."""
+    asyncio.run(backend.check([code_file], MYPY_FLAGS))
+
+    daemon = backend._daemons[0]
+    with open(daemon.status_file) as f:
+        os.kill(json.load(f)["pid"], signal.SIGKILL)
+
+    response = asyncio.run(backend.check([code_file], MYPY_FLAGS))
+
+    assert "arg-type" in response["out"]
+    assert backend.get_stats()["restarts"] == 1
+
+
+def test_late_cancellation_leaves_daemon_alone(backend, code_file):
+    """Test that cancelling a check after it finished does not kill the daemon."""
+    claim = _Claim()
+    backend._check([code_file], MYPY_FLAGS, 30.0, claim, 0.0)
+    daemon = backend._daemons[0]
+    pid = daemon.pid()
+    claim.cancel()
+
+    response = asyncio.run(backend.check([code_file], MYPY_FLAGS))
+
+    assert "arg-type" in response["out"]
+    assert daemon.pid() == pid
+    assert backend.get_stats()["restarts"] == 0
+
+
+def test_closed_backends_leave_no_exit_hooks(tmp_path, code_file):
+    """Test that a closed backend is not kept alive by an exit hook."""
+    backend = DmypyBackend(cache_dir=str(tmp_path / "cache"))
+    asyncio.run(backend.check([code_file], MYPY_FLAGS))
+    backend.close()
+    closed = weakref.ref(backend)
+    del backend
+    gc.collect()
+
+    assert closed() is None
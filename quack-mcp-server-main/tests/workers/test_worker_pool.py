@@ -0,0 +1,235 @@
+"""
+Test for the worker pool.
+
+This file tests the pre-warmed pylint worker pool.
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import pytest
+
+from quack.workers.pool import Worker, WorkerPool, WorkerLimitError, _Request
+from quack.workers.resources import ResourceLimits
+
+BAD_CODE = "import os\nx = 1\n"
+
+
+@pytest.fixture
+def code_file():
+    """Create a temporary Python file with a few lint issues."""
+    fd, path = tempfile.mkstemp(suffix=".py", text=True)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(BAD_CODE)
+    yield path
+    os.remove(path)
+
+
+def test_pool_runs_pylint(code_file):
+    """Test that a worker lints a file and reports JSON messages."""
+    pool = WorkerPool("quack.workers.pylint_worker", size=1)
+    try:
+        response = asyncio.run(pool.submit({"paths": [code_file]}))
+    finally:
+        pool.close()
+
+    assert response["ok"], response
+    symbols = {message["symbol"] for message in json.loads(response["output"])}
+    assert "unused-import" in symbols
+
+
+def test_pool_recycles_workers(code_file):
+    """Test that workers are replaced after serving their job quota."""
+    pool = WorkerPool("quack.workers.pylint_worker", size=1, max_jobs_per_worker=2)
+
+    async def run_jobs():
+        for _ in range(3):
+            await pool.submit({"paths": [code_file]})
+
+    try:
+        asyncio.run(run_jobs())
+        stats = pool.get_stats()
+    finally:
+        pool.close()
+
+    assert stats["jobs_served"] == 3
+    assert stats["workers_recycled"] == 1
+    assert stats["workers_started"] == 2
+
+
+def test_pool_handles_concurrent_jobs(code_file):
+    """Test that concurrent submissions are spread over the workers."""
+    pool = WorkerPool("quack.workers.pylint_worker", size=2)
+
+    async def run_jobs():
+        return await asyncio.gather(*(pool.submit({"paths": [code_file]}) for _ in range(4)))
+
+    try:
+        responses = asyncio.run(run_jobs())
+        stats = pool.get_stats()
+    finally:
+        pool.close()
+
+    assert all(response["ok"] for response in responses)
+    assert stats["workers_started"] == 2
+    assert stats["busy"] == 0
+
+
+def test_pool_reports_worker_errors():
+    """Test that a failing request is reported without killing the worker."""
+    pool = WorkerPool("quack.workers.pylint_worker", size=1)
+    try:
+        response = asyncio.run(pool.submit({"no_paths": True}))
+        stats = pool.get_stats()
+    finally:
+        pool.close()
+
+    assert not response["ok"]
+    assert "KeyError" in response["error"]
+    assert stats["workers_started"] == 1
+
+
+def is_running(pid):
+    """Check whether a process exists and is not a zombie."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_pool_cancel_kills_process_tree(tmp_path):
+    """Test that cancelling a request kills the worker and the processes it started."""
+    pid_file = tmp_path / "child.pid"
+    (tmp_path / "test_hang.py").write_text(
+        "import subprocess, time\n\n"
+        "def test_hang():\n"
+        "    child = subprocess.Popen(['sleep', '60'])\n"
+        f"    open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+        "    time.sleep(60)\n"
+    )
+    pool = WorkerPool("quack.workers.pytest_worker", size=1)
+
+    async def cancel_request():
+        task = asyncio.create_task(pool.submit({"paths": [str(tmp_path / "test_hang.py")], "rootdir": str(tmp_path)}))
+        while not pid_file.exists() or not pid_file.read_text():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    try:
+        asyncio.run(asyncio.wait_for(cancel_request(), 30))
+        child_pid = int(pid_file.read_text())
+        deadline = time.time() + 5
+        while is_running(child_pid) and time.time() < deadline:
+            time.sleep(0.1)
+        assert not is_running(child_pid)
+    finally:
+        pool.close()
+
+
+def test_pool_reports_usage(code_file):
+    """Test that every response carries the request's resource usage."""
+    pool = WorkerPool("quack.workers.pylint_worker", size=1)
+    try:
+        response = asyncio.run(pool.submit({"paths": [code_file]}))
+    finally:
+        pool.close()
+
+    usage = response["usage"]
+    assert usage["cpu_time"] > 0
+    assert usage["peak_rss_kb"] > 0
+    assert usage["output_bytes"] > len(response["output"])
+
+
+def test_pool_enforces_limits(tmp_path):
+    """Test that a test over its memory or CPU limit cannot take the host with it."""
+    (tmp_path / "test_memory.py").write_text("def test_memory():\n    data = bytearray(512 * 1024 * 1024)\n")
+    (tmp_path / "test_spin.py").write_text("def test_spin():\n    while True:\n        pass\n")
+    pool = WorkerPool("quack.workers.pytest_worker", size=1, limits=ResourceLimits(cpu_time=1, memory_mb=256))
+
+    async def run(name):
+        return await pool.submit({"paths": [str(tmp_path / name)], "rootdir": str(tmp_path)}, timeout=30)
+
+    try:
+        response = asyncio.run(run("test_memory.py"))
+        assert response["tests"][0]["outcome"] == "failed"
+        assert "MemoryError" in response["tests"][0]["message"]
+
+        with pytest.raises(WorkerLimitError):
+            asyncio.run(run("test_spin.py"))
+    finally:
+        pool.close()
+
+
+def test_pytest_worker_isolates_jobs(tmp_path):
+    """Test that a test changing the interpreter does not affect later jobs on the same worker."""
+    (tmp_path / "test_patch.py").write_text("import math\n\ndef test_a():\n    math.pi = 3\n")
+    (tmp_path / "test_check.py").write_text("import math\n\ndef test_b():\n    assert math.pi > 3.14\n")
+    pool = WorkerPool("quack.workers.pytest_worker", size=1)
+
+    async def run(name):
+        return await pool.submit({"paths": [str(tmp_path / name)], "rootdir": str(tmp_path)}, timeout=30)
+
+    try:
+        assert asyncio.run(run("test_patch.py"))["tests"][0]["outcome"] == "passed"
+        response = asyncio.run(run("test_check.py"))
+        stats = pool.get_stats()
+    finally:
+        pool.close()
+
+    assert response["tests"][0]["outcome"] == "passed"
+    # Both jobs were served by the same warm worker
+    assert stats["workers_started"] == 1
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_pool_reports_peak_rss_per_request(tmp_path):
+    """Test that a small job after a large one on the same worker reports its own peak."""
+    (tmp_path / "test_large.py").write_text("def test_large():\n    data = bytearray(256 * 1024 * 1024)\n")
+    (tmp_path / "test_small.py").write_text("def test_small():\n    assert True\n")
+    pool = WorkerPool("quack.workers.pytest_worker", size=1)
+
+    async def run(name):
+        return await pool.submit({"paths": [str(tmp_path / name)], "rootdir": str(tmp_path)}, timeout=30)
+
+    try:
+        large = asyncio.run(run("test_large.py"))["usage"]["peak_rss_kb"]
+        small = asyncio.run(run("test_small.py"))["usage"]["peak_rss_kb"]
+    finally:
+        pool.close()
+
+    assert large > 256 * 1024
+    assert small < 128 * 1024
+
+
+def test_stopped_workers_close_their_pipes():
+    """Test that stopping a worker, running or already killed, closes its pipes."""
+    workers = [Worker("quack.workers.pylint_worker", "test") for _ in range(2)]
+    workers[1].kill()
+    workers[1].process.wait()
+
+    for worker in workers:
+        worker.stop()
+        assert worker.process.stdin.closed
+        assert worker.process.stdout.closed
+
+
+def test_late_cancellation_leaves_worker_alone(code_file):
+    """Test that cancelling a request after it finished does not kill the worker serving the next one."""
+    pool = WorkerPool("quack.workers.pylint_worker", size=1)
+    try:
+        request = _Request()
+        pool._run({"paths": [code_file]}, None, request)
+        request.cancel()
+        response = asyncio.run(pool.submit({"paths": [code_file]}))
+        stats = pool.get_stats()
+    finally:
+        pool.close()
+
+    assert response["ok"]
+    assert stats["workers_started"] == 1